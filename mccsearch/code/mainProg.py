@@ -45,40 +45,56 @@ def main():
     # ---------------------------------------------------------------------------------
 
 
+    #the state of this search, with the user defined variables in mccSearch or e.g. 
+    # context = mccSearch.SearchContext(mccSearch.SearchConfig(T_BB_MAX=233))
+    context = mccSearch.SearchContext()
+
     #create main directory and file structure for storing intel
-    mccSearch.createMainDirectory(mainDirStr)
+    mccSearch.createMainDirectory(context, mainDirStr)
     TRMMCEdirName = mainDirStr+'/TRMMnetcdfCEs'
     CEdirName = mainDirStr+'/MERGnetcdfCEs'
 
     # for doing some postprocessing with the clipped datasets instead of running the full program, e.g.
-    # mccSearch.postProcessingNetCDF(3,CEoriDirName)
-    # mccSearch.postProcessingNetCDF(2)
+    # mccSearch.postProcessingNetCDF(context, 3,CEoriDirName)
+    # mccSearch.postProcessingNetCDF(context, 2)
+    # -------------------------------------------------------------------------------------------------
+
+    # for going on from the graphs saved by an earlier run in mainDirStr instead of finding the CEs and the cloud clusters again, 
+    # e.g. to find the MCCs with other MCC criteria
+    # if mccSearch.loadCheckpoint(context) == 'cloudClusters':
+    #     MCCList,MCSList = mccSearch.findMCC(context, context.prunedGraph)
     # -------------------------------------------------------------------------------------------------
 
     #let's go!
     print "\n -------------- Read MERG Data ----------"
-    mergImgs, timeList = mccSearch.readMergData(CEoriDirName)
+    mergImgs, timeList = mccSearch.readMergData(context, CEoriDirName)
     print ("-"*80)
 
     print 'in main', len(mergImgs)
     #print 'timeList', timeList
     print 'TRMMdirName ', TRMMdirName
     print "\n -------------- TESTING findCloudElements ----------"
-    CEGraph = mccSearch.findCloudElements(mergImgs,timeList,TRMMdirName)
+    CEGraph = mccSearch.findCloudElements(context, mergImgs,timeList,TRMMdirName)
     #if the TRMMdirName wasnt entered for whatever reason, you can still get the TRMM data this way
-    # CEGraph = mccSearch.findCloudElements(mergImgs,timeList)
-    # allCETRMMList=mccSearch.findPrecipRate(TRMMdirName,timeList)
+    # CEGraph = mccSearch.findCloudElements(context, mergImgs,timeList)
+    # allCETRMMList=mccSearch.findPrecipRate(context, TRMMdirName,timeList)
+    #for long records, save the CEs found every 24 frames so that a run that stopped goes on from its last checkpoint when it is run again
+    # CEGraph = mccSearch.findCloudElements(context, mergImgs,timeList,TRMMdirName,checkpointFrames=24)
+    #for long records, stream the MERG files instead of reading them all at once, and use several processes
+    # CEGraph = mccSearch.findCloudElementsInFiles(context, CEoriDirName, TRMMdirName=TRMMdirName, processes=4)
+    #to compare the results of other criteria on the same MERG data, e.g.
+    # sweepResults = mccSearch.runSweep(context, mergImgs, timeList, [{'T_BB_MAX': 233}, {'T_BB_MAX': 223, 'AREA_MIN': 3000.0}], TRMMdirName)
     # ----------------------------------------------------------------------------------------------
     print ("-"*80)
     print "number of nodes in CEGraph is: ", CEGraph.number_of_nodes()
     print ("-"*80)    
     print "\n -------------- TESTING findCloudClusters ----------"
-    prunedGraph = mccSearch.findCloudClusters(CEGraph)
+    prunedGraph = mccSearch.findCloudClusters(context, CEGraph)
     print ("-"*80)
     print "number of nodes in prunedGraph is: ", prunedGraph.number_of_nodes()
     print ("-"*80)
     print "\n -------------- TESTING findMCCs ----------"
-    MCCList,MCSList = mccSearch.findMCC(prunedGraph)
+    MCCList,MCSList = mccSearch.findMCC(context, prunedGraph)
     print ("-"*80)
     print "MCC List has been acquired ", len(MCCList)
     print "MCS List has been acquired ", len(MCSList)
@@ -87,22 +103,22 @@ def main():
     print "\n -------------- TESTING METRICS ----------"
 
     #some calculations/metrics that work that work
-    # print "creating the MCC userfile ", mccSearch.createTextFile(MCCList,1)
-    # print "creating the MCS userfile ", mccSearch.createTextFile(MCSList,2)
-    # MCCTimes, tdelta = mccSearch.temporalAndAreaInfoMetric(MCCList)
+    # print "creating the MCC userfile ", mccSearch.createTextFile(context, MCCList,1)
+    # print "creating the MCS userfile ", mccSearch.createTextFile(context, MCSList,2)
+    # MCCTimes, tdelta = mccSearch.temporalAndAreaInfoMetric(context, MCCList)
     # print "number of MCCs is: ", mccSearch.numberOfFeatures(MCCList)
     # print "longest duration is: ", mccSearch.longestDuration(MCCTimes), "hrs"
     # print "shortest duration is: ", mccSearch.shortestDuration(MCCTimes), "hrs"
     # #print "Average duration is: ", mccSearch.convert_timedelta(mccSearch.averageMCCLength(MCCTimes))
     # print "Average duration is: ", mccSearch.averageDuration(MCCTimes), "hrs"
-    # print "Average size is: ", mccSearch.averageFeatureSize(MCCList), "km^2" 
+    # print "Average size is: ", mccSearch.averageFeatureSize(context, MCCList), "km^2" 
     
     #some plots that work
-    # mccSearch.plotAccTRMM(MCCList)
-    mccSearch.displayPrecip(MCCList)
-    # mccSearch.plotAccuInTimeRange('2009-09-01_00:00:00', '2009-09-01_09:00:00')
-    # mccSearch.displaySize(MCCList)
-    # mccSearch.displayPrecip(MCCList)
+    # mccSearch.plotAccTRMM(context, MCCList)
+    mccSearch.displayPrecip(context, MCCList)
+    # mccSearch.plotAccuInTimeRange(context, '2009-09-01_00:00:00', '2009-09-01_09:00:00')
+    # mccSearch.displaySize(context, MCCList)
+    # mccSearch.displayPrecip(context, MCCList)
     # mccSearch.plotHistogram(MCCList)
     #
     print ("-"*80)
@@ -15,9 +15,11 @@
 #  limitations under the License.
 #
 
+from collections import OrderedDict, deque
 from datetime import timedelta, datetime
 import glob
 import itertools
+import multiprocessing
 from netCDF4 import Dataset, date2num
 import numpy as np
 import numpy.ma as ma
@@ -28,6 +30,7 @@ from scipy import ndimage
 import string
 import subprocess
 import sys
+import tempfile
 import time
 
 import networkx as nx
@@ -44,6 +47,7 @@ import ocw.plotter as plotter
 
 #----------------------- GLOBAL VARIABLES --------------------------
 # --------------------- User defined variables ---------------------
+#these are the defaults of the SearchConfig of each search, a search can use other values e.g. SearchConfig(T_BB_MAX=233)
 #FYI the lat lon values are not necessarily inclusive of the points given. These are the limits
 #the first point closest the the value (for the min) from the MERG data is used, etc.
 LATMIN = '5.0' #min latitude; -ve values in the SH e.g. 5S = -5
@@ -76,21 +80,118 @@ MINIMUM_DURATION = 6 #min number of frames the MCC must exist for (assuming hrly
 MAXIMUM_DURATION = 24#max number of framce the MCC can last for 
 #------------------- End user defined Variables -------------------
 edgeWeight = [1,2,3] #weights for the graph edges
-#graph object fo the CEs meeting the criteria
-CLOUD_ELEMENT_GRAPH = nx.DiGraph()
-#graph meeting the CC criteria
-PRUNED_GRAPH = nx.DiGraph()
+#the user defined variables of the region, which are fixed once the MERG data is read
+GRID_PARAMETERS = ('LATMIN', 'LATMAX', 'LONMIN', 'LONMAX')
+#the columns of the table of the scalar attributes of the CEs of a search, one row per CE
+CE_TABLE_DTYPE = [('uniqueID', 'S32'), ('cloudElementTime', 'M8[s]'), ('latCenter', 'f8'), ('lonCenter', 'f8'), 
+					('cloudElementArea', 'f8'), ('cloudElementEccentricity', 'f8'), ('cloudElementTmax', 'f8'), 
+					('cloudElementTmin', 'f8'), ('cloudElementPrecipTotal', 'f8'), ('TRMMArea', 'f8'), ('CETRMMmax', 'f8'), 
+					('CETRMMmin', 'f8'), ('CriteriaBArea', 'f8'), ('nodeBehaviorIdentifier', 'S1'), ('nodeMCSIdentifier', 'S1')]
+#file in the main directory of a search storing the boxes of all the CEs
+CE_STORE_FILENAME = 'cloudElements.nc'
+#directory in the main directory of a search storing the checkpoints of the graphs after findCloudElements and findCloudClusters
+CHECKPOINT_DIRNAME = 'checkpoints'
+#the user defined variables that the graphs of each stage depend on, a checkpoint is only used by a search with the same values
+CLOUD_ELEMENT_PARAMETERS = GRID_PARAMETERS + ('XRES', 'YRES', 'STRUCTURING_ELEMENT', 'T_BB_MAX', 'CONVECTIVE_FRACTION', 
+											'AREA_MIN', 'MIN_OVERLAP')
+CLOUD_CLUSTER_PARAMETERS = CLOUD_ELEMENT_PARAMETERS + ('MIN_MCS_DURATION',)
+#TRMM data regridded to a MERG grid, by filename and grid, and the weights for regridding it, by grids. 
+#These only depend on the files and the grids, so they are shared by the searches in a process
+TRMM_CACHE = OrderedDict()
+MAX_CACHED_TRMM_FIELDS = 8
+TRMM_REGRID_WEIGHTS = {}
+#the search context and the data shared by the tasks of a worker process of a pool, set by initWorker
+WORKER_STATE = {}
 #------------------------ End GLOBAL VARS -------------------------
+#************************* Search context *************************
+class SearchConfig(object):
+	'''
+	Purpose::
+		The user defined variables of a search i.e. the region, the resolutions and the criteria for the CEs,
+		the cloud clusters and the MCCs
+
+	Input::
+		parameters (optional): the user defined variables that differ from the defaults above as keywords
+			e.g. SearchConfig(T_BB_MAX=233, AREA_MIN=3000.0)
+
+	Assumptions::
+		The defaults are the values of the user defined variables when the SearchConfig is created
+
+	'''
+
+	PARAMETERS = ('LATMIN', 'LATMAX', 'LONMIN', 'LONMAX', 'XRES', 'YRES', 'TRES', 'LAT_DISTANCE', 'LON_DISTANCE', 
+				'STRUCTURING_ELEMENT', 'T_BB_MAX', 'T_BB_MIN', 'CONVECTIVE_FRACTION', 'MIN_MCS_DURATION', 'AREA_MIN', 
+				'MIN_OVERLAP', 'ECCENTRICITY_THRESHOLD_MAX', 'ECCENTRICITY_THRESHOLD_MIN', 'OUTER_CLOUD_SHIELD_AREA', 
+				'INNER_CLOUD_SHIELD_AREA', 'OUTER_CLOUD_SHIELD_TEMPERATURE', 'INNER_CLOUD_SHIELD_TEMPERATURE', 
+				'MINIMUM_DURATION', 'MAXIMUM_DURATION')
+
+	def __init__(self, **parameters):
+		for name in self.PARAMETERS:
+			setattr(self, name, globals()[name])
+		self.update(**parameters)
+
+	def update(self, **parameters):
+		'''Sets some of the user defined variables, raises ValueError for a name that isn't one of them'''
+		unknownNames = sorted(set(parameters) - set(self.PARAMETERS))
+		if unknownNames:
+			raise ValueError('Unknown search parameters: %s' %', '.join(unknownNames))
+
+		for name, value in parameters.items():
+			setattr(self, name, value)
+
+	def copy(self, **parameters):
+		'''Returns a new SearchConfig with the same values except for the parameters given'''
+		newConfig = SearchConfig(**self.asDict())
+		newConfig.update(**parameters)
+		return newConfig
+
+	def asDict(self):
+		'''Returns a dictionary of the user defined variables by name'''
+		return dict((name, getattr(self, name)) for name in self.PARAMETERS)
+#******************************************************************
+class SearchContext(object):
+	'''
+	Purpose::
+		The state of one search: its config, the lat/lon grid of the region, the graphs, the table of the CE attributes 
+		and the main directory, where the output (the CE store, the text files and the images) is stored. 
+		The functions that use the state of a search take its context as their first argument, so several searches
+		can be run in one process
+
+	Input::
+		config (optional): the SearchConfig of the search. The default uses the user defined variables
+		mainDirectory (optional): a string representing the directory for the output, usually set by createMainDirectory
+
+	'''
+
+	def __init__(self, config=None, mainDirectory=None):
+		if config is None:
+			config = SearchConfig()
+
+		self.config = config
+		self.mainDirectory = mainDirectory
+		#the lat/lon grid of the region, set by readMergGrid
+		self.LAT = None
+		self.LON = None
+		#graph object of the CEs meeting the criteria
+		self.cloudElementGraph = nx.DiGraph()
+		#graph meeting the CC criteria
+		self.prunedGraph = nx.DiGraph()
+		#table of the scalar attributes of the CEs in cloudElementGraph, one row per CE, and the row of each CE by uniqueID
+		self.CETable = np.zeros(0, dtype=CE_TABLE_DTYPE)
+		self.CETableIndex = {}
 #************************ Begin Functions *************************
 #******************************************************************
-def readMergData(dirname, filelist = None):
+def readMergData(context, dirname, filelist = None, processes = 1):
 	'''
 	Purpose::
 		Read MERG data into RCMES format
 	
 	Input::
+		context: the SearchContext of the search
 		dirname: a string representing the directory to the MERG files in NETCDF format
 		filelist (optional): a list of strings representing the filenames betweent the start and end dates provided
+		processes (optional): an integer representing the number of files to read in parallel. The default
+			reads the files one after the other
 	
 	Output::
 		A 3D masked array (t,lat,lon) with only the variables which meet the minimum temperature 
@@ -100,112 +201,199 @@ def readMergData(dirname, filelist = None):
 		The MERG data has been converted to NETCDF using LATS4D
 		The data has the same lat/lon format
 
-	TODO:: figure out how to use netCDF4 to do the clipping tmp = netCDF4.Dataset(filelist[0])
-
 	'''
-
-	global LAT
-	global LON
+	config = context.config
 
 	# these strings are specific to the MERG data
 	mergVarName = 'ch4'
-	mergTimeVarName = 'time'
-	mergLatVarName = 'latitude'
-	mergLonVarName = 'longitude'
 	
 	filelistInstructions = dirname + '/*'
 	if filelist == None:
 		filelist = glob.glob(filelistInstructions)
 
-	
-	#sat_img is the array that will contain all the masked frames
-	mergImgs = []
 	#timelist of python time strings
 	timelist = [] 
-	time2store = None
-	tempMaskedValueNp =[]
-	
+	#the files that could be read and the number of frames in each
+	readableFiles = []
+	framesPerFile = []
 
 	filelist.sort()
-	nfiles = len(filelist)
 
-	# Crash nicely if there are no netcdf files
-	if nfiles == 0:
-		print 'Error: no files in this directory! Exiting elegantly'
-		sys.exit()
-	else:
-		# Open the first file in the list to read in lats, lons and generate the  grid for comparison
-		tmp = Dataset(filelist[0], 'r+',format='NETCDF4')
-
-		alllatsraw = tmp.variables[mergLatVarName][:]
-		alllonsraw = tmp.variables[mergLonVarName][:]
-		alllonsraw[alllonsraw > 180] = alllonsraw[alllonsraw > 180] - 360.  # convert to -180,180 if necessary
-		
-		#get the lat/lon info data (different resolution)
-		latminNETCDF = find_nearest(alllatsraw, float(LATMIN))
-		latmaxNETCDF = find_nearest(alllatsraw, float(LATMAX))
-		lonminNETCDF = find_nearest(alllonsraw, float(LONMIN))
-		lonmaxNETCDF = find_nearest(alllonsraw, float(LONMAX))
-		latminIndex = (np.where(alllatsraw == latminNETCDF))[0][0]
-		latmaxIndex = (np.where(alllatsraw == latmaxNETCDF))[0][0]
-		lonminIndex = (np.where(alllonsraw == lonminNETCDF))[0][0]
-		lonmaxIndex = (np.where(alllonsraw == lonmaxNETCDF))[0][0]
-		
-		#subsetting the data
-		latsraw = alllatsraw[latminIndex: latmaxIndex]
-		lonsraw = alllonsraw[lonminIndex:lonmaxIndex]
-		
-		LON, LAT = np.meshgrid(lonsraw, latsraw)
-		#clean up
-		latsraw =[]
-		lonsraw = []
-		nygrd = len(LAT[:, 0]); nxgrd = len(LON[0, :])
-		tmp.close
+	latminIndex, latmaxIndex, lonminIndex, lonmaxIndex = readMergGrid(context, filelist)
+	nygrd = len(context.LAT[:, 0]); nxgrd = len(context.LON[0, :])
 	
+	#read the times first so that the array for all the frames is only allocated once
 	for files in filelist:
+		time2store = readMergTimes(files)
+		if time2store is None:
+			continue
+
+		#extend instead of append because readMergTimes returns a list already and we don't 
+		#want a list of list
+		timelist.extend(time2store)
+		readableFiles.append(files)
+		framesPerFile.append(len(time2store))
+
+	mergImgs = np.zeros((len(timelist), nygrd, nxgrd), dtype='int16')
+	fileRegions = [(files, mergVarName, latminIndex, latmaxIndex, lonminIndex, lonmaxIndex, config.T_BB_MAX) 
+					for files in readableFiles]
+
+	if processes > 1:
+		pool = multiprocessing.Pool(processes)
 		try:
-			thisFile = Dataset(files, format='NETCDF4')
-			#clip the dataset according to user lat,lon coordinates
-			tempRaw = thisFile.variables[mergVarName][:,latminIndex:latmaxIndex,lonminIndex:lonmaxIndex].astype('int16')
-			tempMask = ma.masked_array(tempRaw, mask=(tempRaw > T_BB_MAX), fill_value=0) 
-			
-			#get the actual values that the mask returned
-			tempMaskedValue = ma.zeros((tempRaw.shape)).astype('int16')
-			for index, value in maenumerate(tempMask): 
-				time_index, lat_index, lon_index = index			
-				tempMaskedValue[time_index,lat_index, lon_index]=value	
-			
-			xtimes = thisFile.variables[mergTimeVarName]
-			#convert this time to a python datastring
-			time2store, _ = getModelTimes(xtimes, mergTimeVarName)
-			#extend instead of append because getModelTimes returns a list already and we don't 
-			#want a list of list
-			timelist.extend(time2store)
-			mergImgs.extend(tempMaskedValue) 
-			thisFile.close
-			thisFile = None
-			
-		except:
-			print "bad file! ", files
+			allFrames = pool.imap(readMergFrames, fileRegions)
+			firstFrame = 0
+			for frames, nframes in itertools.izip(allFrames, framesPerFile):
+				mergImgs[firstFrame:firstFrame + nframes] = frames
+				firstFrame += nframes
+		finally:
+			pool.terminate()
+			pool.join()
+	else:
+		firstFrame = 0
+		for fileRegion, nframes in itertools.izip(fileRegions, framesPerFile):
+			mergImgs[firstFrame:firstFrame + nframes] = readMergFrames(fileRegion)
+			firstFrame += nframes
 
 	mergImgs = ma.array(mergImgs)
 
 	return mergImgs, timelist
 #******************************************************************
-def findCloudElements(mergImgs,timelist,TRMMdirName=None):
+def readMergGrid(context, filelist):
+	'''
+	Purpose::
+		Sets the lat/lon grid of the region (context.LAT, context.LON) from the first MERG file 
+	
+	Input::
+		context: the SearchContext of the search
+		filelist: a sorted list of strings representing the MERG filenames
+	
+	Output::
+		latminIndex, latmaxIndex, lonminIndex, lonmaxIndex: integers representing the start and end indices of 
+		the latitudes and longitudes of the region in the MERG files
+
+	Assumptions::
+		The MERG files have the same lat/lon format
+
+	'''
+	config = context.config
+
+	# these strings are specific to the MERG data
+	mergLatVarName = 'latitude'
+	mergLonVarName = 'longitude'
+
+	# Crash nicely if there are no netcdf files
+	if len(filelist) == 0:
+		print 'Error: no files in this directory! Exiting elegantly'
+		sys.exit()
+
+	# Open the first file in the list to read in lats, lons and generate the  grid for comparison
+	tmp = Dataset(filelist[0], 'r', format='NETCDF4')
+
+	#the grid has no missing values, and plain arrays are much faster to index box by box
+	alllatsraw = ma.getdata(tmp.variables[mergLatVarName][:])
+	alllonsraw = ma.getdata(tmp.variables[mergLonVarName][:])
+	alllonsraw[alllonsraw > 180] = alllonsraw[alllonsraw > 180] - 360.  # convert to -180,180 if necessary
+	
+	#get the lat/lon info data (different resolution)
+	latminNETCDF = find_nearest(alllatsraw, float(config.LATMIN))
+	latmaxNETCDF = find_nearest(alllatsraw, float(config.LATMAX))
+	lonminNETCDF = find_nearest(alllonsraw, float(config.LONMIN))
+	lonmaxNETCDF = find_nearest(alllonsraw, float(config.LONMAX))
+	latminIndex = (np.where(alllatsraw == latminNETCDF))[0][0]
+	latmaxIndex = (np.where(alllatsraw == latmaxNETCDF))[0][0]
+	lonminIndex = (np.where(alllonsraw == lonminNETCDF))[0][0]
+	lonmaxIndex = (np.where(alllonsraw == lonmaxNETCDF))[0][0]
+	
+	#subsetting the data
+	latsraw = alllatsraw[latminIndex: latmaxIndex]
+	lonsraw = alllonsraw[lonminIndex:lonmaxIndex]
+	
+	context.LON, context.LAT = np.meshgrid(lonsraw, latsraw)
+	tmp.close()
+
+	return latminIndex, latmaxIndex, lonminIndex, lonmaxIndex
+#******************************************************************
+def readMergTimes(fileName):
+	'''
+	Purpose::
+		Read the times of the frames in one MERG file
+	
+	Input::
+		fileName: a string representing the MERG filename
+	
+	Output::
+		A list of python datetimes, or None if the file can't be read
+
+	'''
+
+	mergTimeVarName = 'time'
+
+	try:
+		thisFile = Dataset(fileName, 'r', format='NETCDF4')
+	except (IOError, RuntimeError):
+		print "bad file! ", fileName
+		return None
+
+	try:
+		xtimes = thisFile.variables[mergTimeVarName]
+		#convert this time to a python datastring
+		time2store, _ = getModelTimes(xtimes, mergTimeVarName)
+	except KeyError:
+		print "bad file! ", fileName
+		return None
+	finally:
+		thisFile.close()
+
+	return time2store
+#******************************************************************
+def readMergFrames(fileRegion):
+	'''
+	Purpose::
+		Read the frames of the region from one MERG file. Used by readMergData
+	
+	Input::
+		fileRegion: a tuple of the filename, the name of the variable, the start and end indices of the 
+			latitudes and longitudes of the region and the warmest temperature to keep i.e. T_BB_MAX
+	
+	Output::
+		A 3D int16 array (t,lat,lon) in which the temperatures warmer than the warmest temperature to keep
+		and the missing values are zero
+
+	'''
+
+	fileName, varName, latminIndex, latmaxIndex, lonminIndex, lonmaxIndex, tBBMax = fileRegion
+
+	thisFile = Dataset(fileName, 'r', format='NETCDF4')
+	try:
+		#clip the dataset according to user lat,lon coordinates
+		tempRaw = thisFile.variables[varName][:,latminIndex:latmaxIndex,lonminIndex:lonmaxIndex]
+	finally:
+		thisFile.close()
+
+	frames = ma.getdata(tempRaw).astype('int16')
+	frames[(frames > tBBMax) | ma.getmaskarray(tempRaw)] = 0
+
+	return frames
+#******************************************************************
+def findCloudElements(context, mergImgs,timelist,TRMMdirName=None,checkpointFrames=None):
 	'''
 	Purpose::
 		Determines the contiguous boxes for a given time of the satellite images i.e. each frame
 		using scipy ndimage package
 	
 	Input::	
+		context: the SearchContext of the search
 		mergImgs: masked numpy array in (time,lat,lon),T_bb representing the satellite data. This is masked based on the
 		maximum acceptable temperature, T_BB_MAX
 		timelist: a list of python datatimes
 		TRMMdirName (optional): string representing the path where to find the TRMM datafiles
+		checkpointFrames (optional): an integer representing the number of frames between the checkpoints of the
+			CEs found so far. If the checkpoint of an unfinished run on the same frames is in context.mainDirectory, 
+			the run goes on after its last frame. The default only saves the checkpoint of the finished graph
 		
 	Output::
-		CLOUD_ELEMENT_GRAPH: a Networkx directed graph where each node contains the information in cloudElementDict
+		context.cloudElementGraph: a Networkx directed graph where each node contains the information in cloudElementDict
 		The nodes are determined according to the area of contiguous squares. The nodes are linked through weighted edges.
 
 		cloudElementDict = {'uniqueID': unique tag for this CE, 
@@ -225,624 +413,748 @@ def findCloudElements(mergImgs,timelist,TRMMdirName=None):
 		Assumes we are dealing with MERG data which is 4kmx4km resolved, thus the smallest value 
 		required according to Vila et al. (2008) is 2400km^2 
 		therefore, 2400/16 = 150 contiguous squares
+		The graph is saved in context.mainDirectory/checkpoints for loadCheckpoint
 	'''
 
-	frame = ma.empty((1,mergImgs.shape[1],mergImgs.shape[2]))
-	CEcounter = 0
-	frameCEcounter = 0
-	frameNum = 0
-	cloudElementEpsilon = 0.0
-	cloudElementDict = {} 
-	cloudElementCenter = []		#list with two elements [lat,lon] for the center of a CE
-	prevFrameCEs = []			#list for CEs in previous frame
-	currFrameCEs = []			#list for CEs in current frame
-	cloudElementLat = []		#list for a particular CE's lat values
-	cloudElementLon = []		#list for a particular CE's lon values
-	cloudElementLatLons = []	#list for a particular CE's (lat,lon) values
-	
-	prevLatValue = 0.0
-	prevLonValue = 0.0
-	TIR_min = 0.0
-	TIR_max = 0.0
-	temporalRes = 3 # TRMM data is 3 hourly
-	precipTotal = 0.0
-	CETRMMList =[]
-	precip =[]
-	TRMMCloudElementLatLons =[]
+	progress = None
+	framesDone = 0
+	if checkpointFrames:
+		progress = readCloudElementsProgress(context, TRMMdirName)
+	if progress is not None:
+		framesDone = int(progress['framesDone'])
+		if framesDone > len(timelist) or timelist[framesDone-1] != progress['lastFrameTime'].item():
+			print "The checkpoint of the unfinished run is of other MERG data, starting from the first frame"
+			progress = None
+			framesDone = 0
 
-	minCELatLimit = 0.0
-	minCELonLimit = 0.0
-	maxCELatLimit = 0.0
-	maxCELonLimit = 0.0
-	
-	nygrd = len(LAT[:, 0]); nxgrd = len(LON[0, :])
-	
-	#openfile for storing ALL cloudElement information 
-	cloudElementsFile = open((MAINDIRECTORY+'/textFiles/cloudElements.txt'),'wb')
-	#openfile for storing cloudElement information meeting user criteria i.e. MCCs in this case
-	cloudElementsUserFile = open((MAINDIRECTORY+'/textFiles/cloudElementsUserFile.txt'),'w')
-	
 	#NB in the TRMM files the info is hours since the time thus 00Z file has in 01, 02 and 03 times
-	for t in xrange(mergImgs.shape[0]):
-		#-------------------------------------------------
-		# #textfile name for saving the data for arcgis
-		# thisFileName = MAINDIRECTORY+'/' + (str(timelist[t])).replace(" ", "_") + '.txt'
-		# cloudElementsTextFile = open(thisFileName,'w')
-		#-------------------------------------------------
-
-		#determine contiguous locations with temeperature below the warmest temp i.e. cloudElements in each frame
-	   	frame, CEcounter = ndimage.measurements.label(mergImgs[t,:,:], structure=STRUCTURING_ELEMENT)
-	   	frameCEcounter=0
-		frameNum += 1
-
-		#for each of the areas identified, check to determine if it a valid CE via an area and T requirement
-	   	for count in xrange(CEcounter):
-	   		#[0] is time dimension. Determine the actual values from the data
-	   		#loc is a masked array
-	   		try:
-	   			loc = ndimage.find_objects(frame==(count+1))[0]
-	   		except Exception, e:
-	   			print "Error is ", e
-	   			continue
-
-
-	   		cloudElement = mergImgs[t,:,:][loc]
-	   		labels, lcounter = ndimage.label(cloudElement)
-	   		
-	   		#determine the true lats and lons for this particular CE
-   			cloudElementLat = LAT[loc[0],0]
-   			cloudElementLon = LON[0,loc[1]] 
-   			
-	   		#determine number of boxes in this cloudelement
-	   		numOfBoxes = np.count_nonzero(cloudElement)
-	   		cloudElementArea = numOfBoxes*XRES*YRES
-
-	   		#If the area is greater than the area required, or if the area is smaller than the suggested area, check if it meets a convective fraction requirement
-	   		#consider as CE
-
-	   		if cloudElementArea >= AREA_MIN or (cloudElementArea < AREA_MIN and ((ndimage.minimum(cloudElement, labels=labels))/float((ndimage.maximum(cloudElement, labels=labels)))) < CONVECTIVE_FRACTION ):
-
-	   			#get some time information and labeling info
-	   			frameTime = str(timelist[t])
-	   			frameCEcounter +=1
-	   			CEuniqueID = 'F'+str(frameNum)+'CE'+str(frameCEcounter) 
-
-	   			#-------------------------------------------------
-				#textfile name for accesing CE data using MATLAB code
-				# thisFileName = MAINDIRECTORY+'/' + (str(timelist[t])).replace(" ", "_") + CEuniqueID +'.txt'
-				# cloudElementsTextFile = open(thisFileName,'w')
-				#-------------------------------------------------
-
-				# ------ NETCDF File stuff for brightness temp stuff ------------------------------------
-				thisFileName = MAINDIRECTORY +'/MERGnetcdfCEs/cloudElements'+ (str(timelist[t])).replace(" ", "_") + CEuniqueID +'.nc'
-				currNetCDFCEData = Dataset(thisFileName, 'w', format='NETCDF4')
-				currNetCDFCEData.description = 'Cloud Element '+CEuniqueID + ' temperature data'
-				currNetCDFCEData.calendar = 'standard'
-				currNetCDFCEData.conventions = 'COARDS'
-				# dimensions
-				currNetCDFCEData.createDimension('time', None)
-				currNetCDFCEData.createDimension('lat', len(LAT[:,0]))
-				currNetCDFCEData.createDimension('lon', len(LON[0,:]))
-				# variables
-				tempDims = ('time','lat', 'lon',)
-				times = currNetCDFCEData.createVariable('time', 'f8', ('time',))
-				times.units = 'hours since '+ str(timelist[t])[:-6]
-				latitudes = currNetCDFCEData.createVariable('latitude', 'f8', ('lat',))
-				longitudes = currNetCDFCEData.createVariable('longitude', 'f8', ('lon',))
-				brightnesstemp = currNetCDFCEData.createVariable('brightnesstemp', 'i16',tempDims )
-				brightnesstemp.units = 'Kelvin'
-				# NETCDF data
-				dates=[timelist[t]+timedelta(hours=0)]
-				times[:] =  date2num(dates,units=times.units)
-				longitudes[:] = LON[0,:]
-				longitudes.units = "degrees_east" 
-				longitudes.long_name = "Longitude" 
-
-				latitudes[:] =  LAT[:,0]
-				latitudes.units = "degrees_north"
-				latitudes.long_name ="Latitude"
-				
-				#generate array of zeros for brightness temperature
-				brightnesstemp1 = ma.zeros((1,len(latitudes), len(longitudes))).astype('int16')
-				#-----------End most of NETCDF file stuff ------------------------------------
-
-				#if other dataset (TRMM) assumed to be a precipitation dataset was entered
-				if TRMMdirName:
-					#------------------TRMM stuff -------------------------------------------------
-					fileDate = ((str(timelist[t])).replace(" ", "")[:-8]).replace("-","")
-					fileHr1 = (str(timelist[t])).replace(" ", "")[-8:-6]
-					
-					if int(fileHr1) % temporalRes == 0:
-						fileHr = fileHr1
-					else:
-						fileHr = (int(fileHr1)/temporalRes) * temporalRes
-					if fileHr < 10:
-						fileHr = '0'+str(fileHr)
-					else:
-						str(fileHr)
-
-					#open TRMM file for the resolution info and to create the appropriate sized grid
-					TRMMfileName = TRMMdirName+'/3B42.'+ fileDate + "."+str(fileHr)+".7A.nc"
-					
-					TRMMData = Dataset(TRMMfileName,'r', format='NETCDF4')
-					precipRate = TRMMData.variables['pcp'][:,:,:]
-					latsrawTRMMData = TRMMData.variables['latitude'][:]
-					lonsrawTRMMData = TRMMData.variables['longitude'][:]
-					lonsrawTRMMData[lonsrawTRMMData > 180] = lonsrawTRMMData[lonsrawTRMMData>180] - 360.
-					LONTRMM, LATTRMM = np.meshgrid(lonsrawTRMMData, latsrawTRMMData)
-
-					nygrdTRMM = len(LATTRMM[:,0]); nxgrdTRMM = len(LONTRMM[0,:])
-					precipRateMasked = ma.masked_array(precipRate, mask=(precipRate < 0.0))
-					#---------regrid the TRMM data to the MERG dataset ----------------------------------
-					#regrid using the do_regrid stuff from the Apache OCW 
-					regriddedTRMM = ma.zeros((0, nygrd, nxgrd))
-					#regriddedTRMM = process.do_regrid(precipRateMasked[0,:,:], LATTRMM,  LONTRMM, LAT, LON, order=1, mdi= -999999999)
-					regriddedTRMM = do_regrid(precipRateMasked[0,:,:], LATTRMM,  LONTRMM, LAT, LON, order=1, mdi= -999999999)
-					#----------------------------------------------------------------------------------
+	frameTasks = ((t+1, timelist[t], mergImgs[t,:,:], TRMMdirName) for t in xrange(framesDone, mergImgs.shape[0]))
+
+	return buildCloudElementGraph(context, (findFrameCloudElements(context, frameTask) for frameTask in frameTasks), 
+									checkpointFrames, progress, TRMMdirName)
+#******************************************************************
+def findCloudElementsInFiles(context, dirname, filelist=None, TRMMdirName=None, processes=1, checkpointFrames=None):
+	'''
+	Purpose::
+		Determines the CEs in the MERG files like readMergData followed by findCloudElements, without holding all the frames
+		in memory. The files are read as they are needed and the CEs of the frames in each file are found in a pool of 
+		processes. The CEs are then linked to the CEs of the previous frame in the order of the frames as the results arrive
+
+	Input::
+		context: the SearchContext of the search
+		dirname: a string representing the directory to the MERG files in NETCDF format
+		filelist (optional): a list of strings representing the filenames betweent the start and end dates provided
+		TRMMdirName (optional): string representing the path where to find the TRMM datafiles
+		processes (optional): an integer representing the number of files to find the CEs in in parallel. The default
+			considers the files one after the other
+		checkpointFrames (optional): an integer representing the number of frames between the checkpoints of the
+			CEs found so far, as described in findCloudElements
+
+	Output::
+		context.cloudElementGraph: a Networkx directed graph of the CEs as returned by findCloudElements
+
+	Assumptions::
+		The same as readMergData and findCloudElements
+		At most 2*processes files are read or waiting to be linked at any time
+
+	'''
+	config = context.config
+
+	if filelist == None:
+		filelist = glob.glob(dirname + '/*')
+	filelist = sorted(filelist)
+
+	latminIndex, latmaxIndex, lonminIndex, lonmaxIndex = readMergGrid(context, filelist)
+
+	progress = None
+	framesDone = 0
+	if checkpointFrames:
+		progress = readCloudElementsProgress(context, TRMMdirName)
+	if progress is not None:
+		#the time of the last frame of the checkpoint in these files
+		framesDone = int(progress['framesDone'])
+		lastFrameTime = None
+		frameNum = 1
+		for files in filelist:
+			frameTimes = readMergTimes(files)
+			if frameTimes is None:
+				continue
+			if frameNum + len(frameTimes) > framesDone:
+				lastFrameTime = frameTimes[framesDone - frameNum]
+				break
+			frameNum += len(frameTimes)
+
+		if lastFrameTime != progress['lastFrameTime'].item():
+			print "The checkpoint of the unfinished run is of other MERG data, starting from the first frame"
+			progress = None
+			framesDone = 0
+
+	def fileTasks():
+		#the times are read as the files are needed, for the frame number of the first frame of each file
+		frameNum = 1
+		for files in filelist:
+			frameTimes = readMergTimes(files)
+			if frameTimes is None:
+				continue
+
+			#the frames of the checkpoint are skipped
+			if frameNum + len(frameTimes) > framesDone + 1:
+				fileRegion = (files, 'ch4', latminIndex, latmaxIndex, lonminIndex, lonmaxIndex, config.T_BB_MAX)
+				yield (fileRegion, frameNum, frameTimes, TRMMdirName, max(0, framesDone + 1 - frameNum))
+			frameNum += len(frameTimes)
+
+	if processes > 1:
+		#the pool is started after readMergGrid so that the processes have the lat/lon grid
+		pool = multiprocessing.Pool(processes, initializer=initWorker, initargs=(context,))
+		try:
+			fileResults = imapBounded(pool, findFileCloudElementsInWorker, fileTasks(), 2*processes)
+			return buildCloudElementGraph(context, itertools.chain.from_iterable(fileResults), checkpointFrames, progress, 
+										TRMMdirName)
+		finally:
+			pool.terminate()
+			pool.join()
+	else:
+		fileResults = (findFileCloudElements(context, fileTask) for fileTask in fileTasks())
+		return buildCloudElementGraph(context, itertools.chain.from_iterable(fileResults), checkpointFrames, progress, 
+										TRMMdirName)
+#******************************************************************
+def findFileCloudElements(context, fileTask):
+	'''
+	Purpose::
+		Reads the frames of one MERG file and determines the CEs in each of them. Used by findCloudElementsInFiles
+
+	Input::
+		context: the SearchContext of the search
+		fileTask: a tuple of the fileRegion for readMergFrames, an integer representing the number of the first frame 
+			of the file from 1, a list of python datetimes of the frames in the file, TRMMdirName (or None) and an integer
+			representing the number of frames at the start of the file that were already considered
+
+	Output::
+		A list of the results of findFrameCloudElements for the other frames in the file
+
+	'''
+
+	fileRegion, firstFrameNum, frameTimes, TRMMdirName, skippedFrames = fileTask
+	frames = readMergFrames(fileRegion)
+
+	return [findFrameCloudElements(context, (firstFrameNum + i, frameTimes[i], ma.array(frames[i]), TRMMdirName)) 
+			for i in xrange(skippedFrames, len(frameTimes))]
+#******************************************************************
+def findFileCloudElementsInWorker(fileTask):
+	'''
+	Purpose::
+		findFileCloudElements in a worker process of the pool of findCloudElementsInFiles, with the context 
+		the pool was started with
+
+	Input::
+		fileTask: a tuple as described in findFileCloudElements
+
+	Output::
+		A list of the results of findFrameCloudElements for the frames in the file
+
+	'''
+
+	return findFileCloudElements(WORKER_STATE['context'], fileTask)
+#******************************************************************
+def findFrameCloudElements(context, frameTask):
+	'''
+	Purpose::
+		Determines the CEs in one frame of the satellite images. The frames are independent of each other, 
+		so they can be considered in any order or in parallel
+
+	Input::
+		context: the SearchContext of the search
+		frameTask: a tuple of an integer representing the number of the frame from 1, a python datetime of the frame,
+			a 2D masked array (lat,lon) of T_bb for the frame and TRMMdirName (or None)
+
+	Output::
+		frameTime: the python datetime of the frame
+		frameCEs: a list of the cloudElementDict of each CE in the frame as described in findCloudElements, without
+			'cloudElementLatLon' and 'cloudElementLatLonTRMM'. These lists are slow to send between processes, 
+			so buildCloudElementGraph makes them from the records instead
+		frameCERecords: a list of the records of the CEs for addCloudElementsToStore
+		userFileText: a string representing the information of the CEs for cloudElementsUserFile.txt
+		allFileText: a string representing the information of the CEs for cloudElements.txt, only for the first frame
+
+	'''
+	config = context.config
+
+	frameNum, frameTime, frameValues, TRMMdirName = frameTask
+	frameCEcounter = 0
+	frameCEs = []
+	frameCERecords = []
+	userFileText = []
+	allFileText = []
+
+	#the frames may have been read with a warmer T_BB_MAX than this search's e.g. in runSweep
+	warmerBoxes = ma.getdata(frameValues) > config.T_BB_MAX
+	if warmerBoxes.any():
+		frameValues = ma.where(warmerBoxes, 0, frameValues)
+
+	#determine contiguous locations with temeperature below the warmest temp i.e. cloudElements in each frame
+	frame, CEcounter = ndimage.measurements.label(frameValues, structure=config.STRUCTURING_ELEMENT)
+
+	#determine the properties of all the areas identified in this frame at once
+	frameCEProperties = findCloudElementProperties(frameValues, frame, CEcounter)
+
+	#for each of the areas identified, check to determine if it a valid CE via an area and T requirement
+	for CEProperties in frameCEProperties:
+		loc = CEProperties['boundingBox']
+		latIndices, lonIndices = CEProperties['pixelIndices']
+
+		#determine number of boxes in this cloudelement
+		numOfBoxes = CEProperties['numOfBoxes']
+		cloudElementArea = numOfBoxes*config.XRES*config.YRES
+		convectiveFraction = CEProperties['Tmin']/float(CEProperties['Tmax'])
+
+		#If the area is greater than the area required, or if the area is smaller than the suggested area, check if it meets a convective fraction requirement
+		#consider as CE
+		if not (cloudElementArea >= config.AREA_MIN or (cloudElementArea < config.AREA_MIN and convectiveFraction < config.CONVECTIVE_FRACTION)):
+			continue
+
+		#the values of only this CE in the box bounding it
+		cloudElement = ma.where(frame[loc] == CEProperties['label'], frameValues[loc], 0)
+		TIR_min = CEProperties['Tmin']
+		TIR_max = CEProperties['Tmax']
+
+		#get some labeling info
+		frameCEcounter +=1
+		CEuniqueID = 'F'+str(frameNum)+'CE'+str(frameCEcounter) 
+
+		#the values of the CE's boxes by their indices in the full grid
+		CEValues = ma.getdata(frameValues)[latIndices, lonIndices]
+		CETRMMValues = None
+
+		#if other dataset (TRMM) assumed to be a precipitation dataset was entered
+		if TRMMdirName:
+			#------------------TRMM stuff -------------------------------------------------
+			#the TRMM data regridded to the MERG dataset, read once for all the CEs in its 3 hours 
+			regriddedTRMM = readTRMMRegridded(context, TRMMdirName, frameTime)
+
+			CETRMMValues = ma.filled(regriddedTRMM[latIndices,lonIndices], 0.0)
+
+			#calculate the total precip associated with the feature
+			precipTotal = float(CETRMMValues.sum())
+			TRMMnumOfBoxes = np.count_nonzero(CETRMMValues)
+			TRMMArea = TRMMnumOfBoxes*config.XRES*config.YRES
+			if TRMMnumOfBoxes > 0:
+				maxCEprecipRate = np.max(CETRMMValues[np.nonzero(CETRMMValues)])
+				minCEprecipRate = np.min(CETRMMValues[np.nonzero(CETRMMValues)])
+			else:
+				maxCEprecipRate = 0.0
+				minCEprecipRate = 0.0
+
+		#store the CE's boxes for post processing
+		frameCERecords.append((CEuniqueID, frameTime, latIndices, lonIndices, CEValues, CETRMMValues))
+
+		#determine if the cloud element the shape 
+		cloudElementEpsilon = eccentricity (cloudElement)
+		latCenter, lonCenter = CEProperties['center']
 		
-					# #get the lat/lon info from cloudElement
-					#get the lat/lon info from the file
-					latCEStart = LAT[0][0]
-					latCEEnd = LAT[-1][0]
-					lonCEStart = LON[0][0]
-					lonCEEnd = LON[0][-1]
-					
-					#get the lat/lon info for TRMM data (different resolution)
-					latStartT = find_nearest(latsrawTRMMData, latCEStart)
-					latEndT = find_nearest(latsrawTRMMData, latCEEnd)
-					lonStartT = find_nearest(lonsrawTRMMData, lonCEStart)
-					lonEndT = find_nearest(lonsrawTRMMData, lonCEEnd)
-					latStartIndex = np.where(latsrawTRMMData == latStartT)
-					latEndIndex = np.where(latsrawTRMMData == latEndT)
-					lonStartIndex = np.where(lonsrawTRMMData == lonStartT)
-					lonEndIndex = np.where(lonsrawTRMMData == lonEndT)
-
-					#get the relevant TRMM info 
-					CEprecipRate = precipRate[:,(latStartIndex[0][0]-1):latEndIndex[0][0],(lonStartIndex[0][0]-1):lonEndIndex[0][0]]
-					TRMMData.close()
-					
-					# ------ NETCDF File info for writing TRMM CE rainfall ------------------------------------
-					thisFileName = MAINDIRECTORY+'/TRMMnetcdfCEs/TRMM' + (str(timelist[t])).replace(" ", "_") + CEuniqueID +'.nc'
-					currNetCDFTRMMData = Dataset(thisFileName, 'w', format='NETCDF4')
-					currNetCDFTRMMData.description = 'Cloud Element '+CEuniqueID + ' precipitation data'
-					currNetCDFTRMMData.calendar = 'standard'
-					currNetCDFTRMMData.conventions = 'COARDS'
-					# dimensions
-					currNetCDFTRMMData.createDimension('time', None)
-					currNetCDFTRMMData.createDimension('lat', len(LAT[:,0]))
-					currNetCDFTRMMData.createDimension('lon', len(LON[0,:]))
-					
-					# variables
-					TRMMprecip = ('time','lat', 'lon',)
-					times = currNetCDFTRMMData.createVariable('time', 'f8', ('time',))
-					times.units = 'hours since '+ str(timelist[t])[:-6]
-					latitude = currNetCDFTRMMData.createVariable('latitude', 'f8', ('lat',))
-					longitude = currNetCDFTRMMData.createVariable('longitude', 'f8', ('lon',))
-					rainFallacc = currNetCDFTRMMData.createVariable('precipitation_Accumulation', 'f8',TRMMprecip )
-					rainFallacc.units = 'mm'
-
-					longitude[:] = LON[0,:]
-					longitude.units = "degrees_east" 
-					longitude.long_name = "Longitude" 
-
-					latitude[:] =  LAT[:,0]
-					latitude.units = "degrees_north"
-					latitude.long_name ="Latitude"
-
-					finalCETRMMvalues = ma.zeros((brightnesstemp.shape))
-					#-----------End most of NETCDF file stuff ------------------------------------
-
-	   			#populate cloudElementLatLons by unpacking the original values from loc to get the actual value for lat and lon
-				#TODO: KDW - too dirty... play with itertools.izip or zip and the enumerate with this
-				# 			as cloudElement is masked
-				for index,value in np.ndenumerate(cloudElement):
-					if value != 0 : 
-						lat_index,lon_index = index
-						lat_lon_tuple = (cloudElementLat[lat_index], cloudElementLon[lon_index],value)
-
-						#generate the comma separated file for GIS
-						cloudElementLatLons.append(lat_lon_tuple)
-
-						#temp data for CE NETCDF file
-						brightnesstemp1[0,int(np.where(LAT[:,0]==cloudElementLat[lat_index])[0]),int(np.where(LON[0,:]==cloudElementLon[lon_index])[0])] = value
-						
-						if TRMMdirName:
-							finalCETRMMvalues[0,int(np.where(LAT[:,0]==cloudElementLat[lat_index])[0]),int(np.where(LON[0,:]==cloudElementLon[lon_index])[0])] = regriddedTRMM[int(np.where(LAT[:,0]==cloudElementLat[lat_index])[0]),int(np.where(LON[0,:]==cloudElementLon[lon_index])[0])]
-							CETRMMList.append((cloudElementLat[lat_index], cloudElementLon[lon_index], finalCETRMMvalues[0,cloudElementLat[lat_index], cloudElementLon[lon_index]]))
+		#latCenter and lonCenter are indices in the full grid, so convert them to the lat and lon
+		latCenter = context.LAT[int(round(latCenter)),0]
+		lonCenter = context.LON[0,int(round(lonCenter))]
+		cloudElementCenter = [latCenter, lonCenter]
+
+		CEText = []
+		CEText.append("\nCenter (lat,lon) is: %.2f\t%.2f" %(latCenter, lonCenter))
+		CEText.append("\nNumber of boxes are: %d" %numOfBoxes)
+		CEText.append("\nArea is: %.4f km^2" %(cloudElementArea))
+		CEText.append("\nAverage brightness temperature is: %.4f K" %CEProperties['Tmean'])
+		CEText.append("\nMin brightness temperature is: %.4f K" %CEProperties['Tmin'])
+		CEText.append("\nMax brightness temperature is: %.4f K" %CEProperties['Tmax'])
+		CEText.append("\nBrightness temperature variance is: %.4f K" %CEProperties['Tvariance'])
+		CEText.append("\nConvective fraction is: %.4f " %(convectiveFraction*100.0))
+		CEText.append("\nEccentricity is: %.4f " %(cloudElementEpsilon))
+
+		userFileText.append("\n\nTime is: %s" %(str(frameTime)))
+		userFileText.append("\nCEuniqueID is: %s" %CEuniqueID)
+		userFileText.extend(CEText)
+
+		#populate the dictionary, the (lat,lon,value) lists are added by buildCloudElementGraph
+		if TRMMdirName:
+			cloudElementDict = {'uniqueID': CEuniqueID, 'cloudElementTime': frameTime, 'cloudElementCenter':cloudElementCenter, 'cloudElementArea':cloudElementArea, 'cloudElementEccentricity':cloudElementEpsilon, 'cloudElementTmax':TIR_max, 'cloudElementTmin': TIR_min, 'cloudElementPrecipTotal':precipTotal, 'TRMMArea': TRMMArea,'CETRMMmax':maxCEprecipRate, 'CETRMMmin':minCEprecipRate}
+		else:
+			cloudElementDict = {'uniqueID': CEuniqueID, 'cloudElementTime': frameTime, 'cloudElementCenter':cloudElementCenter, 'cloudElementArea':cloudElementArea, 'cloudElementEccentricity':cloudElementEpsilon, 'cloudElementTmax':TIR_max, 'cloudElementTmin': TIR_min,}
+		
+		#current frame list of CEs
+		frameCEs.append(cloudElementDict)
+		
+		if frameNum == 1:
+			#TODO: remove this else as we only wish for the CE details
+			#ensure only the non-zero elements are considered
+			#store intel in allCE file
+			allFileText.append("\n-----------------------------------------------")
+			allFileText.append("\n\nTime is: %s" %(str(frameTime)))
+			allFileText.append("\nLocation of rejected CE (lat,lon) points are: %s" %zip(context.LAT[latIndices,0], context.LON[0,lonIndices]))
+			allFileText.extend(CEText)
+			allFileText.append("\n-----------------------------------------------")
+
+	return frameTime, frameCEs, frameCERecords, ''.join(userFileText), ''.join(allFileText)
+#******************************************************************
+def buildCloudElementGraph(context, frameResults, checkpointFrames=None, progress=None, TRMMdirName=None):
+	'''
+	Purpose::
+		Adds the CEs of consecutive frames to context.cloudElementGraph and links them to the CEs they overlap in the previous frame.
+		Only the CEs of the previous frame are kept for linking, so the frames can be processed as they arrive
 
+	Input::
+		context: the SearchContext of the search
+		frameResults: an iterable of the results of findFrameCloudElements in the order of the frames 
+		checkpointFrames (optional): an integer representing the number of frames between the checkpoints of the CEs found so far
+		progress (optional): the checkpoint of an unfinished run returned by readCloudElementsProgress, whose frames 
+			are before the frames in frameResults
+		TRMMdirName (optional): string representing the path of the TRMM datafiles the frameResults were found with, 
+			that is saved in the checkpoint
 
-				brightnesstemp[:] = brightnesstemp1[:]
-				currNetCDFCEData.close()
+	Output::
+		context.cloudElementGraph: a Networkx directed graph of the CEs as returned by findCloudElements
+		NB: also writes the CEs to the CE store and to the text files in context.mainDirectory/textFiles, 
+		and the graph to the checkpoint in context.mainDirectory/checkpoints
 
-				if TRMMdirName:
+	'''
+	config = context.config
 
-					#calculate the total precip associated with the feature
-					for index, value in np.ndenumerate(finalCETRMMvalues):
-						precipTotal += value 
-						precip.append(value)
+	nygrd = len(context.LAT[:, 0]); nxgrd = len(context.LON[0, :])
+	
+	if progress is None:
+		#the checkpoints of an earlier run are not of this graph
+		removeCheckpoints(context)
+
+		prevFrameCEs = []			#list for CEs in previous frame
+		prevCELabels = None			#label image of the CEs in previous frame, numbered from 1 in the order of prevFrameCEs
+		CEEdges = []				#list of the rows of the CEs in context.CETable and the weight of each edge, in the order they were added
+		framesDone = 0
+		numOfBoxes = 0
+		precipDtype = 'f8'
+
+		#store for the boxes of all the CEs, for post processing
+		CEStore = createCloudElementStore(context)
+		context.cloudElementGraph = nx.DiGraph()
+		clearCETable(context)
+
+		#openfile for storing ALL cloudElement information 
+		cloudElementsFile = open((context.mainDirectory+'/textFiles/cloudElements.txt'),'wb')
+		#openfile for storing cloudElement information meeting user criteria i.e. MCCs in this case
+		cloudElementsUserFile = open((context.mainDirectory+'/textFiles/cloudElementsUserFile.txt'),'w')
+	else:
+		#go on from the last frame of the checkpoint, the CEs and text written after it are overwritten
+		prevFrameCEs, prevCELabels = restoreCloudElementGraph(context, progress)
+		CEEdges = progress['edges'].tolist()
+		framesDone = int(progress['framesDone'])
+		numOfBoxes = int(progress['numOfBoxes'])
+		precipDtype = str(progress['precipDtype'])
+
+		CEStore = Dataset(context.mainDirectory+'/'+CE_STORE_FILENAME, 'a', format='NETCDF4')
+
+		cloudElementsFile = open((context.mainDirectory+'/textFiles/cloudElements.txt'),'r+b')
+		cloudElementsUserFile = open((context.mainDirectory+'/textFiles/cloudElementsUserFile.txt'),'r+b')
+		for textFile, textFileSize in zip([cloudElementsFile, cloudElementsUserFile], progress['textFileSizes']):
+			textFile.truncate(textFileSize)
+			textFile.seek(0, os.SEEK_END)
+		print "Resuming from frame %d of the checkpoint" %framesDone
+
+	def saveProgress(lastFrameTime, complete):
+		#the text files and the store are complete up to the last frame before its checkpoint is saved
+		cloudElementsFile.flush()
+		cloudElementsUserFile.flush()
+		if CEStore.isopen():
+			CEStore.sync()
+
+		numOfCEs = len(context.CETableIndex)
+		writeCheckpoint(context, 'cloudElements', CLOUD_ELEMENT_PARAMETERS, {
+			'LAT': context.LAT, 'LON': context.LON, 'CETable': context.CETable[:numOfCEs], 
+			'edges': np.array(CEEdges, dtype='int64').reshape(-1, 3), 'framesDone': framesDone, 
+			'lastFrameTime': np.datetime64(lastFrameTime, 's'), 'complete': complete,
+			'lastFrameRows': np.array([context.CETableIndex[CE['uniqueID']] for CE in prevFrameCEs], dtype='int64'), 
+			'textFileSizes': [cloudElementsFile.tell(), cloudElementsUserFile.tell()], 'numOfBoxes': numOfBoxes, 
+			'precipDtype': precipDtype, 'TRMMdirName': TRMMdirName or ''})
+
+	lastFrameTime = progress['lastFrameTime'].item() if progress is not None else None
+
+	for frameTime, currFrameCEs, frameCERecords, userFileText, allFileText in frameResults:
+		cloudElementsUserFile.write(userFileText)
+		cloudElementsFile.write(allFileText)
+
+		#label image of the CEs in current frame, numbered from 1 in the order of currFrameCEs
+		currCELabels = np.zeros((nygrd, nxgrd), dtype='int32')
+
+		for CENum, (cloudElementDict, CERecord) in enumerate(zip(currFrameCEs, frameCERecords)):
+			_, _, latIndices, lonIndices, CEValues, CETRMMValues = CERecord
+			currCELabels[latIndices, lonIndices] = CENum + 1
+
+			#the (lat,lon,value) of the CE's boxes, sorted by lats
+			cloudElementDict['cloudElementLatLon'] = sorted(zip(context.LAT[latIndices,0], context.LON[0,lonIndices], CEValues), key=lambda tup: tup[0])
+			if CETRMMValues is not None:
+				cloudElementDict['cloudElementLatLonTRMM'] = zip(context.LAT[latIndices,0], context.LON[0,lonIndices], CETRMMValues)
+				precipDtype = CETRMMValues.dtype.str
+
+			#draw the graph node
+			context.cloudElementGraph.add_node(cloudElementDict['uniqueID'], cloudElementDict)
+			addCETableRow(context, cloudElementDict)
 			
-					rainFallacc[:] = finalCETRMMvalues[:]
-					currNetCDFTRMMData.close()
-					TRMMnumOfBoxes = np.count_nonzero(finalCETRMMvalues)
-					TRMMArea = TRMMnumOfBoxes*XRES*YRES
-					try:
-						maxCEprecipRate = np.max(finalCETRMMvalues[np.nonzero(finalCETRMMvalues)])
-						minCEprecipRate = np.min(finalCETRMMvalues[np.nonzero(finalCETRMMvalues)])
-					except:
-						pass
-
-				#sort cloudElementLatLons by lats
-				cloudElementLatLons.sort(key=lambda tup: tup[0])	
-
-				#determine if the cloud element the shape 
-				cloudElementEpsilon = eccentricity (cloudElement)
-				cloudElementsUserFile.write("\n\nTime is: %s" %(str(timelist[t])))
-				cloudElementsUserFile.write("\nCEuniqueID is: %s" %CEuniqueID)
-				latCenter, lonCenter = ndimage.measurements.center_of_mass(cloudElement, labels=labels)
-				
-				#latCenter and lonCenter are given according to the particular array defining this CE
-				#so you need to convert this value to the overall domain truth
-				latCenter = cloudElementLat[round(latCenter)]
-				lonCenter = cloudElementLon[round(lonCenter)]
-				cloudElementsUserFile.write("\nCenter (lat,lon) is: %.2f\t%.2f" %(latCenter, lonCenter))
-				cloudElementCenter.append(latCenter)
-				cloudElementCenter.append(lonCenter)
-				cloudElementsUserFile.write("\nNumber of boxes are: %d" %numOfBoxes)
-				cloudElementsUserFile.write("\nArea is: %.4f km^2" %(cloudElementArea))
-				cloudElementsUserFile.write("\nAverage brightness temperature is: %.4f K" %ndimage.mean(cloudElement, labels=labels))
-				cloudElementsUserFile.write("\nMin brightness temperature is: %.4f K" %ndimage.minimum(cloudElement, labels=labels))
-				cloudElementsUserFile.write("\nMax brightness temperature is: %.4f K" %ndimage.maximum(cloudElement, labels=labels))
-				cloudElementsUserFile.write("\nBrightness temperature variance is: %.4f K" %ndimage.variance(cloudElement, labels=labels))
-				cloudElementsUserFile.write("\nConvective fraction is: %.4f " %(((ndimage.minimum(cloudElement, labels=labels))/float((ndimage.maximum(cloudElement, labels=labels))))*100.0))
-				cloudElementsUserFile.write("\nEccentricity is: %.4f " %(cloudElementEpsilon))
-				#populate the dictionary
-				if TRMMdirName:
-					cloudElementDict = {'uniqueID': CEuniqueID, 'cloudElementTime': timelist[t],'cloudElementLatLon': cloudElementLatLons, 'cloudElementCenter':cloudElementCenter, 'cloudElementArea':cloudElementArea, 'cloudElementEccentricity':cloudElementEpsilon, 'cloudElementTmax':TIR_max, 'cloudElementTmin': TIR_min, 'cloudElementPrecipTotal':precipTotal,'cloudElementLatLonTRMM':CETRMMList, 'TRMMArea': TRMMArea,'CETRMMmax':maxCEprecipRate, 'CETRMMmin':minCEprecipRate}
-				else:
-					cloudElementDict = {'uniqueID': CEuniqueID, 'cloudElementTime': timelist[t],'cloudElementLatLon': cloudElementLatLons, 'cloudElementCenter':cloudElementCenter, 'cloudElementArea':cloudElementArea, 'cloudElementEccentricity':cloudElementEpsilon, 'cloudElementTmax':TIR_max, 'cloudElementTmin': TIR_min,}
-				
-				#current frame list of CEs
-				currFrameCEs.append(cloudElementDict)
-				
-				#draw the graph node
-				CLOUD_ELEMENT_GRAPH.add_node(CEuniqueID, cloudElementDict)
-				
-				if frameNum != 1:
-					for cloudElementDict in prevFrameCEs:
-						thisCElen = len(cloudElementLatLons)
-						percentageOverlap, areaOverlap = cloudElementOverlap(cloudElementLatLons, cloudElementDict['cloudElementLatLon'])
-						
-						#change weights to integers because the built in shortest path chokes on floating pts according to Networkx doc
-						#according to Goyens et al, two CEs are considered related if there is atleast 95% overlap between them for consecutive imgs a max of 2 hrs apart
-						if percentageOverlap >= 0.95: 
-							CLOUD_ELEMENT_GRAPH.add_edge(cloudElementDict['uniqueID'], CEuniqueID, weight=edgeWeight[0])
-							
-						elif percentageOverlap >= 0.90 and percentageOverlap < 0.95 :
-							CLOUD_ELEMENT_GRAPH.add_edge(cloudElementDict['uniqueID'], CEuniqueID, weight=edgeWeight[1])
+		#the CEs of the frame are the last rows of context.CETable
+		addCloudElementsToStore(CEStore, frameCERecords, len(context.CETableIndex) - len(frameCERecords), numOfBoxes)
+		numOfBoxes += sum(len(CERecord[2]) for CERecord in frameCERecords)
+
+		#link the CEs in current frame to the CEs they overlap in previous frame
+		if prevCELabels is not None:
+			CEOverlaps = findCloudElementOverlaps(prevCELabels, currCELabels, len(prevFrameCEs), len(currFrameCEs))
+			for prevCEIndex, currCEIndex, numOfOverlappingBoxes in CEOverlaps:
+				prevCE = prevFrameCEs[prevCEIndex]
+				currCE = currFrameCEs[currCEIndex]
+				percentageOverlap = max((numOfOverlappingBoxes*1.0)/len(currCE['cloudElementLatLon']), 
+										(numOfOverlappingBoxes*1.0)/len(prevCE['cloudElementLatLon']))
+				areaOverlap = numOfOverlappingBoxes*config.XRES*config.YRES
+
+				#change weights to integers because the built in shortest path chokes on floating pts according to Networkx doc
+				#according to Goyens et al, two CEs are considered related if there is atleast 95% overlap between them for consecutive imgs a max of 2 hrs apart
+				if percentageOverlap >= 0.95: 
+					CEEdgeWeight = edgeWeight[0]
+					
+				elif percentageOverlap >= 0.90 and percentageOverlap < 0.95 :
+					CEEdgeWeight = edgeWeight[1]
 
-						elif areaOverlap >= MIN_OVERLAP:
-							CLOUD_ELEMENT_GRAPH.add_edge(cloudElementDict['uniqueID'], CEuniqueID, weight=edgeWeight[2])
+				elif areaOverlap >= config.MIN_OVERLAP:
+					CEEdgeWeight = edgeWeight[2]
 
 				else:
-					#TODO: remove this else as we only wish for the CE details
-					#ensure only the non-zero elements are considered
-					#store intel in allCE file
-					labels, _ = ndimage.label(cloudElement)
-					cloudElementsFile.write("\n-----------------------------------------------")
-					cloudElementsFile.write("\n\nTime is: %s" %(str(timelist[t])))
-					# cloudElementLat = LAT[loc[0],0]
-					# cloudElementLon = LON[0,loc[1]] 
-					
-					#populate cloudElementLatLons by unpacking the original values from loc
-					#TODO: KDW - too dirty... play with itertools.izip or zip and the enumerate with this
-					# 			as cloudElement is masked
-					for index,value in np.ndenumerate(cloudElement):
-						if value != 0 : 
-							lat_index,lon_index = index
-							lat_lon_tuple = (cloudElementLat[lat_index], cloudElementLon[lon_index])
-							cloudElementLatLons.append(lat_lon_tuple)
-	
-					cloudElementsFile.write("\nLocation of rejected CE (lat,lon) points are: %s" %cloudElementLatLons)
-					#latCenter and lonCenter are given according to the particular array defining this CE
-		   			#so you need to convert this value to the overall domain truth
-					latCenter, lonCenter = ndimage.measurements.center_of_mass(cloudElement, labels=labels)
-					latCenter = cloudElementLat[round(latCenter)]
-					lonCenter = cloudElementLon[round(lonCenter)]
-					cloudElementsFile.write("\nCenter (lat,lon) is: %.2f\t%.2f" %(latCenter, lonCenter))
-					cloudElementsFile.write("\nNumber of boxes are: %d" %numOfBoxes)
-					cloudElementsFile.write("\nArea is: %.4f km^2" %(cloudElementArea))
-					cloudElementsFile.write("\nAverage brightness temperature is: %.4f K" %ndimage.mean(cloudElement, labels=labels))
-					cloudElementsFile.write("\nMin brightness temperature is: %.4f K" %ndimage.minimum(cloudElement, labels=labels))
-					cloudElementsFile.write("\nMax brightness temperature is: %.4f K" %ndimage.maximum(cloudElement, labels=labels))
-					cloudElementsFile.write("\nBrightness temperature variance is: %.4f K" %ndimage.variance(cloudElement, labels=labels))
-					cloudElementsFile.write("\nConvective fraction is: %.4f " %(((ndimage.minimum(cloudElement, labels=labels))/float((ndimage.maximum(cloudElement, labels=labels))))*100.0))
-					cloudElementsFile.write("\nEccentricity is: %.4f " %(cloudElementEpsilon))
-					cloudElementsFile.write("\n-----------------------------------------------")
-					
-			#reset list for the next CE
-			nodeExist = False
-			cloudElementCenter=[]
-			cloudElement = []
-			cloudElementLat=[]
-			cloudElementLon =[]
-			cloudElementLatLons =[]
-			brightnesstemp1 =[]
-			brightnesstemp =[]
-			finalCETRMMvalues =[]
-			CEprecipRate =[]
-			CETRMMList =[]
-			precipTotal = 0.0
-			precip=[]
-			TRMMCloudElementLatLons=[]
-			
+					continue
+
+				context.cloudElementGraph.add_edge(prevCE['uniqueID'], currCE['uniqueID'], weight=CEEdgeWeight)
+				CEEdges.append((context.CETableIndex[prevCE['uniqueID']], context.CETableIndex[currCE['uniqueID']], CEEdgeWeight))
+
 		#reset for the next time
-		prevFrameCEs =[]
 		prevFrameCEs = currFrameCEs
-		currFrameCEs =[]
+		prevCELabels = currCELabels
+		framesDone += 1
+		lastFrameTime = frameTime
+
+		if checkpointFrames and framesDone % checkpointFrames == 0:
+			saveProgress(lastFrameTime, False)
 						
-	cloudElementsFile.close
-	cloudElementsUserFile.close
-	#if using ARCGIS data store code, uncomment this file close line
-	#cloudElementsTextFile.close
+	CEStore.close()
 
 	#clean up graph - remove parent and childless nodes
-	outAndInDeg = CLOUD_ELEMENT_GRAPH.degree_iter()
-	toRemove = [node[0] for node in outAndInDeg if node[1]<1]
-	CLOUD_ELEMENT_GRAPH.remove_nodes_from(toRemove)
+	removeUnlinkedCloudElements(context.cloudElementGraph)
+
+	saveProgress(lastFrameTime, True)
+	cloudElementsFile.close()
+	cloudElementsUserFile.close()
 	
-	print "number of nodes are: ", CLOUD_ELEMENT_GRAPH.number_of_nodes()
-	print "number of edges are: ", CLOUD_ELEMENT_GRAPH.number_of_edges()
+	print "number of nodes are: ", context.cloudElementGraph.number_of_nodes()
+	print "number of edges are: ", context.cloudElementGraph.number_of_edges()
 	print ("*"*80)
 
 	#hierachial graph output
 	graphTitle = "Cloud Elements observed over somewhere from 0000Z to 0000Z" 
-	#drawGraph(CLOUD_ELEMENT_GRAPH, graphTitle, edgeWeight)
+	#drawGraph(context.cloudElementGraph, graphTitle, edgeWeight)
+
+	return context.cloudElementGraph	
+#******************************************************************
+def removeUnlinkedCloudElements(CEGraph):
+	'''
+	Purpose::
+		Removes the CEs without a parent or a child from the graph of the CEs
+
+	Input::
+		CEGraph: a Networkx directed graph of the CEs
+
+	Output:: None
+
+	'''
+	outAndInDeg = CEGraph.degree_iter()
+	toRemove = [node[0] for node in outAndInDeg if node[1]<1]
+	CEGraph.remove_nodes_from(toRemove)
+#******************************************************************
+def findCloudElementProperties(frameValues, labels, numOfLabels):
+	'''
+	Purpose::
+		Determines the properties of all the contiguous areas labelled in a frame at once
+		using the labelled reductions of the scipy ndimage package
+
+	Input::
+		frameValues: 2D array (lat,lon) of T_bb for the frame
+		labels: 2D integer array (lat,lon) labelling the contiguous areas as returned by ndimage.label
+		numOfLabels: an integer representing the number of labelled areas
+
+	Output::
+		A list of dictionaries, one for each label in order
+
+		CEProperties = {'label': integer representing the label of the area,
+						'boundingBox': tuple of the (lat,lon) slices of the box bounding the area,
+						'pixelIndices': tuple of the (lat,lon) index arrays of the area's boxes in the frame,
+						'numOfBoxes': integer representing the number of boxes in the area,
+						'Tmin': integer representing the minimum Tb in the area,
+						'Tmax': integer representing the maximum Tb in the area,
+						'Tmean': floating-point representing the average Tb in the area,
+						'Tvariance': floating-point representing the variance of Tb in the area,
+						'center': tuple of floating-point (lat,lon) indices of the Tb weighted center of mass}
+
+	'''
+
+	if numOfLabels == 0:
+		return []
+
+	frameValues = ma.getdata(frameValues)
+	index = np.arange(1, numOfLabels + 1)
+
+	numOfBoxes = np.bincount(labels.ravel(), minlength=numOfLabels + 1)[1:]
+	Tmin = ndimage.minimum(frameValues, labels, index)
+	Tmax = ndimage.maximum(frameValues, labels, index)
+	Tmean = ndimage.mean(frameValues, labels, index)
+	Tvariance = ndimage.variance(frameValues, labels, index)
+	centers = ndimage.center_of_mass(frameValues, labels, index)
+	boundingBoxes = ndimage.find_objects(labels, numOfLabels)
+
+	allCEProperties = []
+	for i, boundingBox in enumerate(boundingBoxes):
+		#the indices of the boxes within the bounding box, moved to the full frame
+		latIndices, lonIndices = np.nonzero(labels[boundingBox] == i + 1)
+		latIndices += boundingBox[0].start
+		lonIndices += boundingBox[1].start
+
+		allCEProperties.append({'label': i + 1, 'boundingBox': boundingBox, 
+								'pixelIndices': (latIndices, lonIndices), 'numOfBoxes': numOfBoxes[i], 
+								'Tmin': Tmin[i], 'Tmax': Tmax[i], 'Tmean': Tmean[i], 
+								'Tvariance': Tvariance[i], 'center': centers[i]})
+
+	return allCEProperties
+#******************************************************************
+def findCloudElementOverlaps(previousCELabels, currentCELabels, numOfPreviousCEs, numOfCurrentCEs):
+	'''
+	Purpose::
+		Determines the number of overlapping boxes of all the pairs of CEs in consecutive frames
+		by overlaying the label images of the frames
+
+	Input::
+		previousCELabels: 2D integer array (lat,lon) labelling the CEs in the previous frame from 1, and 0 elsewhere
+		currentCELabels: 2D integer array (lat,lon) labelling the CEs in the current frame from 1, and 0 elsewhere
+		numOfPreviousCEs: an integer representing the number of CEs in the previous frame
+		numOfCurrentCEs: an integer representing the number of CEs in the current frame
+
+	Output::
+		overlaps: a list of tuples (previousCEIndex, currentCEIndex, numOfOverlappingBoxes) for the pairs of CEs
+			that overlap, where the indices are the labels less 1
+
+	'''
+
+	overlapping = (previousCELabels > 0) & (currentCELabels > 0)
+
+	#number each pair of labels and count the boxes of each pair at once
+	pairs = previousCELabels[overlapping].astype('int64') * (numOfCurrentCEs + 1) + currentCELabels[overlapping]
+	pairCounts = np.bincount(pairs, minlength=(numOfPreviousCEs + 1) * (numOfCurrentCEs + 1))
+
+	overlappingPairs = np.flatnonzero(pairCounts)
+	previousLabels, currentLabels = np.divmod(overlappingPairs, numOfCurrentCEs + 1)
 
-	return CLOUD_ELEMENT_GRAPH	
+	return zip(previousLabels - 1, currentLabels - 1, pairCounts[overlappingPairs])
 #******************************************************************
-def findPrecipRate(TRMMdirName, timelist):
+def findPrecipRate(context, TRMMdirName, timelist):
 	''' 
 	Purpose:: 
 		Determines the precipitation rates for MCSs found if TRMMdirName was not entered in findCloudElements this can be used
 
 	Input:: 
+		context: the SearchContext of the search
 		TRMMdirName: a string representing the directory for the original TRMM netCDF files
 		timelist: a list of python datatimes
 
 	Output:: a list of dictionary of the TRMM data 
-		NB: also creates netCDF with TRMM data for each CE (for post processing) index
-			in MAINDIRECTORY/TRMMnetcdfCEs
+		NB: also adds the TRMM data of each CE to the CE store (for post processing) 
+			in context.mainDirectory/cloudElements.nc, and to the checkpoint of the CEs for loadCheckpoint
    
 	Assumptions:: Assumes that findCloudElements was run without the TRMMdirName value 
  
 	'''
+	config = context.config
 	allCEnodesTRMMdata =[]
 	TRMMdataDict={}
 	precipTotal = 0.0
 
-	os.chdir((MAINDIRECTORY+'/MERGnetcdfCEs/'))
-	imgFilename = ''
-	temporalRes = 3 #3 hours for TRMM
-	
-	#sort files
-	files = filter(os.path.isfile, glob.glob("*.nc"))
-	files.sort(key=lambda x: os.path.getmtime(x))
-	
-	for afile in files:
-		fullFname = os.path.splitext(afile)[0]
-		noFrameExtension = (fullFname.replace("_","")).split('F')[0]
-		CEuniqueID = 'F' +(fullFname.replace("_","")).split('F')[1]
-		fileDateTimeChar = (noFrameExtension.replace(":","")).split('s')[1]
-		fileDateTime = fileDateTimeChar.replace("-","")
-		fileDate = fileDateTime[:-6]
-		fileHr1=fileDateTime[-6:-4]
-
-		cloudElementData = Dataset(afile,'r', format='NETCDF4')
-		brightnesstemp1 = cloudElementData.variables['brightnesstemp'][:,:,:] 
-		latsrawCloudElements = cloudElementData.variables['latitude'][:]
-		lonsrawCloudElements = cloudElementData.variables['longitude'][:]
-		
-		brightnesstemp = np.squeeze(brightnesstemp1, axis=0)
-		
-		if int(fileHr1) % temporalRes == 0:
-			fileHr = fileHr1
-		else:
-			fileHr = (int(fileHr1)/temporalRes) * temporalRes
-		
-		if fileHr < 10:
-			fileHr = '0'+str(fileHr)
-		else:
-			str(fileHr)
-
-		TRMMfileName = TRMMdirName+"/3B42."+ str(fileDate) + "."+str(fileHr)+".7A.nc"
-		TRMMData = Dataset(TRMMfileName,'r', format='NETCDF4')
-		precipRate = TRMMData.variables['pcp'][:,:,:]
-		latsrawTRMMData = TRMMData.variables['latitude'][:]
-		lonsrawTRMMData = TRMMData.variables['longitude'][:]
-		lonsrawTRMMData[lonsrawTRMMData > 180] = lonsrawTRMMData[lonsrawTRMMData>180] - 360.
-		LONTRMM, LATTRMM = np.meshgrid(lonsrawTRMMData, latsrawTRMMData)
-
-		#nygrdTRMM = len(LATTRMM[:,0]); nxgrd = len(LONTRMM[0,:])
-		nygrd = len(LAT[:, 0]); nxgrd = len(LON[0, :])
-
-		precipRateMasked = ma.masked_array(precipRate, mask=(precipRate < 0.0))
-		#---------regrid the TRMM data to the MERG dataset ----------------------------------
-		#regrid using the do_regrid stuff from the Apache OCW 
-		regriddedTRMM = ma.zeros((0, nygrd, nxgrd))
-		regriddedTRMM = do_regrid(precipRateMasked[0,:,:], LATTRMM,  LONTRMM, LAT, LON, order=1, mdi= -999999999)
-		#regriddedTRMM = process.do_regrid(precipRateMasked[0,:,:], LATTRMM,  LONTRMM, LAT, LON, order=1, mdi= -999999999)
-		#----------------------------------------------------------------------------------
-
-		# #get the lat/lon info from
-		latCEStart = LAT[0][0]
-		latCEEnd = LAT[-1][0]
-		lonCEStart = LON[0][0]
-		lonCEEnd = LON[0][-1]
-
-		#get the lat/lon info for TRMM data (different resolution)
-		latStartT = find_nearest(latsrawTRMMData, latCEStart)
-		latEndT = find_nearest(latsrawTRMMData, latCEEnd)
-		lonStartT = find_nearest(lonsrawTRMMData, lonCEStart)
-		lonEndT = find_nearest(lonsrawTRMMData, lonCEEnd)
-		latStartIndex = np.where(latsrawTRMMData == latStartT)
-		latEndIndex = np.where(latsrawTRMMData == latEndT)
-		lonStartIndex = np.where(lonsrawTRMMData == lonStartT)
-		lonEndIndex = np.where(lonsrawTRMMData == lonEndT)
-
-		#get the relevant TRMM info 
-		CEprecipRate = precipRate[:,(latStartIndex[0][0]-1):latEndIndex[0][0],(lonStartIndex[0][0]-1):lonEndIndex[0][0]]
-		TRMMData.close()
-			
+	nygrd = len(context.LAT[:, 0]); nxgrd = len(context.LON[0, :])
+
+	CEStore = Dataset(context.mainDirectory+'/'+CE_STORE_FILENAME, 'a', format='NETCDF4')
+	uniqueIDs, CETimes, firstBoxes, numOfBoxes = readCloudElementStoreIndex(CEStore)
+	
+	#the CEs are stored in the order they were found
+	for CEIndex, CEuniqueID in enumerate(uniqueIDs):
+		boxes = slice(firstBoxes[CEIndex], firstBoxes[CEIndex] + numOfBoxes[CEIndex])
+		latIndices = CEStore.variables['latIndex'][boxes]
+		lonIndices = CEStore.variables['lonIndex'][boxes]
 		
-		# ------ NETCDF File stuff ------------------------------------
-		thisFileName = MAINDIRECTORY+'/TRMMnetcdfCEs/'+ fileDateTime + CEuniqueID +'.nc'
-		currNetCDFTRMMData = Dataset(thisFileName, 'w', format='NETCDF4')
-		currNetCDFTRMMData.description = 'Cloud Element '+CEuniqueID + ' rainfall data'
-		currNetCDFTRMMData.calendar = 'standard'
-		currNetCDFTRMMData.conventions = 'COARDS'
-		# dimensions
-		currNetCDFTRMMData.createDimension('time', None)
-		currNetCDFTRMMData.createDimension('lat', len(LAT[:,0]))
-		currNetCDFTRMMData.createDimension('lon', len(LON[0,:]))
-		# variables
-		TRMMprecip = ('time','lat', 'lon',)
-		times = currNetCDFTRMMData.createVariable('time', 'f8', ('time',))
-		times.units = 'hours since '+ fileDateTime[:-6] 
-		latitude = currNetCDFTRMMData.createVariable('latitude', 'f8', ('lat',))
-		longitude = currNetCDFTRMMData.createVariable('longitude', 'f8', ('lon',))
-		rainFallacc = currNetCDFTRMMData.createVariable('precipitation_Accumulation', 'f8',TRMMprecip )
-		rainFallacc.units = 'mm'
-
-		longitude[:] = LON[0,:]
-		longitude.units = "degrees_east" 
-		longitude.long_name = "Longitude" 
-
-		latitude[:] =  LAT[:,0]
-		latitude.units = "degrees_north"
-		latitude.long_name ="Latitude"
-
-		finalCETRMMvalues = ma.zeros((brightnesstemp1.shape))
-		#-----------End most of NETCDF file stuff ------------------------------------	
-		for index,value in np.ndenumerate(brightnesstemp):
-			lat_index, lon_index = index
-			currTimeValue = 0
-			if value > 0:
-
-				finalCETRMMvalues[0,lat_index,lon_index] = regriddedTRMM[int(np.where(LAT[:,0]==LAT[lat_index,0])[0]), int(np.where(LON[0,:]==LON[0,lon_index])[0])]
-				
+		#the TRMM data regridded to the MERG dataset, read once for all the CEs in its 3 hours 
+		regriddedTRMM = readTRMMRegridded(context, TRMMdirName, CETimes[CEIndex])
 
-		rainFallacc[:] = finalCETRMMvalues
-		currNetCDFTRMMData.close()
+		#the TRMM data of the CE's boxes
+		CETRMMValues = ma.filled(regriddedTRMM[latIndices,lonIndices], 0.0)
+		CEStore.variables['precipitation_Accumulation'][boxes] = CETRMMValues
 
-		for index, value in np.ndenumerate(finalCETRMMvalues):
-			precipTotal += value 
+		finalCETRMMvalues = ma.zeros((1, nygrd, nxgrd))
+		finalCETRMMvalues[0,latIndices,lonIndices] = CETRMMValues
 
-		TRMMnumOfBoxes = np.count_nonzero(finalCETRMMvalues)
-		TRMMArea = TRMMnumOfBoxes*XRES*YRES	
+		precipTotal = CETRMMValues.sum()
 
-		try:
-			minCEprecipRate = np.min(finalCETRMMvalues[np.nonzero(finalCETRMMvalues)])
-		except:
-			minCEprecipRate = 0.0
+		TRMMnumOfBoxes = np.count_nonzero(CETRMMValues)
+		TRMMArea = TRMMnumOfBoxes*config.XRES*config.YRES	
 
-		try:
-			maxCEprecipRate = np.max(finalCETRMMvalues[np.nonzero(finalCETRMMvalues)])
-		except:
+		if TRMMnumOfBoxes > 0:
+			minCEprecipRate = np.min(CETRMMValues[np.nonzero(CETRMMValues)])
+			maxCEprecipRate = np.max(CETRMMValues[np.nonzero(CETRMMValues)])
+		else:
+			minCEprecipRate = 0.0
 			maxCEprecipRate = 0.0
 
-		#add info to CLOUDELEMENTSGRAPH
-		#TODO try block
-		for eachdict in CLOUD_ELEMENT_GRAPH.nodes(CEuniqueID):
-			if eachdict[1]['uniqueID'] == CEuniqueID:
-				if not 'cloudElementPrecipTotal' in eachdict[1].keys():
-					eachdict[1]['cloudElementPrecipTotal'] = precipTotal
-				if not 'cloudElementLatLonTRMM' in eachdict[1].keys():
-					eachdict[1]['cloudElementLatLonTRMM'] = finalCETRMMvalues
-				if not 'TRMMArea' in eachdict[1].keys():
-					eachdict[1]['TRMMArea'] = TRMMArea
-				if not 'CETRMMmin' in eachdict[1].keys():
-					eachdict[1]['CETRMMmin'] = minCEprecipRate
-				if not 'CETRMMmax' in eachdict[1].keys():
-					eachdict[1]['CETRMMmax'] = maxCEprecipRate
+		#add info to CLOUDELEMENTSGRAPH, the CE may have been removed from it
+		eachdict = thisDict(context, CEuniqueID)
+		if eachdict is not None:
+			if not 'cloudElementPrecipTotal' in eachdict:
+				eachdict['cloudElementPrecipTotal'] = precipTotal
+			if not 'cloudElementLatLonTRMM' in eachdict:
+				eachdict['cloudElementLatLonTRMM'] = finalCETRMMvalues
+			if not 'TRMMArea' in eachdict:
+				eachdict['TRMMArea'] = TRMMArea
+			if not 'CETRMMmin' in eachdict:
+				eachdict['CETRMMmin'] = minCEprecipRate
+			if not 'CETRMMmax' in eachdict:
+				eachdict['CETRMMmax'] = maxCEprecipRate
+			updateCETable(context, CEuniqueID, eachdict)
 
 		#clean up
 		precipTotal = 0.0
-		latsrawTRMMData =[]
-		lonsrawTRMMData = []
-		latsrawCloudElements=[]
-		lonsrawCloudElements=[]
 		finalCETRMMvalues =[]
-		CEprecipRate =[]
-		brightnesstemp =[]
 		TRMMdataDict ={}
 
+	CEStore.close()
+
+	#the checkpoint of the CEs, if it is of these CEs, gets their precipitation
+	checkpoint = readCheckpoint(context, 'cloudElements', CLOUD_ELEMENT_PARAMETERS)
+	numOfCEs = len(context.CETableIndex)
+	if checkpoint is not None and checkpoint['complete'] and len(checkpoint['CETable']) == numOfCEs:
+		checkpoint['CETable'] = context.CETable[:numOfCEs]
+		checkpoint['TRMMdirName'] = TRMMdirName
+		writeCheckpoint(context, 'cloudElements', CLOUD_ELEMENT_PARAMETERS, checkpoint)
+
 	return allCEnodesTRMMdata
 #******************************************************************	
-def findCloudClusters(CEGraph):
+def findCloudClusters(context, CEGraph):
 	'''
 	Purpose:: 
 		Determines the cloud clusters properties from the subgraphs in 
 		the graph i.e. prunes the graph according to the minimum depth
 
 	Input:: 
+		context: the SearchContext of the search
 		CEGraph: a Networkx directed graph of the CEs with weighted edges
 		according the area overlap between nodes (CEs) of consectuive frames
 	
 	Output:: 
-		PRUNED_GRAPH: a Networkx directed graph of with CCs/ MCSs
+		context.prunedGraph: a Networkx directed graph of with CCs/ MCSs
+		NB: also saves the graph to the checkpoint in context.mainDirectory/checkpoints
 
 	'''
+	config = context.config
+
+	seenNodes = set()
+	context.prunedGraph = nx.DiGraph()
+	#the nodes and the edges of context.prunedGraph in the order they were added, for its checkpoint
+	prunedNodes = []
+	prunedEdges = []
 
-	seenNode = []
-	allMCSLists =[]
-	pathDictList =[]
-	pathList=[]
+	cloudClustersFile = open((context.mainDirectory+'/textFiles/cloudClusters.txt'),'wb')
 
-	cloudClustersFile = open((MAINDIRECTORY+'/textFiles/cloudClusters.txt'),'wb')
+	#the depth of the tree below each node and its shortest path with that depth, for all nodes at once
+	maxDepths, minPathDistances, nextNodes = findMaxDepthsAndMinPaths(CEGraph)
 	
-	for eachNode in CEGraph:
+	#consider the nodes in topological order, so that the roots of the trees are considered first
+	for eachNode in nx.topological_sort(CEGraph):
 		#check if the node has been seen before
-		if eachNode not in dict(enumerate(zip(*seenNode))):
-			#look for all trees associated with node as the root
-			thisPathDistanceAndLength = nx.single_source_dijkstra(CEGraph, eachNode)
-			#determine the actual shortestPath and minimum depth/length
-			maxDepthAndMinPath = findMaxDepthAndMinPath(thisPathDistanceAndLength)
-			if maxDepthAndMinPath:
-				maxPathLength = maxDepthAndMinPath[0] 
-				shortestPath = maxDepthAndMinPath[1]
+		if eachNode not in seenNodes:
+			#if the duration is shorter then the min MCS length, then don't store!
+			if maxDepths[eachNode] >= config.MIN_MCS_DURATION:
+				maxPathLength = minPathDistances[eachNode]
+				#the path ends where it joins a path found before, as the rest of it is already in context.prunedGraph
+				shortestPath = [eachNode]
+				while nextNodes[shortestPath[-1]] is not None and shortestPath[-1] not in seenNodes:
+					shortestPath.append(nextNodes[shortestPath[-1]])
 				
-				#add nodes and paths to PRUNED_GRAPH
+				#add nodes and paths to context.prunedGraph
+				prunedNodes.extend(node for node in shortestPath if context.prunedGraph.has_node(node) is False)
 				for i in xrange(len(shortestPath)):
-					if PRUNED_GRAPH.has_node(shortestPath[i]) is False:
-						PRUNED_GRAPH.add_node(shortestPath[i])
+					if context.prunedGraph.has_node(shortestPath[i]) is False:
+						context.prunedGraph.add_node(shortestPath[i])
 						
 					#add edge if necessary
-					if i < (len(shortestPath)-1) and PRUNED_GRAPH.has_edge(shortestPath[i], shortestPath[i+1]) is False:
+					if i < (len(shortestPath)-1) and context.prunedGraph.has_edge(shortestPath[i], shortestPath[i+1]) is False:
 						prunedGraphEdgeweight = CEGraph.get_edge_data(shortestPath[i], shortestPath[i+1])['weight']
-						PRUNED_GRAPH.add_edge(shortestPath[i], shortestPath[i+1], weight=prunedGraphEdgeweight)
+						context.prunedGraph.add_edge(shortestPath[i], shortestPath[i+1], weight=prunedGraphEdgeweight)
+						prunedEdges.append((shortestPath[i], shortestPath[i+1], prunedGraphEdgeweight))
 
 				#note information in a file for consideration later i.e. checking to see if it works
 				cloudClustersFile.write("\nSubtree pathlength is %d and path is %s" %(maxPathLength, shortestPath))
-				#update seenNode info
-				seenNode.append(shortestPath)	
+				#update seenNodes info
+				seenNodes.update(shortestPath)
 
 	print "pruned graph"
-	print "number of nodes are: ", PRUNED_GRAPH.number_of_nodes()
-	print "number of edges are: ", PRUNED_GRAPH.number_of_edges()
+	print "number of nodes are: ", context.prunedGraph.number_of_nodes()
+	print "number of edges are: ", context.prunedGraph.number_of_edges()
 	print ("*"*80)		
 					
 	graphTitle = "Cloud Clusters observed over somewhere during sometime"
-	#drawGraph(PRUNED_GRAPH, graphTitle, edgeWeight)
-	cloudClustersFile.close
+	#drawGraph(context.prunedGraph, graphTitle, edgeWeight)
+	cloudClustersFile.close()
+
+	writeCheckpoint(context, 'cloudClusters', CLOUD_CLUSTER_PARAMETERS, {
+		'nodes': np.array(prunedNodes, dtype='S'), 'edges': np.array([edge[:2] for edge in prunedEdges], dtype='S').reshape(-1, 2),
+		'weights': np.array([edge[2] for edge in prunedEdges], dtype='int64')})
 	
-	return PRUNED_GRAPH  
+	return context.prunedGraph  
+#******************************************************************
+def findMaxDepthsAndMinPaths(CEGraph):
+	'''
+	Purpose:: 
+		Determines the maximum depth of the tree below each node in the graph and the shortest (min sum of the edge weights)
+		of the paths from the node with that depth, in one pass over the nodes from the last to the first in topological order
+
+	Input:: 
+		CEGraph: a Networkx directed graph of the CEs with weighted edges
+		according the area overlap between nodes (CEs) of consectuive frames
+
+	Output:: 
+		maxDepths: a dictionary of the number of nodes on the deepest path from each node
+		minPathDistances: a dictionary of the sum of the edge weights of the shortest deepest path from each node
+		nextNodes: a dictionary of the node following each node on its shortest deepest path, None for the last node 
+
+	Assumptions::
+		The graph is acyclic, as the edges are between CEs of consecutive frames
+	'''
+	maxDepths = {}
+	minPathDistances = {}
+	nextNodes = {}
+
+	#the depths and paths of the successors of a node are known before the node is considered
+	for eachNode in reversed(list(nx.topological_sort(CEGraph))):
+		maxDepths[eachNode] = 1
+		minPathDistances[eachNode] = 0
+		nextNodes[eachNode] = None
+
+		for successor in CEGraph.successors(eachNode):
+			depth = maxDepths[successor] + 1
+			pathDistance = CEGraph.get_edge_data(eachNode, successor)['weight'] + minPathDistances[successor]
+			if depth > maxDepths[eachNode] or (depth == maxDepths[eachNode] and pathDistance < minPathDistances[eachNode]):
+				maxDepths[eachNode] = depth
+				minPathDistances[eachNode] = pathDistance
+				nextNodes[eachNode] = successor
+
+	return maxDepths, minPathDistances, nextNodes
 #******************************************************************
-def findMCC (prunedGraph):
+def findMCC (context, prunedGraph):
 	'''
 	Purpose:: 
 		Determines if subtree is a MCC according to Laurent et al 1998 criteria
 
 	Input:: 
+		context: the SearchContext of the search
 		prunedGraph: a Networkx Graph representing the CCs 
 
 	Output:: 
@@ -852,6 +1164,7 @@ def findMCC (prunedGraph):
 		frames are ordered and are equally distributed in time e.g. hrly satellite images
  
 	'''
+	config = context.config
 	MCCList = []
 	MCSList = []
 	definiteMCC = []
@@ -876,14 +1189,14 @@ def findMCC (prunedGraph):
 
 	
 	#connected_components is not available for DiGraph, so generate graph as undirected 
-	unDirGraph = PRUNED_GRAPH.to_undirected()
+	unDirGraph = context.prunedGraph.to_undirected()
 	subGraph = nx.connected_component_subgraphs(unDirGraph)
 
 	#for each path in the subgraphs determined
 	for path in subGraph:
 		#definite is a subTree provided the duration is longer than 3 hours
 
-		if len(path.nodes()) > MIN_MCS_DURATION:
+		if len(path.nodes()) > config.MIN_MCS_DURATION:
 			orderedPath = path.nodes()
 			orderedPath.sort(key=lambda item:(len(item.split('C')[0]), item.split('C')[0]))
 			#definiteMCS.append(orderedPath)
@@ -903,17 +1216,17 @@ def findMCC (prunedGraph):
 			imgCount +=1
 			#----------end build back ---------------------------------------------
 
-			mergeList, splitList = hasMergesOrSplits(path)	
+			mergeList, splitList = hasMergesOrSplits(context, path)	
 			#add node behavior regarding neutral, merge, split or both
 			for node in path:
 				if node in mergeList and node in splitList:
-					addNodeBehaviorIdentifier(node,'B')
+					addNodeBehaviorIdentifier(context, node,'B')
 				elif node in mergeList and not node in splitList:
-					addNodeBehaviorIdentifier(node,'M')
+					addNodeBehaviorIdentifier(context, node,'M')
 				elif node in splitList and not node in mergeList:
-					addNodeBehaviorIdentifier(node,'S')
+					addNodeBehaviorIdentifier(context, node,'S')
 				else:
-					addNodeBehaviorIdentifier(node,'N')
+					addNodeBehaviorIdentifier(context, node,'N')
 			
 
 			#Do the first part of checking for the MCC feature
@@ -921,10 +1234,10 @@ def findMCC (prunedGraph):
 			treeTraversalList = traverseTree(aSubGraph, orderedPath[0],[],[])
 			#print "treeTraversalList is ", treeTraversalList
 			#check the nodes to determine if a MCC on just the area criteria (consecutive nodes meeting the area and temp requirements)
-			MCCList = checkedNodesMCC(prunedGraph, treeTraversalList)
+			MCCList = checkedNodesMCC(context, prunedGraph, treeTraversalList)
 			for aDict in MCCList:
 				for eachNode in aDict["fullMCSMCC"]:
-					addNodeMCSIdentifier(eachNode[0],eachNode[1])
+					addNodeMCSIdentifier(context, eachNode[0],eachNode[1])
 				
 			#do check for if MCCs overlap
 			if MCCList:
@@ -942,11 +1255,11 @@ def findMCC (prunedGraph):
 								eachList.sort(key=lambda nodeID:(len(nodeID.split('C')[0]), nodeID.split('C')[0]))
 								if eachList:
 									lNode = eachList[-1]
-									if lNode in CLOUD_ELEMENT_GRAPH.predecessors(fNode):
-										for aNode in CLOUD_ELEMENT_GRAPH.predecessors(fNode):
+									if lNode in context.cloudElementGraph.predecessors(fNode):
+										for aNode in context.cloudElementGraph.predecessors(fNode):
 											if aNode in eachList and aNode == lNode:
 												#if edge_data is equal or less than to the exisitng edge in the tree append one to the other
-												if CLOUD_ELEMENT_GRAPH.get_edge_data(aNode,fNode)['weight'] <= CLOUD_ELEMENT_GRAPH.get_edge_data(lNode,fNode)['weight']:
+												if context.cloudElementGraph.get_edge_data(aNode,fNode)['weight'] <= context.cloudElementGraph.get_edge_data(lNode,fNode)['weight']:
 													MCCList[count-1]["possMCCList"].extend(MCCList[count]["possMCCList"]) 
 													MCCList[count-1]["fullMCSMCC"].extend(MCCList[count]["fullMCSMCC"])
 													MCCList[count-1]["durationAandB"] +=  MCCList[count]["durationAandB"]
@@ -964,7 +1277,7 @@ def findMCC (prunedGraph):
 			#check if the nodes also meet the duration criteria and the shape crieria
 			for eachDict in MCCList:
 				#order the fullMCSMCC list, then run maximum extent and eccentricity criteria 
-				if (eachDict["durationAandB"] * TRES) >= MINIMUM_DURATION and (eachDict["durationAandB"] * TRES) <= MAXIMUM_DURATION:
+				if (eachDict["durationAandB"] * config.TRES) >= config.MINIMUM_DURATION and (eachDict["durationAandB"] * config.TRES) <= config.MAXIMUM_DURATION:
 					eachList = list(x[0] for x in eachDict["fullMCSMCC"])
 					eachList.sort(key=lambda nodeID:(len(nodeID.split('C')[0]), nodeID.split('C')[0]))
 					eachMCCList = list(x[0] for x in eachDict["possMCCList"])
@@ -975,19 +1288,19 @@ def findMCC (prunedGraph):
 					#find last element in eachMCCList in eachList and ensure everything after it is indicated as 'D'
 					#ensure that everything between is listed as 'M'
 					for eachNode in eachList[:(eachList.index(eachMCCList[0]))]: 
-						addNodeMCSIdentifier(eachNode,'I')
+						addNodeMCSIdentifier(context, eachNode,'I')
 
-					addNodeMCSIdentifier(eachMCCList[0],'M')
+					addNodeMCSIdentifier(context, eachMCCList[0],'M')
 
 					for eachNode in eachList[(eachList.index(eachMCCList[-1])+1):]:
-						addNodeMCSIdentifier(eachNode, 'D')
+						addNodeMCSIdentifier(context, eachNode, 'D')
 
 					#update definiteMCS list
 					for eachNode in orderedPath[(orderedPath.index(eachMCCList[-1])+1):]:
-						addNodeMCSIdentifier(eachNode, 'D')
+						addNodeMCSIdentifier(context, eachNode, 'D')
 
 					#run maximum extent and eccentricity criteria
-					maxExtentNode, definiteMCCFlag = maxExtentAndEccentricity(eachList)
+					maxExtentNode, definiteMCCFlag = maxExtentAndEccentricity(context, eachList)
 					#print "maxExtentNode, definiteMCCFlag ", maxExtentNode, definiteMCCFlag
 					if definiteMCCFlag == True:
 						definiteMCC.append(eachList)
@@ -1004,12 +1317,131 @@ def findMCC (prunedGraph):
 		
 	return definiteMCC, definiteMCS
 #******************************************************************
-def traverseTree(subGraph,node, stack, checkedNodes=None):
+def runSweep(context, mergImgs, timelist, parameterSets, TRMMdirName=None, processes=None):
 	'''
-	Purpose:: 
-		To traverse a tree using a modified depth-first iterative deepening (DFID) search algorithm 
+	Purpose::
+		Runs the search (findCloudElements, findCloudClusters and findMCC) for many combinations of the user defined 
+		variables at once, on the MERG data read once by readMergData. Each run has its own SearchContext, so the runs
+		are independent of each other and of context
 
-	Input:: 
+	Input::
+		context: the SearchContext the MERG data was read with. The output of each run is stored in
+			context.mainDirectory/sweep/runN, where N is the index of its parameters in parameterSets
+		mergImgs: masked numpy array in (time,lat,lon) of the MERG data returned by readMergData
+		timelist: a list of python datetimes of the frames
+		parameterSets: a list of dictionaries of the user defined variables of each run that differ from context.config
+			e.g. [{'T_BB_MAX': 233}, {'T_BB_MAX': 223, 'AREA_MIN': 3000.0}]
+		TRMMdirName (optional): string representing the path where to find the TRMM datafiles
+		processes (optional): an integer representing the number of runs at a time. The default is the number of CPUs
+
+	Output::
+		sweepResults: a list of dictionaries, one for each run in the order of parameterSets
+
+		sweepResult = {'parameters': the dictionary of the run's parameters from parameterSets,
+						'mainDirectory': string representing the directory of the run's output,
+						'numOfCEs': integer representing the number of nodes in the run's CE graph,
+						'numOfPrunedCEs': integer representing the number of nodes in the run's pruned graph,
+						'MCCList': a list of list of strings representing the nodes of each MCC found by findMCC,
+						'MCSList': a list of list of strings representing the nodes of each MCS found by findMCC}
+
+	Assumptions::
+		The region (LATMIN, LATMAX, LONMIN, LONMAX) is the region of the MERG data for all the runs
+		The MERG data was read with the warmest T_BB_MAX of the runs i.e. context.config.T_BB_MAX 
+		The processes are forked, so the runs share the MERG data instead of copying it
+
+	'''
+
+	for parameters in parameterSets:
+		#raises ValueError for unknown names
+		context.config.copy(**parameters)
+
+		changedGridParameters = [name for name in GRID_PARAMETERS 
+									if name in parameters and parameters[name] != getattr(context.config, name)]
+		if changedGridParameters:
+			raise ValueError('The region of the MERG data can not be changed in a sweep: %s' %', '.join(changedGridParameters))
+
+		if parameters.get('T_BB_MAX', context.config.T_BB_MAX) > context.config.T_BB_MAX:
+			raise ValueError('The MERG data was read with T_BB_MAX %s, so a run can not use the warmer T_BB_MAX %s' 
+							%(context.config.T_BB_MAX, parameters['T_BB_MAX']))
+
+	if processes is None:
+		processes = multiprocessing.cpu_count()
+
+	runTasks = list(enumerate(parameterSets))
+
+	#a daemonic process, e.g. a worker of another pool, can't start worker processes
+	if processes > 1 and len(runTasks) > 1 and not multiprocessing.current_process().daemon:
+		pool = multiprocessing.Pool(min(processes, len(runTasks)), initializer=initWorker, 
+									initargs=(context, (mergImgs, timelist, TRMMdirName)))
+		try:
+			return pool.map(runSweepTaskInWorker, runTasks, chunksize=1)
+		finally:
+			pool.terminate()
+			pool.join()
+	else:
+		#createMainDirectory changes to the directory of each run
+		currentDirectory = os.getcwd()
+		try:
+			return [runSweepTask(context, mergImgs, timelist, TRMMdirName, runTask) for runTask in runTasks]
+		finally:
+			os.chdir(currentDirectory)
+#******************************************************************
+def runSweepTask(context, mergImgs, timelist, TRMMdirName, runTask):
+	'''
+	Purpose::
+		Runs the search for one combination of the user defined variables of runSweep
+
+	Input::
+		context: the SearchContext the MERG data was read with
+		mergImgs: masked numpy array in (time,lat,lon) of the MERG data returned by readMergData
+		timelist: a list of python datetimes of the frames
+		TRMMdirName: string representing the path where to find the TRMM datafiles, or None
+		runTask: a tuple of an integer representing the index of the run and the dictionary of its parameters
+
+	Output::
+		sweepResult: a dictionary of the results of the run as described in runSweep
+
+	'''
+
+	runNum, parameters = runTask
+
+	runContext = SearchContext(context.config.copy(**parameters))
+	runContext.LAT = context.LAT
+	runContext.LON = context.LON
+	createMainDirectory(runContext, os.path.join(context.mainDirectory, 'sweep', 'run%d' %runNum))
+
+	CEGraph = findCloudElements(runContext, mergImgs, timelist, TRMMdirName)
+	prunedGraph = findCloudClusters(runContext, CEGraph)
+	MCCList, MCSList = findMCC(runContext, prunedGraph)
+
+	return {'parameters': parameters, 'mainDirectory': runContext.mainDirectory, 
+			'numOfCEs': CEGraph.number_of_nodes(), 'numOfPrunedCEs': prunedGraph.number_of_nodes(), 
+			'MCCList': MCCList, 'MCSList': MCSList}
+#******************************************************************
+def runSweepTaskInWorker(runTask):
+	'''
+	Purpose::
+		runSweepTask in a worker process of the pool of runSweep, with the context and the MERG data 
+		the pool was started with
+
+	Input::
+		runTask: a tuple as described in runSweepTask
+
+	Output::
+		sweepResult: a dictionary of the results of the run as described in runSweep
+
+	'''
+
+	mergImgs, timelist, TRMMdirName = WORKER_STATE['sharedData']
+
+	return runSweepTask(WORKER_STATE['context'], mergImgs, timelist, TRMMdirName, runTask)
+#******************************************************************
+def traverseTree(subGraph,node, stack, checkedNodes=None):
+	'''
+	Purpose:: 
+		To traverse a tree using a modified depth-first iterative deepening (DFID) search algorithm 
+
+	Input:: 
 		subGraph: a Networkx DiGraph representing a CC
 			lengthOfsubGraph: an integer representing the length of the subgraph
 			node: a string representing the node currently being checked
@@ -1056,13 +1488,14 @@ def traverseTree(subGraph,node, stack, checkedNodes=None):
 	
 	return checkedNodes 
 #******************************************************************
-def checkedNodesMCC (prunedGraph, nodeList):
+def checkedNodesMCC (context, prunedGraph, nodeList):
 	'''
 	Purpose :: 
 		Determine if this path is (or is part of) a MCC and provides 
 		preliminary information regarding the stages of the feature
 
 	Input:: 
+		context: the SearchContext of the search
 		prunedGraph: a Networkx Graph representing all the cloud clusters 
 		nodeList: list of strings (CE ID) from the traversal
 		
@@ -1070,6 +1503,7 @@ def checkedNodesMCC (prunedGraph, nodeList):
 		potentialMCCList: list of dictionaries representing all possible MCC within the path
 			dictionary = {"possMCCList":[(node,'I')], "fullMCSMCC":[(node,'I')], "CounterCriteriaA": CounterCriteriaA, "durationAandB": durationAandB}
 	'''
+	config = context.config
 	
 	CounterCriteriaAFlag = False
 	CounterCriteriaBFlag = False
@@ -1092,30 +1526,30 @@ def checkedNodesMCC (prunedGraph, nodeList):
 		nodeList.append(oldNode)
 
 	for node in nodeList:
-		thisdict = thisDict(node)
+		thisdict = thisDict(context, node)
 		CounterCriteriaAFlag = False
 		CounterCriteriaBFlag = False
 		existingFrameFlag = False
 
-		if thisdict['cloudElementArea'] >= OUTER_CLOUD_SHIELD_AREA:
+		if thisdict['cloudElementArea'] >= config.OUTER_CLOUD_SHIELD_AREA:
 			CounterCriteriaAFlag = True
 			INITIATIONFLAG = True
 			MATURITYFLAG = False
 
 			#check if criteriaA is met
-			cloudElementAreaA, criteriaA = checkCriteria(thisdict['cloudElementLatLon'], OUTER_CLOUD_SHIELD_TEMPERATURE)
+			cloudElementAreaA, criteriaA = checkCriteria(context, thisdict['cloudElementLatLon'], config.OUTER_CLOUD_SHIELD_TEMPERATURE)
 			#TODO: calcuate the eccentricity at this point and read over????or create a new field in the dict
 			
-			if cloudElementAreaA >= OUTER_CLOUD_SHIELD_AREA:
+			if cloudElementAreaA >= config.OUTER_CLOUD_SHIELD_AREA:
 				#check if criteriaB is met
-				cloudElementAreaB,criteriaB = checkCriteria(thisdict['cloudElementLatLon'], INNER_CLOUD_SHIELD_TEMPERATURE)
+				cloudElementAreaB,criteriaB = checkCriteria(context, thisdict['cloudElementLatLon'], config.INNER_CLOUD_SHIELD_TEMPERATURE)
 				
 				#if Criteria A and B have been met, then the MCC is initiated, i.e. store node as potentialMCC
-		   		if cloudElementAreaB >= INNER_CLOUD_SHIELD_AREA:
+		   		if cloudElementAreaB >= config.INNER_CLOUD_SHIELD_AREA:
 		   			#TODO: add another field to the dictionary for the OUTER_AREA_SHIELD area
 		   			CounterCriteriaBFlag = True
 		   			#append this information on to the dictionary
-		   			addInfothisDict(node, cloudElementAreaB, criteriaB)
+		   			addInfothisDict(context, node, cloudElementAreaB, criteriaB)
 		   			INITIATIONFLAG = False
 		   			MATURITYFLAG = True
 		   			stage = 'M'
@@ -1396,12 +1830,13 @@ def isThereALink(prunedGraph, upOrDown,node,potentialMCCList,whichList):
 
 	return thisFlag, index
 #******************************************************************
-def maxExtentAndEccentricity(eachList):
+def maxExtentAndEccentricity(context, eachList):
 	'''
 	Purpose:: 
 		Perform the final check for MCC based on maximum extent and eccentricity criteria
 
 	Input:: 
+		context: the SearchContext of the search
 		eachList: a list of strings  representing the node of the possible MCCs within a path
 
 	Output:: 
@@ -1409,86 +1844,134 @@ def maxExtentAndEccentricity(eachList):
 		definiteMCCFlag: a boolean indicating that the MCC has met all requirements
 
 	'''
+	config = context.config
 	maxShieldNode =''
 	maxShieldArea = 0.0
 	maxShieldEccentricity = 0.0
 	definiteMCCFlag = False
 	
 	if eachList:
-		for eachNode in eachList:
-			if (thisDict(eachNode)['nodeMCSIdentifier'] == 'M' or thisDict(eachNode)['nodeMCSIdentifier'] == 'D') and thisDict(eachNode)['cloudElementArea'] > maxShieldArea:
-				maxShieldNode = eachNode
-				maxShieldArea = thisDict(eachNode)['cloudElementArea']
-				
-		maxShieldEccentricity = thisDict(maxShieldNode)['cloudElementEccentricity']
-		if thisDict(maxShieldNode)['cloudElementEccentricity'] >= ECCENTRICITY_THRESHOLD_MIN and thisDict(maxShieldNode)['cloudElementEccentricity'] <= ECCENTRICITY_THRESHOLD_MAX :
-			#criteria met
-			definiteMCCFlag = True
+		rows = CETableRows(context, eachList)
+		#the first of the mature or decaying nodes with the largest area
+		shieldAreas = np.where(np.in1d(rows['nodeMCSIdentifier'], ['M', 'D']), rows['cloudElementArea'], maxShieldArea)
+		if shieldAreas.max() > maxShieldArea:
+			maxShieldIndex = shieldAreas.argmax()
+			maxShieldNode = eachList[maxShieldIndex]
+			maxShieldArea = shieldAreas[maxShieldIndex]
+
+			maxShieldEccentricity = rows['cloudElementEccentricity'][maxShieldIndex]
+			if maxShieldEccentricity >= config.ECCENTRICITY_THRESHOLD_MIN and maxShieldEccentricity <= config.ECCENTRICITY_THRESHOLD_MAX :
+				#criteria met
+				definiteMCCFlag = True
 			
 	return maxShieldNode, definiteMCCFlag		
 #******************************************************************
-def findMaxDepthAndMinPath (thisPathDistanceAndLength):
+def thisDict (context, thisNode):
 	'''
 	Purpose:: 
-		To determine the maximum depth and min path for the headnode
+		Return dictionary from graph if node exist in tree
 
 	Input:: 
-		tuple of dictionaries representing the shortest distance and paths for a node in the tree as returned by nx.single_source_dijkstra
-		thisPathDistanceAndLength({distance}, {path})
-			{distance} = nodeAsString, valueAsInt, {path} = nodeAsString, pathAsList
+		context: the SearchContext of the search
+		thisNode: a string representing the CE to get the information for
 
-	Output:: 
-		tuple of the max pathLength and min pathDistance as a tuple (like what was input)
-			minDistanceAndMaxPath = ({distance},{path}) 
+	Output :: 
+		a dictionary representing the info associated with thisNode from the graph, or None
+
+	'''
+	return context.cloudElementGraph.node.get(thisNode)
+#******************************************************************
+def clearCETable(context):
 	'''
-	maxPathLength = 0
-	minPath = 0
+	Purpose:: 
+		Empty the table of the CE attributes (context.CETable) before the CEs are found
 
-	#maxPathLength for the node in question
-	maxPathLength = max(len (values) for values in thisPathDistanceAndLength[1].values())
+	Input::
+		context: the SearchContext of the search
 
-	#if the duration is shorter then the min MCS length, then don't store!
-	if maxPathLength < MIN_MCS_DURATION: #MINIMUM_DURATION :
-		minDistanceAndMaxPath = ()
+	Output:: None
 
-	#else find the min path and max depth
-	else:
-		#max path distance for the node in question  
-		minPath = max(values for values in thisPathDistanceAndLength[0].values())
-		
-		#check to determine the shortest path from the longest paths returned
-		for pathDistance, path in itertools.izip(thisPathDistanceAndLength[0].values(), thisPathDistanceAndLength[1].values()):
-			pathLength = len(path)
-			#if pathLength is the same as the maxPathLength, then look the pathDistance to determine if the min
-			if pathLength == maxPathLength :
-				if pathDistance <= minPath:
-					minPath = pathLength
-					#store details if absolute minPath and deepest
-					minDistanceAndMaxPath = (pathDistance, path)
-	return minDistanceAndMaxPath
-#******************************************************************
-def thisDict (thisNode):
+	'''
+	context.CETable = np.zeros(0, dtype=CE_TABLE_DTYPE)
+	context.CETableIndex.clear()
+#******************************************************************
+def addCETableRow(context, cloudElementDict):
 	'''
 	Purpose:: 
-		Return dictionary from graph if node exist in tree
+		Add a row with the scalar attributes of a CE to the table of CE attributes (context.CETable)
 
 	Input:: 
-		thisNode: a string representing the CE to get the information for
+		context: the SearchContext of the search
+		cloudElementDict: a dictionary representing the info of the CE as stored in the graph
 
-	Output :: 
-		eachdict[1]: a dictionary representing the info associated with thisNode from the graph
+	Output:: None
+
+	Assumptions::
+		The table grows by doubling, so that adding all the CEs takes linear time. 
+		The rows after the last CE are not used
 
 	'''
-	for eachdict in CLOUD_ELEMENT_GRAPH.nodes(thisNode):
-		if eachdict[1]['uniqueID'] == thisNode:
-			return eachdict[1]
+	row = len(context.CETableIndex)
+	if row == len(context.CETable):
+		newTable = np.zeros(max(2*len(context.CETable), 1024), dtype=CE_TABLE_DTYPE)
+		newTable[:row] = context.CETable
+		context.CETable = newTable
+
+	context.CETableIndex[cloudElementDict['uniqueID']] = row
+	context.CETable['uniqueID'][row] = cloudElementDict['uniqueID']
+	context.CETable['cloudElementTime'][row] = cloudElementDict['cloudElementTime']
+	updateCETable(context, cloudElementDict['uniqueID'], cloudElementDict)
 #******************************************************************
-def checkCriteria (thisCloudElementLatLon, aTemperature):
+def updateCETable(context, thisNode, cloudElementDict):
+	'''
+	Purpose:: 
+		Copy the scalar attributes of a CE from its dictionary to its row in the table of CE attributes (context.CETable)
+
+	Input:: 
+		context: the SearchContext of the search
+		thisNode: a string representing the unique ID of a node
+		cloudElementDict: a dictionary representing the info of the CE as stored in the graph
+
+	Output:: None
+
+	Assumptions::
+		Attributes missing from the dictionary, e.g. the TRMM info when TRMMdirName was not entered 
+		in findCloudElements, are NaN or '' in the table
+
+	'''
+	row = context.CETable[context.CETableIndex[thisNode]:context.CETableIndex[thisNode]+1]
+
+	row['latCenter'] = cloudElementDict['cloudElementCenter'][0]
+	row['lonCenter'] = cloudElementDict['cloudElementCenter'][1]
+	for column in context.CETable.dtype.names[4:]:
+		if context.CETable.dtype[column].kind == 'f':
+			row[column] = cloudElementDict.get(column, np.nan)
+		else:
+			row[column] = cloudElementDict.get(column, '')
+#******************************************************************
+def CETableRows(context, nodeList):
+	'''
+	Purpose:: 
+		Get the rows of the table of CE attributes (context.CETable) of some CEs, for vectorized access to their attributes 
+
+	Input:: 
+		context: the SearchContext of the search
+		nodeList: a list of strings representing the unique IDs of the CEs
+
+	Output:: 
+		a structured numpy array with the rows of the CEs in the order of nodeList, with the fields in CE_TABLE_DTYPE
+		e.g. CETableRows(context, eachMCC)['cloudElementArea'] are the areas of the CEs in eachMCC
+
+	'''
+	return context.CETable[[context.CETableIndex[node] for node in nodeList]]
+#******************************************************************
+def checkCriteria (context, thisCloudElementLatLon, aTemperature):
 	'''
 	Purpose:: 
 		Determine if criteria B is met for a CEGraph
 
 	Input:: 
+		context: the SearchContext of the search
 		thisCloudElementLatLon: 2D array of (lat,lon) variable from the node dictionary being currently considered
 		aTemperature:a integer representing the temperature maximum for masking
 
@@ -1496,9 +1979,10 @@ def checkCriteria (thisCloudElementLatLon, aTemperature):
 		cloudElementArea: a floating-point number representing the area in the array that meet the criteria - criteriaB
 
 	'''
+	config = context.config
 	cloudElementCriteriaBLatLon=[]
 
-	frame, CEcounter = ndimage.measurements.label(thisCloudElementLatLon, structure=STRUCTURING_ELEMENT)
+	frame, CEcounter = ndimage.measurements.label(thisCloudElementLatLon, structure=config.STRUCTURING_ELEMENT)
 	frameCEcounter=0
 	#determine min and max values in lat and lon, then use this to generate teh array from LAT,LON meshgrid
 	
@@ -1507,17 +1991,17 @@ def checkCriteria (thisCloudElementLatLon, aTemperature):
 	minLon = min(x[1]for x in thisCloudElementLatLon)
 	maxLon = max(x[1]for x in thisCloudElementLatLon)
 
-	minLatIndex = np.argmax(LAT[:,0] == minLat)
-	maxLatIndex = np.argmax(LAT[:,0]== maxLat)
-	minLonIndex = np.argmax(LON[0,:] == minLon)
-	maxLonIndex = np.argmax(LON[0,:] == maxLon)
+	minLatIndex = np.argmax(context.LAT[:,0] == minLat)
+	maxLatIndex = np.argmax(context.LAT[:,0]== maxLat)
+	minLonIndex = np.argmax(context.LON[0,:] == minLon)
+	maxLonIndex = np.argmax(context.LON[0,:] == maxLon)
 
 	criteriaBframe = ma.zeros(((abs(maxLatIndex - minLatIndex)+1), (abs(maxLonIndex - minLonIndex)+1)))
 	
 	for x in thisCloudElementLatLon:
 		#to store the values of the subset in the new array, remove the minLatIndex and minLonindex from the
 		#index given in the original array to get the indices for the new array
-		criteriaBframe[(np.argmax(LAT[:,0] == x[0]) - minLatIndex),(np.argmax(LON[0,:] == x[1]) - minLonIndex)] = x[2]
+		criteriaBframe[(np.argmax(context.LAT[:,0] == x[0]) - minLatIndex),(np.argmax(context.LON[0,:] == x[1]) - minLonIndex)] = x[2]
 
 	#keep only those values < aTemperature
 	tempMask = ma.masked_array(criteriaBframe, mask=(criteriaBframe >= aTemperature), fill_value = 0)
@@ -1554,10 +2038,10 @@ def checkCriteria (thisCloudElementLatLon, aTemperature):
    			if value !=0:
    				t,lat,lon = index
    				#add back on the minLatIndex and minLonIndex to find the true lat, lon values
-   				lat_lon_tuple = (LAT[(lat),0], LON[0,(lon)],value)
+   				lat_lon_tuple = (context.LAT[(lat),0], context.LON[0,(lon)],value)
    				cloudElementCriteriaBLatLon.append(lat_lon_tuple)
 
-		cloudElementArea = np.count_nonzero(cloudElementCriteriaB)*XRES*YRES
+		cloudElementArea = np.count_nonzero(cloudElementCriteriaB)*config.XRES*config.YRES
 		#do some cleaning up
 		tempMask =[]
 		criteriaB =[]
@@ -1565,11 +2049,12 @@ def checkCriteria (thisCloudElementLatLon, aTemperature):
 
 		return cloudElementArea, cloudElementCriteriaBLatLon
 #******************************************************************
-def hasMergesOrSplits (nodeList):
+def hasMergesOrSplits (context, nodeList):
 	'''
 	Purpose:: 
 		Determine if nodes within a path defined from shortest_path splittingNodeDict
 	Input:: 
+		context: the SearchContext of the search
 		nodeList: list of strings representing the nodes from a path
 	Output:: 
 		splitList: a list of strings representing all the nodes in the path that split
@@ -1578,11 +2063,11 @@ def hasMergesOrSplits (nodeList):
 	mergeList=[]
 	splitList=[]
 
-	for node,numParents in PRUNED_GRAPH.in_degree(nodeList).items():
+	for node,numParents in context.prunedGraph.in_degree(nodeList).items():
 		if numParents > 1:
 			mergeList.append(node)
 
-	for node, numChildren in PRUNED_GRAPH.out_degree(nodeList).items():
+	for node, numChildren in context.prunedGraph.out_degree(nodeList).items():
 		if numChildren > 1:
 			splitList.append(node)
 	#sort
@@ -1591,12 +2076,13 @@ def hasMergesOrSplits (nodeList):
 			
 	return mergeList,splitList
 #******************************************************************
-def allAncestors(path, aNode):
+def allAncestors(context, path, aNode):
 	'''
 	Purpose:: 
 		Utility script to provide the path leading up to a nodeList
 
 	Input:: 
+		context: the SearchContext of the search
 		path: a list of strings representing the nodes in the path 
 		aNode: a string representing a node to be checked for parents
 
@@ -1605,24 +2091,25 @@ def allAncestors(path, aNode):
 		numOfChildren: an integer representing the number of parents of the node passed
 	'''
 
-	numOfParents = PRUNED_GRAPH.in_degree(aNode)
+	numOfParents = context.prunedGraph.in_degree(aNode)
 	try:
-		if PRUNED_GRAPH.predecessors(aNode) and numOfParents <= 1:
-			path = path + PRUNED_GRAPH.predecessors(aNode)
-			thisNode = PRUNED_GRAPH.predecessors(aNode)[0]
-			return allAncestors(path,thisNode)
+		if context.prunedGraph.predecessors(aNode) and numOfParents <= 1:
+			path = path + context.prunedGraph.predecessors(aNode)
+			thisNode = context.prunedGraph.predecessors(aNode)[0]
+			return allAncestors(context, path,thisNode)
 		else:
 			path = path+aNode
 			return path, numOfParents
 	except:
 		return path, numOfParents
 #******************************************************************
-def allDescendants(path, aNode):
+def allDescendants(context, path, aNode):
 	'''
 	Purpose:: 
 		Utility script to provide the path leading up to a nodeList
 
 	Input:: 
+		context: the SearchContext of the search
 		path: a list of strings representing the nodes in the path 
 		aNode: a string representing a node to be checked for children
 
@@ -1631,26 +2118,27 @@ def allDescendants(path, aNode):
 		numOfChildren: an integer representing the number of children of the node passed
 	'''
 
-	numOfChildren = PRUNED_GRAPH.out_degree(aNode)
+	numOfChildren = context.prunedGraph.out_degree(aNode)
 	try:
-		if PRUNED_GRAPH.successors(aNode) and numOfChildren <= 1:
-			path = path + PRUNED_GRAPH.successors(aNode)
-			thisNode = PRUNED_GRAPH.successors(aNode)[0]
-			return allDescendants(path,thisNode)
+		if context.prunedGraph.successors(aNode) and numOfChildren <= 1:
+			path = path + context.prunedGraph.successors(aNode)
+			thisNode = context.prunedGraph.successors(aNode)[0]
+			return allDescendants(context, path,thisNode)
 		else:
 			path = path + aNode
-			#i.e. PRUNED_GRAPH.predecessors(aNode) is empty
+			#i.e. context.prunedGraph.predecessors(aNode) is empty
 			return path, numOfChildren
 	except:
-		#i.e. PRUNED_GRAPH.predecessors(aNode) threw an exception
+		#i.e. context.prunedGraph.predecessors(aNode) threw an exception
 		return path, numOfChildren
 #******************************************************************
-def addInfothisDict (thisNode, cloudElementArea,criteriaB):
+def addInfothisDict (context, thisNode, cloudElementArea,criteriaB):
 	'''
 	Purpose:: 
 		Update original dictionary node with information
 
 	Input:: 
+		context: the SearchContext of the search
 		thisNode: a string representing the unique ID of a node
 		cloudElementArea: a floating-point number representing the area of the cloud element
 		criteriaB: a masked array of floating-point numbers representing the lat,lons meeting the criteria  
@@ -1658,242 +2146,701 @@ def addInfothisDict (thisNode, cloudElementArea,criteriaB):
 	Output:: None 
 
 	'''
-	for eachdict in CLOUD_ELEMENT_GRAPH.nodes(thisNode):
-		if eachdict[1]['uniqueID'] == thisNode:
-			eachdict[1]['CriteriaBArea'] = cloudElementArea
-			eachdict[1]['CriteriaBLatLon'] = criteriaB
+	eachdict = context.cloudElementGraph.node[thisNode]
+	eachdict['CriteriaBArea'] = cloudElementArea
+	eachdict['CriteriaBLatLon'] = criteriaB
+	updateCETable(context, thisNode, eachdict)
 	return
 #******************************************************************
-def addNodeBehaviorIdentifier (thisNode, nodeBehaviorIdentifier):
+def addNodeBehaviorIdentifier (context, thisNode, nodeBehaviorIdentifier):
 	'''
 	Purpose:: add an identifier to the node dictionary to indicate splitting, merging or neither node
 
 	Input:: 
+		context: the SearchContext of the search
 		thisNode: a string representing the unique ID of a node
 		nodeBehaviorIdentifier: a string representing the behavior S- split, M- merge, B- both split and merge, N- neither split or merge 
 
 	Output :: None
 
 	'''
-	for eachdict in CLOUD_ELEMENT_GRAPH.nodes(thisNode):
-		if eachdict[1]['uniqueID'] == thisNode:
-			if not 'nodeBehaviorIdentifier' in eachdict[1].keys():
-				eachdict[1]['nodeBehaviorIdentifier'] = nodeBehaviorIdentifier
+	eachdict = context.cloudElementGraph.node[thisNode]
+	if not 'nodeBehaviorIdentifier' in eachdict:
+		eachdict['nodeBehaviorIdentifier'] = nodeBehaviorIdentifier
+		updateCETable(context, thisNode, eachdict)
 	return
 #******************************************************************
-def addNodeMCSIdentifier (thisNode, nodeMCSIdentifier):
+def addNodeMCSIdentifier (context, thisNode, nodeMCSIdentifier):
 	'''
 	Purpose:: 
 		Add an identifier to the node dictionary to indicate splitting, merging or neither node
 
-	Input:: 
-		thisNode: a string representing the unique ID of a node
-		nodeMCSIdentifier: a string representing the stage of the MCS lifecyle  'I' for Initiation, 'M' for Maturity, 'D' for Decay
+	Input:: 
+		context: the SearchContext of the search
+		thisNode: a string representing the unique ID of a node
+		nodeMCSIdentifier: a string representing the stage of the MCS lifecyle  'I' for Initiation, 'M' for Maturity, 'D' for Decay
+
+	Output :: None
+
+	'''
+	eachdict = context.cloudElementGraph.node[thisNode]
+	if not 'nodeMCSIdentifier' in eachdict:
+		eachdict['nodeMCSIdentifier'] = nodeMCSIdentifier
+		updateCETable(context, thisNode, eachdict)
+	return
+#******************************************************************
+def updateNodeMCSIdentifier (context, thisNode, nodeMCSIdentifier):
+	'''
+	Purpose:: 
+		Update an identifier to the node dictionary to indicate splitting, merging or neither node
+
+	Input:: 
+		context: the SearchContext of the search
+		thisNode: thisNode: a string representing the unique ID of a node
+		nodeMCSIdentifier: a string representing the stage of the MCS lifecyle  'I' for Initiation, 'M' for Maturity, 'D' for Decay  
+
+	Output :: None
+
+	'''
+	eachdict = context.cloudElementGraph.node[thisNode]
+	eachdict['nodeMCSIdentifier'] = nodeMCSIdentifier
+	updateCETable(context, thisNode, eachdict)
+
+	return
+#******************************************************************
+def eccentricity (cloudElementLatLon):
+	'''
+	Purpose::
+		Determines the eccentricity (shape) of contiguous boxes 
+		Values tending to 1 are more circular by definition, whereas 
+		values tending to 0 are more linear
+	
+	Input::
+		cloudElementLatLon: 2D array in (lat,lon) representing T_bb contiguous squares 
+		
+	Output::
+		epsilon: a floating-point representing the eccentricity of the matrix passed
+	
+	'''
+	
+	epsilon = 0.0
+	
+	if len(cloudElementLatLon) > 0:
+		#determine the number of non-zero cols and rows
+		nonEmptyLons = sum(sum(cloudElementLatLon)>0)
+		nonEmptyLats = sum(sum(cloudElementLatLon.transpose())>0)
+		
+		lonEigenvalues = 1.0 * nonEmptyLats / (nonEmptyLons+0.001) #for long oval on y axis
+		latEigenvalues = 1.0 * nonEmptyLons / (nonEmptyLats +0.001) #for long oval on x-axs
+		epsilon = min(latEigenvalues,lonEigenvalues)
+		
+	return epsilon
+#******************************************************************
+def cloudElementOverlap (context, currentCELatLons, previousCELatLons):
+	'''
+	Purpose::
+		Determines the percentage overlap between two list of lat-lons passed
+
+	Input::
+		context: the SearchContext of the search
+		currentCELatLons: a list of tuples for the current CE
+		previousCELatLons: a list of tuples for the other CE being considered
+
+	Output::
+		percentageOverlap: a floating-point representing the number of overlapping lat_lon tuples
+		areaOverlap: a floating-point number representing the area overlapping
+
+	'''
+	config = context.config
+
+	latlonprev =[]
+	latloncurr = []
+	count = 0 
+	percentageOverlap = 0.0
+	areaOverlap = 0.0
+
+	#remove the temperature from the tuples for currentCELatLons and previousCELatLons then check for overlap
+	latlonprev = [(x[0],x[1]) for x in previousCELatLons]
+	latloncurr = [(x[0],x[1]) for x in currentCELatLons]  
+
+	#find overlap
+	count = len(list(set(latloncurr)&set(latlonprev)))
+
+	#find area overlap
+	areaOverlap = count*config.XRES*config.YRES
+	
+	#find percentage
+	percentageOverlap = max(((count*1.0)/(len(latloncurr)*1.0)),((count*1.0)/(len(latlonprev)*1.0)))
+	
+	return percentageOverlap, areaOverlap
+#******************************************************************
+def findCESpeed(context, node, MCSList):
+	'''
+	Purpose:: 
+		To determine the speed of the CEs uses vector displacement delta_lat/delta_lon (y/x)
+
+	Input:: 
+		context: the SearchContext of the search
+		node: a string representing the CE
+		MCSList: a list of strings representing the feature
+
+	Output::
+		CEspeed: a floating-point number representing the speed of the CE 
+
+	'''
+	config = context.config
+
+	#the successors of the node that are part of the MCSList
+	theList = [aNode for aNode in context.cloudElementGraph.successors(node) if aNode in MCSList]
+	if not theList:
+		return 0.0
+
+	nodeRow = CETableRows(context, [node])
+	aNodeRows = CETableRows(context, theList)
+
+	#calculate CE speed from the distance to each of them
+	delta_lat = ((nodeRow['latCenter'] +90.0) - (aNodeRows['latCenter']+90.0))
+	delta_lon = ((nodeRow['lonCenter']+360.0) - (aNodeRows['lonCenter']+360.0))
+
+	#the speed is 0.0 if the lons are the same
+	movedLon = delta_lon != 0.0
+	CEspeed = np.zeros(len(theList))
+	CEspeed[movedLon] = abs((((delta_lat[movedLon]/delta_lon[movedLon])*config.LAT_DISTANCE*1000)/(config.TRES*3600))) #convert to s --> m/s
+
+	return CEspeed.min()
+#******************************************************************
+#
+#			UTILITY SCRIPTS FOR MCCSEARCH.PY
+#
+#******************************************************************
+def imapBounded(pool, function, tasks, maxPending):
+	'''
+	Purpose::
+		Like pool.imap, applies a function to the tasks in a pool of processes and yields the results in the order 
+		of the tasks, but only takes the next task from tasks when fewer than maxPending results are waiting. 
+		pool.imap takes all the tasks at once, which would read all the frames into memory
+
+	Input::
+		pool: a multiprocessing.Pool
+		function: a module level function taking one task
+		tasks: an iterable of the tasks
+		maxPending: an integer representing the number of tasks that are run or waiting to be taken at any time
+
+	Output::
+		A generator of the results of the function in the order of the tasks
+
+	'''
+
+	pending = deque()
+	for task in tasks:
+		pending.append(pool.apply_async(function, (task,)))
+		if len(pending) >= maxPending:
+			yield pending.popleft().get()
+
+	while pending:
+		yield pending.popleft().get()
+#******************************************************************
+def initWorker(context, sharedData=None):
+	'''
+	Purpose::
+		Keeps the search context and the data shared by the tasks in a worker process of a pool, so that they are 
+		not sent with each task. Used as the initializer of the pool
+
+	Input::
+		context: the SearchContext of the search
+		sharedData (optional): the data shared by the tasks e.g. the MERG data in runSweep
+
+	Output:: None
+
+	Assumptions::
+		The processes are forked, so the context and the data are not copied until they are modified
+
+	'''
+
+	WORKER_STATE['context'] = context
+	WORKER_STATE['sharedData'] = sharedData
+#******************************************************************
+def maenumerate(mArray):
+	'''
+	Purpose::
+		Utility script for returning the actual values from the masked array
+		Taken from: http://stackoverflow.com/questions/8620798/numpy-ndenumerate-for-masked-arrays
+	
+	Input::
+		mArray: the masked array returned from the ma.array() command
+		
+		
+	Output::
+		maskedValues: 3D (t,lat,lon), value of only masked values
+	
+	'''
+
+	mask = ~mArray.mask.ravel()
+	#beware yield fast, but generates a type called "generate" that does not allow for array methods
+	for index, maskedValue in itertools.izip(np.ndenumerate(mArray), mask):
+		if maskedValue: 
+			yield index	
+#******************************************************************
+def createMainDirectory(context, mainDirStr):
+	'''
+	Purpose:: 
+		To create the main directory for storing information and
+		the subdirectories for storing information
+	Input:: 
+		context: the SearchContext of the search
+		mainDir: a directory for where all information generated from
+			the program are to be stored
+	Output:: None
+
+	'''
+	#the output is stored by absolute paths, which still hold after the change of directory below
+	context.mainDirectory = os.path.abspath(mainDirStr)
+	#if directory doesnt exist, creat it
+	if not os.path.exists(context.mainDirectory):
+		os.makedirs(context.mainDirectory)
+
+	os.chdir((context.mainDirectory))
+	#create the subdirectories
+	try:	
+		os.makedirs('images')
+		os.makedirs('textFiles')
+		os.makedirs('TRMMnetcdfCEs')
+	except:
+		print "Directory exists already!!!"
+		#TODO: some nice way of prompting if it is ok to continue...or just leave
+
+	return 
+#******************************************************************
+def createCloudElementStore(context):
+	'''
+	Purpose::
+		Creates the store for the boxes of all the CEs of a run. The store is a single NETCDF file, 
+		context.mainDirectory/cloudElements.nc, with an index of the CEs and the (lat,lon) indices and 
+		values of the boxes of each CE instead of a full grid NETCDF file for each CE
+
+	Input::
+		context: the SearchContext of the search
+
+	Output::
+		CEStore: the NETCDF4 Dataset of the store, to add CEs to with addCloudElementsToStore
+
+	'''
+
+	CEStore = Dataset(context.mainDirectory+'/'+CE_STORE_FILENAME, 'w', format='NETCDF4')
+	CEStore.description = 'Cloud Elements brightness temperature and precipitation data'
+	CEStore.calendar = 'standard'
+	CEStore.conventions = 'COARDS'
+	# dimensions
+	CEStore.createDimension('lat', len(context.LAT[:,0]))
+	CEStore.createDimension('lon', len(context.LON[0,:]))
+	CEStore.createDimension('cloudElement', None)
+	CEStore.createDimension('box', None)
+	# the grid
+	latitudes = CEStore.createVariable('latitude', 'f8', ('lat',))
+	latitudes[:] = context.LAT[:,0]
+	latitudes.units = "degrees_north"
+	latitudes.long_name = "Latitude"
+	longitudes = CEStore.createVariable('longitude', 'f8', ('lon',))
+	longitudes[:] = context.LON[0,:]
+	longitudes.units = "degrees_east" 
+	longitudes.long_name = "Longitude" 
+	# the index of the CEs, whose boxes are numOfBoxes boxes from firstBox
+	CEStore.createVariable('uniqueID', str, ('cloudElement',))
+	times = CEStore.createVariable('time', 'f8', ('cloudElement',))
+	times.units = 'hours since 1970-01-01 00:00:00'
+	CEStore.createVariable('firstBox', 'i8', ('cloudElement',))
+	CEStore.createVariable('numOfBoxes', 'i4', ('cloudElement',))
+	# the boxes
+	CEStore.createVariable('latIndex', 'i4', ('box',))
+	CEStore.createVariable('lonIndex', 'i4', ('box',))
+	brightnesstemp = CEStore.createVariable('brightnesstemp', 'i2', ('box',))
+	brightnesstemp.units = 'Kelvin'
+	rainFallacc = CEStore.createVariable('precipitation_Accumulation', 'f8', ('box',))
+	rainFallacc.units = 'mm'
+
+	return CEStore
+#******************************************************************
+def addCloudElementsToStore(CEStore, CERecords, firstCE=None, firstBox=None):
+	'''
+	Purpose::
+		Adds CEs to the store created by createCloudElementStore
+
+	Input::
+		CEStore: the NETCDF4 Dataset of the store
+		CERecords: a list of tuples (uniqueID, time, latIndices, lonIndices, brightnesstemp, precipitation) for each
+			CE where the indices and values are arrays for the CE's boxes. precipitation is None if there is no TRMM data
+		firstCE (optional): an integer representing the index in the store of the first CE. The default adds the CEs 
+			after the last CE in the store
+		firstBox (optional): an integer representing the index in the store of the first box of the CEs. The default adds
+			the boxes after the last box in the store
+
+	Output:: None
+
+	Assumptions::
+		Only the CEs and boxes from firstCE and firstBox are overwritten e.g. when going on from a checkpoint
+
+	'''
+
+	if not CERecords:
+		return
+
+	if firstCE is None:
+		firstCE = len(CEStore.dimensions['cloudElement'])
+	if firstBox is None:
+		firstBox = len(CEStore.dimensions['box'])
+
+	lastCE = firstCE + len(CERecords)
+	numOfBoxes = np.array([len(record[2]) for record in CERecords])
+	lastBoxes = firstBox + np.cumsum(numOfBoxes)
+
+	CEStore.variables['uniqueID'][firstCE:lastCE] = np.array([record[0] for record in CERecords], dtype='object')
+	CEStore.variables['time'][firstCE:lastCE] = [(record[1] - datetime(1970,1,1)).total_seconds()/3600.0 for record in CERecords]
+	CEStore.variables['firstBox'][firstCE:lastCE] = lastBoxes - numOfBoxes
+	CEStore.variables['numOfBoxes'][firstCE:lastCE] = numOfBoxes
+
+	CEStore.variables['latIndex'][firstBox:lastBoxes[-1]] = np.concatenate([record[2] for record in CERecords])
+	CEStore.variables['lonIndex'][firstBox:lastBoxes[-1]] = np.concatenate([record[3] for record in CERecords])
+	CEStore.variables['brightnesstemp'][firstBox:lastBoxes[-1]] = np.concatenate([record[4] for record in CERecords])
+	CEStore.variables['precipitation_Accumulation'][firstBox:lastBoxes[-1]] = np.concatenate(
+		[record[5] if record[5] is not None else np.zeros(len(record[2])) for record in CERecords])
+
+	return
+#******************************************************************
+def readCloudElementStoreIndex(CEStore):
+	'''
+	Purpose::
+		Reads the index of the CEs in the store created by findCloudElements
+
+	Input::
+		CEStore: the NETCDF4 Dataset of the store
+
+	Output::
+		uniqueIDs: a list of strings representing the uniqueIDs of the CEs in the order they were found
+		times: a list of python datetimes of the CEs
+		firstBoxes: an integer array of the index of the first box of each CE
+		numOfBoxes: an integer array of the number of boxes of each CE
+
+	'''
+
+	numOfCEs = len(CEStore.dimensions['cloudElement'])
+	if numOfCEs == 0:
+		return [], [], np.zeros(0, dtype='int64'), np.zeros(0, dtype='int32')
+
+	uniqueIDs = list(CEStore.variables['uniqueID'][:])
+	times = [datetime(1970,1,1) + timedelta(hours=float(hours)) for hours in CEStore.variables['time'][:]]
+
+	return uniqueIDs, times, CEStore.variables['firstBox'][:], CEStore.variables['numOfBoxes'][:]
+#******************************************************************
+def readCloudElements(context, varName, uniqueIDs=None, startTime=None, endTime=None):
+	'''
+	Purpose::
+		Reads the data of CEs from the store created by findCloudElements 
+
+	Input::
+		context: the SearchContext of the search
+		varName: a string representing the variable to read, 'brightnesstemp' or 'precipitation_Accumulation'
+		uniqueIDs (optional): a list of strings representing the uniqueIDs of the CEs to read in that order. 
+			The default reads all the CEs in the order they were found
+		startTime (optional): a python datetime of the earliest CE to read
+		endTime (optional): a python datetime of the latest CE to read
+
+	Output::
+		A generator of tuples (uniqueID, time, values) for each CE where values is a 2D array (lat,lon)
+		of the variable over the full grid that is zero outside the CE. The uniqueIDs not in the store are skipped
+
+	'''
+
+	CEStore = Dataset(context.mainDirectory+'/'+CE_STORE_FILENAME, 'r', format='NETCDF4')
+	try:
+		allUniqueIDs, times, firstBoxes, numOfBoxes = readCloudElementStoreIndex(CEStore)
+		nygrd = len(CEStore.dimensions['lat']); nxgrd = len(CEStore.dimensions['lon'])
+
+		if uniqueIDs is None:
+			CEIndices = range(len(allUniqueIDs))
+		else:
+			rows = dict((uniqueID, row) for row, uniqueID in enumerate(allUniqueIDs))
+			CEIndices = [rows[uniqueID] for uniqueID in uniqueIDs if uniqueID in rows]
+
+		for CEIndex in CEIndices:
+			if (startTime and times[CEIndex] < startTime) or (endTime and times[CEIndex] > endTime):
+				continue
 
-	Output :: None
+			boxes = slice(firstBoxes[CEIndex], firstBoxes[CEIndex] + numOfBoxes[CEIndex])
+			values = np.zeros((nygrd, nxgrd), dtype=CEStore.variables[varName].dtype)
+			values[CEStore.variables['latIndex'][boxes], CEStore.variables['lonIndex'][boxes]] = CEStore.variables[varName][boxes]
 
-	'''
-	for eachdict in CLOUD_ELEMENT_GRAPH.nodes(thisNode):
-		if eachdict[1]['uniqueID'] == thisNode:
-			if not 'nodeMCSIdentifier' in eachdict[1].keys():
-				eachdict[1]['nodeMCSIdentifier'] = nodeMCSIdentifier
-	return
+			yield allUniqueIDs[CEIndex], times[CEIndex], values
+	finally:
+		CEStore.close()
 #******************************************************************
-def updateNodeMCSIdentifier (thisNode, nodeMCSIdentifier):
+def readCloudElementStoreGrid(context):
 	'''
-	Purpose:: 
-		Update an identifier to the node dictionary to indicate splitting, merging or neither node
+	Purpose::
+		Reads the grid of the store created by findCloudElements 
 
-	Input:: 
-		thisNode: thisNode: a string representing the unique ID of a node
-		nodeMCSIdentifier: a string representing the stage of the MCS lifecyle  'I' for Initiation, 'M' for Maturity, 'D' for Decay  
+	Input::
+		context: the SearchContext of the search
 
-	Output :: None
+	Output::
+		lats: a 1D array of the latitudes of the grid
+		lons: a 1D array of the longitudes of the grid
 
 	'''
-	for eachdict in CLOUD_ELEMENT_GRAPH.nodes(thisNode):
-		if eachdict[1]['uniqueID'] == thisNode:
-			eachdict[1]['nodeMCSIdentifier'] = nodeBehaviorIdentifier
 
-	return
+	CEStore = Dataset(context.mainDirectory+'/'+CE_STORE_FILENAME, 'r', format='NETCDF4')
+	lats = CEStore.variables['latitude'][:]
+	lons = CEStore.variables['longitude'][:]
+	CEStore.close()
+
+	return lats, lons
 #******************************************************************
-def eccentricity (cloudElementLatLon):
+def loadCheckpoint(context):
 	'''
 	Purpose::
-		Determines the eccentricity (shape) of contiguous boxes 
-		Values tending to 1 are more circular by definition, whereas 
-		values tending to 0 are more linear
-	
+		Restores the graphs of a search from the checkpoints in context.mainDirectory, so that the search can go on 
+		from the last stage it completed e.g. findMCC with other MCC criteria, without finding the CEs again
+
 	Input::
-		cloudElementLatLon: 2D array in (lat,lon) representing T_bb contiguous squares 
-		
+		context: the SearchContext of the search, with the mainDirectory of the run that saved the checkpoints
+
 	Output::
-		epsilon: a floating-point representing the eccentricity of the matrix passed
-	
+		stage: a string representing the last stage that was restored, 'cloudClusters' if context.cloudElementGraph 
+			and context.prunedGraph were restored, 'cloudElements' if only context.cloudElementGraph was restored, 
+			or None if there is no checkpoint of a completed stage for the user defined variables in context.config
+		NB: context.LAT, context.LON and context.CETable are also restored
+
+	Assumptions::
+		The CE store of the run is in context.mainDirectory
+		The checkpoint of a stage is only used if the user defined variables the stage depends on, 
+		CLOUD_ELEMENT_PARAMETERS or CLOUD_CLUSTER_PARAMETERS, are the same as in context.config
+
 	'''
-	
-	epsilon = 0.0
-	
-	#loop over all lons and determine longest (non-zero) col
-	#loop over all lats and determine longest (non-zero) row
-	for latLon in cloudElementLatLon:
-		#assign a matrix to determine the legit values
-		
-		nonEmptyLons = sum(sum(cloudElementLatLon)>0)
-		nonEmptyLats = sum(sum(cloudElementLatLon.transpose())>0)
-		
-		lonEigenvalues = 1.0 * nonEmptyLats / (nonEmptyLons+0.001) #for long oval on y axis
-		latEigenvalues = 1.0 * nonEmptyLons / (nonEmptyLats +0.001) #for long oval on x-axs
-		epsilon = min(latEigenvalues,lonEigenvalues)
-		
-	return epsilon
+
+	checkpoint = readCheckpoint(context, 'cloudElements', CLOUD_ELEMENT_PARAMETERS)
+	if checkpoint is None or not checkpoint['complete']:
+		return None
+
+	restoreCloudElementGraph(context, checkpoint)
+	print "number of nodes in the restored CE graph are: ", context.cloudElementGraph.number_of_nodes()
+
+	checkpoint = readCheckpoint(context, 'cloudClusters', CLOUD_CLUSTER_PARAMETERS)
+	if checkpoint is None:
+		return 'cloudElements'
+
+	context.prunedGraph = nx.DiGraph()
+	context.prunedGraph.add_nodes_from(checkpoint['nodes'].tolist())
+	for (source, target), weight in zip(checkpoint['edges'].tolist(), checkpoint['weights'].tolist()):
+		context.prunedGraph.add_edge(source, target, weight=weight)
+	print "number of nodes in the restored pruned graph are: ", context.prunedGraph.number_of_nodes()
+
+	return 'cloudClusters'
 #******************************************************************
-def cloudElementOverlap (currentCELatLons, previousCELatLons):
+def writeCheckpoint(context, stage, parameterNames, arrays):
 	'''
 	Purpose::
-		Determines the percentage overlap between two list of lat-lons passed
+		Saves the checkpoint of a stage of a search to context.mainDirectory/checkpoints/stage.npz, a compressed 
+		numpy archive of arrays that is read without unpickling
 
 	Input::
-		currentCELatLons: a list of tuples for the current CE
-		previousCELatLons: a list of tuples for the other CE being considered
+		context: the SearchContext of the search
+		stage: a string representing the stage, 'cloudElements' or 'cloudClusters'
+		parameterNames: a tuple of the names of the user defined variables the stage depends on
+		arrays: a dictionary of the arrays of the checkpoint by name
 
-	Output::
-		percentageOverlap: a floating-point representing the number of overlapping lat_lon tuples
-		areaOverlap: a floating-point number representing the area overlapping
+	Output:: None
 
-	'''
+	Assumptions::
+		The checkpoint is written to a temporary file that is renamed, so a crash never leaves a partial checkpoint
 
-	latlonprev =[]
-	latloncurr = []
-	count = 0 
-	percentageOverlap = 0.0
-	areaOverlap = 0.0
+	'''
 
-	#remove the temperature from the tuples for currentCELatLons and previousCELatLons then check for overlap
-	latlonprev = [(x[0],x[1]) for x in previousCELatLons]
-	latloncurr = [(x[0],x[1]) for x in currentCELatLons]  
+	checkpointDir = os.path.join(context.mainDirectory, CHECKPOINT_DIRNAME)
+	if not os.path.exists(checkpointDir):
+		os.makedirs(checkpointDir)
 
-	#find overlap
-	count = len(list(set(latloncurr)&set(latlonprev)))
+	arrays = dict(arrays, parameterNames=np.array(parameterNames), 
+				parameterValues=np.array([repr(getattr(context.config, name)) for name in parameterNames]))
 
-	#find area overlap
-	areaOverlap = count*XRES*YRES
-	
-	#find percentage
-	percentageOverlap = max(((count*1.0)/(len(latloncurr)*1.0)),((count*1.0)/(len(latlonprev)*1.0)))
-	
-	return percentageOverlap, areaOverlap
+	handle, tempPath = tempfile.mkstemp(dir=checkpointDir, suffix='.tmp')
+	try:
+		with os.fdopen(handle, 'wb') as checkpointFile:
+			np.savez_compressed(checkpointFile, **arrays)
+		os.rename(tempPath, os.path.join(checkpointDir, stage + '.npz'))
+	except:
+		os.remove(tempPath)
+		raise
 #******************************************************************
-def findCESpeed(node, MCSList):
+def readCheckpoint(context, stage, parameterNames):
 	'''
-	Purpose:: 
-		To determine the speed of the CEs uses vector displacement delta_lat/delta_lon (y/x)
+	Purpose::
+		Reads the checkpoint of a stage of a search saved by writeCheckpoint
 
-	Input:: 
-		node: a string representing the CE
-		MCSList: a list of strings representing the feature
+	Input::
+		context: the SearchContext of the search
+		stage: a string representing the stage, 'cloudElements' or 'cloudClusters'
+		parameterNames: a tuple of the names of the user defined variables the stage depends on
 
 	Output::
-		CEspeed: a floating-point number representing the speed of the CE 
+		checkpoint: a dictionary of the arrays of the checkpoint by name, or None if there is no checkpoint of the stage
+			or it was saved with other values of the user defined variables in parameterNames than in context.config
 
 	'''
 
-	delta_lon =0.0
-	delta_lat =0.0
-	CEspeed =[]
-	theSpeed = 0.0
-	
+	checkpointPath = os.path.join(context.mainDirectory, CHECKPOINT_DIRNAME, stage + '.npz')
+	if not os.path.exists(checkpointPath):
+		return None
 
-	theList = CLOUD_ELEMENT_GRAPH.successors(node)
-	nodeLatLon=thisDict(node)['cloudElementCenter']
+	checkpointFile = np.load(checkpointPath)
+	try:
+		checkpoint = dict((name, checkpointFile[name]) for name in checkpointFile.files)
+	finally:
+		checkpointFile.close()
 
-	
-	for aNode in theList:
-		if aNode in MCSList:
-			#if aNode is part of the MCSList then determine distance
-			aNodeLatLon = thisDict(aNode)['cloudElementCenter']
-			#calculate CE speed
-			#checking the lats
-			# nodeLatLon[0] += 90.0
-			# aNodeLatLon[0] += 90.0
-			# delta_lat = (nodeLatLon[0] - aNodeLatLon[0]) 
-			delta_lat = ((thisDict(node)['cloudElementCenter'][0] +90.0) - (thisDict(aNode)['cloudElementCenter'][0]+90.0))
-			# nodeLatLon[1] += 360.0
-			# aNodeLatLon[1] += 360.0
-			# delta_lon = (nodeLatLon[1] - aNodeLatLon[1]) 
-			delta_lon = ((thisDict(node)['cloudElementCenter'][1]+360.0) - (thisDict(aNode)['cloudElementCenter'][1]+360.0))
-			
-			try:
-				theSpeed = abs((((delta_lat/delta_lon)*LAT_DISTANCE*1000)/(TRES*3600))) #convert to s --> m/s
-			except:
-				theSpeed = 0.0
-			
-			CEspeed.append(theSpeed)
+	savedParameters = dict(zip(checkpoint['parameterNames'].tolist(), checkpoint['parameterValues'].tolist()))
+	changedParameters = [name for name in parameterNames if savedParameters.get(name) != repr(getattr(context.config, name))]
+	if changedParameters:
+		print "The %s checkpoint was saved with other %s" %(stage, ', '.join(changedParameters))
+		return None
 
-			# print "~~~ ", thisDict(aNode)['uniqueID']
-			# print "*** ", nodeLatLon, thisDict(node)['cloudElementCenter']
-			# print "*** ", aNodeLatLon, thisDict(aNode)['cloudElementCenter']
-			
-	if not CEspeed:
-		return 0.0
-	else:
-		return min(CEspeed)	
+	return checkpoint
 #******************************************************************
-#
-#			UTILITY SCRIPTS FOR MCCSEARCH.PY
-#
+def removeCheckpoints(context):
+	'''
+	Purpose::
+		Removes the checkpoints of a search e.g. before its CEs are found again
+
+	Input::
+		context: the SearchContext of the search
+
+	Output:: None
+
+	'''
+
+	for stage in ['cloudElements', 'cloudClusters']:
+		checkpointPath = os.path.join(context.mainDirectory, CHECKPOINT_DIRNAME, stage + '.npz')
+		if os.path.exists(checkpointPath):
+			os.remove(checkpointPath)
 #******************************************************************
-def maenumerate(mArray):
+def readCloudElementsProgress(context, TRMMdirName=None):
 	'''
 	Purpose::
-		Utility script for returning the actual values from the masked array
-		Taken from: http://stackoverflow.com/questions/8620798/numpy-ndenumerate-for-masked-arrays
-	
+		Reads the checkpoint of an unfinished findCloudElements or findCloudElementsInFiles, to go on after its last frame
+
 	Input::
-		mArray: the masked array returned from the ma.array() command
-		
-		
+		context: the SearchContext of the search
+		TRMMdirName (optional): string representing the path where to find the TRMM datafiles of the run that goes on
+
 	Output::
-		maskedValues: 3D (t,lat,lon), value of only masked values
-	
+		progress: a dictionary of the arrays of the checkpoint as saved by buildCloudElementGraph, or None if there is 
+			no checkpoint of an unfinished run for the user defined variables in context.config and TRMMdirName
+
 	'''
 
-	mask = ~mArray.mask.ravel()
-	#beware yield fast, but generates a type called "generate" that does not allow for array methods
-	for index, maskedValue in itertools.izip(np.ndenumerate(mArray), mask):
-		if maskedValue: 
-			yield index	
+	progress = readCheckpoint(context, 'cloudElements', CLOUD_ELEMENT_PARAMETERS)
+	if progress is None or progress['complete'] or not os.path.exists(context.mainDirectory+'/'+CE_STORE_FILENAME):
+		return None
+
+	#the CEs found so far have the precipitation of the TRMM data of the run that saved the checkpoint
+	if 'TRMMdirName' not in progress or str(progress['TRMMdirName']) != (TRMMdirName or ''):
+		print "The checkpoint of the unfinished run used other TRMM data, starting from the first frame"
+		return None
+
+	return progress
 #******************************************************************
-def createMainDirectory(mainDirStr):
+def restoreCloudElementGraph(context, checkpoint):
 	'''
-	Purpose:: 
-		To create the main directory for storing information and
-		the subdirectories for storing information
-	Input:: 
-		mainDir: a directory for where all information generated from
-			the program are to be stored
-	Output:: None
+	Purpose::
+		Restores context.cloudElementGraph, context.CETable, context.LAT and context.LON from the checkpoint of 
+		the CEs saved by buildCloudElementGraph and the boxes of the CEs in the CE store
+
+	Input::
+		context: the SearchContext of the search
+		checkpoint: a dictionary of the arrays of the checkpoint as returned by readCheckpoint
+
+	Output::
+		prevFrameCEs: a list of the cloudElementDict of the CEs of the last frame of the checkpoint
+		prevCELabels: a label image of the CEs of the last frame, numbered from 1 in the order of prevFrameCEs
+
+	Assumptions::
+		The nodes and edges are added in the order they were added when the CEs were found, so the graph is the same
+		as the graph that was saved, including the order of its nodes
+		Only the CEs with edges and the CEs of the last frame have their cloudElementDict, the others are removed 
+		once all the frames are considered
 
 	'''
-	global MAINDIRECTORY
 
-	MAINDIRECTORY = mainDirStr
-	#if directory doesnt exist, creat it
-	if not os.path.exists(MAINDIRECTORY):
-		os.makedirs(MAINDIRECTORY)
+	context.LAT = checkpoint['LAT']
+	context.LON = checkpoint['LON']
+	context.CETable = checkpoint['CETable']
+	uniqueIDs = context.CETable['uniqueID'].tolist()
+	context.CETableIndex = dict((uniqueID, row) for row, uniqueID in enumerate(uniqueIDs))
 
-	os.chdir((MAINDIRECTORY))
-	#create the subdirectories
-	try:	
-		os.makedirs('images')
-		os.makedirs('textFiles')
-		os.makedirs('MERGnetcdfCEs')
-		os.makedirs('TRMMnetcdfCEs')
-	except:
-		print "Directory exists already!!!"
-		#TODO: some nice way of prompting if it is ok to continue...or just leave
+	edges = checkpoint['edges']
+	lastFrameRows = checkpoint['lastFrameRows'].tolist()
+	linkedRows = set(edges[:, :2].ravel().tolist())
+	if not checkpoint['complete']:
+		linkedRows.update(lastFrameRows)
 
-	return 
+	#the boxes of the CEs, read at once. The CEs in the store are in the order of the rows of context.CETable
+	CEStore = Dataset(context.mainDirectory+'/'+CE_STORE_FILENAME, 'r', format='NETCDF4')
+	try:
+		firstBoxes = ma.getdata(CEStore.variables['firstBox'][:len(uniqueIDs)])
+		numOfBoxes = ma.getdata(CEStore.variables['numOfBoxes'][:len(uniqueIDs)])
+		latIndices = ma.getdata(CEStore.variables['latIndex'][:int(checkpoint['numOfBoxes'])])
+		lonIndices = ma.getdata(CEStore.variables['lonIndex'][:int(checkpoint['numOfBoxes'])])
+		CEValues = ma.getdata(CEStore.variables['brightnesstemp'][:int(checkpoint['numOfBoxes'])])
+		CETRMMValues = ma.getdata(CEStore.variables['precipitation_Accumulation'][:int(checkpoint['numOfBoxes'])])
+	finally:
+		CEStore.close()
+	CETRMMValues = CETRMMValues.astype(str(checkpoint['precipDtype']))
+	lats = context.LAT[latIndices, 0]
+	lons = context.LON[0, lonIndices]
+
+	context.cloudElementGraph = nx.DiGraph()
+	for row, uniqueID in enumerate(uniqueIDs):
+		if row not in linkedRows:
+			context.cloudElementGraph.add_node(uniqueID)
+			continue
+
+		CERow = context.CETable[row]
+		boxes = slice(firstBoxes[row], firstBoxes[row] + numOfBoxes[row])
+		#the attributes have the types they have when the CEs are found
+		cloudElementDict = {'uniqueID': uniqueID, 'cloudElementTime': CERow['cloudElementTime'].item(), 
+							'cloudElementCenter': [context.LAT.dtype.type(CERow['latCenter']), context.LON.dtype.type(CERow['lonCenter'])], 
+							'cloudElementArea': CERow['cloudElementArea'], 'cloudElementEccentricity': CERow['cloudElementEccentricity'], 
+							'cloudElementTmax': CEValues.dtype.type(CERow['cloudElementTmax']), 
+							'cloudElementTmin': CEValues.dtype.type(CERow['cloudElementTmin'])}
+		cloudElementDict['cloudElementLatLon'] = sorted(zip(lats[boxes], lons[boxes], CEValues[boxes]), key=lambda tup: tup[0])
+
+		#the TRMM info is NaN in the table if TRMMdirName was not entered
+		if not np.isnan(CERow['cloudElementPrecipTotal']):
+			cloudElementDict['cloudElementPrecipTotal'] = float(CERow['cloudElementPrecipTotal'])
+			cloudElementDict['TRMMArea'] = float(CERow['TRMMArea'])
+			if CERow['TRMMArea'] > 0:
+				cloudElementDict['CETRMMmax'] = CETRMMValues.dtype.type(CERow['CETRMMmax'])
+				cloudElementDict['CETRMMmin'] = CETRMMValues.dtype.type(CERow['CETRMMmin'])
+			else:
+				cloudElementDict['CETRMMmax'] = 0.0
+				cloudElementDict['CETRMMmin'] = 0.0
+			cloudElementDict['cloudElementLatLonTRMM'] = zip(lats[boxes], lons[boxes], CETRMMValues[boxes])
+
+		context.cloudElementGraph.add_node(uniqueID, cloudElementDict)
+
+	for prevRow, currRow, weight in edges.tolist():
+		context.cloudElementGraph.add_edge(uniqueIDs[prevRow], uniqueIDs[currRow], weight=weight)
+
+	if checkpoint['complete']:
+		removeUnlinkedCloudElements(context.cloudElementGraph)
+		return [], None
+
+	nygrd = len(context.LAT[:, 0]); nxgrd = len(context.LON[0, :])
+	prevFrameCEs = [context.cloudElementGraph.node[uniqueIDs[row]] for row in lastFrameRows]
+	prevCELabels = np.zeros((nygrd, nxgrd), dtype='int32')
+	for CENum, row in enumerate(lastFrameRows):
+		boxes = slice(firstBoxes[row], firstBoxes[row] + numOfBoxes[row])
+		prevCELabels[latIndices[boxes], lonIndices[boxes]] = CENum + 1
+
+	return prevFrameCEs, prevCELabels
 #******************************************************************
 def checkForFiles(startTime, endTime, thisDir, fileType):
 	'''
@@ -2062,14 +3009,16 @@ def find_nearest(thisArray,value):
 #******************************************************************	
 
 #******************************************************************
-def postProcessingNetCDF(dataset, dirName = None):
+def postProcessingNetCDF(context, dataset, dirName = None):
 	'''
 	Purpose::
 		Utility script displaying the data in NETCDF4 files 
 
 	Input::
+		context: the SearchContext of the search
 		dataset: integer representing original MERG (1) or post-processed MERG data (2) or post-processed TRMM(3)
-		string: Directory to the location of the raw (MERG) files, preferably zipped
+		string: Directory to the location of the raw (MERG) files, preferably zipped. The post-processed
+			data is read from the CE store in context.mainDirectory
 		
 	Output::
 	   Generates 2D plots in location as specfied in the code
@@ -2089,42 +3038,49 @@ def postProcessingNetCDF(dataset, dirName = None):
 		plotTitle = 'TRMM CE data'
 
 	
-	#sort files
-	os.chdir((dirName+'/'))		
-	files = filter(os.path.isfile, glob.glob("*.nc"))
-	files.sort(key=lambda x: os.path.getmtime(x))
-
-	for eachfile in files:
-		fullFname = os.path.splitext(eachfile)[0]
-		fnameNoExtension = fullFname.split('.nc')[0]
-		
-		fname = dirName+'/'+fnameNoExtension+'.nc'
-		
-		if os.path.isfile(fname):	
-			fileData = Dataset(fname,'r',format='NETCDF4')
-			file_variable = fileData.variables[var][:]
-			lats = fileData.variables['latitude'][:]
-			lons = fileData.variables['longitude'][:]
-			LONDATA, LATDATA = np.meshgrid(lons,lats)
-			nygrd = len(LATDATA[:,0]) 
-			nxgrd = len(LONDATA[0,:])
-			fileData.close()
-		
-		imgFilename = MAINDIRECTORY+'/images/'+fnameNoExtension + '.gif'
-		
-		if dataset == 3:
-			createPrecipPlot(np.squeeze(file_variable, axis=0), LATDATA[:,0], LONDATA[0,:],  plotTitle,imgFilename)
-		else:
-			plotter.draw_contour_map(file_variable, LATDATA[:,0], LONDATA[0,:], imgFilename, ptitle=plotTitle)
+	if dataset == 1:
+		#sort files
+		os.chdir((dirName+'/'))		
+		files = filter(os.path.isfile, glob.glob("*.nc"))
+		files.sort(key=lambda x: os.path.getmtime(x))
+
+		for eachfile in files:
+			fullFname = os.path.splitext(eachfile)[0]
+			fnameNoExtension = fullFname.split('.nc')[0]
+			
+			fname = dirName+'/'+fnameNoExtension+'.nc'
+			
+			if os.path.isfile(fname):	
+				fileData = Dataset(fname,'r',format='NETCDF4')
+				file_variable = fileData.variables[var][:]
+				lats = fileData.variables['latitude'][:]
+				lons = fileData.variables['longitude'][:]
+				fileData.close()
+			
+			imgFilename = context.mainDirectory+'/images/'+fnameNoExtension + '.gif'
+			plotter.draw_contour_map(file_variable, lats, lons, imgFilename, ptitle=plotTitle)
+	else:
+		#the CEs are stored in the order they were found
+		lats, lons = readCloudElementStoreGrid(context)
+		for CEuniqueID, CETime, CEValues in readCloudElements(context, var):
+			if dataset == 3:
+				fnameNoExtension = 'TRMM' + str(CETime).replace(" ", "_") + CEuniqueID
+				imgFilename = context.mainDirectory+'/images/'+fnameNoExtension + '.gif'
+				createPrecipPlot(CEValues, lats, lons, plotTitle, imgFilename)
+			else:
+				fnameNoExtension = 'cloudElements' + str(CETime).replace(" ", "_") + CEuniqueID
+				imgFilename = context.mainDirectory+'/images/'+fnameNoExtension + '.gif'
+				plotter.draw_contour_map(CEValues[np.newaxis,:,:], lats, lons, imgFilename, ptitle=plotTitle)
 	
 	return
 #******************************************************************	
-def drawGraph (thisGraph, graphTitle, edgeWeight=None):
+def drawGraph (context, thisGraph, graphTitle, edgeWeight=None):
 	'''
 	Purpose:: 
 		Utility function to draw graph in the hierachial format
 
 	Input:: 
+		context: the SearchContext of the search
 		thisGraph: a Networkx directed graph 
 		graphTitle: a string representing the graph title
 		edgeWeight: (optional) a list of integers representing the edge weights in the graph
@@ -2133,7 +3089,7 @@ def drawGraph (thisGraph, graphTitle, edgeWeight=None):
 
 	'''
 	
-	imgFilename = MAINDIRECTORY+'/images/'+ graphTitle+".gif"
+	imgFilename = context.mainDirectory+'/images/'+ graphTitle+".gif"
 	fig=plt.figure(facecolor='white', figsize=(16,12)) 
 	
 	edge95 = [(u,v) for (u,v,d) in thisGraph.edges(data=True) if d['weight'] == edgeWeight[0]]
@@ -2155,7 +3111,7 @@ def drawGraph (thisGraph, graphTitle, edgeWeight=None):
 	plt.axis('off')
 	plt.savefig(imgFilename, facecolor=fig.get_facecolor(), transparent=True)
 	#do some clean up...and ensuring that we are in the right dir
-	os.chdir((MAINDIRECTORY+'/'))
+	os.chdir((context.mainDirectory+'/'))
 	subprocess.call('rm test.dot', shell=True)
 #******************************************************************
 def getModelTimes(xtimes, timeVarName):
@@ -2337,6 +3293,134 @@ def decodeTimeFromString(time_string):
     print 'Error decoding time string: string does not match a predefined time format'
     return 0
 #******************************************************************
+def readTRMMRegridded(context, TRMMdirName, aTime):
+	'''
+	Purpose::
+		Reads the TRMM data of the 3 hourly file covering a time, regridded to the MERG grid (context.LAT, context.LON).
+		The regridded data of the last MAX_CACHED_TRMM_FIELDS files read is kept, so each file is read
+		and regridded once when the CEs are considered in time order
+
+	Input::
+		context: the SearchContext of the search
+		TRMMdirName: a string representing the directory for the original TRMM netCDF files
+		aTime: a python datetime
+
+	Output::
+		regriddedTRMM: a 2D masked array (lat,lon) of the precipitation rate on the MERG grid
+
+	'''
+
+	temporalRes = 3 # TRMM data is 3 hourly
+	fileHr = (aTime.hour/temporalRes) * temporalRes
+	TRMMfileName = TRMMdirName+'/3B42.'+ aTime.strftime('%Y%m%d') + '.%02d.7A.nc' %fileHr
+
+	#the searches in a process may have different grids
+	cacheKey = (TRMMfileName, context.LAT.shape, context.LAT[0,0], context.LAT[-1,0], context.LON[0,0], context.LON[0,-1])
+	if cacheKey in TRMM_CACHE:
+		regriddedTRMM = TRMM_CACHE.pop(cacheKey)
+		TRMM_CACHE[cacheKey] = regriddedTRMM
+		return regriddedTRMM
+
+	TRMMData = Dataset(TRMMfileName,'r', format='NETCDF4')
+	precipRate = TRMMData.variables['pcp'][0,:,:]
+	latsrawTRMMData = TRMMData.variables['latitude'][:]
+	lonsrawTRMMData = TRMMData.variables['longitude'][:]
+	lonsrawTRMMData[lonsrawTRMMData > 180] = lonsrawTRMMData[lonsrawTRMMData>180] - 360.
+	TRMMData.close()
+
+	precipRateMasked = ma.masked_array(precipRate, mask=(precipRate < 0.0))
+	regriddedTRMM = regridTRMM(precipRateMasked, findTRMMRegridWeights(context, latsrawTRMMData, lonsrawTRMMData))
+
+	TRMM_CACHE[cacheKey] = regriddedTRMM
+	while len(TRMM_CACHE) > MAX_CACHED_TRMM_FIELDS:
+		TRMM_CACHE.popitem(last=False)
+
+	return regriddedTRMM
+#******************************************************************
+def findTRMMRegridWeights(context, latsTRMM, lonsTRMM):
+	'''
+	Purpose::
+		Determines the weights of the bilinear interpolation from the TRMM grid to the MERG grid (context.LAT, context.LON)
+		that do_regrid does. The weights are computed once for each pair of grids
+
+	Input::
+		context: the SearchContext of the search
+		latsTRMM: a 1D array of the latitudes of the TRMM grid
+		lonsTRMM: a 1D array of the longitudes of the TRMM grid
+
+	Output::
+		regridWeights: a dictionary with the four 'corners' around each MERG box as tuples (latIndices, lonIndices, weights)
+			of flat arrays, and 'outsideDomain', a 2D boolean array of the MERG boxes outside the TRMM grid
+
+	'''
+
+	gridKey = (len(latsTRMM), latsTRMM.min(), latsTRMM.max(), len(lonsTRMM), lonsTRMM.min(), lonsTRMM.max(),
+				context.LAT.shape, context.LAT.min(), context.LAT.max(), context.LON.min(), context.LON.max())
+	if gridKey in TRMM_REGRID_WEIGHTS:
+		return TRMM_REGRID_WEIGHTS[gridKey]
+
+	nlat = len(latsTRMM); nlon = len(lonsTRMM)
+
+	#the MERG boxes as (float) indices in the TRMM grid, with the boxes outside along the edges
+	lati = (nlat - 1) * (np.clip(context.LAT.ravel(), latsTRMM.min(), latsTRMM.max()) - latsTRMM.min()) / (latsTRMM.max() - latsTRMM.min())
+	loni = (nlon - 1) * (np.clip(context.LON.ravel(), lonsTRMM.min(), lonsTRMM.max()) - lonsTRMM.min()) / (lonsTRMM.max() - lonsTRMM.min())
+
+	lat0 = np.floor(lati).astype('int64'); lon0 = np.floor(loni).astype('int64')
+	latFraction = lati - lat0; lonFraction = loni - lon0
+
+	corners = []
+	for latOffset, latWeight in ((0, 1.0 - latFraction), (1, latFraction)):
+		for lonOffset, lonWeight in ((0, 1.0 - lonFraction), (1, lonFraction)):
+			#a box on the last row or column has no weight for the next one
+			corners.append((np.minimum(lat0 + latOffset, nlat - 1), np.minimum(lon0 + lonOffset, nlon - 1), 
+							latWeight * lonWeight))
+
+	outsideDomain = np.logical_or(np.logical_or(context.LAT >= latsTRMM.max(), context.LAT <= latsTRMM.min()), 
+								np.logical_or(context.LON <= lonsTRMM.min(), context.LON >= lonsTRMM.max()))
+
+	regridWeights = {'corners': corners, 'outsideDomain': outsideDomain}
+	TRMM_REGRID_WEIGHTS[gridKey] = regridWeights
+
+	return regridWeights
+#******************************************************************
+def regridTRMM(precipRate, regridWeights):
+	'''
+	Purpose::
+		Regrids TRMM data to the MERG grid with the weights from findTRMMRegridWeights in the same way as do_regrid
+
+	Input::
+		precipRate: a 2D masked array (lat,lon) of TRMM data with the missing data masked
+		regridWeights: the dictionary returned by findTRMMRegridWeights for the TRMM grid
+
+	Output::
+		regriddedTRMM: a 2D masked array (lat,lon) on the MERG grid where the boxes that are outside the TRMM grid
+			or are interpolated from missing data are masked
+
+	'''
+
+	#set the missing data to the neighbouring values to avoid strong gradients, as do_regrid does
+	precipRate = ma.masked_array(precipRate, mask=ma.getmaskarray(precipRate), copy=True)
+	for shift in (-1, 1):
+		for axis in (0, 1):
+			shifted = np.roll(precipRate, shift=shift, axis=axis)
+			idx = ~shifted.mask * precipRate.mask
+			precipRate.data[idx] = shifted[idx]
+
+	values = precipRate.data
+	missing = precipRate.mask
+
+	gridShape = regridWeights['outsideDomain'].shape
+	regridded = np.zeros(regridWeights['outsideDomain'].size)
+	interpolatedFromMissing = np.zeros(regridWeights['outsideDomain'].size, dtype='bool')
+	for latIndices, lonIndices, weights in regridWeights['corners']:
+		regridded += weights * values[latIndices, lonIndices]
+		interpolatedFromMissing |= (weights != 0.0) & missing[latIndices, lonIndices]
+
+	regridded = regridded.astype(values.dtype).reshape(gridShape)
+	mask = np.logical_or(interpolatedFromMissing.reshape(gridShape), regridWeights['outsideDomain'])
+
+	return ma.masked_array(regridded, mask=mask)
+#******************************************************************
 def do_regrid(q, lat, lon, lat2, lon2, order=1, mdi=-999999999):
     """ 
     This function has been moved to the ocw/dataset_processor module
@@ -2367,12 +3451,13 @@ def numberOfFeatures(finalMCCList):
 	'''
 	return len(finalMCCList)
 #******************************************************************
-def temporalAndAreaInfoMetric(finalMCCList):
+def temporalAndAreaInfoMetric(context, finalMCCList):
 	'''
 	Purpose:: 
 		To provide information regarding the temporal properties of the MCCs found
 
 	Input:: 
+		context: the SearchContext of the search
 		finalMCCList: a list of dictionaries representing a list of nodes representing a MCC
 	
 	Output:: 
@@ -2392,22 +3477,18 @@ def temporalAndAreaInfoMetric(finalMCCList):
 	
 	if finalMCCList:
 		for eachMCC in finalMCCList:
-			#get the info from the node
-			for eachNode in eachMCC:
-				MCCtimes.append(thisDict(eachNode)['cloudElementTime'])
-				MCSArea.append(thisDict(eachNode)['cloudElementArea'])
-			
-			#sort and remove duplicates 
-			MCCtimes=list(set(MCCtimes))
-			MCCtimes.sort()
+			#get the info from the nodes
+			rows = CETableRows(context, eachMCC)
+			MCSArea = rows['cloudElementArea'].tolist()
+
+			#sort and remove duplicates
+			MCCtimes = np.unique(rows['cloudElementTime']).astype(datetime).tolist()
 			tdelta = MCCtimes[1] - MCCtimes[0]
 			starttime = MCCtimes[0]
 			endtime = MCCtimes[-1]
 			duration = (endtime - starttime) + tdelta
 			print "starttime ", starttime, "endtime ", endtime, "tdelta ", tdelta, "duration ", duration, "MCSAreas ", MCSArea
 			allMCCtimes.append({'MCCtimes':MCCtimes, 'starttime':starttime, 'endtime':endtime, 'duration':duration, 'MCSArea': MCSArea})
-			MCCtimes=[]
-			MCSArea=[]
 	else:
 		allMCCtimes =[]
 		tdelta = 0 
@@ -2509,38 +3590,35 @@ def averageTime (allTimes):
 	rez = str(avgTime/3600) + ' ' + str((avgTime%3600)/60) + ' ' + str(avgTime%60)
 	return datetime.strptime(rez, "%H %M %S")
 #******************************************************************
-def averageFeatureSize(finalMCCList): 
+def averageFeatureSize(context, finalMCCList): 
 	'''
 	Purpose:: To determine the average MCC size for the period
 
-	Input:: a list of list of strings - finalMCCList: a list of list of nodes representing a MCC
+	Input::
+		context: the SearchContext of the search
+		a list of list of strings - finalMCCList: a list of list of nodes representing a MCC
 	
 	Output::a floating-point representing the average area of a MCC in the period
 			
 	Assumptions:: 
 
 	'''
-	thisMCC = 0.0
 	thisMCCAvg = 0.0
 
-	#for each node in the list, get the are information from the dictionary
-	#in the graph and calculate the area
+	#for each path, get the area information from the CE table and calculate the average area
 	for eachPath in finalMCCList:
-		for eachNode in eachPath:
-			thisMCC += thisDict(eachNode)['cloudElementArea']
-
-		thisMCCAvg += (thisMCC/len(eachPath))
-		thisMCC = 0.0
+		thisMCCAvg += CETableRows(context, eachPath)['cloudElementArea'].mean()
 
 	#calcuate final average
 	return thisMCCAvg/(len(finalMCCList))
 #******************************************************************
-def commonFeatureSize(finalMCCList): 
+def commonFeatureSize(context, finalMCCList): 
 	'''
 	Purpose:: 
 		To determine the common (mode) MCC size for the period
 
 	Input:: 
+		context: the SearchContext of the search
 		finalMCCList: a list of list of strings representing the list of nodes representing a MCC
 	
 	Output::
@@ -2549,81 +3627,58 @@ def commonFeatureSize(finalMCCList):
 	Assumptions:: 
 
 	'''
-	thisMCC = 0.0
 	thisMCCAvg = []
 
-	#for each node in the list, get the area information from the dictionary
-	#in the graph and calculate the area
+	#for each path, get the area information from the CE table and calculate the average area
 	for eachPath in finalMCCList:
-		for eachNode in eachPath:
-			thisMCC += eachNode['cloudElementArea']
-
-		thisMCCAvg.append(thisMCC/len(eachPath))
-		thisMCC = 0.0
+		thisMCCAvg.append(CETableRows(context, eachPath)['cloudElementArea'].mean())
 
 	#calcuate 
 	hist, bin_edges = np.histogram(thisMCCAvg)
 	return hist,bin_edges
 #******************************************************************
-def precipTotals(finalMCCList):
+def precipTotals(context, finalMCCList):
 	'''
 	Purpose:: 
 		Precipitation totals associated with a cloud element
 
 	Input:: 
+		context: the SearchContext of the search
 		finalMCCList: a list of dictionaries representing a list of nodes representing a MCC
 
 	Output:: 
 		precipTotal: a floating-point number representing the total amount of precipitation associated 
 			with the feature
 	'''
-	precipTotal = 0.0
-	CEprecip =0.0
 	MCSPrecip=[]
 	allMCSPrecip =[]
-	count = 0
 
 	if finalMCCList:
-		#print "len finalMCCList is: ", len(finalMCCList)
 		for eachMCC in finalMCCList:
-			#get the info from the node
-			for node in eachMCC:
-				eachNode=thisDict(node)
-				count += 1
-				if count == 1:
-					prevHr = int(str(eachNode['cloudElementTime']).replace(" ", "")[-8:-6])
-				
-				currHr =int(str(eachNode['cloudElementTime']).replace(" ", "")[-8:-6])
-				if prevHr == currHr:
-					CEprecip += eachNode['cloudElementPrecipTotal'] 
-				else:
-					MCSPrecip.append((prevHr,CEprecip))
-					CEprecip = eachNode['cloudElementPrecipTotal'] 
-				#last value in for loop
-				if count == len(eachMCC):
-					MCSPrecip.append((currHr, CEprecip))
-
-				precipTotal += eachNode['cloudElementPrecipTotal'] 
-				prevHr = currHr
-
-			MCSPrecip.append(('0',precipTotal))
+			#get the info from the nodes
+			rows = CETableRows(context, eachMCC)
+			CETimes = rows['cloudElementTime']
+			CEHrs = (CETimes - CETimes.astype('M8[D]')).astype('m8[h]').astype('int')
+			CEprecip = rows['cloudElementPrecipTotal']
+
+			#the precip of each run of consecutive nodes in the same hour
+			hrStarts = np.flatnonzero(np.r_[True, CEHrs[1:] != CEHrs[:-1]])
+			MCSPrecip = zip(CEHrs[hrStarts].tolist(), np.add.reduceat(CEprecip, hrStarts).tolist())
+			MCSPrecip.append(('0',CEprecip.sum()))
 			
 			allMCSPrecip.append(MCSPrecip)
-			precipTotal =0.0
-			CEprecip = 0.0
-			MCSPrecip = []
-			count = 0
 
 		print "allMCSPrecip ", allMCSPrecip
 
 	return allMCSPrecip
 #******************************************************************
-def precipMaxMin(finalMCCList):
+def precipMaxMin(context, finalMCCList):
 	'''
 	TODO: this doesnt work the np.min/max function seems to be not working with the nonzero option..possibly a problem upstream with cloudElementLatLonTRMM
 	Purpose:: 
 		Precipitation maximum and min rates associated with each CE in MCS
 	Input:: 
+		context: the SearchContext of the search
 		finalMCCList: a list of dictionaries representing a list of nodes representing a MCC
 
 	Output::
@@ -2639,7 +3694,7 @@ def precipMaxMin(finalMCCList):
 	if finalMCCList:
 		if type(finalMCCList[0]) is str: # len(finalMCCList) == 1:
 			for node in finalMCCList:
-				eachNode = thisDict(node)
+				eachNode = thisDict(context, node)
 				CETRMM = eachNode['cloudElementLatLonTRMM']
 
 				print "all ", np.min(CETRMM[np.nonzero(CETRMM)])
@@ -2655,7 +3710,7 @@ def precipMaxMin(finalMCCList):
 			for eachMCC in finalMCCList:
 				#get the info from the node
 				for node in eachMCC: 
-					eachNode=thisDict(node)
+					eachNode=thisDict(context, node)
 					#find min and max precip
 					maxCEprecip =  np.max(eachNode['cloudElementLatLonTRMM'][np.nonzero(eachNode['cloudElementLatLonTRMM'])])
 					minCEprecip =  np.min(eachNode['cloudElementLatLonTRMM'][np.nonzero(eachNode['cloudElementLatLonTRMM'])])
@@ -2669,12 +3724,13 @@ def precipMaxMin(finalMCCList):
 #							PLOTS
 #
 #******************************************************************
-def displaySize(finalMCCList): 
+def displaySize(context, finalMCCList): 
 	'''
 	Purpose:: 
 		To create a figure showing the area verse time for each MCS
 
 	Input:: 
+		context: the SearchContext of the search
 		finalMCCList: a list of list of strings representing the list of nodes representing a MCC
 	
 	Output:: 
@@ -2693,20 +3749,16 @@ def displaySize(finalMCCList):
 
 	if finalMCCList:
 		for eachMCC in finalMCCList:
-			#get the info from the node
-			for node in eachMCC:
-				eachNode=thisDict(node)
-				timeList.append(eachNode['cloudElementTime'])
+			#get the info from the nodes
+			rows = CETableRows(context, eachMCC)
+			CETimes = rows['cloudElementTime'].astype(datetime)
+			CEAreas = rows['cloudElementArea']
 
-				if eachNode['cloudElementArea'] < minArea:
-					minArea = eachNode['cloudElementArea']
-				if eachNode['cloudElementArea'] > maxArea:
-					maxArea = eachNode['cloudElementArea']
+			minArea = min(minArea, CEAreas.min())
+			maxArea = max(maxArea, CEAreas.max())
 
-				
-			#sort and remove duplicates 
-			timeList=list(set(timeList))
-			timeList.sort()
+			#sort and remove duplicates
+			timeList = np.unique(rows['cloudElementTime']).astype(datetime).tolist()
 			tdelta = timeList[1] - timeList[0]
 			starttime = timeList[0]-tdelta
 			endtime = timeList[-1]+tdelta
@@ -2720,15 +3772,13 @@ def displaySize(finalMCCList):
 			fig,ax = plt.subplots(1, facecolor='white', figsize=(10,10))
 			
 			#the data
-			for node in eachMCC: #for eachNode in eachMCC:
-				eachNode=thisDict(node)
-				if eachNode['cloudElementArea'] < 80000 : #2400.00:
-					ax.plot(eachNode['cloudElementTime'], eachNode['cloudElementArea'],'bo', markersize=10)
-				elif eachNode['cloudElementArea'] >= 80000.00 and eachNode['cloudElementArea'] < 160000.00:
-					ax.plot(eachNode['cloudElementTime'], eachNode['cloudElementArea'],'yo',markersize=20)
-				else:
-					ax.plot(eachNode['cloudElementTime'], eachNode['cloudElementArea'],'ro',markersize=30)
-				
+			small = CEAreas < 80000 #2400.00
+			large = CEAreas >= 160000.00
+			medium = ~small & ~large
+			ax.plot(CETimes[small], CEAreas[small],'bo', markersize=10)
+			ax.plot(CETimes[medium], CEAreas[medium],'yo',markersize=20)
+			ax.plot(CETimes[large], CEAreas[large],'ro',markersize=30)
+
 			#axes and labels
 			maxArea += 1000.00
 			ax.set_xlim(starttime,endtime)
@@ -2740,7 +3790,7 @@ def displaySize(finalMCCList):
 			
 			plt.subplots_adjust(bottom=0.2)
 			
-			imgFilename = MAINDIRECTORY+'/images/'+ str(count)+'MCS.gif'
+			imgFilename = context.mainDirectory+'/images/'+ str(count)+'MCS.gif'
 			plt.savefig(imgFilename, facecolor=fig.get_facecolor(), transparent=True)
 			
 			#if time in not already in the time list, append it
@@ -2748,12 +3798,13 @@ def displaySize(finalMCCList):
 			count += 1
 	return 
 #******************************************************************
-def displayPrecip(finalMCCList): 
+def displayPrecip(context, finalMCCList): 
 	'''
 	Purpose:: 
 		To create a figure showing the precip rate verse time for each MCS
 
 	Input:: 
+		context: the SearchContext of the search
 		finalMCCList: a list of dictionaries representing a list of nodes representing a MCC
 
 	Output:: None
@@ -2789,7 +3840,7 @@ def displayPrecip(finalMCCList):
 		for eachMCC in finalMCCList:
 			#get the info from the node
 			for node in eachMCC:
-				eachNode=thisDict(node)
+				eachNode=thisDict(context, node)
 				if firstTime == True:
 					xStart = eachNode['cloudElementCenter'][1]#lon
 					yStart = eachNode['cloudElementCenter'][0]#lat
@@ -2838,7 +3889,7 @@ def displayPrecip(finalMCCList):
 					ax.annotate('%d'%percentagePrecipitating[i]+'%', (x[i],y[i]))
 				precip=[]
 
-			imgFilename = MAINDIRECTORY+'/images/MCSprecip'+ str(count)+'.gif'
+			imgFilename = context.mainDirectory+'/images/MCSprecip'+ str(count)+'.gif'
 			plt.savefig(imgFilename, facecolor=fig.get_facecolor(), transparent=True)
 			
 			#reset for next image
@@ -2854,12 +3905,13 @@ def displayPrecip(finalMCCList):
 			firstTime = True
 	return 
 #******************************************************************
-def plotPrecipHistograms(finalMCCList, num_bins=5):
+def plotPrecipHistograms(context, finalMCCList, num_bins=5):
 	'''
 	Purpose:: 
-		To create plots (histograms) of the each TRMMnetcdfCEs files
+		To create plots (histograms) of the TRMM data of each CE in the CE store
 
 	Input:: 
+		context: the SearchContext of the search
 		finalMCCList: a list of dictionaries representing a list of nodes representing a MCC
 		num_bins: an integer representing the number of bins 
 	Output:: 
@@ -2884,9 +3936,14 @@ def plotPrecipHistograms(finalMCCList, num_bins=5):
 			#totalPrecip=np.zeros((1,137,440))
 			totalPrecip=np.zeros((1,413,412))
 
+			#read the CEs of the MCC from the CE store in one pass, in the order of the nodes
+			MCCNodes = [thisDict(context, node) for node in eachMCC]
+			CEPrecipRates = readCloudElements(context, 'precipitation_Accumulation', 
+				[eachNode['uniqueID'] for eachNode in MCCNodes if eachNode['cloudElementArea'] >= 2400.0])
+			nextCE = next(CEPrecipRates, None)
+
 			#get the info from the node
-			for node in eachMCC:
-				eachNode=thisDict(node)
+			for eachNode in MCCNodes:
 				thisTime = eachNode['cloudElementTime']
 				MCSlen = len(eachMCC)
 				thisCount += 1
@@ -2914,36 +3971,34 @@ def plotPrecipHistograms(finalMCCList, num_bins=5):
 						# # Set the formatter
 						# plt.gca().yaxis.set_major_formatter(formatter)
 						# plt.gca().xaxis.set_major_formatter(FormatStrFormatter('%0.0f'))
-						# imgFilename = MAINDIRECTORY+'/images/'+str(thisTime)+eachNode['uniqueID']+'TRMMMCS.gif'
+						# imgFilename = context.mainDirectory+'/images/'+str(thisTime)+eachNode['uniqueID']+'TRMMMCS.gif'
 						
 						# plt.savefig(imgFilename, transparent=True)
 						data_names =['Precipitation [mm]','Area']
 						plotter.draw_histogram(precip,data_names,imgFilename, num_bins)
 						precip =[]
 						
-					# ------ NETCDF File get info ------------------------------------
-					thisFileName = MAINDIRECTORY+'/TRMMnetcdfCEs/TRMM' + str(thisTime).replace(" ", "_") + eachNode['uniqueID'] +'.nc'
-					TRMMData = Dataset(thisFileName,'r', format='NETCDF4')
-					precipRate = TRMMData.variables['precipitation_Accumulation'][:,:,:]
-					CEprecipRate = precipRate[0,:,:]
-					TRMMData.close()
-					if firstTime==True:
-						totalPrecip=np.zeros((CEprecipRate.shape))
-					
-					totalPrecip = np.add(totalPrecip, precipRate)
-					# ------ End NETCDF File ------------------------------------
-					for index, value in np.ndenumerate(CEprecipRate): 
-						if value != 0.0:
-							precip.append(value)
+					# ------ CE store get info ------------------------------------
+					if nextCE is not None and nextCE[0] == eachNode['uniqueID']:
+						CEprecipRate = nextCE[2]
+						if firstTime==True:
+							totalPrecip=np.zeros((CEprecipRate.shape))
+						
+						totalPrecip = np.add(totalPrecip, CEprecipRate)
+						precip.extend(CEprecipRate[np.nonzero(CEprecipRate)])
+						nextCE = next(CEPrecipRates, None)
+					# ------ End CE store ------------------------------------
 
 					lastTime = str(thisTime)
 					firstTime = False
 				else:
 					lastTime = str(thisTime)
 					firstTime = False  	
+
+			CEPrecipRates.close()
 	return 
 #******************************************************************
-def plotAccTRMM (finalMCCList):
+def plotAccTRMM (context, finalMCCList):
 	'''
 	Purpose:: 
 		(1) generate a file with the accumulated precipiation for the MCS
@@ -2952,50 +4007,46 @@ def plotAccTRMM (finalMCCList):
 		TODO: look into getting the info from the NETCDF file
 
 	Input:: 
+		context: the SearchContext of the search
 		finalMCCList: a list of dictionaries representing a list of nodes representing a MCC
   
 	Output:: 
 		a netcdf file containing the accumulated precip 
 		a 2D matlablibplot
 	'''
-	os.chdir((MAINDIRECTORY+'/TRMMnetcdfCEs'))
-	fname =''
 	imgFilename = ''
 	firstPartName = ''
 	firstTime = True
 	replaceExpXDef = ''
+
+	lats, lons = readCloudElementStoreGrid(context)
+	LONTRMM, LATTRMM = np.meshgrid(lons,lats)
+	nygrdTRMM = len(LATTRMM[:,0]) 
+	nxgrdTRMM = len(LONTRMM[0,:])
 	
 	#generate the file name using MCCTimes
-	#if the file name exists, add it to the accTRMM file
+	#if the CE is in the CE store, add it to the accTRMM file
 	for path in finalMCCList:
-		for eachNode in path:
-			thisNode = thisDict(eachNode)
-			fname = 'TRMM'+ str(thisNode['cloudElementTime']).replace(" ", "_") + thisNode['uniqueID'] +'.nc'
-			
-			if os.path.isfile(fname):	
-				#open NetCDF file add info to the accu 
-				#print "opening TRMM file ", fname
-				TRMMCEData = Dataset(fname,'r',format='NETCDF4')
-				precipRate = TRMMCEData.variables['precipitation_Accumulation'][:]
-				lats = TRMMCEData.variables['latitude'][:]
-				lons = TRMMCEData.variables['longitude'][:]
-				LONTRMM, LATTRMM = np.meshgrid(lons,lats)
-				nygrdTRMM = len(LATTRMM[:,0]) 
-				nxgrdTRMM = len(LONTRMM[0,:])
-				precipRate = ma.masked_array(precipRate, mask=(precipRate < 0.0))
-				TRMMCEData.close()
+		pathNodes = [thisDict(context, eachNode) for eachNode in path]
+		nodesByID = dict((eachNode['uniqueID'], eachNode) for eachNode in pathNodes)
+		thisNode = pathNodes[-1]
 
-				if firstTime == True:
-					firstPartName = str(thisNode['cloudElementTime']).replace(" ", "_")+'-'
-					accuPrecipRate = ma.zeros((precipRate.shape))
-					firstTime = False
+		#read the CEs of the path from the CE store in one pass
+		for CEuniqueID, _, precipRate in readCloudElements(context, 'precipitation_Accumulation', 
+				[eachNode['uniqueID'] for eachNode in pathNodes]):
+			precipRate = ma.masked_array(precipRate[np.newaxis,:,:], mask=(precipRate[np.newaxis,:,:] < 0.0))
+
+			if firstTime == True:
+				firstPartName = str(nodesByID[CEuniqueID]['cloudElementTime']).replace(" ", "_")+'-'
+				accuPrecipRate = ma.zeros((precipRate.shape))
+				firstTime = False
 
-				accuPrecipRate += precipRate
+			accuPrecipRate += precipRate
 
-		imgFilename = MAINDIRECTORY+'/images/MCSaccu'+firstPartName+str(thisNode['cloudElementTime']).replace(" ", "_")+'.gif'
+		imgFilename = context.mainDirectory+'/images/MCSaccu'+firstPartName+str(thisNode['cloudElementTime']).replace(" ", "_")+'.gif'
 		
 	#create new netCDF file
-	accuTRMMFile = MAINDIRECTORY+'/TRMMnetcdfCEs/accu'+firstPartName+str(thisNode['cloudElementTime']).replace(" ", "_")+'.nc'
+	accuTRMMFile = context.mainDirectory+'/TRMMnetcdfCEs/accu'+firstPartName+str(thisNode['cloudElementTime']).replace(" ", "_")+'.nc'
 	#write the file
 	accuTRMMData = Dataset(accuTRMMFile, 'w', format='NETCDF4')
 	accuTRMMData.description =  'Accumulated precipitation data'
@@ -3033,12 +4084,13 @@ def plotAccTRMM (finalMCCList):
 	    			
 	return	
 #******************************************************************
-def plotAccuInTimeRange(starttime, endtime):
+def plotAccuInTimeRange(context, starttime, endtime):
 	'''
 	Purpose:: 
 		Create accumulated precip plot within a time range given using all CEs
 
 	Input:: 
+		context: the SearchContext of the search
 		starttime: a string representing the time to start the accumulations format yyyy-mm-dd_hh:mm:ss
 		endtime: a string representing the time to end the accumulations format yyyy-mm-dd_hh:mm:ss
 
@@ -3048,41 +4100,29 @@ def plotAccuInTimeRange(starttime, endtime):
 
 	'''
 
-	os.chdir((MAINDIRECTORY+'/TRMMnetcdfCEs/'))
-	
 	imgFilename = ''
 	firstPartName = ''
 	firstTime = True
 
-	fileList = []
 	sTime = datetime.strptime(starttime.replace("_"," "),'%Y-%m-%d %H:%M:%S')
 	eTime = datetime.strptime(endtime.replace("_"," "),'%Y-%m-%d %H:%M:%S')
-	thisTime = sTime
-
-	while thisTime <= eTime:
-		fileList = filter(os.path.isfile, glob.glob(('TRMM'+ str(thisTime).replace(" ", "_") + '*' +'.nc')))
-		for fname in fileList:
-			TRMMCEData = Dataset(fname,'r',format='NETCDF4')
-			precipRate = TRMMCEData.variables['precipitation_Accumulation'][:]
-			lats = TRMMCEData.variables['latitude'][:]
-			lons = TRMMCEData.variables['longitude'][:]
-			LONTRMM, LATTRMM = np.meshgrid(lons,lats)
-			nygrdTRMM = len(LATTRMM[:,0]) 
-			nxgrdTRMM = len(LONTRMM[0,:])
-			precipRate = ma.masked_array(precipRate, mask=(precipRate < 0.0))
-			TRMMCEData.close()
 
-			if firstTime == True:
-				accuPrecipRate = ma.zeros((precipRate.shape))
-				firstTime = False
+	lats, lons = readCloudElementStoreGrid(context)
+	LONTRMM, LATTRMM = np.meshgrid(lons,lats)
+	nygrdTRMM = len(LATTRMM[:,0]) 
+	nxgrdTRMM = len(LONTRMM[0,:])
 
-			accuPrecipRate += precipRate
+	for _, _, precipRate in readCloudElements(context, 'precipitation_Accumulation', startTime=sTime, endTime=eTime):
+		precipRate = ma.masked_array(precipRate[np.newaxis,:,:], mask=(precipRate[np.newaxis,:,:] < 0.0))
+
+		if firstTime == True:
+			accuPrecipRate = ma.zeros((precipRate.shape))
+			firstTime = False
 
-		#increment the time
-		thisTime +=timedelta(hours=TRES)
+		accuPrecipRate += precipRate
 
 	#create new netCDF file
-	accuTRMMFile = MAINDIRECTORY+'/TRMMnetcdfCEs/accu'+starttime+'-'+endtime+'.nc'
+	accuTRMMFile = context.mainDirectory+'/TRMMnetcdfCEs/accu'+starttime+'-'+endtime+'.nc'
 	print "accuTRMMFile ", accuTRMMFile
 	#write the file
 	accuTRMMData = Dataset(accuTRMMFile, 'w', format='NETCDF4')
@@ -3116,7 +4156,7 @@ def plotAccuInTimeRange(starttime, endtime):
 	accuTRMMData.close()
 
 	#plot the stuff
-	imgFilename = MAINDIRECTORY+'/images/accu'+starttime+'-'+endtime+'.gif'	
+	imgFilename = context.mainDirectory+'/images/accu'+starttime+'-'+endtime+'.gif'	
 	plotTitle = "TRMM Accumulated Precipitation [mm] "+starttime+'-'+endtime
 	createPrecipPlot(np.squeeze(accuPrecipRate, axis=0), LATTRMM[:,0], LONTRMM[0,:], plotTitle,imgFilename)
 
@@ -3174,13 +4214,14 @@ def createPrecipPlot(dataset, lats, lons, plotTitle,imgFilename):
 	plt.savefig(imgFilename, facecolor=fig.get_facecolor(), transparent=True)	
 	return	
 #******************************************************************
-def createTextFile(finalMCCList, identifier):
+def createTextFile(context, finalMCCList, identifier):
 	'''
 	Purpose:: 
 		Create a text file with information about the MCS
 		This function is expected to be especially of use regarding long term record checks
 
 	Input:: 
+		context: the SearchContext of the search
 		finalMCCList: a list of dictionaries representing a list of nodes representing a MCC
 		identifier: an integer representing the type of list that has been entered...this is for creating file purposes
 			1 - MCCList; 2- MCSList
@@ -3191,6 +4232,7 @@ def createTextFile(finalMCCList, identifier):
 
 	Assumptions:: 
 	'''
+	config = context.config
 
 	durations=0.0
 	startTimes =[]
@@ -3244,22 +4286,22 @@ def createTextFile(finalMCCList, identifier):
 	maxSpeed =0.0
 
 	if identifier == 1:
-		MCSUserFile = open((MAINDIRECTORY+'/textFiles/MCCsUserFile.txt'),'wb')
-		MCSSummaryFile = open((MAINDIRECTORY+'/textFiles/MCCSummary.txt'),'wb')
-		MCSPostFile = open((MAINDIRECTORY+'/textFiles/MCCPostPrecessing.txt'),'wb')
+		MCSUserFile = open((context.mainDirectory+'/textFiles/MCCsUserFile.txt'),'wb')
+		MCSSummaryFile = open((context.mainDirectory+'/textFiles/MCCSummary.txt'),'wb')
+		MCSPostFile = open((context.mainDirectory+'/textFiles/MCCPostPrecessing.txt'),'wb')
 	
 	if identifier == 2:
-		MCSUserFile = open((MAINDIRECTORY+'/textFiles/MCSsUserFile.txt'),'wb')
-		MCSSummaryFile = open((MAINDIRECTORY+'/textFiles/MCSSummary.txt'),'wb')
-		MCSPostFile = open((MAINDIRECTORY+'/textFiles/MCSPostPrecessing.txt'),'wb')
+		MCSUserFile = open((context.mainDirectory+'/textFiles/MCSsUserFile.txt'),'wb')
+		MCSSummaryFile = open((context.mainDirectory+'/textFiles/MCSSummary.txt'),'wb')
+		MCSPostFile = open((context.mainDirectory+'/textFiles/MCSPostPrecessing.txt'),'wb')
 
 	for eachPath in finalMCCList:
 		eachPath.sort(key=lambda nodeID:(len(nodeID.split('C')[0]), nodeID.split('C')[0], nodeID.split('CE')[1]))
 		MCSPostFile.write("\n %s" %eachPath)
 
-		startTime = thisDict(eachPath[0])['cloudElementTime']
-		endTime = thisDict(eachPath[-1])['cloudElementTime']
-		duration = (endTime - startTime) + timedelta(hours=TRES)
+		startTime = thisDict(context, eachPath[0])['cloudElementTime']
+		endTime = thisDict(context, eachPath[-1])['cloudElementTime']
+		duration = (endTime - startTime) + timedelta(hours=config.TRES)
 		
 		# convert datatime duration to seconds and add to the total for the average duration of all MCS in finalMCCList
 		durations += (duration.total_seconds()) 
@@ -3272,7 +4314,7 @@ def createTextFile(finalMCCList, identifier):
 		
 		for eachNode in eachPath:
 
-			thisNode = thisDict(eachNode)
+			thisNode = thisDict(context, eachNode)
 
 			#set first time min "fake" values
 			if firstTime == True:
@@ -3281,8 +4323,8 @@ def createTextFile(finalMCCList, identifier):
 				firstTime = False
 
 			#calculate the speed
-			if thisNode['cloudElementArea'] >= OUTER_CLOUD_SHIELD_AREA:
-				averagePropagationSpeed += findCESpeed(eachNode, eachPath)
+			if thisNode['cloudElementArea'] >= config.OUTER_CLOUD_SHIELD_AREA:
+				averagePropagationSpeed += findCESpeed(context, eachNode, eachPath)
 				speedCounter +=1
 
 			#Amax: find max area
@@ -3329,7 +4371,7 @@ def createTextFile(finalMCCList, identifier):
 					precipCounter += 1
 
 				#system speed for only mature stage
-				CEspeed = findCESpeed(eachNode,eachPath)
+				CEspeed = findCESpeed(context, eachNode,eachPath)
 				if CEspeed > 0.0 :
 					MCSspeed += CEspeed
 					MCSspeedCounter += 1
@@ -3383,7 +4425,7 @@ def createTextFile(finalMCCList, identifier):
 		MCSUserFile.write("\nEndtime is: %s " %(str(endTime)))
 		MCSUserFile.write("\nLife duration is %s hrs" %(str(duration)))
 		MCSUserFile.write("\nTime of maturity is %s " %(timeMCSMatures))
-		MCSUserFile.write("\nDuration mature stage is: %s " %durationOfMatureMCC*TRES)
+		MCSUserFile.write("\nDuration mature stage is: %s " %durationOfMatureMCC*config.TRES)
 		MCSUserFile.write("\nAverage area is: %.4f km^2 " %(averageArea))
 		MCSUserFile.write("\nMax area is: %.4f km^2 " %(maxArea))
 		MCSUserFile.write("\nMax area time is: %s " %(maxAreaTime))
@@ -3441,7 +4483,7 @@ def createTextFile(finalMCCList, identifier):
 		areaAvg = sum(averageAreas)/ len(finalMCCList)
 	#create histogram plot here
 	if len(averageAreas) > 1:
-		imgFilename = MAINDIRECTORY+'/images/averageAreas.gif'
+		imgFilename = context.mainDirectory+'/images/averageAreas.gif'
 		plotter.draw_histogram(averageAreas, ["Average Area [km^2]", "Area [km^2]"],imgFilename,10)
 
 	#Amax: average maximum area
@@ -3449,7 +4491,7 @@ def createTextFile(finalMCCList, identifier):
 		amax = sum(avgMaxArea)/ maxAreaCounter
 		#create histogram plot here
 		if len(avgMaxArea) > 1:
-			imgFilename = MAINDIRECTORY+'/images/avgMaxArea.gif'
+			imgFilename = context.mainDirectory+'/images/avgMaxArea.gif'
 			plotter.draw_histogram(avgMaxArea, ["Maximum Area [km^2]", "Area [km^2]"], imgFilename,10)
 			
 	#v_avg: calculate the average propagation speed 
@@ -3480,7 +4522,7 @@ def createTextFile(finalMCCList, identifier):
 	if len(avgPrecipArea) > 0:
 		precipAreaAvg = sum(avgPrecipArea)/len(avgPrecipArea)
 		if len(avgPrecipArea) > 1:
-			imgFilename = MAINDIRECTORY+'/images/avgPrecipArea.gif'
+			imgFilename = context.mainDirectory+'/images/avgPrecipArea.gif'
 			plotter.draw_histogram(avgPrecipArea, ["Average Rainfall Area [km^2]", "Area [km^2]"],imgFilename,10)
 		
 
@@ -99,8 +99,11 @@ def main():
         print "Error with files in the original MERG directory entered. Please check your files before restarting. "
         return
 
+    #the state of this search, with the user defined variables in mccSearch
+    context = mccSearch.SearchContext()
+
     #create main directory and file structure for storing intel
-    mccSearch.createMainDirectory(DIRS['mainDirStr'])
+    mccSearch.createMainDirectory(context, DIRS['mainDirStr'])
     TRMMCEdirName = DIRS['mainDirStr']+'/TRMMnetcdfCEs'
     CEdirName = DIRS['mainDirStr']+'/MERGnetcdfCEs'
 
@@ -108,7 +111,7 @@ def main():
     postprocessing = raw_input("> Do you wish to postprocess data? [y/n] \n")
     while postprocessing.lower() != 'n':
         if postprocessing.lower() == 'y':
-            option = postProcessingplotMenu(DIRS)
+            option = postProcessingplotMenu(context, DIRS)
             return
         elif postprocessing.lower() == 'n':
             pass
@@ -121,34 +124,35 @@ def main():
     print "\t\t Starting the MCCSearch Analysis "
     print ("-"*80) 
     print "\n -------------- Reading MERG and TRMM Data ----------"
-    mergImgs, timeList = mccSearch.readMergData(DIRS['CEoriDirName'], filelist)
+    mergImgs, timeList = mccSearch.readMergData(context, DIRS['CEoriDirName'], filelist)
     print "\n -------------- findCloudElements ----------"
-    CEGraph = mccSearch.findCloudElements(mergImgs,timeList,DIRS['TRMMdirName'])
+    CEGraph = mccSearch.findCloudElements(context, mergImgs,timeList,DIRS['TRMMdirName'])
     #if the TRMMdirName wasnt entered for whatever reason, you can still get the TRMM data this way
-    # CEGraph = mccSearch.findCloudElements(mergImgs,timeList)
-    # allCETRMMList=mccSearch.findPrecipRate(DIRS['TRMMdirName'],timeList)
+    # CEGraph = mccSearch.findCloudElements(context, mergImgs,timeList)
+    # allCETRMMList=mccSearch.findPrecipRate(context, DIRS['TRMMdirName'],timeList)
     # ----------------------------------------------------------------------------------------------   
     print "\n -------------- findCloudClusters ----------"
-    prunedGraph = mccSearch.findCloudClusters(CEGraph)
+    prunedGraph = mccSearch.findCloudClusters(context, CEGraph)
     print "\n -------------- findMCCs ----------"
-    MCCList,MCSList = mccSearch.findMCC(prunedGraph)
+    MCCList,MCSList = mccSearch.findMCC(context, prunedGraph)
     #now ready to perform various calculations/metrics
     print ("-"*80)
     print "\n -------------- METRICS ----------"
     print ("-"*80)
     #some calculations/metrics that work that work
-    print "creating the MCC userfile ", mccSearch.createTextFile(MCCList,1)
-    print "creating the MCS userfile ", mccSearch.createTextFile(MCSList,2)
-    plotMenu(MCCList, MCSList)
+    print "creating the MCC userfile ", mccSearch.createTextFile(context, MCCList,1)
+    print "creating the MCS userfile ", mccSearch.createTextFile(context, MCSList,2)
+    plotMenu(context, MCCList, MCSList)
     
     #Let's get outta here! Engage!
     print ("-"*80)
 #*********************************************************************************************************************
-def plotMenu(MCCList, MCSList):
+def plotMenu(context, MCCList, MCSList):
     '''
     Purpose:: The flow of plots for the user to choose
 
-    Input:: MCCList: a list of directories representing a list of nodes in the MCC
+    Input:: context: the SearchContext of the search
+            MCCList: a list of directories representing a list of nodes in the MCC
             MCSList: a list of directories representing a list of nodes in the MCS
             
     Output:: None
@@ -158,22 +162,22 @@ def plotMenu(MCCList, MCSList):
         try:   
             if option == 1:
                 print "Generating Accumulated Rainfall from TRMM for the entire period ...\n"
-                mccSearch.plotAccTRMM(MCSList)
+                mccSearch.plotAccTRMM(context, MCSList)
             if option == 2:
                 startDateTime = raw_input("> Please enter the start date and time yyyy-mm-dd_hr:mm:ss format: \n")
                 endDateTime = raw_input("> Please enter the end date and time yyyy-mm-dd_hr:mm:ss format: \n")
                 print "Generating acccumulated rainfall between ", startDateTime," and ", endDateTime, " ... \n"
-                mccSearch.plotAccuInTimeRange(startDateTime, endDateTime)
+                mccSearch.plotAccuInTimeRange(context, startDateTime, endDateTime)
             if option == 3:
                 print "Generating area distribution plot ... \n"
-                mccSearch.displaySize(MCCList)
+                mccSearch.displaySize(context, MCCList)
             if option == 4:
                 print "Generating precipitation and area distribution plot ... \n"
-                mccSearch.displayPrecip(MCCList)
+                mccSearch.displayPrecip(context, MCCList)
             if option == 5:
                 try:
                     print "Generating histogram of precipitation for each time ... \n"
-                    mccSearch.plotPrecipHistograms(MCCList)
+                    mccSearch.plotPrecipHistograms(context, MCCList)
                 except:
                     pass
         except:
@@ -219,11 +223,12 @@ def displayPostprocessingPlotMenu():
     option = int(raw_input("> Please enter your option for plots: \n"))
     return option
 #*********************************************************************************************************************
-def postProcessingplotMenu(DIRS):
+def postProcessingplotMenu(context, DIRS):
     '''
     Purpose:: The flow of plots for the user to choose
 
-    Input:: DIRS a dictionary of directories
+    Input:: context: the SearchContext of the search
+            DIRS a dictionary of directories
     #       DIRS={
     #          mainDirStr= "/directory/to/where/to/store/outputs"
     #          TRMMdirName = "/directory/to/the/TRMM/netCDF/files" 
@@ -240,13 +245,13 @@ def postProcessingplotMenu(DIRS):
         try:
             if option == 1:
                 print "Generating images from the original MERG dataset ... \n"
-                mccSearch.postProcessingNetCDF(1, DIRS['CEoriDirName']) 
+                mccSearch.postProcessingNetCDF(context, 1, DIRS['CEoriDirName']) 
             if option == 2:
                 print "Generating images from the cloud elements using MERG IR data ... \n"
-                mccSearch.postProcessingNetCDF(2, CEdirName) 
+                mccSearch.postProcessingNetCDF(context, 2, CEdirName) 
             if option == 3:
                 print "Generating precipitation accumulation images from the cloud elements using TRMM data ... \n"
-                mccSearch.postProcessingNetCDF(3, TRMMCEdirName)
+                mccSearch.postProcessingNetCDF(context, 3, TRMMCEdirName)
             # if option == 4:
             #     print "Generating Accumulated TRMM rainfall from cloud elements for each MCS ... \n"
             #     featureType = int(raw_input("> Please enter type of MCS MCC-1 or MCS-2: \n"))
@@ -255,9 +260,9 @@ def postProcessingplotMenu(DIRS):
             #         try:
             #             if os.path.isfile(filename):
             #             #read each line as a list
-            #         mccSearch.plotAccTRMM()
+            #         mccSearch.plotAccTRMM(context)
             # if option == 5:
-            #     mccSearch.plotAccuInTimeRange()
+            #     mccSearch.plotAccuInTimeRange(context)
         except:
             print "Invalid option, please try again"
         option = displayPostprocessingPlotMenu() 
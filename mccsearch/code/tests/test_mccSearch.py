@@ -0,0 +1,317 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+'''Unit tests for the mccSearch.py module'''
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from netCDF4 import Dataset
+import networkx as nx
+import numpy as np
+import numpy.ma as ma
+from scipy import ndimage
+# mccSearch imports these in its functions, after it changed the working
+# directory, which fails when ocw is found relative to the first one.
+import ocw.dataset_processor
+import ocw.utils
+
+# mccSearch.py is run from its directory, like mainProg.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+import mccSearch
+
+def write_merg_files(directory):
+    ''' Write six hourly MERG files with two cloud systems that move east. '''
+    lats = np.arange(4., 20.01, 0.1)
+    lons = np.arange(-6., 6.01, 0.1)
+    grid_lats, grid_lons = np.meshgrid(lats, lons, indexing='ij')
+
+    def cloud(lat, lon, radius, depth):
+        return depth * np.exp(-((grid_lats - lat) ** 2 +
+                                (grid_lons - lon) ** 2) / radius ** 2)
+
+    for hour in range(1, 7):
+        merg = Dataset(os.path.join(directory,
+                                    'merg_20060911%02d_4km-pixel.nc' % hour),
+                       'w')
+        merg.createDimension('time', 1)
+        merg.createDimension('latitude', len(lats))
+        merg.createDimension('longitude', len(lons))
+        times = merg.createVariable('time', 'f8', ('time',))
+        times.units = 'hours since 2006-09-11 00'
+        times[:] = [hour]
+        merg.createVariable('latitude', 'f4', ('latitude',))[:] = lats
+        merg.createVariable('longitude', 'f4', ('longitude',))[:] = lons
+        temperature = merg.createVariable('ch4', 'f4',
+                                          ('time', 'latitude', 'longitude'),
+                                          fill_value=330.)
+        temperature[0] = (280. - cloud(12., -2. + 0.2 * hour, 1.5, 100.) -
+                          cloud(8., 3., 0.6 + 0.15 * hour, 90.))
+        merg.close()
+
+def write_trmm_files(directory):
+    ''' Write 3 hourly TRMM files that cover the MERG files. '''
+    random = np.random.RandomState(1)
+    lats = np.arange(4., 20.01, 0.25)
+    lons = np.arange(-6., 6.01, 0.25)
+
+    for hour in (0, 3, 6):
+        trmm = Dataset(os.path.join(directory,
+                                    '3B42.20060911.%02d.7A.nc' % hour), 'w')
+        trmm.createDimension('time', 1)
+        trmm.createDimension('latitude', len(lats))
+        trmm.createDimension('longitude', len(lons))
+        trmm.createVariable('latitude', 'f4', ('latitude',))[:] = lats
+        trmm.createVariable('longitude', 'f4', ('longitude',))[:] = lons
+        precipitation = np.clip(random.gamma(0.5, 4, (len(lats), len(lons))) - 1,
+                                0, None)
+        precipitation[random.rand(len(lats), len(lons)) < 0.05] = -9999.9
+        trmm.createVariable('pcp', 'f4',
+                            ('time', 'latitude', 'longitude'))[0] = precipitation
+        trmm.close()
+
+def graph_snapshot(context):
+    ''' The CEs, their links, the CE store and the text files of a search. '''
+    graph = context.cloudElementGraph
+    store = Dataset(os.path.join(context.mainDirectory,
+                                 mccSearch.CE_STORE_FILENAME))
+    try:
+        store_values = dict((name, store.variables[name][:].tolist())
+                            for name in store.variables)
+    finally:
+        store.close()
+
+    text_files = [open(os.path.join(context.mainDirectory, 'textFiles',
+                                    name)).read()
+                  for name in ('cloudElements.txt',
+                               'cloudElementsUserFile.txt')]
+
+    return {'nodes': dict((node, repr(sorted(graph.node[node].items())))
+                          for node in graph.nodes()),
+            'edges': sorted(graph.edges(data=True)),
+            'store': store_values,
+            'text_files': text_files}
+
+class TestMccSearch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.data_dir = tempfile.mkdtemp()
+        cls.merg_dir = os.path.join(cls.data_dir, 'MERG')
+        cls.trmm_dir = os.path.join(cls.data_dir, 'TRMM')
+        os.makedirs(cls.merg_dir)
+        os.makedirs(cls.trmm_dir)
+        write_merg_files(cls.merg_dir)
+        write_trmm_files(cls.trmm_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.data_dir)
+
+    def setUp(self):
+        # The mccSearch functions change the working directory.
+        self.cwd = os.getcwd()
+        self.main_dirs = []
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        for main_dir in self.main_dirs:
+            shutil.rmtree(main_dir)
+
+    def make_context(self, config=None):
+        context = mccSearch.SearchContext(config)
+        main_dir = tempfile.mkdtemp()
+        self.main_dirs.append(main_dir)
+        mccSearch.createMainDirectory(context, main_dir)
+        return context
+
+    def read_merg_data(self, context):
+        return mccSearch.readMergData(context, self.merg_dir)
+
+    def test_cloud_element_properties(self):
+        context = self.make_context()
+        merg_images, _ = self.read_merg_data(context)
+        frame = merg_images[2]
+        labels, num_of_labels = ndimage.label(
+            frame, context.config.STRUCTURING_ELEMENT)
+        self.assertGreater(num_of_labels, 1)
+
+        properties = mccSearch.findCloudElementProperties(frame, labels,
+                                                          num_of_labels)
+
+        values = ma.getdata(frame).astype('f8')
+        self.assertEqual(len(properties), num_of_labels)
+        for label, ce in enumerate(properties, 1):
+            lat_indices, lon_indices = np.nonzero(labels == label)
+            ce_values = values[lat_indices, lon_indices]
+            self.assertEqual(ce['label'], label)
+            self.assertEqual(sorted(zip(*ce['pixelIndices'])),
+                             sorted(zip(lat_indices, lon_indices)))
+            self.assertEqual(ce['numOfBoxes'], len(ce_values))
+            self.assertEqual(ce['Tmin'], ce_values.min())
+            self.assertEqual(ce['Tmax'], ce_values.max())
+            self.assertAlmostEqual(ce['Tmean'], ce_values.mean())
+            self.assertAlmostEqual(ce['Tvariance'], ce_values.var())
+            np.testing.assert_allclose(
+                ce['center'],
+                (np.sum(lat_indices * ce_values) / ce_values.sum(),
+                 np.sum(lon_indices * ce_values) / ce_values.sum()))
+
+    def test_cloud_element_properties_without_labels(self):
+        self.assertEqual(mccSearch.findCloudElementProperties(
+            np.zeros((3, 3)), np.zeros((3, 3), dtype='int32'), 0), [])
+
+    def test_cloud_element_overlaps(self):
+        random = np.random.RandomState(0)
+        previous_labels = random.randint(0, 5, (30, 40))
+        current_labels = random.randint(0, 7, (30, 40))
+
+        overlaps = mccSearch.findCloudElementOverlaps(previous_labels,
+                                                      current_labels, 4, 6)
+
+        expected = []
+        for previous_ce in range(4):
+            for current_ce in range(6):
+                count = np.sum((previous_labels == previous_ce + 1) &
+                               (current_labels == current_ce + 1))
+                if count:
+                    expected.append((previous_ce, current_ce, count))
+        self.assertEqual(sorted(overlaps), expected)
+
+    def test_regrid_trmm(self):
+        context = self.make_context()
+        self.read_merg_data(context)
+        trmm = Dataset(os.path.join(self.trmm_dir, '3B42.20060911.00.7A.nc'))
+        precipitation = trmm.variables['pcp'][0]
+        lats = trmm.variables['latitude'][:]
+        lons = trmm.variables['longitude'][:]
+        trmm.close()
+        precipitation = ma.masked_array(precipitation,
+                                        mask=precipitation < 0.0)
+        grid_lats, grid_lons = np.meshgrid(lats, lons, indexing='ij')
+
+        expected = mccSearch.do_regrid(precipitation, grid_lats, grid_lons,
+                                       context.LAT, context.LON)
+        regridded = mccSearch.regridTRMM(
+            precipitation,
+            mccSearch.findTRMMRegridWeights(context, lats, lons))
+
+        np.testing.assert_array_equal(ma.getmaskarray(regridded),
+                                      ma.getmaskarray(expected))
+        np.testing.assert_allclose(regridded.filled(0), expected.filled(0),
+                                   rtol=1e-5, atol=1e-5)
+
+    def test_max_depths_and_min_paths(self):
+        # A splits into B and C, which merge into E. B also ends in D.
+        graph = nx.DiGraph()
+        graph.add_edge('A', 'B', weight=1)
+        graph.add_edge('A', 'C', weight=3)
+        graph.add_edge('B', 'D', weight=1)
+        graph.add_edge('B', 'E', weight=2)
+        graph.add_edge('C', 'E', weight=1)
+        graph.add_edge('E', 'F', weight=3)
+        graph.add_node('G')
+
+        max_depths, min_path_distances, next_nodes = \
+            mccSearch.findMaxDepthsAndMinPaths(graph)
+
+        for node in graph.nodes():
+            paths = [path for leaf in graph.nodes()
+                     if graph.out_degree(leaf) == 0
+                     for path in nx.all_simple_paths(graph, node, leaf)]
+            paths = paths or [[node]]
+            max_depth = max(len(path) for path in paths)
+            distances = dict((sum(graph[u][v]['weight']
+                                  for u, v in zip(path, path[1:])), path)
+                             for path in paths if len(path) == max_depth)
+            min_distance = min(distances)
+
+            self.assertEqual(max_depths[node], max_depth)
+            self.assertEqual(min_path_distances[node], min_distance)
+            self.assertEqual(next_nodes[node],
+                             distances[min_distance][1]
+                             if max_depth > 1 else None)
+
+        self.assertEqual((max_depths['A'], min_path_distances['A']), (4, 6))
+        self.assertEqual(next_nodes['A'], 'B')
+
+    def test_load_checkpoint(self):
+        context = self.make_context()
+        merg_images, times = self.read_merg_data(context)
+        mccSearch.findCloudElements(context, merg_images, times, self.trmm_dir)
+        mccSearch.findCloudClusters(context, context.cloudElementGraph)
+        num_of_ces = len(context.CETableIndex)
+        self.assertGreater(context.prunedGraph.number_of_nodes(), 0)
+
+        restored = mccSearch.SearchContext(
+            mainDirectory=context.mainDirectory)
+
+        self.assertEqual(mccSearch.loadCheckpoint(restored), 'cloudClusters')
+        self.assertEqual(graph_snapshot(restored), graph_snapshot(context))
+        self.assertEqual(sorted(restored.prunedGraph.edges(data=True)),
+                         sorted(context.prunedGraph.edges(data=True)))
+        self.assertEqual(repr(restored.CETable[:num_of_ces].tolist()),
+                         repr(context.CETable[:num_of_ces].tolist()))
+        np.testing.assert_array_equal(restored.LAT, context.LAT)
+
+        # The checkpoints are only used with the same CE and cluster criteria.
+        other_clusters = mccSearch.SearchContext(
+            mccSearch.SearchConfig(MIN_MCS_DURATION=4),
+            context.mainDirectory)
+        self.assertEqual(mccSearch.loadCheckpoint(other_clusters),
+                         'cloudElements')
+        other_ces = mccSearch.SearchContext(
+            mccSearch.SearchConfig(T_BB_MAX=233), context.mainDirectory)
+        self.assertIsNone(mccSearch.loadCheckpoint(other_ces))
+
+    def test_resume_from_checkpoint_frames(self):
+        context = self.make_context()
+        merg_images, times = self.read_merg_data(context)
+        mccSearch.findCloudElements(context, merg_images, times, self.trmm_dir)
+        expected = graph_snapshot(context)
+
+        find_frame_cloud_elements = mccSearch.findFrameCloudElements
+
+        def stop_at_frame_five(context, frame_task):
+            if frame_task[0] == 5:
+                raise RuntimeError('Stopped')
+            return find_frame_cloud_elements(context, frame_task)
+
+        resumed = self.make_context()
+        resumed.LAT, resumed.LON = context.LAT, context.LON
+        mccSearch.findFrameCloudElements = stop_at_frame_five
+        try:
+            self.assertRaises(RuntimeError, mccSearch.findCloudElements,
+                              resumed, merg_images, times, self.trmm_dir, 2)
+        finally:
+            mccSearch.findFrameCloudElements = find_frame_cloud_elements
+
+        progress = mccSearch.readCloudElementsProgress(resumed, self.trmm_dir)
+        self.assertEqual(int(progress['framesDone']), 4)
+        # A run with other TRMM data starts from the first frame.
+        self.assertIsNone(mccSearch.readCloudElementsProgress(resumed))
+
+        mccSearch.findCloudElements(resumed, merg_images, times,
+                                    self.trmm_dir, 2)
+
+        self.assertEqual(graph_snapshot(resumed), expected)
+
+if __name__ == '__main__':
+    unittest.main()
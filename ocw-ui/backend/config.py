@@ -24,3 +24,56 @@ WORK_DIR = '/tmp/ocw/'
 # Any directory under this will be visible to the frontend when loading
 # a local model file.
 PATH_LEADER = '/usr/local/ocw'
+
+# SQLite database that holds the queue of evaluation jobs and their results.
+JOB_DATABASE = '/tmp/ocw/jobs.sqlite'
+
+# Number of evaluation jobs that are run concurrently, in all the processes
+# of the web services.
+JOB_WORKERS = 2
+
+# Seconds after which a running job whose process stopped renewing its lease
+# is queued again.
+JOB_LEASE_TIMEOUT = 60
+
+# Seconds after which ended jobs and their progress events are removed from
+# the job database.
+JOB_MAX_AGE = 7 * 24 * 3600
+
+# Number of processes that draw the plots of all evaluations concurrently, per
+# process of the web services. None uses one process per CPU.
+PLOT_PROCESSES = None
+
+# Seconds between the checks for new progress events of a job whose events
+# are streamed, and seconds after which an idle event stream is sent a
+# keep-alive comment so that proxies don't close it.
+JOB_EVENT_POLL_INTERVAL = 0.5
+JOB_EVENT_KEEP_ALIVE = 15
+
+# Bytes of disk space that evaluation results in WORK_DIR may use. The least
+# recently used results are removed once they use more.
+RESULT_CACHE_QUOTA = 2 * 1024 ** 3
+
+# Bytes of memory that prepared datasets may use when they are kept in memory
+# for reuse by later evaluations.
+DATASET_CACHE_SIZE = 1024 ** 3
+
+# WSGI server that run_webservices uses. 'waitress' serves requests from a pool
+# of threads and 'gunicorn' from pre-forked worker processes. 'wsgiref' is
+# Bottle's single threaded development server, which handles one request at a
+# time and doesn't stream job events.
+WSGI_SERVER = 'waitress'
+
+# Number of request handling threads per process for 'waitress' and
+# 'gunicorn', and number of worker processes for 'gunicorn'.
+WSGI_THREADS = 8
+WSGI_WORKERS = 4
+
+# Seconds that an idle keep-alive connection is held open by 'gunicorn'.
+# 'waitress' keeps HTTP/1.1 connections alive by default.
+WSGI_KEEP_ALIVE = 5
+
+# Seconds that browsers may cache the frontend files and the evaluation
+# result images for. Result images never change once they are written.
+STATIC_MAX_AGE = 3600
+EVAL_RESULTS_MAX_AGE = 86400
@@ -0,0 +1,144 @@
+#
+#  Licensed to the Apache Software Foundation (ASF) under one or more
+#  contributor license agreements.  See the NOTICE file distributed with
+#  this work for additional information regarding copyright ownership.
+#  The ASF licenses this file to You under the Apache License, Version 2.0
+#  (the "License"); you may not use this file except in compliance with
+#  the License.  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+''' In memory cache of the prepared datasets of evaluations. '''
+
+from collections import OrderedDict
+import json
+import threading
+
+from result_cache import normalize_dataset_object
+
+def get_dataset_key(dataset_object, eval_bounds, temporal_resolution,
+                    lat_bins, lon_bins):
+    ''' Get the cache key of a prepared dataset.
+
+    :param dataset_object: The dataset object of an evaluation request.
+    :type dataset_object: Dictionary
+    :param eval_bounds: The time and lat/lon bounds of the evaluation.
+    :type eval_bounds: Dictionary
+    :param temporal_resolution: The temporal re-bin resolution in days.
+    :type temporal_resolution: Integer
+    :param lat_bins: The latitude values of the spatial re-grid.
+    :type lat_bins: numpy.ndarray
+    :param lon_bins: The longitude values of the spatial re-grid.
+    :type lon_bins: numpy.ndarray
+
+    :returns: A string that identifies the prepared dataset.
+    '''
+    bounds = {name: str(value) for name, value in eval_bounds.items()}
+    key = [
+        normalize_dataset_object(dataset_object),
+        bounds,
+        int(temporal_resolution),
+        [float(lat) for lat in lat_bins],
+        [float(lon) for lon in lon_bins]
+    ]
+    return json.dumps(key, sort_keys=True, separators=(',', ':'))
+
+class DatasetCache(object):
+    ''' A thread safe, memory bounded LRU cache of Datasets.
+
+    The cached Datasets are shared by everyone who gets them from the cache,
+    so they must not be modified.
+    '''
+
+    def __init__(self, max_size):
+        '''
+        :param max_size: The bytes that the cached Datasets may use.
+        :type max_size: Integer
+        '''
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        ''' Get a cached Dataset and mark it as recently used.
+
+        :returns: The Dataset, or None if it isn't cached.
+        '''
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, dataset):
+        ''' Cache a Dataset, evicting the least recently used Datasets if
+        the cache is full.
+
+        Datasets that are larger than the whole cache aren't cached.
+        '''
+        size = _get_dataset_size(dataset)
+
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self.size -= old_entry[1]
+
+            if size > self.max_size:
+                return
+
+            while self._entries and self.size + size > self.max_size:
+                evicted_key, (evicted, evicted_size) = \
+                    self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+            self._entries[key] = (dataset, size)
+            self.size += size
+
+    def clear(self):
+        ''' Remove all the cached Datasets. '''
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        ''' Get the cache statistics.
+
+        :returns: A dictionary with the hits, misses, evictions, entries, size
+            and max_size of the cache.
+        '''
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size': self.size,
+                'max_size': self.max_size
+            }
+
+def _get_dataset_size(dataset):
+    ''' Get the bytes used by the arrays of a Dataset. '''
+    size = dataset.lats.nbytes + dataset.lons.nbytes + dataset.times.nbytes
+    size += dataset.values.nbytes
+    # Masked values carry a boolean mask of the same shape.
+    mask = getattr(dataset.values, 'mask', None)
+    if mask is not None and mask.shape:
+        size += mask.nbytes
+    return size
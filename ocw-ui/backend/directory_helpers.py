@@ -22,6 +22,7 @@ import os
 import re
 
 from config import WORK_DIR, PATH_LEADER
+from file_metadata import prefetch_file_metadata
 
 dir_app = Bottle()
 
@@ -52,8 +53,12 @@ def get_directory_info(dir_path='/'):
     .. sourcecode:: javascript
 
         {'listing': []}
+
+    The metadata of the NetCDF files in the directory is read in the
+    background so that it is ready when the user selects one of them.
     '''
     dir_info = []
+    file_paths = []
 
     try:
         clean_path = _get_clean_directory_path(PATH_LEADER, dir_path)
@@ -71,10 +76,14 @@ def get_directory_info(dir_path='/'):
             # Create a path to the listed object. If it's a directory add a
             # trailing slash as a visual clue. Then strip out the path leader.
             obj = os.path.join(clean_path, obj)
-            if os.path.isdir(obj): obj = obj + '/'
+            if os.path.isdir(obj):
+                obj = obj + '/'
+            else:
+                file_paths.append(obj)
             dir_info.append(obj.replace(PATH_LEADER, ''))
 
         sorted(dir_info, key=lambda s: s.lower())
+        prefetch_file_metadata(file_paths)
 
     if request.query.callback:
         return "%s(%s)" % (request.query.callback, {'listing': dir_info})
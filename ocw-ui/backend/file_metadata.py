@@ -0,0 +1,221 @@
+#
+#  Licensed to the Apache Software Foundation (ASF) under one or more
+#  contributor license agreements.  See the NOTICE file distributed with
+#  this work for additional information regarding copyright ownership.
+#  The ASF licenses this file to You under the Apache License, Version 2.0
+#  (the "License"); you may not use this file except in compliance with
+#  the License.  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+''' Cached metadata of local NetCDF files.
+
+The metadata that the UI shows for a local file is read once and cached by
+the file's path, modification time and size. Only the file header and the
+first and last values of coordinate variables are read, since coordinate
+variables are monotonic.
+'''
+
+from collections import OrderedDict
+import logging
+import os
+import Queue
+import threading
+
+import netCDF4
+
+import ocw.utils
+
+logger = logging.getLogger(__name__)
+
+# File extensions of the files that are prefetched.
+NETCDF_EXTENSIONS = ('.nc', '.nc4', '.netcdf', '.cdf')
+
+# The maximum number of files whose metadata is cached.
+MAX_CACHED_FILES = 4096
+
+LAT_NAME_GUESSES = set(['latitude', 'lat', 'lats', 'latitudes'])
+LON_NAME_GUESSES = set(['longitude', 'lon', 'lons', 'longitudes'])
+TIME_NAME_GUESSES = set(['time', 'times', 't', 'date', 'dates', 'julian'])
+
+# Maps a file path to its (modification time, size, metadata).
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+_prefetch_queue = Queue.Queue()
+_prefetch_thread = None
+_prefetch_lock = threading.Lock()
+
+def get_file_metadata(path):
+    ''' Get the metadata of a NetCDF file.
+
+    :param path: The path of the NetCDF file.
+    :type path: String
+
+    :returns: A dictionary of the form
+
+        .. sourcecode:: javascript
+
+            {
+                'variables': The variable names in the file,
+                'latlon': The list_latlon response for the file,
+                'time': The list_time response for the file
+            }
+
+    :raises OSError: If the file doesn't exist.
+    :raises IOError: If the file can't be opened as a NetCDF file.
+    '''
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+
+    with _cache_lock:
+        cached = _cache.pop(path, None)
+        if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+            _cache[path] = cached
+            return cached[2]
+
+    metadata = _read_file_metadata(path)
+
+    with _cache_lock:
+        _cache.pop(path, None)
+        _cache[path] = (stat.st_mtime, stat.st_size, metadata)
+        while len(_cache) > MAX_CACHED_FILES:
+            _cache.popitem(last=False)
+
+    return metadata
+
+def prefetch_file_metadata(paths):
+    ''' Read the metadata of NetCDF files in a background thread.
+
+    Paths that don't have a NetCDF file extension are skipped.
+
+    :param paths: The paths of the files to prefetch.
+    :type paths: List of Strings
+    '''
+    global _prefetch_thread
+
+    paths = [path for path in paths
+             if path.lower().endswith(NETCDF_EXTENSIONS)]
+    if not paths:
+        return
+
+    with _prefetch_lock:
+        if _prefetch_thread is None:
+            _prefetch_thread = threading.Thread(target=_prefetch_worker,
+                                                name='ocw-metadata-prefetch')
+            _prefetch_thread.daemon = True
+            _prefetch_thread.start()
+
+    for path in paths:
+        _prefetch_queue.put(path)
+
+def clear_file_metadata_cache():
+    ''' Remove the metadata of all files from the cache. '''
+    with _cache_lock:
+        _cache.clear()
+
+def _prefetch_worker():
+    while True:
+        path = _prefetch_queue.get()
+        try:
+            get_file_metadata(path)
+        except Exception as e:
+            logger.debug('Could not prefetch metadata of %s: %s', path, e)
+        finally:
+            _prefetch_queue.task_done()
+
+def _read_file_metadata(path):
+    ''' Read the metadata of a NetCDF file. '''
+    in_file = netCDF4.Dataset(path, mode='r')
+
+    try:
+        var_names = set([key.encode().lower()
+                         for key in in_file.variables.keys()])
+        var_names_list = list(var_names)
+
+        return {
+            'variables': [key for key in in_file.variables.keys()],
+            'latlon': _read_latlon(in_file, var_names, var_names_list),
+            'time': _read_time(in_file, var_names, var_names_list)
+        }
+    finally:
+        in_file.close()
+
+def _read_latlon(in_file, var_names, var_names_list):
+    lat_guesses = list(var_names & LAT_NAME_GUESSES)
+    lon_guesses = list(var_names & LON_NAME_GUESSES)
+
+    if not lat_guesses or not lon_guesses:
+        return {'success': False, 'variables': var_names_list}
+
+    lat_name = var_names_list[var_names_list.index(lat_guesses[0])]
+    lon_name = var_names_list[var_names_list.index(lon_guesses[0])]
+    lat_min, lat_max = _get_degree_range(in_file.variables[lat_name])
+    lon_min, lon_max = _get_degree_range(in_file.variables[lon_name])
+
+    return {
+        'success': True,
+        'lat_name': lat_name,
+        'lon_name': lon_name,
+        'lat_min': lat_min,
+        'lat_max': lat_max,
+        'lon_min': lon_min,
+        'lon_max': lon_max
+    }
+
+def _read_time(in_file, var_names, var_names_list):
+    time_guesses = list(var_names & TIME_NAME_GUESSES)
+
+    if not time_guesses:
+        return {'success': False, 'variables': var_names_list}
+
+    time_var_name = time_guesses[0]
+    indices = _get_end_indices(in_file.variables[time_var_name])
+    times = ocw.utils.decode_time_values(in_file, time_var_name, indices)
+
+    return {
+        'success': True,
+        'time_name': time_var_name,
+        'start_time': str(min(times)),
+        'end_time': str(max(times))
+    }
+
+def _get_degree_range(variable):
+    ''' Get the range of lat or lon values with values above 180 degrees
+    moved into the -180 to 180 range.
+    '''
+    indices = _get_end_indices(variable)
+    if indices is not None:
+        ends = variable[indices]
+        # A monotonic axis that stays below 180 degrees has its extremes at
+        # its ends. Otherwise the shifted values have to be searched.
+        if ends.max() <= 180:
+            return float(ends.min()), float(ends.max())
+
+    values = variable[:]
+    values[values > 180] = values[values > 180] - 360
+    return float(values.min()), float(values.max())
+
+def _get_end_indices(variable):
+    ''' Get the indices of the first and last values of a coordinate variable.
+
+    Coordinate variables are one dimensional and share their name with their
+    dimension. The CF conventions require their values to be monotonic, so
+    their extremes are their first and last values.
+
+    :returns: The list of indices, or None if the variable isn't a coordinate
+        variable.
+    '''
+    if (len(variable.dimensions) != 1 or
+            variable.dimensions[0] != variable.name or
+            len(variable) == 0):
+        return None
+
+    return sorted(set([0, len(variable) - 1]))
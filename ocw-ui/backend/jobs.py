@@ -0,0 +1,434 @@
+#
+#  Licensed to the Apache Software Foundation (ASF) under one or more
+#  contributor license agreements.  See the NOTICE file distributed with
+#  this work for additional information regarding copyright ownership.
+#  The ASF licenses this file to You under the Apache License, Version 2.0
+#  (the "License"); you may not use this file except in compliance with
+#  the License.  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+''' Persistent background job queue for long running backend requests. '''
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+import ocw.events as events
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+FINISHED = 'finished'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+# Job states that a job never leaves.
+FINAL_STATES = (FINISHED, FAILED, CANCELLED)
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        request TEXT NOT NULL,
+        stage TEXT,
+        progress REAL NOT NULL DEFAULT 0,
+        result TEXT,
+        error TEXT,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        created REAL NOT NULL,
+        started REAL,
+        finished REAL,
+        owner TEXT,
+        heartbeat REAL
+    )
+'''
+
+# Columns that were added to the jobs table after its first release, with
+# their types. They are added to older databases when a queue is created.
+_ADDED_COLUMNS = [('owner', 'TEXT'), ('heartbeat', 'REAL')]
+
+_EVENTS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS job_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL,
+        event TEXT NOT NULL
+    )
+'''
+
+_EVENTS_INDEX = '''
+    CREATE INDEX IF NOT EXISTS job_events_by_job ON job_events (job_id, id)
+'''
+
+class JobCancelled(Exception):
+    ''' Raised inside a running job when its cancellation was requested. '''
+
+class JobQueue(object):
+    ''' A SQLite backed job queue that is worked off by a pool of threads.
+
+    Jobs are stored in a SQLite database so that queued jobs and the status
+    and results of finished jobs survive a restart of the web services.
+    Several processes, e.g. the workers of a pre-forked server, may work off
+    the same database. A claimed job is leased to the queue that runs it,
+    which renews the lease while the job runs. Jobs whose lease has expired,
+    because the process running them stopped, are queued again. The number
+    of jobs that run at the same time is bounded across all the queues that
+    share the database.
+
+    Every job is run by calling ``run_job(request, progress)`` where
+    ``request`` is the JSON serializable object passed to :meth:`submit` and
+    ``progress`` is a callable taking a stage name and a fraction of the job
+    that is done. Calling ``progress`` raises :class:`JobCancelled` once the
+    job has been cancelled, so a job is cancelled at its next stage. The
+    JSON serializable return value of ``run_job`` is stored as the result of
+    the job.
+
+    The :mod:`ocw.events` progress events that a job emits while it runs are
+    stored with the job, so they can be streamed to clients by any process
+    that shares the database.
+    '''
+
+    def __init__(self, db_path, run_job, workers=2, poll_interval=1.0,
+                 max_running=None, lease_timeout=60.0, max_age=None):
+        '''
+        :param db_path: The path of the SQLite database to store jobs in.
+        :type db_path: String
+        :param run_job: The callable that runs a single job.
+        :type run_job: Callable
+        :param workers: The number of jobs that run concurrently.
+        :type workers: Integer > 0
+        :param poll_interval: The seconds an idle worker waits before it
+            checks the database for jobs that were queued by another process.
+        :type poll_interval: Float
+        :param max_running: (Optional) The number of jobs that run
+            concurrently in all the queues that share the database. Defaults
+            to workers.
+        :type max_running: Integer > 0
+        :param lease_timeout: The seconds after the last renewal of a running
+            job's lease at which it is considered interrupted and queued
+            again. Leases are renewed every quarter of this time.
+        :type lease_timeout: Float
+        :param max_age: (Optional) The seconds after which ended jobs and
+            their events are removed. Ended jobs are kept if it is None.
+        :type max_age: Float
+        '''
+        self.db_path = db_path
+        self.run_job = run_job
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_running = max_running or workers
+        self.lease_timeout = lease_timeout
+        self.max_age = max_age
+
+        # Identifies the jobs that this queue has claimed.
+        self.owner = '{}:{}:{}'.format(socket.gethostname(), os.getpid(),
+                                        uuid.uuid4().hex)
+
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        connection = self._connect()
+        try:
+            connection.execute(_SCHEMA)
+            columns = [row['name'] for row in
+                       connection.execute("PRAGMA table_info(jobs)")]
+            for name, column_type in _ADDED_COLUMNS:
+                if name not in columns:
+                    connection.execute("ALTER TABLE jobs ADD COLUMN {} {}"
+                                       .format(name, column_type))
+            connection.execute(_EVENTS_SCHEMA)
+            connection.execute(_EVENTS_INDEX)
+        finally:
+            connection.close()
+
+    def start(self):
+        ''' Start the worker threads and the renewal of the job leases.
+
+        Jobs that were interrupted are queued again once their lease has
+        expired. Expired jobs are removed while the queue runs. Calling start
+        on a queue that is already running does nothing.
+        '''
+        with self._lock:
+            if self._threads:
+                return
+
+            self._stopping.clear()
+
+            targets = [self._work] * self.workers + [self._maintain]
+            for index, target in enumerate(targets):
+                name = ('ocw-job-worker-%d' % index if index < self.workers
+                        else 'ocw-job-maintenance')
+                thread = threading.Thread(target=target, name=name)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        ''' Stop the worker threads once they finish their current job. '''
+        with self._lock:
+            self._stopping.set()
+            self._wakeup.set()
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+
+    def submit(self, request, job_id=None):
+        ''' Queue a new job.
+
+        :param request: The JSON serializable job parameters.
+        :param job_id: (Optional) The id of the new job, e.g. one that was
+            made with :func:`new_job_id` and referenced in the request. A new
+            id is made if it is None.
+        :type job_id: String
+
+        :returns: The id of the new job.
+        '''
+        job_id = job_id or new_job_id()
+        self._execute("INSERT INTO jobs (id, status, request, created) "
+                      "VALUES (?, ?, ?, ?)",
+                      (job_id, QUEUED, json.dumps(request), time.time()))
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        ''' Get the status of a job.
+
+        :param job_id: The id of the job.
+        :type job_id: String
+
+        :returns: A dictionary with the keys id, status, request, stage,
+            progress, result, error, created, started and finished, or None
+            if there is no such job.
+        '''
+        rows = self._query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return _row_to_job(rows[0]) if rows else None
+
+    def list(self, status=None):
+        ''' List jobs, oldest first.
+
+        :param status: (Optional) Only list jobs in this state.
+        :type status: String
+
+        :returns: A list of job dictionaries as returned by :meth:`get`.
+        '''
+        if status is None:
+            rows = self._query("SELECT * FROM jobs ORDER BY created")
+        else:
+            rows = self._query("SELECT * FROM jobs WHERE status = ? "
+                               "ORDER BY created", (status,))
+        return [_row_to_job(row) for row in rows]
+
+    def cancel(self, job_id):
+        ''' Cancel a job.
+
+        A queued job is cancelled right away. A running job is cancelled the
+        next time it reports its progress.
+
+        :param job_id: The id of the job.
+        :type job_id: String
+
+        :returns: True if the job was or will be cancelled, False if it
+            doesn't exist or has already ended.
+        '''
+        if self._execute("UPDATE jobs SET status = ?, finished = ? "
+                         "WHERE id = ? AND status = ?",
+                         (CANCELLED, time.time(), job_id, QUEUED)):
+            return True
+
+        return bool(self._execute("UPDATE jobs SET cancel_requested = 1 "
+                                  "WHERE id = ? AND status = ?",
+                                  (job_id, RUNNING)))
+
+    def get_events(self, job_id, after=0):
+        ''' Get the progress events of a job.
+
+        :param job_id: The id of the job.
+        :type job_id: String
+        :param after: (Optional) Only return the events whose id is greater
+            than this id.
+        :type after: Integer
+
+        :returns: A list of (event id, event dictionary) tuples, oldest first.
+        '''
+        rows = self._query("SELECT id, event FROM job_events "
+                           "WHERE job_id = ? AND id > ? ORDER BY id",
+                           (job_id, after))
+        return [(row['id'], json.loads(row['event'])) for row in rows]
+
+    def remove_expired(self):
+        ''' Remove the jobs that ended more than max_age seconds ago.
+
+        The progress events of the jobs are removed with them.
+
+        :returns: The number of removed jobs.
+        '''
+        if self.max_age is None:
+            return 0
+
+        expired = ("SELECT id FROM jobs WHERE status IN (?, ?, ?) "
+                   "AND finished < ?")
+        parameters = tuple(FINAL_STATES) + (time.time() - self.max_age,)
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("DELETE FROM job_events WHERE job_id IN "
+                               "({})".format(expired), parameters)
+            removed = connection.execute("DELETE FROM jobs WHERE id IN "
+                                         "({})".format(expired),
+                                         parameters).rowcount
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+        return removed
+
+    def _add_event(self, job_id, event):
+        self._execute("INSERT INTO job_events (job_id, event) VALUES (?, ?)",
+                      (job_id, json.dumps(event, default=str)))
+
+    def _work(self):
+        while not self._stopping.is_set():
+            job = self._claim_next_job()
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            self._run(job)
+
+    def _maintain(self):
+        interval = self.lease_timeout / 4.
+        while not self._stopping.wait(interval):
+            # A busy database must not stop the renewal of the leases.
+            try:
+                self._execute("UPDATE jobs SET heartbeat = ? "
+                              "WHERE owner = ? AND status = ?",
+                              (time.time(), self.owner, RUNNING))
+                self.remove_expired()
+            except sqlite3.Error:
+                logger.exception('Job queue maintenance failed')
+
+    def _claim_next_job(self):
+        connection = self._connect()
+        try:
+            # The transaction holds the database's write lock, so no other
+            # queue claims a job in between.
+            connection.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            connection.execute("UPDATE jobs SET status = ?, stage = NULL, "
+                               "progress = 0, started = NULL, owner = NULL, "
+                               "heartbeat = NULL WHERE status = ? AND "
+                               "(heartbeat IS NULL OR heartbeat < ?)",
+                               (QUEUED, RUNNING, now - self.lease_timeout))
+
+            row = None
+            running = connection.execute("SELECT COUNT(*) FROM jobs "
+                                         "WHERE status = ?",
+                                         (RUNNING,)).fetchone()[0]
+            if running < self.max_running:
+                row = connection.execute("SELECT * FROM jobs "
+                                         "WHERE status = ? "
+                                         "ORDER BY created LIMIT 1",
+                                         (QUEUED,)).fetchone()
+            if row is not None:
+                connection.execute("UPDATE jobs SET status = ?, started = ?, "
+                                   "owner = ?, heartbeat = ? WHERE id = ?",
+                                   (RUNNING, now, self.owner, now, row['id']))
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+        return _row_to_job(row) if row is not None else None
+
+    def _run(self, job):
+        job_id = job['id']
+
+        def progress(stage, fraction):
+            self._execute("UPDATE jobs SET stage = ?, progress = ? "
+                          "WHERE id = ? AND owner = ?",
+                          (stage, fraction, job_id, self.owner))
+            rows = self._query("SELECT cancel_requested, owner FROM jobs "
+                               "WHERE id = ?", (job_id,))
+            # A job whose lease expired may run in another queue by now.
+            if (rows and rows[0]['cancel_requested'] or
+                    rows and rows[0]['owner'] != self.owner):
+                raise JobCancelled(job_id)
+
+        def record_event(event):
+            self._add_event(job_id, event)
+
+        try:
+            with events.listening(record_event):
+                result = self.run_job(job['request'], progress)
+        except JobCancelled:
+            self._end(job_id, CANCELLED)
+        except Exception as e:
+            logger.error('Job %s failed:\n%s', job_id, traceback.format_exc())
+            self._end(job_id, FAILED, error=str(e) or e.__class__.__name__)
+        else:
+            self._end(job_id, FINISHED, result=result)
+
+    def _end(self, job_id, status, result=None, error=None):
+        progress = 1.0 if status == FINISHED else None
+        self._execute("UPDATE jobs SET status = ?, result = ?, error = ?, "
+                      "progress = COALESCE(?, progress), finished = ? "
+                      "WHERE id = ? AND owner = ? AND status = ?",
+                      (status, json.dumps(result), error, progress,
+                       time.time(), job_id, self.owner, RUNNING))
+
+    def _connect(self):
+        # SQLite connections can't be shared between threads, so every
+        # operation uses its own short lived connection.
+        connection = sqlite3.connect(self.db_path, timeout=30,
+                                     isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _execute(self, statement, parameters=()):
+        connection = self._connect()
+        try:
+            return connection.execute(statement, parameters).rowcount
+        finally:
+            connection.close()
+
+    def _query(self, statement, parameters=()):
+        connection = self._connect()
+        try:
+            return connection.execute(statement, parameters).fetchall()
+        finally:
+            connection.close()
+
+def new_job_id():
+    ''' Make a unique id for a job.
+
+    :returns: The job id.
+    :rtype: String
+    '''
+    return uuid.uuid4().hex
+
+def _row_to_job(row):
+    job = {key: row[key] for key in row.keys()
+           if key not in ('cancel_requested', 'owner', 'heartbeat')}
+    job['request'] = json.loads(job['request'])
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
@@ -0,0 +1,132 @@
+#
+#  Licensed to the Apache Software Foundation (ASF) under one or more
+#  contributor license agreements.  See the NOTICE file distributed with
+#  this work for additional information regarding copyright ownership.
+#  The ASF licenses this file to You under the Apache License, Version 2.0
+#  (the "License"); you may not use this file except in compliance with
+#  the License.  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+''' Measure the request throughput of a running OCW UI backend.
+
+Every client thread sends its requests over one keep-alive connection, so the
+results show how well a server handles concurrent clients. For example, start
+the backend with
+
+    python run_webservices.py --server waitress --threads 8
+
+and then run
+
+    python load_test.py --clients 16 --requests 200 /processing/metrics/
+'''
+
+import argparse
+import httplib
+import threading
+import time
+
+def run_client(host, port, paths, num_requests, latencies, errors):
+    ''' Send requests over a single keep-alive connection.
+
+    :param host: The host name of the backend.
+    :type host: String
+    :param port: The port of the backend.
+    :type port: Integer
+    :param paths: The paths to request in turn.
+    :type paths: List of Strings
+    :param num_requests: The number of requests to send.
+    :type num_requests: Integer
+    :param latencies: The list that the seconds taken by every successful
+        request are appended to.
+    :type latencies: List
+    :param errors: The list that failed requests are appended to.
+    :type errors: List
+    '''
+    connection = httplib.HTTPConnection(host, port, timeout=60)
+
+    for index in range(num_requests):
+        path = paths[index % len(paths)]
+        start = time.time()
+        try:
+            connection.request('GET', path,
+                               headers={'Accept-Encoding': 'gzip'})
+            response = connection.getresponse()
+            response.read()
+        except (httplib.HTTPException, IOError) as e:
+            errors.append((path, str(e)))
+            connection.close()
+            connection = httplib.HTTPConnection(host, port, timeout=60)
+            continue
+
+        if response.status >= 400:
+            errors.append((path, response.status))
+        else:
+            latencies.append(time.time() - start)
+
+    connection.close()
+
+def run_load_test(host, port, paths, num_clients, num_requests):
+    ''' Send requests from concurrent clients and summarize the results.
+
+    :returns: A dictionary with the number of successful requests, errors,
+        the elapsed seconds, the requests per second and the median and 95th
+        percentile latencies in seconds.
+    '''
+    latencies = []
+    errors = []
+    threads = [threading.Thread(target=run_client,
+                                args=(host, port, paths, num_requests,
+                                      latencies, errors))
+               for client in range(num_clients)]
+
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'median_latency': _percentile(latencies, 50),
+        'p95_latency': _percentile(latencies, 95)
+    }
+
+def _percentile(sorted_values, percentile):
+    if not sorted_values:
+        return float('nan')
+    index = int(round((len(sorted_values) - 1) * percentile / 100.))
+    return sorted_values[index]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Measure the request throughput of the OCW UI backend.')
+    parser.add_argument('paths', nargs='*', default=['/processing/metrics/'],
+                        help='Paths to request in turn.')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8082)
+    parser.add_argument('--clients', type=int, default=8,
+                        help='Number of concurrent clients.')
+    parser.add_argument('--requests', type=int, default=100,
+                        help='Number of requests per client.')
+    args = parser.parse_args()
+
+    results = run_load_test(args.host, args.port, args.paths,
+                            args.clients, args.requests)
+
+    print '%(requests)d requests, %(errors)d errors in %(seconds).2fs' % results
+    print '%(requests_per_second).1f requests/s' % results
+    print 'median latency %.1fms, 95th percentile %.1fms' % (
+        results['median_latency'] * 1000, results['p95_latency'] * 1000)
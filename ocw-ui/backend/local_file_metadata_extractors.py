@@ -18,12 +18,11 @@
 ''' Helpers for local model/observation file metadata extraction. '''
 
 import sys
-import netCDF4
 import json
 
 from bottle import Bottle, request, route, response
 
-import ocw.utils
+from file_metadata import get_file_metadata
 
 lfme_app = Bottle()
 
@@ -61,59 +60,7 @@ def list_latlon(file_path):
             'variables': List of all variables present in the NetCDF file
         }
     '''
-    in_file = netCDF4.Dataset(file_path, mode='r')
-
-    var_names = set([key.encode().lower() for key in in_file.variables.keys()])
-    var_names_list = list(var_names)
-
-    lat_name_guesses = set(['latitude','lat','lats','latitudes'])
-    lon_name_guesses = set(['longitude','lon','lons','longitudes'])
-
-    # Attempt to determine the lat name
-    found_lat_name = False
-
-    # Find the intersection (if there is one) of the var names with the lat guesses
-    lat_guesses = list(var_names & lat_name_guesses)
-
-    if len(lat_guesses) >= 1:
-        found_lat_name = True
-        lat_name = var_names_list[var_names_list.index(lat_guesses[0])]
-
-        lats = in_file.variables[lat_name][:]
-
-        # Change 0 - 360 degree values to be -180 to 180
-        lats[lats > 180] = lats[lats > 180] - 360
-
-        lat_min = float(lats.min())
-        lat_max = float(lats.max())
-
-    # Attempt to determine the lon name
-    found_lon_name = False
-
-    # Find the intersection (if there is one) of the var names with the lon guesses
-    lon_guesses = list(var_names & lon_name_guesses)
-
-    if len(lon_guesses) >= 1:
-        found_lon_name = True
-        lon_name = var_names_list[var_names_list.index(lon_guesses[0])]
-
-        lons = in_file.variables[lon_name][:]
-
-        # Change 0 - 360 degree values to be -180 to 180
-        lons[lons > 180] = lons[lons > 180] - 360
-
-        lon_min = float(lons.min())
-        lon_max = float(lons.max())
-
-    in_file.close()
-
-    success = found_lat_name and found_lon_name
-    if success:
-        values = [success, lat_name, lon_name, lat_min, lat_max, lon_min, lon_max]
-        value_names = ['success', 'lat_name', 'lon_name', 'lat_min', 'lat_max', 'lon_min', 'lon_max']
-        output = dict(zip(value_names, values))
-    else:
-        output = {'success': success, 'variables': var_names_list}
+    output = get_file_metadata(file_path)['latlon']
 
     if request.query.callback:
         return '%s(%s)' % (request.query.callback, json.dumps(output))
@@ -150,32 +97,7 @@ def list_time(file_path):
             "variables": List of all variable names in the file
         } 
     '''
-    in_file = netCDF4.Dataset(file_path, mode='r')
-
-    var_names = set([key.encode().lower() for key in in_file.variables.keys()])
-    var_names_list = list(var_names)
-
-    time_name_guesses = set(['time', 'times', 't', 'date', 'dates', 'julian'])
-
-    # Find the intersection (if there is one) of the var names with the lat guesses
-    time_guesses = list(var_names & time_name_guesses)
-
-    if len(time_guesses) >= 1:
-        # Convert time data to datetime objects
-        time_var_name = time_guesses[0]
-        times = ocw.utils.decode_time_values(in_file, time_var_name)
-
-        start_time = str(min(times))
-        end_time = str(max(times))
-
-        output = {
-            'success': True,
-            'time_name': time_var_name,
-            'start_time': start_time,
-            'end_time': end_time
-        }
-    else:
-        output = {'success': False, 'variables': var_names_list}
+    output = get_file_metadata(file_path)['time']
 
     if request.query.callback:
         return '%s(%s)' % (request.query.callback, json.dumps(output))
@@ -210,12 +132,11 @@ def list_vars(file_path):
         }
     '''
     try:
-        in_file = netCDF4.Dataset(file_path, mode='r')
-    except RuntimeError:
+        variables = get_file_metadata(file_path)['variables']
+    except (IOError, OSError, RuntimeError):
         output = {'success': False}
     else:
-        output = {'success': True, 'variables': in_file.variables.keys()}
-        in_file.close()
+        output = {'success': True, 'variables': variables}
     finally:
         if request.query.callback:
             return "%s(%s)" % (request.query.callback, json.dumps(output))
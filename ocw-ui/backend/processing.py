@@ -17,28 +17,55 @@
 
 ''' Provides endpoints for running an OCW evaluation. '''
 
+from contextlib import contextmanager
 from datetime import timedelta, datetime
 import inspect
 import sys
 import os
 import json
+import threading
+import time
 
-from bottle import Bottle, request, response
+from bottle import Bottle, request, response, abort
 
-from config import WORK_DIR
+from config import (WORK_DIR, JOB_DATABASE, JOB_WORKERS, JOB_LEASE_TIMEOUT,
+                    JOB_MAX_AGE, RESULT_CACHE_QUOTA, DATASET_CACHE_SIZE,
+                    JOB_EVENT_POLL_INTERVAL, JOB_EVENT_KEEP_ALIVE,
+                    PLOT_PROCESSES)
+import dataset_cache
+import jobs
+import result_cache
 
 import ocw.data_source.local as local
 import ocw.data_source.rcmed as rcmed
 import ocw.dataset_processor as dsp
+import ocw.events as events
 from ocw.evaluation import Evaluation
 from ocw.dataset import Bounds
 import ocw.metrics as metrics
+import ocw.plot_pool as plot_pool
+from ocw.plot_pool import PlotPool
 import ocw.plotter as plotter
 
 import numpy as np
 
 processing_app = Bottle()
 
+# The stages of an evaluation job in the order that they are run.
+EVALUATION_STAGES = ['loading', 'normalizing', 'subsetting', 'temporal_rebin',
+                     'spatial_regrid', 'evaluating', 'plotting']
+
+# The queue of evaluation jobs. It is created on first use by _get_job_queue.
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+# Prepared datasets that are shared between the evaluations of this process.
+_dataset_cache = dataset_cache.DatasetCache(DATASET_CACHE_SIZE)
+
+# The processes that draw the plots of all evaluations of this process. They
+# are started by start_plot_processes.
+_plot_processes = None
+
 class EnableCors(object):
     name = 'enable_cors'
     api = 2
@@ -154,11 +181,388 @@ def run_evaluation():
             // format that this data is passed.
             'subregion_information': Path to a subregion file on the server.
         }
+
+    **Example Return JSON Format**
+
+    The evaluation is queued and run in the background. Its progress and
+    results are available from the */jobs/<job_id>/* endpoints. If the same
+    evaluation has been run before, the existing results are returned with a
+    null job id. If it is already queued or running, its job is returned.
+
+    .. sourcecode:: javascript
+
+        {
+            'job_id': The id of the evaluation job or null,
+            'eval_work_dir': The result directory name under the work directory,
+            'cached': True if the results already exist
+        }
     '''
     # TODO: validate input parameters and return an error if not valid
 
-    eval_time_stamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
     data = request.json
+    request_key = result_cache.get_request_key(data)
+    response.content_type = 'application/json'
+
+    eval_work_dir = result_cache.lookup_result(WORK_DIR, request_key)
+    if eval_work_dir is not None:
+        return json.dumps({'job_id': None,
+                           'eval_work_dir': eval_work_dir,
+                           'cached': True})
+
+    queue = _get_job_queue()
+    for job in queue.list(jobs.QUEUED) + queue.list(jobs.RUNNING):
+        if job['request'].get('request_key') == request_key:
+            return json.dumps({'job_id': job['id'],
+                               'eval_work_dir': job['request']['eval_work_dir'],
+                               'cached': False})
+
+    # The job id keeps jobs that are submitted in the same second from
+    # sharing a result directory.
+    job_id = jobs.new_job_id()
+    eval_work_dir = '{}_{}'.format(
+        datetime.now().strftime('%Y-%m-%d_%H-%M-%S'), job_id
+    )
+    queue.submit({'evaluation': data,
+                  'eval_work_dir': eval_work_dir,
+                  'request_key': request_key}, job_id)
+
+    return json.dumps({'job_id': job_id,
+                       'eval_work_dir': eval_work_dir,
+                       'cached': False})
+
+@processing_app.route('/dataset_cache/')
+def retrieve_dataset_cache_stats():
+    ''' Retrieve the statistics of the prepared dataset cache.
+
+    Evaluations share the datasets that they have loaded, subset and
+    re-binned through an in memory cache. Evaluations that only differ in
+    their metrics skip all of the data preparation.
+
+    **Example Return JSON Format**
+
+    .. sourcecode:: javascript
+
+        {
+            'hits': The number of prepared datasets taken from the cache,
+            'misses': The number of datasets that had to be prepared,
+            'evictions': The number of datasets removed to free memory,
+            'entries': The number of cached datasets,
+            'size': The bytes used by the cached datasets,
+            'max_size': The bytes that the cached datasets may use
+        }
+    '''
+    response.content_type = 'application/json'
+    return json.dumps(_dataset_cache.stats())
+
+@processing_app.route('/jobs/')
+def retrieve_jobs():
+    ''' Retrieve the status of all evaluation jobs.
+
+    The optional *status* query parameter only returns jobs in that state.
+
+    **Example Return JSON Format**
+
+    .. sourcecode:: javascript
+
+        {
+            'jobs': [{...}, {...}, ...]
+        }
+
+    See *retrieve_job* for the format of the job objects.
+    '''
+    status = request.query.status or None
+    jobs = [_job_status(job) for job in _get_job_queue().list(status)]
+
+    response.content_type = 'application/json'
+    return json.dumps({'jobs': jobs})
+
+@processing_app.route('/jobs/<job_id>/')
+def retrieve_job(job_id):
+    ''' Retrieve the status and progress of an evaluation job.
+
+    :param job_id: The id returned by *run_evaluation*.
+    :type job_id: String
+
+    **Example Return JSON Format**
+
+    .. sourcecode:: javascript
+
+        {
+            'job_id': The id of the job,
+            'status': 'queued', 'running', 'finished', 'failed' or 'cancelled',
+            'stage': The stage of the evaluation that is running,
+            'progress': The fraction of the evaluation that is done,
+            'eval_work_dir': The result directory name under the work directory,
+            'error': The error message if the job failed,
+            'created': Submission time in seconds since the epoch,
+            'started': Start time in seconds since the epoch,
+            'finished': End time in seconds since the epoch
+        }
+    '''
+    job = _get_job_or_404(job_id)
+
+    response.content_type = 'application/json'
+    return json.dumps(_job_status(job))
+
+@processing_app.route('/jobs/<job_id>/results/')
+def retrieve_job_results(job_id):
+    ''' Retrieve the results of a finished evaluation job.
+
+    :param job_id: The id returned by *run_evaluation*.
+    :type job_id: String
+
+    **Example Return JSON Format**
+
+    .. sourcecode:: javascript
+
+        {
+            'eval_work_dir': The result directory name under the work directory,
+            'results': [
+                'ref_compared_to_target_bias.png',
+                ...
+            ]
+        }
+
+    Responds with a 409 if the job hasn't finished successfully.
+    '''
+    job = _get_job_or_404(job_id)
+    if job['status'] != jobs.FINISHED:
+        abort(409, 'Job {} is {}'.format(job_id, job['status']))
+
+    response.content_type = 'application/json'
+    return json.dumps(job['result'])
+
+@processing_app.route('/jobs/<job_id>/events/')
+def stream_job_events(job_id):
+    ''' Stream the progress events of an evaluation job as Server-Sent Events.
+
+    Every message has the name of the event as its type, the id of the event
+    as its id and the JSON encoded event as its data. For example
+
+    .. sourcecode:: text
+
+        id: 12
+        event: dataset_loaded
+        data: {"event": "dataset_loaded", "source": "local", "seconds": 1.2, ...}
+
+    The events are
+
+    * ``dataset_loaded`` with the source, name, shape, bytes and seconds of
+      every dataset that is loaded,
+    * ``dataset_cached`` with the name of every prepared dataset that is
+      reused from an earlier evaluation,
+    * ``bytes_fetched`` with the bytes and seconds of every download,
+    * ``stage_started`` and ``stage_finished`` with the stage name and the
+      seconds the stage took,
+    * ``metric_completed`` with the metric, the datasets and the number of
+      completed and total metric runs,
+    * ``plot_rendered`` with the file name and seconds of every plot.
+
+    Events that were emitted before the stream was opened are sent first.
+    Once the job has ended an ``end`` message whose data is the job status
+    as returned by *retrieve_job* is sent and the stream is closed. A client
+    that reconnects with a Last-Event-ID header or a ``last_event_id`` query
+    parameter only gets the events after that id.
+
+    Every open stream holds a connection and a request thread. A server that
+    handles one request at a time would be blocked by it, so such servers
+    respond with a 503 and clients should poll *retrieve_job* instead.
+
+    :param job_id: The id returned by *run_evaluation*.
+    :type job_id: String
+    '''
+    _get_job_or_404(job_id)
+
+    if not request.environ.get('wsgi.multithread'):
+        abort(503, 'Job events are only streamed by a threaded server')
+
+    last_event_id = (request.get_header('Last-Event-ID') or
+                     request.query.last_event_id or 0)
+    try:
+        last_event_id = int(last_event_id)
+    except ValueError:
+        abort(400, 'Invalid last event id {}'.format(last_event_id))
+
+    response.content_type = 'text/event-stream'
+    response.set_header('Cache-Control', 'no-cache')
+    # Keep nginx from buffering the stream.
+    response.set_header('X-Accel-Buffering', 'no')
+    return _generate_job_event_stream(job_id, last_event_id)
+
+@processing_app.route('/jobs/<job_id>/cancel/', method=['POST', 'OPTIONS'])
+def cancel_job(job_id):
+    ''' Cancel an evaluation job.
+
+    A queued job is cancelled right away and a running job is cancelled
+    before it starts its next stage.
+
+    :param job_id: The id returned by *run_evaluation*.
+    :type job_id: String
+
+    **Example Return JSON Format**
+
+    .. sourcecode:: javascript
+
+        {
+            'cancelled': True if the job was or will be cancelled, False if
+                it had already ended
+        }
+    '''
+    _get_job_or_404(job_id)
+    cancelled = _get_job_queue().cancel(job_id)
+
+    response.content_type = 'application/json'
+    return json.dumps({'cancelled': cancelled})
+
+def start_plot_processes():
+    ''' Start the processes that draw the plots of the evaluations.
+
+    Forking a process that runs other threads isn't safe, so this must be
+    called before the process starts any threads, e.g. before the server
+    starts serving requests. If it isn't called, the plots are drawn by the
+    job threads one at a time.
+    '''
+    global _plot_processes
+
+    if _plot_processes is None:
+        _plot_processes = plot_pool.start_worker_pool(PLOT_PROCESSES)
+
+def _get_job_queue():
+    ''' Get the evaluation job queue, starting its workers on first use.
+
+    :returns: The started jobs.JobQueue that runs evaluations.
+    '''
+    global _job_queue
+
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = jobs.JobQueue(JOB_DATABASE,
+                                       _run_evaluation_job,
+                                       workers=JOB_WORKERS,
+                                       lease_timeout=JOB_LEASE_TIMEOUT,
+                                       max_age=JOB_MAX_AGE)
+            _job_queue.start()
+
+    return _job_queue
+
+def _get_job_or_404(job_id):
+    ''' Get a job from the queue or abort the request with a 404. '''
+    job = _get_job_queue().get(job_id)
+    if job is None:
+        abort(404, 'No job with id {}'.format(job_id))
+    return job
+
+def _job_status(job):
+    ''' Convert a queued job into its JSON status representation. '''
+    return {
+        'job_id': job['id'],
+        'status': job['status'],
+        'stage': job['stage'],
+        'progress': job['progress'],
+        'eval_work_dir': job['request']['eval_work_dir'],
+        'error': job['error'],
+        'created': job['created'],
+        'started': job['started'],
+        'finished': job['finished']
+    }
+
+def _generate_job_event_stream(job_id, last_event_id):
+    ''' Generate the Server-Sent Event messages of a job until it ends. '''
+    queue = _get_job_queue()
+
+    # Send the headers right away and tell clients how long to wait before
+    # they reconnect.
+    yield 'retry: 2000\n\n'
+    last_sent = time.time()
+
+    while True:
+        # The status is read before the events so that no event of a job
+        # that ends in between is lost.
+        job = queue.get(job_id)
+        # The job has expired and been removed since the stream was opened.
+        if job is None:
+            return
+
+        for event_id, event in queue.get_events(job_id, last_event_id):
+            last_event_id = event_id
+            last_sent = time.time()
+            yield _format_server_sent_event(event['event'], event, event_id)
+
+        if job['status'] in jobs.FINAL_STATES:
+            yield _format_server_sent_event('end', _job_status(job))
+            return
+
+        if time.time() - last_sent >= JOB_EVENT_KEEP_ALIVE:
+            last_sent = time.time()
+            yield ': keep-alive\n\n'
+
+        time.sleep(JOB_EVENT_POLL_INTERVAL)
+
+def _format_server_sent_event(event_type, data, event_id=None):
+    ''' Format a Server-Sent Events message with JSON encoded data. '''
+    message = 'event: {}\ndata: {}\n\n'.format(event_type, json.dumps(data))
+    if event_id is not None:
+        message = 'id: {}\n'.format(event_id) + message
+    return message
+
+def _run_evaluation_job(job_request, progress):
+    ''' Run a queued evaluation job.
+
+    :param job_request: The job parameters queued by *run_evaluation*. The
+        'evaluation' key holds the POSTed evaluation parameters, the
+        'eval_work_dir' key the name of the result directory, a time stamp
+        followed by the job id, and the
+        'request_key' key the result cache key of the evaluation.
+    :type job_request: Dictionary
+    :param progress: Called with the stage name and the fraction of the
+        evaluation that is done before every stage.
+    :type progress: Callable
+
+    :returns: The result directory name and the list of result file names.
+    '''
+    eval_time_stamp = job_request['eval_work_dir']
+    _run_evaluation(job_request['evaluation'], eval_time_stamp, progress)
+
+    eval_path = os.path.join(WORK_DIR, eval_time_stamp)
+    results = sorted(f for f in os.listdir(eval_path) if f[0] != '.')
+
+    # Jobs queued before the result cache existed don't have a request key.
+    if job_request.get('request_key'):
+        result_cache.store_result(WORK_DIR, job_request['request_key'],
+                                  eval_time_stamp)
+
+    # Never evict the results of this or any other unfinished evaluation.
+    queue = _get_job_queue()
+    keep = [job['request']['eval_work_dir']
+            for job in queue.list(jobs.QUEUED) + queue.list(jobs.RUNNING)]
+    result_cache.evict_results(WORK_DIR, RESULT_CACHE_QUOTA, keep)
+
+    return {
+        'eval_work_dir': eval_time_stamp,
+        'results': results
+    }
+
+def _run_evaluation(data, eval_time_stamp, progress=None):
+    ''' Load, prepare, evaluate and plot the datasets of an evaluation.
+
+    :param data: The evaluation parameters as POSTed to *run_evaluation*.
+    :type data: Dictionary
+    :param eval_time_stamp: The time stamp for the directory where
+        evaluation results should be saved.
+    :type eval_time_stamp: Time stamp of the form '%Y-%m-%d_%H-%M-%S'
+    :param progress: (Optional) Called with the stage name and the fraction
+        of the evaluation that is done before every stage in EVALUATION_STAGES.
+    :type progress: Callable
+    '''
+    if progress is None:
+        progress = lambda stage, fraction: None
+
+    @contextmanager
+    def run_stage(stage):
+        stage_index = EVALUATION_STAGES.index(stage)
+        progress(stage, stage_index / float(len(EVALUATION_STAGES)))
+        with events.stage(stage):
+            yield
 
     eval_bounds = {
         'start_time': datetime.strptime(data['start_time'], '%Y-%m-%d %H:%M:%S'),
@@ -169,22 +573,11 @@ def run_evaluation():
         'lon_max': float(data['lon_max'])
     }
 
-    # Load all the datasets
-    ref_dataset = _process_dataset_object(data['reference_dataset'], eval_bounds)
-
-    target_datasets = [_process_dataset_object(obj, eval_bounds)
-					   for obj
-					   in data['target_datasets']]
-
     # Normalize the dataset time values so they break on consistent days of the
     # month or time of the day, depending on how they will be rebinned.
     resolution = data['temporal_resolution']
     time_delta = timedelta(days=resolution)
-
     time_step = 'daily' if resolution == 1 else 'monthly'
-    ref_dataset = dsp.normalize_dataset_datetimes(ref_dataset, time_step)
-    target_datasets = [dsp.normalize_dataset_datetimes(ds, time_step)
-                       for ds in target_datasets]
 
     # Subset the datasets
     start = eval_bounds['start_time']
@@ -210,17 +603,6 @@ def run_evaluation():
                     start,
                     end)
 
-    ref_dataset = dsp.safe_subset(subset, ref_dataset)
-    target_datasets = [dsp.safe_subset(subset, ds)
-                       for ds
-                       in target_datasets]
-    
-    # Do temporal re-bin based off of passed resolution
-    ref_dataset = dsp.temporal_rebin(ref_dataset, time_delta)
-    target_datasets = [dsp.temporal_rebin(ds, time_delta)
-					   for ds
-					   in target_datasets]
-
     # Do spatial re=bin based off of reference dataset + lat/lon steps
     lat_step = data['spatial_rebin_lat_step']
     lon_step = data['spatial_rebin_lon_step']
@@ -228,10 +610,52 @@ def run_evaluation():
 													lat_step,
 													lon_step)
 
-    ref_dataset = dsp.spatial_regrid(ref_dataset, lat_bins, lon_bins)
-    target_datasets =  [dsp.spatial_regrid(ds, lat_bins, lon_bins)
-						for ds
-						in target_datasets]
+    # The reference dataset is first, followed by the target datasets. Only
+    # the datasets that haven't been prepared by an earlier evaluation with
+    # the same bounds and resolution are loaded and prepared.
+    dataset_objects = [data['reference_dataset']] + data['target_datasets']
+    cache_keys = [dataset_cache.get_dataset_key(obj,
+                                                eval_bounds,
+                                                resolution,
+                                                lat_bins,
+                                                lon_bins)
+                  for obj in dataset_objects]
+    prepared = [_dataset_cache.get(key) for key in cache_keys]
+    datasets = {index: None
+                for index, dataset in enumerate(prepared)
+                if dataset is None}
+
+    # Load all the datasets
+    with run_stage('loading'):
+        for dataset in prepared:
+            if dataset is not None:
+                events.emit('dataset_cached', name=dataset.name)
+
+        for index in datasets:
+            datasets[index] = _process_dataset_object(dataset_objects[index],
+                                                      eval_bounds)
+
+    with run_stage('normalizing'):
+        for index, ds in datasets.items():
+            datasets[index] = dsp.normalize_dataset_datetimes(ds, time_step)
+
+    with run_stage('subsetting'):
+        for index, ds in datasets.items():
+            datasets[index] = dsp.safe_subset(subset, ds)
+
+    # Do temporal re-bin based off of passed resolution
+    with run_stage('temporal_rebin'):
+        for index, ds in datasets.items():
+            datasets[index] = dsp.temporal_rebin(ds, time_delta)
+
+    with run_stage('spatial_regrid'):
+        for index, ds in datasets.items():
+            datasets[index] = dsp.spatial_regrid(ds, lat_bins, lon_bins)
+            _dataset_cache.put(cache_keys[index], datasets[index])
+            prepared[index] = datasets[index]
+
+    ref_dataset = prepared[0]
+    target_datasets = prepared[1:]
 
     # Load metrics
     loaded_metrics = _load_metrics(data['metrics'])
@@ -240,12 +664,13 @@ def run_evaluation():
     evaluation = Evaluation(ref_dataset, target_datasets, loaded_metrics)
 
     # Run evaluation
-    evaluation.run()
+    with run_stage('evaluating'):
+        evaluation.run()
 
     # Plot
-    _generate_evaluation_plots(evaluation, lat_bins, lon_bins, eval_time_stamp)
-
-    return json.dumps({'eval_work_dir': eval_time_stamp})
+    with run_stage('plotting'):
+        _generate_evaluation_plots(evaluation, lat_bins, lon_bins,
+                                   eval_time_stamp)
 
 def _process_dataset_object(dataset_object, eval_bounds):
     ''' Convert an dataset object representation into an OCW Dataset
@@ -513,42 +938,46 @@ def _generate_evaluation_plots(evaluation, lat_bins, lon_bins, eval_time_stamp):
 
     grid_shape = _calculate_grid_shape(grid_shape_dataset)
 
-    if evaluation.results != []:
-        for dataset_index, dataset in enumerate(evaluation.target_datasets):
-            for metric_index, metric in enumerate(evaluation.metrics):
-                results = evaluation.results[dataset_index][metric_index]
-                file_name = _generate_binary_eval_plot_file_path(evaluation,
-																 dataset_index,
-																 metric_index,
-                                                                 eval_time_stamp)
-                plot_title = _generate_binary_eval_plot_title(evaluation,
-															  dataset_index,
-															  metric_index)
-                plotter.draw_contour_map(results,
-										 lat_bins,
-										 lon_bins,
-										 fname=file_name,
-										 ptitle=plot_title,
-                                         gridshape=grid_shape)
-
-    if evaluation.unary_results != []:
-        for metric_index, metric in enumerate(evaluation.unary_metrics):
-			cur_unary_results = evaluation.unary_results[metric_index]
-			for result_index, result in enumerate(cur_unary_results):
-				file_name = _generate_unary_eval_plot_file_path(evaluation,
-																result_index,
-																metric_index,
-                                                                eval_time_stamp)
-				plot_title = _generate_unary_eval_plot_title(evaluation,
-															 result_index,
-															 metric_index)
-
-				plotter.draw_contrough_map(results,
-										   lat_bins,
-										   lon_bins,
-										   fname=file_name,
-										   ptitle=plot_title,
-                                           gridshape=grid_shape)
+    # The plots are independent of each other, so they are drawn
+    # concurrently by the plot processes and every file is written
+    # atomically. Each plot process prepares the map of the evaluation
+    # bounds once and keeps it for the plots of later evaluations.
+    with PlotPool(pool=_plot_processes) as pool:
+        if evaluation.results != []:
+            for dataset_index, dataset in enumerate(evaluation.target_datasets):
+                for metric_index, metric in enumerate(evaluation.metrics):
+                    results = evaluation.results[dataset_index][metric_index]
+                    file_name = _generate_binary_eval_plot_file_path(
+                        evaluation, dataset_index, metric_index,
+                        eval_time_stamp)
+                    plot_title = _generate_binary_eval_plot_title(
+                        evaluation, dataset_index, metric_index)
+
+                    pool.draw(plotter.draw_contour_map,
+                              results,
+                              lat_bins,
+                              lon_bins,
+                              fname=file_name,
+                              ptitle=plot_title,
+                              gridshape=grid_shape)
+
+        if evaluation.unary_results != []:
+            for metric_index, metric in enumerate(evaluation.unary_metrics):
+                cur_unary_results = evaluation.unary_results[metric_index]
+                for result_index, result in enumerate(cur_unary_results):
+                    file_name = _generate_unary_eval_plot_file_path(
+                        evaluation, result_index, metric_index,
+                        eval_time_stamp)
+                    plot_title = _generate_unary_eval_plot_title(
+                        evaluation, result_index, metric_index)
+
+                    pool.draw(plotter.draw_contour_map,
+                              result,
+                              lat_bins,
+                              lon_bins,
+                              fname=file_name,
+                              ptitle=plot_title,
+                              gridshape=grid_shape)
 
 def _calculate_grid_shape(reference_dataset, max_cols=6):
     ''' Calculate the plot grid shape given a reference dataset. 
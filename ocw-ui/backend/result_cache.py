@@ -0,0 +1,265 @@
+#
+#  Licensed to the Apache Software Foundation (ASF) under one or more
+#  contributor license agreements.  See the NOTICE file distributed with
+#  this work for additional information regarding copyright ownership.
+#  The ASF licenses this file to You under the Apache License, Version 2.0
+#  (the "License"); you may not use this file except in compliance with
+#  the License.  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+''' Content addressed cache of evaluation result directories.
+
+Every evaluation result directory in the work directory can be registered
+under the hash of the evaluation request that produced it. The hash maps to
+the directory through a small key file in the hidden *.results* directory, so
+an identical request finds its results without recomputing them. The result
+directories are evicted least recently used first once they use more disk
+space than a quota.
+'''
+
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+logger = logging.getLogger(__name__)
+
+# Hidden directory in the work directory that holds a key file per request.
+KEY_DIR = '.results'
+
+# Hidden file in every cached result directory that holds its request key.
+KEY_FILE = '.request_key'
+
+_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def get_request_key(data):
+    ''' Hash an evaluation request.
+
+    Requests that only differ in the formatting of their values, the order of
+    their keys or the order of their metrics have the same key. Local files
+    are identified by their path, size and modification time so that results
+    are recomputed when a file changes.
+
+    :param data: The evaluation parameters as POSTed to *run_evaluation*.
+    :type data: Dictionary
+
+    :returns: The hex digest of the normalized request.
+    '''
+    normalized = dict(data)
+
+    for name in ['lat_min', 'lat_max', 'lon_min', 'lon_max',
+                 'spatial_rebin_lat_step', 'spatial_rebin_lon_step',
+                 'temporal_resolution']:
+        if name in normalized:
+            normalized[name] = _normalize_number(normalized[name])
+
+    for name in ['start_time', 'end_time']:
+        if name in normalized:
+            normalized[name] = _normalize_time(normalized[name])
+
+    if isinstance(normalized.get('metrics'), list):
+        normalized['metrics'] = sorted(set(normalized['metrics']))
+
+    if 'reference_dataset' in normalized:
+        normalized['reference_dataset'] = normalize_dataset_object(
+            normalized['reference_dataset'])
+
+    if isinstance(normalized.get('target_datasets'), list):
+        normalized['target_datasets'] = [normalize_dataset_object(obj)
+                                         for obj
+                                         in normalized['target_datasets']]
+
+    encoded = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(encoded).hexdigest()
+
+def lookup_result(work_dir, key):
+    ''' Find the result directory of a request and mark it as used.
+
+    :param work_dir: The directory that holds the result directories.
+    :type work_dir: String
+    :param key: The request key from :func:`get_request_key`.
+    :type key: String
+
+    :returns: The name of the result directory, or None if the request isn't
+        cached.
+    '''
+    key_path = os.path.join(work_dir, KEY_DIR, key)
+
+    try:
+        with open(key_path) as key_file:
+            eval_work_dir = key_file.read().strip()
+    except IOError:
+        return None
+
+    eval_path = os.path.join(work_dir, eval_work_dir)
+    try:
+        # The modification time of a result directory is its last use.
+        os.utime(eval_path, None)
+    except OSError:
+        # The result directory has been removed behind our back.
+        _remove_file(key_path)
+        return None
+
+    return eval_work_dir
+
+def store_result(work_dir, key, eval_work_dir):
+    ''' Register a finished result directory under its request key.
+
+    :param work_dir: The directory that holds the result directories.
+    :type work_dir: String
+    :param key: The request key from :func:`get_request_key`.
+    :type key: String
+    :param eval_work_dir: The name of the result directory.
+    :type eval_work_dir: String
+    '''
+    key_dir = os.path.join(work_dir, KEY_DIR)
+    if not os.path.exists(key_dir):
+        try:
+            os.makedirs(key_dir)
+        except OSError:
+            # Another worker created the directory in the meantime.
+            pass
+
+    with open(os.path.join(work_dir, eval_work_dir, KEY_FILE), 'w') as key_file:
+        key_file.write(key)
+
+    # Write the key file atomically so that readers never see a partial name.
+    key_path = os.path.join(key_dir, key)
+    tmp_path = '{}.{}.tmp'.format(key_path, os.getpid())
+    with open(tmp_path, 'w') as key_file:
+        key_file.write(eval_work_dir)
+    os.rename(tmp_path, key_path)
+
+def evict_results(work_dir, quota, keep=()):
+    ''' Remove the least recently used result directories over a disk quota.
+
+    All the directories in the work directory are considered results, whether
+    they are cached or not.
+
+    :param work_dir: The directory that holds the result directories.
+    :type work_dir: String
+    :param quota: The number of bytes that the result directories may use.
+    :type quota: Integer
+    :param keep: The names of result directories that must not be removed,
+        such as the results of running evaluations.
+    :type keep: List of Strings
+
+    :returns: The names of the removed result directories.
+    '''
+    results = []
+    try:
+        names = os.listdir(work_dir)
+    except OSError:
+        return []
+
+    for name in names:
+        path = os.path.join(work_dir, name)
+        if name[0] == '.' or not os.path.isdir(path):
+            continue
+        results.append((os.path.getmtime(path), name, _get_tree_size(path)))
+
+    total_size = sum(size for last_used, name, size in results)
+    removed = []
+
+    for last_used, name, size in sorted(results):
+        if total_size <= quota:
+            break
+        if name in keep:
+            continue
+
+        _remove_result(work_dir, name)
+        total_size -= size
+        removed.append(name)
+
+    if removed:
+        logger.info('Evicted %d result directories from %s',
+                    len(removed), work_dir)
+
+    return removed
+
+def _remove_result(work_dir, name):
+    ''' Remove a result directory and its key file. '''
+    path = os.path.join(work_dir, name)
+
+    try:
+        with open(os.path.join(path, KEY_FILE)) as key_file:
+            key = key_file.read().strip()
+    except IOError:
+        key = None
+
+    if key:
+        _remove_file(os.path.join(work_dir, KEY_DIR, key))
+
+    shutil.rmtree(path, ignore_errors=True)
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _get_tree_size(path):
+    ''' Get the number of bytes used by the files under a directory. '''
+    size = 0
+    for dir_path, dir_names, file_names in os.walk(path):
+        for file_name in file_names:
+            try:
+                size += os.path.getsize(os.path.join(dir_path, file_name))
+            except OSError:
+                pass
+    return size
+
+def _normalize_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+def _normalize_time(value):
+    try:
+        return datetime.strptime(value, _TIME_FORMAT).strftime(_TIME_FORMAT)
+    except (TypeError, ValueError):
+        return value
+
+def normalize_dataset_object(dataset_object):
+    ''' Normalize a dataset object of an evaluation request. '''
+    if not isinstance(dataset_object, dict):
+        return dataset_object
+
+    normalized = dict(dataset_object)
+    info = normalized.get('dataset_info')
+    if not isinstance(info, dict):
+        return normalized
+
+    info = {key: str(value) if isinstance(value, (int, long, float)) else value
+            for key, value in info.items()}
+
+    try:
+        source_id = int(normalized.get('data_source_id'))
+    except (TypeError, ValueError):
+        source_id = normalized.get('data_source_id')
+    normalized['data_source_id'] = source_id
+
+    # Local files are part of the request by their contents. Their size and
+    # modification time stand in for a hash of the whole file.
+    if source_id == 1 and 'dataset_id' in info:
+        try:
+            stat = os.stat(info['dataset_id'])
+        except OSError:
+            pass
+        else:
+            info['file_size'] = stat.st_size
+            info['file_mtime'] = stat.st_mtime
+
+    normalized['dataset_info'] = info
+    return normalized
@@ -16,11 +16,17 @@
 #
 ''' OCW UI Backend web services initialization. '''
 
-from bottle import Bottle, response, static_file
+import argparse
+
+from bottle import Bottle, response, run, static_file
+
+from config import (WORK_DIR, WSGI_SERVER, WSGI_THREADS, WSGI_WORKERS,
+                    WSGI_KEEP_ALIVE, STATIC_MAX_AGE, EVAL_RESULTS_MAX_AGE)
 from local_file_metadata_extractors import lfme_app
 from directory_helpers import dir_app
 from rcmed_helpers import rcmed_app
-from processing import processing_app
+from processing import processing_app, start_plot_processes
+from wsgi_helpers import GzipMiddleware, cached_static_file
 
 app = Bottle()
 app.mount('/lfme/', lfme_app)
@@ -35,29 +41,31 @@ def index():
 
 @app.route('/bower_components/:path#.+#')
 def serve_static(path):
-    return static_file(path, root='./frontend/bower_components/')
+    return cached_static_file(path, './frontend/bower_components/',
+                              STATIC_MAX_AGE)
 
 @app.route('/styles/:path#.+#')
 def serve_static(path):
-    return static_file(path, root='./frontend/app/styles/')
+    return cached_static_file(path, './frontend/app/styles/',
+                              STATIC_MAX_AGE)
 
 @app.route('/scripts/:path#.+#')
 def serve_static(path):
-    return static_file(path, root='./frontend/app/scripts/')
+    return cached_static_file(path, './frontend/app/scripts/',
+                              STATIC_MAX_AGE)
 
 @app.route('/views/:path#.+#')
 def serve_static(path):
-    return static_file(path, root='./frontend/app/views/')
+    return cached_static_file(path, './frontend/app/views/',
+                              STATIC_MAX_AGE)
 
 @app.route('/static/eval_results/<file_path:path>')
 def get_eval_result_image(file_path):
     ''' Return static file.
     
-    Return static file specified by root + filepath where root defaults to:
-        /tmp/ocw
-
-    The 'root' path should coincide with the work directory set used by the
-    OCW toolkit for processing.
+    Return static file specified by root + filepath where root is the
+    WORK_DIR set in the backend configuration. The file is sent with ETag and
+    Cache-Control headers so browsers only download a result image once.
 
     :param filepath: The path component that when appended to the 'root' path
         header specifies a file to return.
@@ -65,12 +73,67 @@ def get_eval_result_image(file_path):
 
     :returns: The requested file resource
     '''
-    return static_file(file_path, root="/tmp/ocw")
+    return cached_static_file(file_path, WORK_DIR, EVAL_RESULTS_MAX_AGE)
 
 @app.hook('after_request')
 def enable_cors():
     ''' Allow Cross-Origin Resource Sharing for all URLs. '''
     response.headers['Access-Control-Allow-Origin'] = '*'
 
+# The WSGI application to deploy. JSON responses are gzipped for clients that
+# accept it, e.g. gunicorn -k gthread run_webservices:application
+application = GzipMiddleware(app)
+
+def run_server(host='localhost', port=8082, server=WSGI_SERVER,
+               threads=WSGI_THREADS, workers=WSGI_WORKERS):
+    ''' Serve the backend with the given WSGI server.
+
+    :param host: The host name or address to listen on.
+    :type host: String
+    :param port: The port to listen on.
+    :type port: Integer
+    :param server: The name of a Bottle server adapter. 'waitress' serves
+        requests from a pool of threads and 'gunicorn' from pre-forked worker
+        processes that each have a pool of threads. Both keep HTTP/1.1
+        connections alive.
+    :type server: String
+    :param threads: The number of request threads per process.
+    :type threads: Integer
+    :param workers: The number of 'gunicorn' worker processes.
+    :type workers: Integer
+    '''
+    options = {}
+    if server == 'waitress':
+        options = {'threads': threads}
+    elif server == 'gunicorn':
+        # Every worker process starts its plot processes right after it is
+        # forked, before it starts its request threads.
+        options = {
+            'workers': workers,
+            'worker_class': 'gthread',
+            'threads': threads,
+            'keepalive': WSGI_KEEP_ALIVE,
+            'post_fork': lambda arbiter, worker: start_plot_processes()
+        }
+
+    # The plot processes are forked before the server starts any threads.
+    if server != 'gunicorn':
+        start_plot_processes()
+
+    run(application, server=server, host=host, port=port, **options)
+
 if __name__ == "__main__":
-    app.run(host='localhost', port=8082)
+    parser = argparse.ArgumentParser(description='Run the OCW UI backend.')
+    parser.add_argument('--host', default='localhost',
+                        help='Host name or address to listen on.')
+    parser.add_argument('--port', type=int, default=8082,
+                        help='Port to listen on.')
+    parser.add_argument('--server', default=WSGI_SERVER,
+                        help='WSGI server: wsgiref, waitress or gunicorn.')
+    parser.add_argument('--threads', type=int, default=WSGI_THREADS,
+                        help='Request threads per process.')
+    parser.add_argument('--workers', type=int, default=WSGI_WORKERS,
+                        help='Worker processes for gunicorn.')
+    args = parser.parse_args()
+
+    run_server(args.host, args.port, args.server, args.threads, args.workers)
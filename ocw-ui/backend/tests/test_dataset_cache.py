@@ -0,0 +1,131 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import datetime as dt
+import unittest
+
+import numpy as np
+
+import backend.dataset_cache as dataset_cache
+from ocw.dataset import Dataset
+
+def _create_dataset(num_times):
+    lats = np.arange(10, dtype=np.float64)
+    lons = np.arange(10, dtype=np.float64)
+    times = np.array([dt.datetime(2000, 1, 1) + dt.timedelta(days=i)
+                      for i in range(num_times)])
+    values = np.zeros((num_times, 10, 10))
+    return Dataset(lats, lons, times, values)
+
+class TestDatasetKey(unittest.TestCase):
+    def setUp(self):
+        self.dataset_object = {
+            'data_source_id': 2,
+            'dataset_info': {'dataset_id': 10, 'parameter_id': 34}
+        }
+        self.eval_bounds = {
+            'start_time': dt.datetime(1989, 1, 1),
+            'end_time': dt.datetime(1991, 1, 1),
+            'lat_min': -25.0,
+            'lat_max': 22.0,
+            'lon_min': -14.0,
+            'lon_max': 40.0
+        }
+        self.lat_bins = np.arange(-25, 22, 1)
+        self.lon_bins = np.arange(-14, 40, 1)
+
+    def get_key(self, **kwargs):
+        args = {
+            'dataset_object': self.dataset_object,
+            'eval_bounds': self.eval_bounds,
+            'temporal_resolution': 30,
+            'lat_bins': self.lat_bins,
+            'lon_bins': self.lon_bins
+        }
+        args.update(kwargs)
+        return dataset_cache.get_dataset_key(**args)
+
+    def test_equivalent_dataset_objects(self):
+        equivalent = {
+            'data_source_id': '2',
+            'dataset_info': {'parameter_id': '34', 'dataset_id': '10'}
+        }
+        self.assertEqual(self.get_key(),
+                         self.get_key(dataset_object=equivalent))
+
+    def test_preparation_parameters_change_key(self):
+        key = self.get_key()
+        self.assertNotEqual(key, self.get_key(temporal_resolution=365))
+        self.assertNotEqual(key, self.get_key(lat_bins=np.arange(-25, 22, 2)))
+
+        bounds = dict(self.eval_bounds, lat_min=-20.0)
+        self.assertNotEqual(key, self.get_key(eval_bounds=bounds))
+
+class TestDatasetCache(unittest.TestCase):
+    def setUp(self):
+        self.dataset_size = dataset_cache._get_dataset_size(_create_dataset(4))
+        self.cache = dataset_cache.DatasetCache(2 * self.dataset_size)
+
+    def test_get_cached_dataset(self):
+        dataset = _create_dataset(4)
+        self.cache.put('a', dataset)
+
+        self.assertIs(self.cache.get('a'), dataset)
+        self.assertIsNone(self.cache.get('b'))
+
+    def test_evict_least_recently_used(self):
+        self.cache.put('a', _create_dataset(4))
+        self.cache.put('b', _create_dataset(4))
+        self.cache.get('a')
+        self.cache.put('c', _create_dataset(4))
+
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('c'))
+        self.assertEqual(self.cache.size, 2 * self.dataset_size)
+
+    def test_oversized_dataset_is_not_cached(self):
+        self.cache.put('a', _create_dataset(4))
+        self.cache.put('huge', _create_dataset(40))
+
+        self.assertIsNone(self.cache.get('huge'))
+        self.assertIsNotNone(self.cache.get('a'))
+
+    def test_replace_dataset(self):
+        self.cache.put('a', _create_dataset(4))
+        self.cache.put('a', _create_dataset(4))
+
+        self.assertEqual(self.cache.size, self.dataset_size)
+
+    def test_stats(self):
+        self.cache.put('a', _create_dataset(4))
+        self.cache.put('b', _create_dataset(4))
+        self.cache.put('c', _create_dataset(4))
+        self.cache.get('c')
+        self.cache.get('a')
+
+        self.assertEqual(self.cache.stats(), {
+            'hits': 1,
+            'misses': 1,
+            'evictions': 1,
+            'entries': 2,
+            'size': 2 * self.dataset_size,
+            'max_size': 2 * self.dataset_size
+        })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import netCDF4
+import numpy as np
+
+import backend.file_metadata as file_metadata
+
+def _write_file(path, lons, num_times=12):
+    out_file = netCDF4.Dataset(path, 'w')
+    out_file.createDimension('lat', 3)
+    out_file.createDimension('lon', len(lons))
+    out_file.createDimension('time', num_times)
+
+    lat = out_file.createVariable('lat', 'f8', ('lat',))
+    lat[:] = [-10, 0, 10]
+    lon = out_file.createVariable('lon', 'f8', ('lon',))
+    lon[:] = lons
+    time = out_file.createVariable('time', 'f8', ('time',))
+    time.units = 'days since 2000-01-01 00:00:00'
+    time[:] = np.arange(num_times)
+    out_file.close()
+
+class TestFileMetadata(unittest.TestCase):
+    def setUp(self):
+        file_metadata.clear_file_metadata_cache()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'model.nc')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_metadata(self):
+        _write_file(self.path, np.arange(-20, 20, 5))
+        metadata = file_metadata.get_file_metadata(self.path)
+
+        self.assertEqual(metadata['variables'], ['lat', 'lon', 'time'])
+        self.assertEqual(metadata['latlon'], {
+            'success': True,
+            'lat_name': 'lat',
+            'lon_name': 'lon',
+            'lat_min': -10.0,
+            'lat_max': 10.0,
+            'lon_min': -20.0,
+            'lon_max': 15.0
+        })
+        self.assertEqual(metadata['time'], {
+            'success': True,
+            'time_name': 'time',
+            'start_time': '2000-01-01 00:00:00',
+            'end_time': '2000-01-12 00:00:00'
+        })
+
+    def test_lons_above_180_degrees(self):
+        _write_file(self.path, np.arange(0, 360, 2))
+        latlon = file_metadata.get_file_metadata(self.path)['latlon']
+
+        self.assertEqual(latlon['lon_min'], -178.0)
+        self.assertEqual(latlon['lon_max'], 180.0)
+
+    def test_metadata_is_cached(self):
+        _write_file(self.path, np.arange(-20, 20, 5))
+        metadata = file_metadata.get_file_metadata(self.path)
+
+        self.assertIs(file_metadata.get_file_metadata(self.path), metadata)
+
+    def test_changed_file_is_read_again(self):
+        _write_file(self.path, np.arange(-20, 20, 5))
+        file_metadata.get_file_metadata(self.path)
+
+        _write_file(self.path, np.arange(-20, 20, 5), num_times=24)
+        stat = os.stat(self.path)
+        os.utime(self.path, (stat.st_atime, stat.st_mtime + 10))
+        metadata = file_metadata.get_file_metadata(self.path)
+
+        self.assertEqual(metadata['time']['end_time'], '2000-01-24 00:00:00')
+
+    def test_prefetch(self):
+        _write_file(self.path, np.arange(-20, 20, 5))
+        other_path = os.path.join(self.tmp_dir, 'notes.txt')
+        open(other_path, 'w').close()
+
+        file_metadata.prefetch_file_metadata([self.path, other_path])
+        file_metadata._prefetch_queue.join()
+
+        self.assertIn(self.path, file_metadata._cache)
+        self.assertNotIn(other_path, file_metadata._cache)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,273 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import backend.jobs as jobs
+import ocw.events as events
+
+def wait_for_job(queue, job_id, timeout=10):
+    ''' Wait until a job has ended and return it. '''
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in jobs.FINAL_STATES:
+            return job
+        time.sleep(0.01)
+    raise AssertionError('Job {} did not end'.format(job_id))
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'jobs.sqlite')
+        self.queues = []
+
+    def tearDown(self):
+        for queue in self.queues:
+            queue.stop()
+        shutil.rmtree(self.tmp_dir)
+
+    def make_queue(self, run_job, workers=2, **kwargs):
+        queue = jobs.JobQueue(self.db_path, run_job, workers=workers,
+                              poll_interval=0.01, **kwargs)
+        self.queues.append(queue)
+        return queue
+
+    def test_finished_job_result(self):
+        def run_job(request, progress):
+            progress('adding', 0.5)
+            return {'sum': request['a'] + request['b']}
+
+        queue = self.make_queue(run_job)
+        queue.start()
+        job = wait_for_job(queue, queue.submit({'a': 1, 'b': 2}))
+
+        self.assertEqual(job['status'], jobs.FINISHED)
+        self.assertEqual(job['result'], {'sum': 3})
+        self.assertEqual(job['stage'], 'adding')
+        self.assertEqual(job['progress'], 1.0)
+        self.assertEqual(job['request'], {'a': 1, 'b': 2})
+
+    def test_failed_job_error(self):
+        def run_job(request, progress):
+            raise ValueError('Invalid metric name')
+
+        queue = self.make_queue(run_job)
+        queue.start()
+        job = wait_for_job(queue, queue.submit({}))
+
+        self.assertEqual(job['status'], jobs.FAILED)
+        self.assertEqual(job['error'], 'Invalid metric name')
+
+    def test_job_events(self):
+        def run_job(request, progress):
+            events.emit('dataset_loaded', name='model')
+            with events.stage('subsetting'):
+                pass
+
+        queue = self.make_queue(run_job)
+        queue.start()
+        job_id = queue.submit({})
+        wait_for_job(queue, job_id)
+        job_events = queue.get_events(job_id)
+
+        self.assertEqual([event['event'] for _, event in job_events],
+                         ['dataset_loaded', 'stage_started', 'stage_finished'])
+        self.assertEqual(job_events[0][1]['name'], 'model')
+        self.assertEqual(job_events[2][1]['stage'], 'subsetting')
+
+        last_event_id = job_events[1][0]
+        self.assertEqual(queue.get_events(job_id, last_event_id),
+                         job_events[2:])
+
+    def test_events_of_other_threads_are_not_recorded(self):
+        def run_job(request, progress):
+            pass
+
+        queue = self.make_queue(run_job)
+        queue.start()
+        job_id = queue.submit({})
+        events.emit('dataset_loaded', name='other')
+        wait_for_job(queue, job_id)
+
+        self.assertEqual(queue.get_events(job_id), [])
+
+    def test_cancel_queued_job(self):
+        queue = self.make_queue(lambda request, progress: None)
+        job_id = queue.submit({})
+
+        self.assertTrue(queue.cancel(job_id))
+        queue.start()
+        time.sleep(0.05)
+        self.assertEqual(queue.get(job_id)['status'], jobs.CANCELLED)
+
+    def test_cancel_running_job(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def run_job(request, progress):
+            progress('loading', 0.)
+            started.set()
+            release.wait(10)
+            progress('plotting', 0.5)
+            return 'never stored'
+
+        queue = self.make_queue(run_job)
+        queue.start()
+        job_id = queue.submit({})
+        started.wait(10)
+
+        self.assertTrue(queue.cancel(job_id))
+        release.set()
+        job = wait_for_job(queue, job_id)
+
+        self.assertEqual(job['status'], jobs.CANCELLED)
+        self.assertEqual(job['stage'], 'plotting')
+        self.assertIsNone(job['result'])
+
+    def test_cancel_ended_job(self):
+        queue = self.make_queue(lambda request, progress: None)
+        queue.start()
+        job_id = queue.submit({})
+        wait_for_job(queue, job_id)
+
+        self.assertFalse(queue.cancel(job_id))
+        self.assertFalse(queue.cancel('missing'))
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def run_job(request, progress):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        queue = self.make_queue(run_job, workers=2)
+        queue.start()
+        job_ids = [queue.submit({}) for i in range(6)]
+        for job_id in job_ids:
+            wait_for_job(queue, job_id)
+
+        self.assertEqual(peak[0], 2)
+
+    def test_jobs_persist_across_restarts(self):
+        queue = self.make_queue(lambda request, progress: request)
+        job_id = queue.submit({'a': 1})
+        # Simulate a job that was interrupted by a restart of the services.
+        queue._execute("UPDATE jobs SET status = ? WHERE id = ?",
+                       (jobs.RUNNING, job_id))
+
+        restarted = self.make_queue(lambda request, progress: request)
+        restarted.start()
+        job = wait_for_job(restarted, job_id)
+
+        self.assertEqual(job['status'], jobs.FINISHED)
+        self.assertEqual(job['result'], {'a': 1})
+        self.assertEqual([j['id'] for j in restarted.list(jobs.FINISHED)],
+                         [job_id])
+
+    def test_expired_lease_is_requeued(self):
+        queue = self.make_queue(lambda request, progress: request)
+        job_id = queue.submit({'a': 1})
+        # Simulate a job of a process that stopped two minutes ago.
+        queue._execute("UPDATE jobs SET status = ?, owner = ?, heartbeat = ? "
+                       "WHERE id = ?",
+                       (jobs.RUNNING, 'stopped', time.time() - 120, job_id))
+        queue.start()
+        job = wait_for_job(queue, job_id)
+
+        self.assertEqual(job['status'], jobs.FINISHED)
+        self.assertEqual(job['result'], {'a': 1})
+
+    def test_running_job_of_other_queue_is_not_requeued(self):
+        started = threading.Event()
+        release = threading.Event()
+        runs = []
+
+        def run_job(request, progress):
+            runs.append(request)
+            started.set()
+            release.wait(10)
+
+        queue = self.make_queue(run_job, lease_timeout=0.2)
+        queue.start()
+        job_id = queue.submit({})
+        started.wait(10)
+
+        other = self.make_queue(run_job, lease_timeout=0.2)
+        other.start()
+        time.sleep(0.5)
+        release.set()
+        job = wait_for_job(queue, job_id)
+
+        self.assertEqual(job['status'], jobs.FINISHED)
+        self.assertEqual(len(runs), 1)
+
+    def test_concurrency_is_bounded_across_queues(self):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def run_job(request, progress):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        queues = [self.make_queue(run_job, workers=2, max_running=2)
+                  for i in range(2)]
+        for queue in queues:
+            queue.start()
+        job_ids = [queues[0].submit({}) for i in range(8)]
+        for job_id in job_ids:
+            wait_for_job(queues[0], job_id)
+
+        self.assertEqual(peak[0], 2)
+
+    def test_remove_expired_jobs(self):
+        queue = self.make_queue(lambda request, progress: events.emit('done'),
+                                max_age=60)
+        queue.start()
+        old_id = queue.submit({})
+        new_id = queue.submit({})
+        queued_id = queue.submit({})
+        queue.cancel(queued_id)
+        for job_id in (old_id, new_id):
+            wait_for_job(queue, job_id)
+        queue._execute("UPDATE jobs SET finished = ? WHERE id IN (?, ?)",
+                       (time.time() - 120, old_id, queued_id))
+
+        self.assertEqual(queue.remove_expired(), 2)
+        self.assertIsNone(queue.get(old_id))
+        self.assertIsNone(queue.get(queued_id))
+        self.assertEqual(queue.get_events(old_id), [])
+        self.assertEqual(len(queue.get_events(new_id)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
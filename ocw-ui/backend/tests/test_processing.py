@@ -15,7 +15,9 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import json
 import os
+import time
 import unittest
 import datetime as dt
 
@@ -301,17 +303,100 @@ class TestRunEvaluation(unittest.TestCase):
 
         # NOTE: Sometimes the file download will die if you use the this WebTest
         # call for testing. If that is the case, download the files manually with wget.
-        test_app.post_json('/processing/run_evaluation/', data)
-        result_dirs = [x for x in os.listdir(WORK_DIR)
-                       if os.path.isdir(os.path.join(WORK_DIR, x))]
+        job = test_app.post_json('/processing/run_evaluation/', data).json
+        status = _wait_for_job(job['job_id'])
+        self.assertEqual(status['status'], 'finished')
 
-        eval_dir = os.path.join(WORK_DIR, result_dirs[-1])
+        eval_dir = os.path.join(WORK_DIR, job['eval_work_dir'])
         eval_files = [f for f in os.listdir(eval_dir)
                       if os.path.isfile(os.path.join(eval_dir, f))]
 
         self.assertTrue(len(eval_files) == 1)
         self.assertEquals(eval_files[0], 'd1.nc_compared_to_d2.nc_bias.png')
 
+class TestEvaluationJobs(unittest.TestCase):
+    def test_invalid_evaluation_job_fails(self):
+        job = test_app.post_json('/processing/run_evaluation/', {}).json
+        status = _wait_for_job(job['job_id'])
+
+        self.assertEqual(status['status'], 'failed')
+        self.assertEqual(status['stage'], None)
+        self.assertEqual(status['eval_work_dir'], job['eval_work_dir'])
+
+        response = test_app.get(
+            '/processing/jobs/{}/results/'.format(job['job_id']),
+            expect_errors=True
+        )
+        self.assertEqual(response.status_int, 409)
+
+        response = test_app.post(
+            '/processing/jobs/{}/cancel/'.format(job['job_id'])
+        )
+        self.assertFalse(response.json['cancelled'])
+
+    def test_jobs_get_their_own_result_directory(self):
+        first = test_app.post_json('/processing/run_evaluation/',
+                                   {'metrics': ['Bias']}).json
+        second = test_app.post_json('/processing/run_evaluation/',
+                                    {'metrics': ['TemporalStdDev']}).json
+
+        self.assertNotEqual(first['eval_work_dir'], second['eval_work_dir'])
+        self.assertTrue(first['eval_work_dir'].endswith(first['job_id']))
+
+    def test_job_event_stream(self):
+        job = test_app.post_json('/processing/run_evaluation/', {}).json
+        _wait_for_job(job['job_id'])
+
+        response = test_app.get(
+            '/processing/jobs/{}/events/'.format(job['job_id']),
+            extra_environ={'wsgi.multithread': True}
+        )
+        messages = response.body.strip().split('\n\n')
+
+        self.assertEqual(response.content_type, 'text/event-stream')
+        self.assertEqual(messages[0], 'retry: 2000')
+        self.assertTrue(messages[-1].startswith('event: end\ndata: '))
+        end_status = json.loads(messages[-1].split('data: ', 1)[1])
+        self.assertEqual(end_status['status'], 'failed')
+
+    def test_job_event_stream_invalid_last_event_id(self):
+        job = test_app.post_json('/processing/run_evaluation/', {}).json
+        response = test_app.get(
+            '/processing/jobs/{}/events/'.format(job['job_id']),
+            headers={'Last-Event-ID': 'abc'},
+            extra_environ={'wsgi.multithread': True},
+            expect_errors=True
+        )
+        self.assertEqual(response.status_int, 400)
+
+    def test_job_event_stream_single_threaded_server(self):
+        job = test_app.post_json('/processing/run_evaluation/', {}).json
+        response = test_app.get(
+            '/processing/jobs/{}/events/'.format(job['job_id']),
+            extra_environ={'wsgi.multithread': False},
+            expect_errors=True
+        )
+        self.assertEqual(response.status_int, 503)
+
+    def test_unknown_job(self):
+        response = test_app.get('/processing/jobs/unknown/', expect_errors=True)
+        self.assertEqual(response.status_int, 404)
+
+    def test_job_listing(self):
+        job = test_app.post_json('/processing/run_evaluation/', {}).json
+        _wait_for_job(job['job_id'])
+
+        listing = test_app.get('/processing/jobs/?status=failed').json['jobs']
+        self.assertIn(job['job_id'], [j['job_id'] for j in listing])
+
+class TestDatasetCacheStats(unittest.TestCase):
+    def test_dataset_cache_stats(self):
+        stats = test_app.get('/processing/dataset_cache/').json
+
+        self.assertEqual(sorted(stats.keys()),
+                         ['entries', 'evictions', 'hits', 'max_size',
+                          'misses', 'size'])
+
 class TestMetricNameRetrieval(unittest.TestCase):
     def test_metric_name_retrieval(self):
         invalid_metrics = ['ABCMeta', 'Metric', 'UnaryMetric', 'BinaryMetric']
@@ -322,6 +407,15 @@ class TestMetricNameRetrieval(unittest.TestCase):
         self.assertTrue(len(metrics) > 0)
         self.assertTrue('Bias' in metrics)
 
+def _wait_for_job(job_id, timeout=600):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = test_app.get('/processing/jobs/{}/'.format(job_id)).json
+        if status['status'] in ('finished', 'failed', 'cancelled'):
+            return status
+        time.sleep(0.1)
+    raise AssertionError('Job {} did not end'.format(job_id))
+
 def _create_fake_dataset(name):
     lats = numpy.array(range(-10, 25, 1))
     lons = numpy.array(range(-30, 40, 1))
@@ -0,0 +1,152 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import backend.result_cache as result_cache
+
+def _evaluation_request():
+    return {
+        'reference_dataset': {
+            'data_source_id': 2,
+            'dataset_info': {'dataset_id': 10, 'parameter_id': 34}
+        },
+        'target_datasets': [],
+        'spatial_rebin_lat_step': 1,
+        'spatial_rebin_lon_step': 1,
+        'temporal_resolution': 30,
+        'metrics': ['Bias', 'TemporalStdDev'],
+        'start_time': '1989-01-01 00:00:00',
+        'end_time': '1991-01-01 00:00:00',
+        'lat_min': -25,
+        'lat_max': 22,
+        'lon_min': -14,
+        'lon_max': 40,
+        'subregion_information': None
+    }
+
+class TestRequestKey(unittest.TestCase):
+    def test_equivalent_requests_share_key(self):
+        request = _evaluation_request()
+        equivalent = _evaluation_request()
+        equivalent['lat_min'] = '-25.0'
+        equivalent['metrics'] = ['TemporalStdDev', 'Bias']
+        equivalent['reference_dataset'] = {
+            'data_source_id': '2',
+            'dataset_info': {'dataset_id': '10', 'parameter_id': '34'}
+        }
+
+        self.assertEqual(result_cache.get_request_key(request),
+                         result_cache.get_request_key(equivalent))
+
+    def test_different_requests_have_different_keys(self):
+        request = _evaluation_request()
+        different = _evaluation_request()
+        different['metrics'] = ['Bias']
+
+        self.assertNotEqual(result_cache.get_request_key(request),
+                            result_cache.get_request_key(different))
+
+    def test_changed_local_file_changes_key(self):
+        tmp_file = tempfile.NamedTemporaryFile()
+        request = _evaluation_request()
+        request['reference_dataset'] = {
+            'data_source_id': 1,
+            'dataset_info': {'dataset_id': tmp_file.name}
+        }
+        key = result_cache.get_request_key(request)
+
+        tmp_file.write('new contents')
+        tmp_file.flush()
+
+        self.assertNotEqual(key, result_cache.get_request_key(request))
+
+    def test_malformed_request_key(self):
+        self.assertEqual(result_cache.get_request_key({}),
+                         result_cache.get_request_key({}))
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def make_result(self, name, size, last_used):
+        path = os.path.join(self.work_dir, name)
+        os.makedirs(path)
+        with open(os.path.join(path, 'plot.png'), 'w') as plot:
+            plot.write('x' * size)
+        os.utime(path, (last_used, last_used))
+
+    def test_lookup_stored_result(self):
+        self.make_result('2015-01-01_00-00-00', 10, 1000)
+        result_cache.store_result(self.work_dir, 'abc', '2015-01-01_00-00-00')
+
+        self.assertEqual(result_cache.lookup_result(self.work_dir, 'abc'),
+                         '2015-01-01_00-00-00')
+        self.assertIsNone(result_cache.lookup_result(self.work_dir, 'def'))
+
+    def test_lookup_marks_result_used(self):
+        self.make_result('old', 10, 1000)
+        result_cache.store_result(self.work_dir, 'abc', 'old')
+        os.utime(os.path.join(self.work_dir, 'old'), (1000, 1000))
+
+        result_cache.lookup_result(self.work_dir, 'abc')
+
+        self.assertGreater(os.path.getmtime(os.path.join(self.work_dir, 'old')),
+                           1000)
+
+    def test_lookup_removed_result(self):
+        self.make_result('gone', 10, 1000)
+        result_cache.store_result(self.work_dir, 'abc', 'gone')
+        shutil.rmtree(os.path.join(self.work_dir, 'gone'))
+
+        self.assertIsNone(result_cache.lookup_result(self.work_dir, 'abc'))
+
+    def test_evict_least_recently_used(self):
+        self.make_result('oldest', 100, 1000)
+        self.make_result('older', 100, 2000)
+        self.make_result('newest', 100, 3000)
+        result_cache.store_result(self.work_dir, 'abc', 'oldest')
+        os.utime(os.path.join(self.work_dir, 'oldest'), (1000, 1000))
+
+        removed = result_cache.evict_results(self.work_dir, 150)
+
+        self.assertEqual(removed, ['oldest', 'older'])
+        self.assertEqual(sorted(os.listdir(self.work_dir)),
+                         ['.results', 'newest'])
+        self.assertIsNone(result_cache.lookup_result(self.work_dir, 'abc'))
+
+    def test_evict_keeps_running_results(self):
+        self.make_result('running', 100, 1000)
+        self.make_result('finished', 100, 2000)
+
+        removed = result_cache.evict_results(self.work_dir, 150,
+                                             keep=['running'])
+
+        self.assertEqual(removed, ['finished'])
+
+    def test_evict_within_quota(self):
+        self.make_result('result', 100, 1000)
+        self.assertEqual(result_cache.evict_results(self.work_dir, 100), [])
+
+if __name__ == '__main__':
+    unittest.main()
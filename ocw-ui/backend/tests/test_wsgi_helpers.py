@@ -0,0 +1,122 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from bottle import Bottle
+from webob import Request
+from webtest import TestApp
+
+from ..wsgi_helpers import GzipMiddleware, cached_static_file
+
+class TestGzipMiddleware(unittest.TestCase):
+    def setUp(self):
+        bottle_app = Bottle()
+
+        @bottle_app.route('/large/')
+        def large():
+            return {'values': range(1000)}
+
+        @bottle_app.route('/small/')
+        def small():
+            return {'values': []}
+
+        @bottle_app.route('/text/')
+        def text():
+            return 'x' * 2000
+
+        self.middleware = GzipMiddleware(bottle_app)
+        self.app = TestApp(self.middleware)
+
+    def test_large_json_is_compressed(self):
+        # WebTest transparently decodes gzipped responses, so the middleware
+        # is called directly.
+        request = Request.blank('/large/', headers={'Accept-Encoding': 'gzip'})
+        status, headers, app_iter = request.call_application(self.middleware)
+        headers = dict(headers)
+        compressed = ''.join(app_iter)
+
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(int(headers['Content-Length']), len(compressed))
+        body = gzip.GzipFile(fileobj=StringIO(compressed)).read()
+        self.assertLess(len(compressed), len(body))
+        self.assertIn('"values": [0, 1, 2', body)
+
+    def test_small_json_is_not_compressed(self):
+        response = self.app.get('/small/',
+                                headers={'Accept-Encoding': 'gzip'})
+
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.json, {'values': []})
+
+    def test_other_content_is_not_compressed(self):
+        response = self.app.get('/text/',
+                                headers={'Accept-Encoding': 'gzip'})
+
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.body, 'x' * 2000)
+
+    def test_client_without_gzip(self):
+        response = self.app.get('/large/')
+
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(len(response.json['values']), 1000)
+
+class TestCachedStaticFile(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        with open(os.path.join(self.root, 'plot.png'), 'w') as plot:
+            plot.write('png')
+
+        bottle_app = Bottle()
+
+        @bottle_app.route('/static/<file_path:path>')
+        def serve(file_path):
+            return cached_static_file(file_path, self.root, 60)
+
+        self.app = TestApp(bottle_app)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_cache_headers(self):
+        response = self.app.get('/static/plot.png')
+
+        self.assertEqual(response.body, 'png')
+        self.assertEqual(response.headers['Cache-Control'],
+                         'public, max-age=60')
+        self.assertIn('ETag', response.headers)
+
+    def test_not_modified(self):
+        etag = self.app.get('/static/plot.png').headers['ETag']
+        response = self.app.get('/static/plot.png',
+                                headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_int, 304)
+        self.assertEqual(response.body, '')
+
+    def test_missing_file(self):
+        response = self.app.get('/static/missing.png', expect_errors=True)
+        self.assertEqual(response.status_int, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#
+#  Licensed to the Apache Software Foundation (ASF) under one or more
+#  contributor license agreements.  See the NOTICE file distributed with
+#  this work for additional information regarding copyright ownership.
+#  The ASF licenses this file to You under the Apache License, Version 2.0
+#  (the "License"); you may not use this file except in compliance with
+#  the License.  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+''' WSGI helpers for serving the OCW UI backend in production. '''
+
+import os
+import zlib
+
+from bottle import HTTPResponse, request, static_file
+
+# Content types that GzipMiddleware compresses.
+COMPRESSED_CONTENT_TYPES = ('application/json',)
+
+class GzipMiddleware(object):
+    ''' Gzip JSON responses for clients that accept gzip encoding.
+
+    Other responses are passed through untouched, so static files are still
+    sent with the server's file wrapper (sendfile where available).
+    '''
+
+    def __init__(self, app, min_size=1024, compress_level=6):
+        '''
+        :param app: The WSGI application to wrap.
+        :param min_size: Responses smaller than this many bytes aren't
+            compressed.
+        :type min_size: Integer
+        :param compress_level: The zlib compression level from 1 to 9.
+        :type compress_level: Integer
+        '''
+        self.app = app
+        self.min_size = min_size
+        self.compress_level = compress_level
+
+    def __call__(self, environ, start_response):
+        if 'gzip' not in environ.get('HTTP_ACCEPT_ENCODING', ''):
+            return self.app(environ, start_response)
+
+        deferred = []
+        chunks = []
+
+        def gzip_start_response(status, headers, exc_info=None):
+            if _should_compress(headers):
+                deferred[:] = [status, headers, exc_info]
+                return chunks.append
+            return start_response(status, headers, exc_info)
+
+        body = self.app(environ, gzip_start_response)
+        if not deferred:
+            return body
+
+        try:
+            chunks.extend(body)
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+
+        status, headers, exc_info = deferred
+        data = ''.join(chunks)
+        headers = [(name, value) for name, value in headers
+                   if name.lower() != 'content-length']
+
+        if len(data) >= self.min_size:
+            compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED,
+                                          16 + zlib.MAX_WBITS)
+            data = compressor.compress(data) + compressor.flush()
+            headers.append(('Content-Encoding', 'gzip'))
+
+        headers.append(('Vary', 'Accept-Encoding'))
+        headers.append(('Content-Length', str(len(data))))
+        start_response(status, headers, exc_info)
+        return [data]
+
+def cached_static_file(file_path, root, max_age):
+    ''' Serve a static file with ETag and Cache-Control headers.
+
+    The file is returned as an open file object, so WSGI servers that provide
+    a file wrapper send it with sendfile. A request whose If-None-Match header
+    matches the file's ETag gets an empty 304 response.
+
+    :param file_path: The path of the file relative to root.
+    :type file_path: String
+    :param root: The directory that the file is served from.
+    :type root: String
+    :param max_age: The seconds that clients may cache the file for.
+    :type max_age: Integer
+
+    :returns: A bottle.HTTPResponse for the file.
+    '''
+    response = static_file(file_path, root=root)
+    if response.status_code not in (200, 304):
+        return response
+
+    path = os.path.join(os.path.abspath(root), file_path.strip('/\\'))
+    stat = os.stat(path)
+    etag = '"{:x}-{:x}"'.format(int(stat.st_mtime), stat.st_size)
+    cache_control = 'public, max-age={}'.format(max_age)
+
+    if etag in request.environ.get('HTTP_IF_NONE_MATCH', ''):
+        if hasattr(response.body, 'close'):
+            response.body.close()
+        return HTTPResponse(status=304, headers={'ETag': etag,
+                                                 'Cache-Control': cache_control})
+
+    response.set_header('ETag', etag)
+    response.set_header('Cache-Control', cache_control)
+    return response
+
+def _should_compress(headers):
+    content_type = ''
+    for name, value in headers:
+        name = name.lower()
+        if name == 'content-encoding':
+            return False
+        if name == 'content-type':
+            content_type = value.split(';')[0].strip().lower()
+    return content_type in COMPRESSED_CONTENT_TYPES
@@ -166,23 +166,95 @@ angular.module('ocwUiApp')
 
       $http.post($rootScope.baseURL + '/processing/run_evaluation/', data).
       success(function(data) {
-        var evalWorkDir = data['eval_work_dir'];
+        $scope.waitForEvaluation(data['job_id'], data['eval_work_dir']);
+      }).error(function() {
+        $scope.runningEval = false;
+      });
+    };
 
+    // The evaluation runs as a background job on the server. Follow the job's
+    // progress events, or poll the job status in browsers without
+    // EventSource, until it ends and then show the results.
+    $scope.waitForEvaluation = function(jobId, evalWorkDir) {
+      // Cached evaluations don't have a job and can be shown right away.
+      if (jobId === null) {
         $scope.runningEval = false;
+        window.location = "#/results/" + evalWorkDir;
+        return;
+      }
 
-        $timeout(function() {
-          if (evalWorkDir !== undefined) {
-            window.location = "#/results/" + evalWorkDir;
-          } else {
-            window.location = "#/results";
-          }
-        }, 100);
-        
+      if (window.EventSource) {
+        $scope.streamEvaluationEvents(jobId, evalWorkDir);
+      } else {
+        $scope.pollEvaluation(jobId, evalWorkDir);
+      }
+    };
+
+    $scope.streamEvaluationEvents = function(jobId, evalWorkDir) {
+      var source = new EventSource($rootScope.baseURL + '/processing/jobs/' +
+                                   jobId + '/events/');
+
+      source.addEventListener('stage_started', function(message) {
+        $scope.$apply(function() {
+          $scope.evalStage = JSON.parse(message.data)['stage'];
+        });
+      });
+
+      source.addEventListener('metric_completed', function(message) {
+        var event = JSON.parse(message.data);
+        $scope.$apply(function() {
+          $scope.evalMetricsDone = event['completed'] + ' / ' + event['total'];
+        });
+      });
+
+      source.addEventListener('end', function(message) {
+        source.close();
+        $scope.$apply(function() {
+          $scope.showEvaluationResults(JSON.parse(message.data), evalWorkDir);
+        });
+      });
+
+      // The stream can't be opened, e.g. behind a proxy that doesn't pass it
+      // through or on a server that doesn't stream events, so fall back to
+      // polling the job status.
+      source.onerror = function() {
+        if (source.readyState == EventSource.CLOSED) {
+          $scope.pollEvaluation(jobId, evalWorkDir);
+        }
+      };
+    };
+
+    $scope.pollEvaluation = function(jobId, evalWorkDir) {
+      $http.get($rootScope.baseURL + '/processing/jobs/' + jobId + '/').
+      success(function(job) {
+        $scope.evalStage = job['stage'];
+        $scope.evalProgress = job['progress'];
+
+        if (job['status'] == 'queued' || job['status'] == 'running') {
+          $timeout(function() {
+            $scope.pollEvaluation(jobId, evalWorkDir);
+          }, 2000);
+          return;
+        }
+
+        $scope.showEvaluationResults(job, evalWorkDir);
       }).error(function() {
         $scope.runningEval = false;
       });
     };
 
+    $scope.showEvaluationResults = function(job, evalWorkDir) {
+      $scope.runningEval = false;
+
+      $timeout(function() {
+        if (job['status'] == 'finished' && evalWorkDir !== undefined) {
+          window.location = "#/results/" + evalWorkDir;
+        } else {
+          window.location = "#/results";
+        }
+      }, 100);
+    };
+
     // Check the Parameter selection boxes after the user has changed input to ensure that valid
     // values were entered
     $scope.checkParameters = function() {
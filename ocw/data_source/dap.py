@@ -15,11 +15,11 @@
 # specific language governing permissions and limitations
 # under the License.
 
-from pydap.client import open_url
-from netcdftime import utime
-import requests
+import time
+
 import numpy as np
 from ocw.dataset import Dataset
+import ocw.events as events
 
 def load(url, variable, name=''):
     '''Load a Dataset from an OpenDAP URL
@@ -38,6 +38,9 @@ def load(url, variable, name=''):
 
     :raises: ServerError
     '''
+    from pydap.client import open_url
+
+    start = time.time()
     # Grab the dataset information and pull the appropriate variable
     d = open_url(url)
     dataset = d[variable]
@@ -45,7 +48,7 @@ def load(url, variable, name=''):
     # Grab the lat, lon, and time variable names.
     # We assume the variable order is (time, lat, lon)
     dataset_dimensions = dataset.dimensions
-    time = dataset_dimensions[0]
+    time_name = dataset_dimensions[0]
     lat = dataset_dimensions[1]
     lon = dataset_dimensions[2]
 
@@ -53,7 +56,7 @@ def load(url, variable, name=''):
     # these values to datetime objects. Note that we use the main object's
     # time object and not the dataset specific reference to it. We need to 
     # grab the 'units' from it and it fails on the dataset specific object.
-    times = np.array(_convert_times_to_datetime(d[time]))
+    times = np.array(_convert_times_to_datetime(d[time_name]))
 
     lats = np.array(dataset[lat][:])
     lons = np.array(dataset[lon][:])
@@ -64,8 +67,12 @@ def load(url, variable, name=''):
         'url': url
     }
 
-    return Dataset(lats, lons, times, values, variable,
-                   name=name, origin=origin)
+    dataset = Dataset(lats, lons, times, values, variable,
+                      name=name, origin=origin)
+    events.emit('dataset_loaded', source='dap', name=name, url=url,
+                shape=list(dataset.values.shape),
+                bytes=dataset.values.nbytes, seconds=time.time() - start)
+    return dataset
 
 def _convert_times_to_datetime(time):
     '''Convert the OpenDAP time object's values to datetime objects
@@ -78,6 +85,8 @@ def _convert_times_to_datetime(time):
 
     :returns: list of converted time values as datetime objects
     '''
+    from netcdftime import utime
+
     units = time.units
     # parse the time units string into a useful object.
     # NOTE: This assumes a 'standard' calendar. It's possible (likely?) that
@@ -26,9 +26,6 @@ from ocw.esgf.logon2 import logon2
 from ocw.esgf.search import SearchClient
 import ocw.data_source.local as local
 
-from bs4 import BeautifulSoup
-import requests
-
 def load_dataset(dataset_id,
                  variable,
                  esgf_username,
@@ -106,6 +103,9 @@ def load_dataset(dataset_id,
 
 def _get_file_download_data(dataset_id, variable, url=DEFAULT_ESGF_SEARCH):
     ''''''
+    from bs4 import BeautifulSoup
+    import requests
+
     url += '?type=File&dataset_id={}&variable={}'
     url = url.format(dataset_id, variable)
 
@@ -22,8 +22,10 @@ from glob import glob
 import re
 import string
 import os
+import time
 
 from ocw.dataset import Dataset
+import ocw.events as events
 import ocw.utils as utils
 
 import netCDF4
@@ -163,7 +165,8 @@ def load_file(file_path,
               name='',
               lat_name=None,
               lon_name=None,
-              time_name=None):
+              time_name=None,
+              dtype=None):
     ''' Load a NetCDF file into a Dataset.
 
     :param file_path: Path to the NetCDF file to load.
@@ -198,6 +201,10 @@ def load_file(file_path,
         dataset.
     :type time_name: :mod:`string`
 
+    :param dtype: (Optional) The numpy dtype to store the values in. Defaults
+        to the global working dtype or the dtype of the file's variable.
+    :type dtype: :class:`numpy.dtype`
+
     :returns: An OCW Dataset object with the requested variable's data from
         the NetCDF file.
     :rtype: :class:`dataset.Dataset`
@@ -206,6 +213,7 @@ def load_file(file_path,
         or when the lat/lon/time variable name cannot be determined
         automatically.
     '''
+    start = time.time()
 
     try:
         netcdf = netCDF4.Dataset(file_path, mode='r')
@@ -267,8 +275,13 @@ def load_file(file_path,
     }
     if elevation_index != 0: origin['elevation_index'] = elevation_index
 
-    return Dataset(lats, lons, times, values, variable=variable_name,
-                   units=variable_unit, name=name, origin=origin)
+    dataset = Dataset(lats, lons, times, values, variable=variable_name,
+                      units=variable_unit, name=name, origin=origin,
+                      dtype=dtype)
+    events.emit('dataset_loaded', source='local', name=name, path=file_path,
+                shape=list(dataset.values.shape),
+                bytes=dataset.values.nbytes, seconds=time.time() - start)
+    return dataset
 
 def load_multiple_files(file_path,
                         filename_pattern,
@@ -27,7 +27,9 @@ import numpy as np
 import numpy.ma as ma
 from datetime import datetime
 import calendar
+import time
 from ocw.dataset import Dataset
+import ocw.events as events
 
 
 URL = 'http://rcmes.jpl.nasa.gov/query-api/query.php?'
@@ -42,8 +44,7 @@ def get_parameters_metadata():
 
     param_info_list = []
     url = URL + "&param_info=yes"
-    string = urllib2.urlopen(url)
-    data_string = string.read()
+    data_string = _fetch(url)
     json_format_data = json.loads(data_string)
     fields_name = json_format_data['fields_name']
     data = json_format_data['data']
@@ -149,6 +150,14 @@ def _make_unique(lats, lons, times):
     return (unique_lats, unique_lons, unique_times)
 
 
+def _fetch(url):
+    '''Read the response to a query and report the bytes fetched.'''
+    start = time.time()
+    data_string = urllib2.urlopen(url).read()
+    events.emit('bytes_fetched', source='rcmed', url=url,
+                bytes=len(data_string), seconds=time.time() - start)
+    return data_string
+
 def _get_data(url):
     '''Reterive data from database.
 
@@ -159,8 +168,7 @@ def _get_data(url):
     :rtype: (Numpy array, Numpy array, Numpy array, Numpy array)
     '''
 
-    string = urllib2.urlopen(url)
-    data_string = string.read()    
+    data_string = _fetch(url)
     index_of_data = re.search('data: \r\n', data_string)
     data = data_string[index_of_data.end():len(data_string)]
     data = data.split('\r\n') 
@@ -346,6 +354,7 @@ def parameter_dataset(dataset_id, parameter_id, min_lat, max_lat, min_lon, max_l
     :rtype: :class:`dataset.Dataset`
     '''
     
+    start = time.time()
     parameters_metadata = get_parameters_metadata()
     parameter_name, time_step, _, _, _, _, parameter_units = _get_parameter_info(parameters_metadata, parameter_id)
     url = _generate_query_url(dataset_id, parameter_id, min_lat, max_lat, min_lon, max_lon, start_time, end_time, time_step)
@@ -362,11 +371,15 @@ def parameter_dataset(dataset_id, parameter_id, min_lat, max_lat, min_lon, max_l
         'parameter_id': parameter_id
     }
     
-    return Dataset(unique_lats_lons_times[0],
-                   unique_lats_lons_times[1],
-                   unique_times,
-                   values,
-                   variable=parameter_name,
-                   units=parameter_units,
-                   name=name,
-                   origin=origin)
+    dataset = Dataset(unique_lats_lons_times[0],
+                      unique_lats_lons_times[1],
+                      unique_times,
+                      values,
+                      variable=parameter_name,
+                      units=parameter_units,
+                      name=name,
+                      origin=origin)
+    events.emit('dataset_loaded', source='rcmed', name=name,
+                shape=list(dataset.values.shape),
+                bytes=dataset.values.nbytes, seconds=time.time() - start)
+    return dataset
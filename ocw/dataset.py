@@ -28,15 +28,13 @@ import datetime as dt
 
 import ocw.utils as utils
 
-from mpl_toolkits.basemap import shiftgrid
-
 logger = logging.getLogger(__name__)
 
-class Dataset:
+class Dataset(object):
     '''Container for a dataset's attributes and data.'''
 
     def __init__(self, lats, lons, times, values, variable=None, units=None,
-                 origin=None, name=""):
+                 origin=None, name="", dtype=None, normalized=False):
         '''Default Dataset constructor
 
         :param lats: One dimensional numpy array of unique latitude values.
@@ -66,20 +64,86 @@ class Dataset:
             this dataset was loaded from.
         :type origin: :class:`dict`
 
+        :param dtype: An optional numpy dtype to store the values in. Defaults
+            to the global working dtype (see
+            :func:`ocw.utils.set_working_dtype`) or, if that isn't set, the
+            dtype of values.
+        :type dtype: :class:`numpy.dtype`
+
+        :param normalized: If True the lats and lons are known to be sorted
+            and within [-90, 90)/[-180, 180), e.g. because they were taken
+            from another Dataset, and normalization is skipped.
+        :type normalized: :class:`bool`
+
         :raises: ValueError
         '''
         self._validate_inputs(lats, lons, times, values)
-        lats, lons, values = utils.normalize_lat_lon_values(lats, lons, values)
+        if dtype is None:
+            dtype = utils.get_working_dtype()
+        if dtype is not None and values.dtype != dtype:
+            values = values.astype(dtype)
+
+        lon_index = None
+        if not normalized:
+            lats, lons, lat_index, lon_index = utils.get_lat_lon_normalization(lats, lons)
+            # Reversals are applied as views. A longitude shift is deferred
+            # until the values are first accessed.
+            values = values[..., lat_index, :]
+            if isinstance(lon_index, slice):
+                values = values[..., lon_index]
+                lon_index = None
 
         self.lats = lats
         self.lons = lons
         self.times = times
-        self.values = values
+        self._values = values
+        self._lon_index = lon_index
         self.variable = variable
         self.units = units
         self.name = name
         self.origin = origin
 
+    @property
+    def values(self):
+        '''The Dataset's values with shape (times, lats, lons).'''
+        if self._lon_index is not None:
+            self._values = self._values[..., self._lon_index]
+            self._lon_index = None
+        return self._values
+
+    @values.setter
+    def values(self, values):
+        self._values = values
+        self._lon_index = None
+
+    def slice_values(self, lat_slice, lon_slice, time_slice=slice(None)):
+        '''Slice the Dataset's values.
+
+        Unlike slicing :attr:`values` directly, a pending longitude shift is
+        only applied to the selected values rather than the full array.
+
+        :param lat_slice: The slice of the latitude axis.
+        :type lat_slice: :class:`slice`
+
+        :param lon_slice: The slice of the longitude axis.
+        :type lon_slice: :class:`slice`
+
+        :param time_slice: (optional) The slice of the time axis. Ignored for
+            two dimensional values.
+        :type time_slice: :class:`slice`
+
+        :returns: The sliced values.
+        :rtype: :class:`numpy.ndarray`
+        '''
+        if self._values.ndim == 2:
+            leading = (lat_slice,)
+        else:
+            leading = (time_slice, lat_slice)
+
+        if self._lon_index is None:
+            return self._values[leading + (lon_slice,)]
+        return self._values[leading][..., self._lon_index[lon_slice]]
+
     def spatial_boundaries(self):
         '''Calculate the spatial boundaries.
 
@@ -16,19 +16,21 @@
 #
 
 from ocw import dataset as ds
+import ocw.utils as utils
 
 import datetime
+import multiprocessing
+from collections import OrderedDict
 import numpy as np
 import numpy.ma as ma
-import scipy.interpolate
-import scipy.ndimage
-from scipy.ndimage import map_coordinates
-import netCDF4
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Standard meteorological seasons as (name, month_start, month_end)
+SEASONS = [('DJF', 12, 2), ('MAM', 3, 5), ('JJA', 6, 8), ('SON', 9, 11)]
+
 def temporal_subset(month_start, month_end, target_dataset, average_each_year=False):
     """ Temporally subset data given month_index.
 
@@ -47,60 +49,42 @@ def temporal_subset(month_start, month_end, target_dataset, average_each_year=Fa
     :returns: A temporal subset OCW Dataset
     :rtype: Open Climate Workbench Dataset Object
     """
+    months, years = _get_months_and_years(target_dataset.times)
+    return _temporal_subset_by_months(month_start, month_end, target_dataset,
+                                      months, years, average_each_year)
 
-    if month_start > month_end:
-        month_index = range(month_start,13)
-        month_index.extend(range(1, month_end+1))
-    else:
-        month_index = range(month_start, month_end+1)
-
-    dates = target_dataset.times
-    months = np.array([d.month for d in dates])
-    time_index = []
-    for m_value in month_index:
-        time_index = np.append(time_index, np.where(months == m_value)[0])
-        if m_value == month_index[0]:
-            time_index_first = np.min(np.where(months == m_value)[0])
-        if m_value == month_index[-1]:
-            time_index_last = np.max(np.where(months == m_value)[0])
+def seasonal_subsets(target_dataset, seasons=None, average_each_year=False):
+    """ Temporally subset data into several seasons at once.
 
-    time_index = np.sort(time_index)
+    The month and year of every time value are decoded only once and shared
+    by all of the requested seasons.
 
-    time_index = time_index[np.where((time_index >= time_index_first) & (time_index <= time_index_last))]
+    :param target_dataset: Dataset object that needs temporal subsetting
+    :type target_dataset: :class:`dataset.Dataset`
 
-    time_index = list(time_index)
+    :param seasons: (optional) Sequence of (name, month_start, month_end)
+        tuples. Defaults to DJF, MAM, JJA and SON.
+    :type seasons: :class:`list` of :func:`tuple`
 
-    new_dataset = ds.Dataset(target_dataset.lats,
-                             target_dataset.lons,
-                             target_dataset.times[time_index],
-                             target_dataset.values[time_index,:],
-                             variable=target_dataset.variable,
-                             units=target_dataset.units,
-                             name=target_dataset.name)
+    :param average_each_year: If True, each output dataset is averaged for
+        each year
+    :type average_each_year: :class:'boolean'
 
-    if average_each_year:
-        nmonth = len(month_index)
-        ntime  = new_dataset.times.size
-        nyear = ntime/nmonth
-        averaged_time = []              
-        ny, nx = target_dataset.values.shape[1:]
-        averaged_values =ma.zeros([nyear, ny, nx])
-        for iyear in np.arange(nyear):
-            # centered time index of the season between month_start and month_end in each year
-            center_index = int(nmonth/2)+iyear*nmonth   
-            if nmonth == 1:
-                center_index = iyear
-            averaged_time.append(new_dataset.times[center_index]) 
-            averaged_values[iyear,:] = ma.average(new_dataset.values[nmonth*iyear:nmonth*iyear+nmonth,:], axis=0)
-        new_dataset = ds.Dataset(target_dataset.lats,
-                                 target_dataset.lons,
-                                 np.array(averaged_time),
-                                 averaged_values,
-                                 variable=target_dataset.variable,
-                                 units=target_dataset.units,
-                                 name=target_dataset.name)
-    
-    return new_dataset
+    :returns: The temporal subset Datasets keyed by season name, in the order
+        the seasons were given.
+    :rtype: :class:`collections.OrderedDict` of :class:`dataset.Dataset`
+    """
+    if seasons is None:
+        seasons = SEASONS
+
+    months, years = _get_months_and_years(target_dataset.times)
+    subsets = OrderedDict()
+    for name, month_start, month_end in seasons:
+        subsets[name] = _temporal_subset_by_months(month_start, month_end,
+                                                   target_dataset,
+                                                   months, years,
+                                                   average_each_year)
+    return subsets
 
 def temporal_rebin(target_dataset, temporal_resolution):     
     """ Rebin a Dataset to a new temporal resolution
@@ -137,7 +121,9 @@ def temporal_rebin(target_dataset, temporal_resolution):
                              variable=target_dataset.variable,
                              units=target_dataset.units,
                              name=target_dataset.name,
-                             origin=target_dataset.origin)
+                             origin=target_dataset.origin,
+                             dtype=utils.processing_dtype(target_dataset.values),
+                             normalized=True)
     
     return new_dataset
 
@@ -157,9 +143,10 @@ def spatial_regrid(target_dataset, new_latitudes, new_longitudes):
     :rtype: :class:`dataset.Dataset`
     """
     # Make masked array of shape (times, new_latitudes,new_longitudes)
+    dtype = utils.processing_dtype(target_dataset.values)
     new_values = ma.zeros([len(target_dataset.times), 
                            len(new_latitudes), 
-                           len(new_longitudes)])
+                           len(new_longitudes)], dtype=dtype)
 
     # Create grids of the given lats and lons for the underlying API
     # NOTE: np.meshgrid() requires inputs (x, y) and returns data 
@@ -172,7 +159,7 @@ def spatial_regrid(target_dataset, new_latitudes, new_longitudes):
     lons = ma.array(lons)
     new_lats = ma.array(new_lats)
     new_lons = ma.array(new_lons)
-    target_values = ma.array(target_dataset.values)
+    target_values = ma.array(target_dataset.values, dtype=dtype)
     
     # Call _rcmes_spatial_regrid on each time slice
     for i in range(len(target_dataset.times)):
@@ -194,7 +181,8 @@ def spatial_regrid(target_dataset, new_latitudes, new_longitudes):
                                    variable=target_dataset.variable,
                                    units=target_dataset.units,
                                    name=target_dataset.name,
-                                   origin=target_dataset.origin)
+                                   origin=target_dataset.origin,
+                                   dtype=dtype)
     return regridded_dataset
 
 def ensemble(datasets):
@@ -202,7 +190,8 @@ def ensemble(datasets):
     Generate a single dataset which is the mean of the input datasets
 
     An ensemble datasets combines input datasets assuming the all have
-    similar shape, dimensions, and units. 
+    similar shape, dimensions, and units. The mean is accumulated one member
+    at a time so the member values are never stacked into a single array.
     
     :param datasets: Datasets to be used to compose the ensemble dataset from.
         All Datasets must be the same shape.
@@ -212,19 +201,131 @@ def ensemble(datasets):
     :rtype: :class:`dataset.Dataset`
     """
     _check_dataset_shapes(datasets)
-    dataset_values = [dataset.values for dataset in datasets]
-    ensemble_values = ma.mean(dataset_values, axis=0)
+    first = datasets[0]
+    sums = np.zeros(first.values.shape)
+    counts = np.zeros(first.values.shape, dtype=np.int32)
+    for dataset in datasets:
+        valid = ~ma.getmaskarray(dataset.values)
+        np.add(sums, ma.getdata(dataset.values), out=sums, where=valid)
+        counts += valid
+
+    ensemble_values = ma.masked_array(sums, mask=(counts == 0))
+    np.divide(sums, counts, out=ensemble_values.data, where=(counts > 0))
     
     # Build new dataset object from the input datasets and the ensemble values and return it
-    ensemble_dataset = ds.Dataset(datasets[0].lats, 
-                                  datasets[0].lons, 
-                                  datasets[0].times,
+    ensemble_dataset = ds.Dataset(first.lats, 
+                                  first.lons, 
+                                  first.times,
                                   ensemble_values,
-                                  units=datasets[0].units,
-                                  name="Dataset Ensemble")
+                                  units=first.units,
+                                  name="Dataset Ensemble",
+                                  dtype=utils.processing_dtype(first.values),
+                                  normalized=True)
     
     return ensemble_dataset
 
+def ensemble_statistics(datasets, percentiles=None, num_members=None):
+    """ Calculate ensemble statistics while streaming over the members
+
+    The mean and spread (standard deviation) are accumulated with Welford's
+    online algorithm. Percentiles are computed exactly by merging each member
+    into running buffers of the lowest/highest values at every grid point, so
+    only the order statistics needed for the requested percentiles are held
+    in memory. Since members are consumed one at a time, ``datasets`` can be
+    a generator which loads each member on demand.
+
+    :param datasets: Datasets to be used to compose the ensemble statistics.
+        All Datasets must be the same shape.
+    :type datasets: Iterable of :class:`dataset.Dataset`
+
+    :param percentiles: (optional) Percentiles in the range [0, 100] to
+        calculate.
+    :type percentiles: :class:`list` of :class:`float`
+
+    :param num_members: (optional) The number of members in datasets. Only
+        required if percentiles are requested and datasets has no length.
+    :type num_members: :class:`int`
+
+    :returns: New Datasets keyed by 'mean', 'std' and 'p<percentile>'
+        (e.g. 'p10' or 'p97.5').
+    :rtype: :class:`collections.OrderedDict` of :class:`dataset.Dataset`
+
+    :raises ValueError: If the Datasets are not the same shape, if there are
+        no Datasets or if the number of members is unknown when percentiles
+        are requested.
+    """
+    percentiles = [] if percentiles is None else list(percentiles)
+    if num_members is None and hasattr(datasets, '__len__'):
+        num_members = len(datasets)
+    if percentiles and not num_members:
+        raise ValueError("num_members must be given to calculate percentiles "
+                         "of an ensemble of unknown size")
+
+    # Number of order statistics needed from each end of the distribution
+    low_count, high_count = 0, 0
+    for percentile in percentiles:
+        if not 0 <= percentile <= 100:
+            raise ValueError("Percentiles must be in the range [0, 100]")
+        position = percentile / 100. * (num_members - 1)
+        if percentile <= 50:
+            low_count = max(low_count, int(np.ceil(position)) + 1)
+        else:
+            high_count = max(high_count,
+                             int(np.ceil(num_members - 1 - position)) + 1)
+
+    first = None
+    for dataset in datasets:
+        if first is None:
+            first = dataset
+            shape = dataset.values.shape
+            counts = np.zeros(shape, dtype=np.int32)
+            mean = np.zeros(shape)
+            m2 = np.zeros(shape)
+            lowest = np.empty((low_count,) + shape)
+            lowest.fill(np.inf)
+            highest = np.empty((high_count,) + shape)
+            highest.fill(-np.inf)
+        elif dataset.values.shape != shape:
+            msg = "%s != %s" % (dataset.values.shape, shape)
+            raise ValueError("Input datasets must be the same shape for an ensemble :: ", msg)
+
+        data = ma.getdata(dataset.values)
+        valid = ~ma.getmaskarray(dataset.values)
+        counts += valid
+
+        delta = np.subtract(data, mean)
+        delta[~valid] = 0.
+        mean += np.divide(delta, np.maximum(counts, 1))
+        m2 += np.where(valid, delta * (data - mean), 0.)
+
+        if low_count:
+            _merge_order_statistic(lowest, np.where(valid, data, np.inf), np.minimum, np.maximum)
+        if high_count:
+            _merge_order_statistic(highest, np.where(valid, data, -np.inf), np.maximum, np.minimum)
+
+    if first is None:
+        raise ValueError("At least one Dataset is required for an ensemble")
+
+    missing = counts == 0
+    spread = np.sqrt(m2 / np.maximum(counts, 1))
+    statistics = OrderedDict([('mean', mean), ('std', spread)])
+    for percentile in percentiles:
+        statistics['p%g' % percentile] = _order_statistic_percentile(
+            lowest, highest, counts, percentile)
+
+    ensemble_datasets = OrderedDict()
+    for key, values in statistics.items():
+        ensemble_datasets[key] = ds.Dataset(first.lats,
+                                            first.lons,
+                                            first.times,
+                                            ma.masked_array(values, mask=missing),
+                                            variable=first.variable,
+                                            units=first.units,
+                                            name="Dataset Ensemble %s" % key,
+                                            dtype=utils.processing_dtype(first.values),
+                                            normalized=True)
+    return ensemble_datasets
+
 def subset(subregion, target_dataset, subregion_name=None):
     '''Subset given dataset(s) with subregion information
 
@@ -257,29 +358,11 @@ def subset(subregion, target_dataset, subregion_name=None):
         subregion_name = target_dataset.name
 
    # Slice the values array with our calculated slice indices
-    if target_dataset.values.ndim == 2:
-        subset_values = ma.zeros([len(target_dataset.values[
-            dataset_slices["lat_start"]:dataset_slices["lat_end"]]), 
-            len(target_dataset.values[
-                dataset_slices["lon_start"]:dataset_slices["lon_end"]])])
-
-        subset_values = target_dataset.values[
-            dataset_slices["lat_start"]:dataset_slices["lat_end"] + 1,
-            dataset_slices["lon_start"]:dataset_slices["lon_end"] + 1]
-
-    elif target_dataset.values.ndim == 3:
-        subset_values = ma.zeros([len(target_dataset.values[
-            dataset_slices["time_start"]:dataset_slices["time_end"]]),
-            len(target_dataset.values[
-                dataset_slices["lat_start"]:dataset_slices["lat_end"]]), 
-            len(target_dataset.values[
-                dataset_slices["lon_start"]:dataset_slices["lon_end"]])])
-        
-        subset_values = target_dataset.values[
-            dataset_slices["time_start"]:dataset_slices["time_end"] + 1,
-            dataset_slices["lat_start"]:dataset_slices["lat_end"] + 1,
-            dataset_slices["lon_start"]:dataset_slices["lon_end"] + 1]
-            
+    subset_values = target_dataset.slice_values(
+        slice(dataset_slices["lat_start"], dataset_slices["lat_end"] + 1),
+        slice(dataset_slices["lon_start"], dataset_slices["lon_end"] + 1),
+        slice(dataset_slices["time_start"], dataset_slices["time_end"] + 1))
+
     # Build new dataset with subset information
     return ds.Dataset(
         # Slice the lats array with our calculated slice indices
@@ -296,7 +379,9 @@ def subset(subregion, target_dataset, subregion_name=None):
         variable=target_dataset.variable,
         units=target_dataset.units,
         name=subregion_name,
-        origin=target_dataset.origin
+        origin=target_dataset.origin,
+        dtype=subset_values.dtype,
+        normalized=True
     )
 
 
@@ -370,67 +455,197 @@ def normalize_dataset_datetimes(dataset, timestep):
         variable=dataset.variable,
         units=dataset.units,
         name=dataset.name,
-        origin=dataset.origin
+        origin=dataset.origin,
+        dtype=dataset.values.dtype,
+        normalized=True
     )
 
-def write_netcdf(dataset, path, compress=True):
+def write_netcdf(dataset, path, compress=True, dtype='f4', complevel=4,
+                 shuffle=True, chunking='map'):
     ''' Write a dataset to a NetCDF file.
 
+    The values are written one block of time steps at a time so that only a
+    single block is ever converted to the output dtype.
+
     :param dataset: The dataset to write.
     :type dataset: :class:`dataset.Dataset`
 
     :param path: The output file path.
     :type path: :mod:`string`
+
+    :param compress: (optional) If True the variables are compressed with
+        zlib.
+    :type compress: :class:`bool`
+
+    :param dtype: (optional) The NetCDF data type of the values variable.
+    :type dtype: :mod:`string`
+
+    :param complevel: (optional) The zlib compression level (1-9).
+    :type complevel: :class:`int`
+
+    :param shuffle: (optional) If True the HDF5 shuffle filter is applied
+        before compression.
+    :type shuffle: :class:`bool`
+
+    :param chunking: (optional) The chunk layout of the values. Either 'map'
+        for fast access to whole time slices, 'timeseries' for fast access to
+        the full time series of a grid point, an explicit (time, lat, lon)
+        chunk shape or None for the NetCDF library default.
+    :type chunking: :mod:`string` or :func:`tuple`
     '''
+    chunk_shape = _get_netcdf_chunk_shape(dataset.values.shape, chunking,
+                                          np.dtype(dtype).itemsize)
+    block_size = chunk_shape[0] if chunk_shape else 1
+    write_netcdf_blocks(path,
+                        dataset.lats,
+                        dataset.lons,
+                        dataset.times,
+                        _iter_time_blocks(dataset.values, block_size),
+                        variable=dataset.variable,
+                        units=dataset.units,
+                        compress=compress,
+                        dtype=dtype,
+                        complevel=complevel,
+                        shuffle=shuffle,
+                        chunking=chunk_shape)
+
+def write_netcdf_blocks(path, lats, lons, times, value_blocks, variable=None,
+                        units=None, compress=True, dtype='f4', complevel=4,
+                        shuffle=True, chunking='map'):
+    ''' Write values produced block by block to a NetCDF file.
+
+    The complete values array never needs to be held in memory. Each block
+    is written as soon as it is produced by value_blocks.
+
+    :param path: The output file path.
+    :type path: :mod:`string`
+
+    :param lats: One dimensional numpy array of latitude values.
+    :type lats: :class:`numpy.ndarray`
+
+    :param lons: One dimensional numpy array of longitude values.
+    :type lons: :class:`numpy.ndarray`
+
+    :param times: One dimensional numpy array of python datetime objects.
+    :type times: :class:`numpy.ndarray`
+
+    :param value_blocks: Iterable of consecutive value arrays with shape
+        (block_length, len(lats), len(lons)) which together cover all times.
+    :type value_blocks: Iterable of :class:`numpy.ndarray`
+
+    :param variable: (optional) Name of the value variable.
+    :type variable: :mod:`string`
+
+    :param units: (optional) Name of the value units.
+    :type units: :mod:`string`
+
+    The remaining parameters are the same as those of :func:`write_netcdf`.
+
+    :raises ValueError: If the blocks don't cover exactly all of the times.
+    '''
+    import netCDF4
+
     out_file = netCDF4.Dataset(path, 'w', format='NETCDF4')
 
-    # Set attribute lenghts
-    lat_len = len(dataset.lats)
-    lon_len = len(dataset.lons)
-    time_len = len(dataset.times)
+    try:
+        # Create attribute dimensions
+        out_file.createDimension('lat', len(lats))
+        out_file.createDimension('lon', len(lons))
+        out_file.createDimension('time', len(times))
+
+        # Create variables
+        lat_var = out_file.createVariable('lat', 'f8', ('lat',), zlib=compress)
+        lon_var = out_file.createVariable('lon', 'f8', ('lon',), zlib=compress)
+        time_var = out_file.createVariable('time', 'f8', ('time',), zlib=compress)
+
+        chunk_shape = _get_netcdf_chunk_shape(
+            (len(times), len(lats), len(lons)), chunking,
+            np.dtype(dtype).itemsize)
+        var_name = variable if variable else 'var'
+        values = out_file.createVariable(var_name,
+                                         dtype,
+                                         ('time', 'lat', 'lon'),
+                                         zlib=compress,
+                                         complevel=complevel,
+                                         shuffle=shuffle,
+                                         chunksizes=chunk_shape)
+
+        # Set the time variable units
+        # We don't deal with hourly/minutely/anything-less-than-a-day data so
+        # we can safely stick with a 'days since' offset here. Note that the
+        # NetCDF4 helper date2num doesn't support 'months' or 'years' instead
+        # of days.
+        time_var.units = "days since %s" % times[0]
+
+        # Store the dataset's values
+        lat_var[:] = lats
+        lon_var[:] = lons
+        time_var[:] = netCDF4.date2num(times, time_var.units)
+        values.units = units
+
+        time_index = 0
+        for block in value_blocks:
+            block_length = len(block)
+            if time_index + block_length > len(times):
+                raise ValueError("Value blocks contain more than the %s "
+                                 "expected time steps" % len(times))
+            values[time_index:time_index + block_length] = block
+            time_index += block_length
+
+        if time_index != len(times):
+            raise ValueError("Value blocks contain %s time steps but %s were "
+                             "expected" % (time_index, len(times)))
+    finally:
+        out_file.close()
+
+def write_netcdf_files(datasets, paths, processes=None, **kwargs):
+    ''' Write several datasets to separate NetCDF files concurrently.
+
+    Compression is CPU bound so each file is written by a separate worker
+    process.
+
+    :param datasets: The datasets to write.
+    :type datasets: :class:`list` of :class:`dataset.Dataset`
 
-    # Create attribute dimensions
-    lat_dim = out_file.createDimension('lat', lat_len)
-    lon_dim = out_file.createDimension('lon', lon_len)
-    time_dim = out_file.createDimension('time', time_len)
+    :param paths: The output file path for each dataset.
+    :type paths: :class:`list` of :mod:`string`
 
-    # Create variables
-    lats = out_file.createVariable('lat', 'f8', ('lat',), zlib=compress)
-    lons = out_file.createVariable('lon', 'f8', ('lon',), zlib=compress)
-    times = out_file.createVariable('time', 'f8', ('time',), zlib=compress)
-
-    var_name = dataset.variable if dataset.variable else 'var'
-    values = out_file.createVariable(var_name,
-                                    'f8',
-                                    ('time', 'lat', 'lon'),
-                                    zlib=compress)
-
-    # Set the time variable units
-    # We don't deal with hourly/minutely/anything-less-than-a-day data so
-    # we can safely stick with a 'days since' offset here. Note that the
-    # NetCDF4 helper date2num doesn't support 'months' or 'years' instead
-    # of days.
-    times.units = "days since %s" % dataset.times[0]
+    :param processes: (optional) The number of worker processes. Defaults
+        to the number of CPUs.
+    :type processes: :class:`int`
 
-    # Store the dataset's values
-    lats[:] = dataset.lats
-    lons[:] = dataset.lons
-    times[:] = netCDF4.date2num(dataset.times, times.units)
-    values[:] = dataset.values
-    values.units = dataset.units
+    :param kwargs: Additional keyword arguments which are passed to
+        :func:`write_netcdf`.
 
-    out_file.close()
+    :raises ValueError: If the number of datasets and paths differ.
+    '''
+    if len(datasets) != len(paths):
+        raise ValueError("%s datasets were given but %s paths" %
+                         (len(datasets), len(paths)))
+
+    jobs = [(dataset, path, kwargs) for dataset, path in zip(datasets, paths)]
+    pool = multiprocessing.Pool(processes)
+    try:
+        pool.map(_write_netcdf_job, jobs)
+    finally:
+        pool.close()
+        pool.join()
 
 def write_netcdf_multiple_datasets_with_subregions(ref_dataset, ref_name, 
                                                    model_dataset_array, model_names,
                                                    path,
                                                    subregions = None, subregion_array = None,
                                                    ref_subregion_mean = None, ref_subregion_std = None, 
-                                                   model_subregion_mean = None, model_subregion_std = None):
+                                                   model_subregion_mean = None, model_subregion_std = None,
+                                                   compress=True, dtype='f4', complevel=4,
+                                                   shuffle=True, chunking='map'):
     #Write multiple reference and model datasets and their subregional means and standard deivations in a NetCDF file.
+    #The compression and layout options are the same as those of write_netcdf.
 
     #:To be updated 
     #
+    import netCDF4
+
     out_file = netCDF4.Dataset(path, 'w', format='NETCDF4')
 
     dataset = ref_dataset
@@ -462,29 +677,35 @@ def write_netcdf_multiple_datasets_with_subregions(ref_dataset, ref_name,
     #for iobs in np.arange(nobs):
     #    index = np.where(ref_dataset_array[iobs].values.mask[:] == True)
     #    mask_array[index] = 1
-    out_file.createVariable(ref_name, 'f8', ('time','y','x'))
-    out_file.variables[ref_name][:] = ref_dataset.values
-    out_file.variables[ref_name].units = ref_dataset.units
-    for imodel in np.arange(nmodel):
-        out_file.createVariable(model_names[imodel], 'f8', ('time','y','x'))
-        #out_file.variables[model_names[imodel]][:] = ma.array(model_dataset_array[imodel].values, mask = mask_array)
-        out_file.variables[model_names[imodel]][:] = model_dataset_array[imodel].values
-        out_file.variables[model_names[imodel]].units = model_dataset_array[imodel].units
+    chunk_shape = _get_netcdf_chunk_shape((time_len, lat_len, lon_len), chunking,
+                                          np.dtype(dtype).itemsize)
+    block_size = chunk_shape[0] if chunk_shape else time_len
+    var_names = [ref_name] + list(model_names)
+    var_datasets = [ref_dataset] + list(model_dataset_array)
+    for var_name, var_dataset in zip(var_names, var_datasets):
+        out_file.createVariable(var_name, dtype, ('time','y','x'),
+                                zlib=compress, complevel=complevel,
+                                shuffle=shuffle, chunksizes=chunk_shape)
+        time_index = 0
+        for block in _iter_time_blocks(var_dataset.values, block_size):
+            out_file.variables[var_name][time_index:time_index + len(block)] = block
+            time_index += len(block)
+        out_file.variables[var_name].units = var_dataset.units
 
     if not subregions == None:
-        out_file.createVariable('subregion_array', 'i4', ('y','x'))
+        out_file.createVariable('subregion_array', 'i4', ('y','x'), zlib=compress)
         out_file.variables['subregion_array'][:] = subregion_array[:]
         nsubregion = len(subregions)
         out_file.createDimension('nsubregion', nsubregion)
         out_file.createDimension('nobs', nobs)
         out_file.createDimension('nmodel', nmodel)
-        out_file.createVariable('obs_subregion_mean', 'f8', ('nobs','time','nsubregion'))
+        out_file.createVariable('obs_subregion_mean', 'f8', ('nobs','time','nsubregion'), zlib=compress)
         out_file.variables['obs_subregion_mean'][:] = ref_subregion_mean[:]
-        out_file.createVariable('obs_subregion_std', 'f8', ('nobs','time','nsubregion'))
+        out_file.createVariable('obs_subregion_std', 'f8', ('nobs','time','nsubregion'), zlib=compress)
         out_file.variables['obs_subregion_std'][:] = ref_subregion_std[:]
-        out_file.createVariable('model_subregion_mean', 'f8', ('nmodel','time','nsubregion'))
+        out_file.createVariable('model_subregion_mean', 'f8', ('nmodel','time','nsubregion'), zlib=compress)
         out_file.variables['model_subregion_mean'][:] = model_subregion_mean[:]
-        out_file.createVariable('model_subregion_std', 'f8', ('nmodel','time','nsubregion'))
+        out_file.createVariable('model_subregion_std', 'f8', ('nmodel','time','nsubregion'), zlib=compress)
         out_file.variables['model_subregion_std'][:] = model_subregion_std[:]
 
     out_file.close()
@@ -557,6 +778,170 @@ def variable_unit_conversion(dataset):
     
     return dataset
 
+def _get_months_and_years(times):
+    ''' Decode the month and year of each datetime value.
+
+    :param times: The datetimes to decode.
+    :type times: List of `datetime` values.
+
+    :returns: A :func:`tuple` of integer numpy arrays (months, years)
+    '''
+    months = np.array([time.month for time in times])
+    years = np.array([time.year for time in times])
+    return months, years
+
+def _temporal_subset_by_months(month_start, month_end, target_dataset,
+                               months, years, average_each_year):
+    ''' Temporally subset a Dataset given pre-decoded months and years.
+
+    :param month_start: An integer for beginning month (Jan=1)
+    :type month_start: :class:`int`
+    :param month_end: An integer for ending month (Jan=1)
+    :type month_end: :class:`int`
+    :param target_dataset: Dataset object that needs temporal subsetting
+    :type target_dataset: :class:`dataset.Dataset`
+    :param months: The month of each of target_dataset's times.
+    :type months: :class:`numpy.ndarray`
+    :param years: The year of each of target_dataset's times.
+    :type years: :class:`numpy.ndarray`
+    :param average_each_year: If True, output dataset is averaged for each year
+    :type average_each_year: :class:'boolean'
+
+    :returns: A temporal subset OCW Dataset
+
+    :raises ValueError: If the first or last month of the season is not
+        present in the Dataset.
+    '''
+    if month_start > month_end:
+        month_index = list(range(month_start, 13)) + list(range(1, month_end + 1))
+    else:
+        month_index = list(range(month_start, month_end + 1))
+
+    first_month = np.nonzero(months == month_index[0])[0]
+    last_month = np.nonzero(months == month_index[-1])[0]
+    if first_month.size == 0 or last_month.size == 0:
+        raise ValueError(
+            "Dataset times do not contain both month %s and month %s" %
+            (month_index[0], month_index[-1]))
+
+    # Select every time in the season, trimmed so that the subset begins
+    # with month_start and finishes with month_end
+    season_mask = np.in1d(months, month_index)
+    season_mask[:first_month[0]] = False
+    season_mask[last_month[-1] + 1:] = False
+    time_index = _boolean_mask_to_index(season_mask)
+
+    new_times = target_dataset.times[time_index]
+    new_values = target_dataset.values[time_index]
+    dtype = target_dataset.values.dtype
+
+    if average_each_year:
+        # Months which wrap past December belong to the following year's season
+        season_years = years[time_index].copy()
+        if month_start > month_end:
+            season_years[months[time_index] >= month_start] += 1
+        new_times, new_values = _average_each_season(new_times,
+                                                     new_values,
+                                                     season_years)
+        dtype = utils.processing_dtype(target_dataset.values)
+
+    return ds.Dataset(target_dataset.lats,
+                      target_dataset.lons,
+                      new_times,
+                      new_values,
+                      variable=target_dataset.variable,
+                      units=target_dataset.units,
+                      name=target_dataset.name,
+                      origin=target_dataset.origin,
+                      dtype=dtype,
+                      normalized=True)
+
+def _boolean_mask_to_index(mask):
+    ''' Convert a 1D boolean mask into the cheapest equivalent index.
+
+    A contiguous selection is returned as a slice so that indexing with it
+    produces a view instead of a copy.
+
+    :param mask: 1D boolean selection mask
+    :type mask: :class:`numpy.ndarray`
+
+    :returns: A :class:`slice` if the selection is contiguous, otherwise mask
+    '''
+    index = np.nonzero(mask)[0]
+    if index.size and index[-1] - index[0] + 1 == index.size:
+        return slice(index[0], index[-1] + 1)
+    return mask
+
+def _average_each_season(times, values, season_years):
+    ''' Average consecutive values which belong to the same season year.
+
+    :param times: The datetimes of the seasonal subset.
+    :type times: :class:`numpy.ndarray`
+    :param values: The values of the seasonal subset with time as the first
+        axis.
+    :type values: :class:`numpy.ndarray`
+    :param season_years: The season year of each time value.
+    :type season_years: :class:`numpy.ndarray`
+
+    :returns: A :func:`tuple` of (centered times, masked seasonal means)
+    '''
+    starts = np.concatenate(([0], np.nonzero(np.diff(season_years))[0] + 1))
+    lengths = np.diff(np.append(starts, len(season_years)))
+
+    data = ma.getdata(values)
+    valid = ~ma.getmaskarray(values)
+    sums = np.add.reduceat(np.where(valid, data, 0), starts, axis=0,
+                           dtype=np.float64)
+    counts = np.add.reduceat(valid, starts, axis=0, dtype=np.int64)
+    means = ma.masked_array(np.true_divide(sums, np.maximum(counts, 1)),
+                            mask=(counts == 0))
+
+    # Use the centered time of each season as its representative time
+    return times[starts + lengths // 2], means
+
+def _write_netcdf_job(job):
+    ''' Unpack a (dataset, path, kwargs) job for :func:`write_netcdf`. '''
+    dataset, path, kwargs = job
+    write_netcdf(dataset, path, **kwargs)
+
+def _iter_time_blocks(values, block_size):
+    ''' Yield consecutive blocks of block_size time steps from values. '''
+    for start in range(0, values.shape[0], block_size):
+        yield values[start:start + block_size]
+
+def _get_netcdf_chunk_shape(shape, chunking, itemsize, chunk_bytes=2 ** 20):
+    ''' Determine the NetCDF chunk shape for a (time, lat, lon) variable.
+
+    :param shape: The (time, lat, lon) shape of the variable.
+    :type shape: :func:`tuple`
+    :param chunking: 'map', 'timeseries', an explicit chunk shape or None.
+    :param itemsize: The size in bytes of a single value.
+    :type itemsize: :class:`int`
+    :param chunk_bytes: (optional) The approximate target size of a chunk.
+    :type chunk_bytes: :class:`int`
+
+    :returns: The chunk shape as a :func:`tuple` or None.
+
+    :raises ValueError: If chunking is not a recognized layout.
+    '''
+    if chunking is None:
+        return None
+
+    ntime, nlat, nlon = [max(1, length) for length in shape]
+    if chunking == 'map':
+        # Whole time slices, grouping as many as fit in a chunk
+        time_steps = max(1, chunk_bytes // (nlat * nlon * itemsize))
+        return (min(ntime, time_steps), nlat, nlon)
+    elif chunking == 'timeseries':
+        # The full time series of a square tile of grid points
+        side = max(1, int(np.sqrt(chunk_bytes // (ntime * itemsize))))
+        return (ntime, min(nlat, side), min(nlon, side))
+    elif isinstance(chunking, basestring):
+        raise ValueError("Unrecognized chunking layout: %s" % chunking)
+
+    return tuple(min(max(1, chunk), length)
+                 for chunk, length in zip(chunking, (ntime, nlat, nlon)))
+
 def _rcmes_normalize_datetimes(datetimes, timestep):
     """ Normalize Dataset datetime values.
 
@@ -592,22 +977,46 @@ def _rcmes_normalize_datetimes(datetimes, timestep):
 
     return normalDatetimes
 
+def union_mask(dataset_array, out=None):
+    ''' Calculate the union of the missing data masks of several datasets.
+
+    The masks are OR-ed into a single boolean array in place, so no
+    per-dataset temporary arrays are created.
+
+    :param dataset_array: an array of OCW datasets with the same shape
+    :type dataset_array: :class:`list` of :class:`dataset.Dataset`
+
+    :param out: (optional) Boolean array to store the union in.
+    :type out: :class:`numpy.ndarray`
+
+    :returns: Boolean array which is True where any dataset is missing data
+    :rtype: :class:`numpy.ndarray`
+    '''
+    if out is None:
+        out = np.zeros(dataset_array[0].values.shape, dtype=bool)
+    for dataset in dataset_array:
+        mask = ma.getmask(dataset.values)
+        if mask is not ma.nomask:
+            np.logical_or(out, mask, out=out)
+    return out
+
 def mask_missing_data(dataset_array):
     ''' Check missing values in observation and model datasets.
     If any of dataset in dataset_array has missing values at a grid point,
     the values at the grid point in all other datasets are masked.
+
+    The values are not copied. Each dataset receives its own copy of the
+    boolean union mask so that later masking of one dataset does not leak
+    into the others.
+
     :param dataset_array: an array of OCW datasets
     '''
-    mask_array = np.zeros(dataset_array[0].values.shape)
+    mask_array = union_mask(dataset_array)
     for dataset in dataset_array:
-        index = np.where(dataset.values.mask == True)
-        if index[0].size >0:
-            mask_array[index] = 1
-    masked_array = []
-    for dataset in dataset_array:
-        dataset.values = ma.array(dataset.values, mask=mask_array)
-        masked_array.append(dataset)
-    return [masked_dataset for masked_dataset in masked_array]
+        dataset.values = ma.masked_array(dataset.values, mask=mask_array,
+                                         keep_mask=False)
+        dataset.values.unshare_mask()
+    return list(dataset_array)
 
 
 def _rcmes_spatial_regrid(spatial_values, lat, lon, lat2, lon2, order=1):
@@ -630,6 +1039,7 @@ def _rcmes_spatial_regrid(spatial_values, lat, lon, lat2, lon2, order=1):
     :returns: 2d masked numpy array with shape(len(lat2), len(lon2))
     :rtype: (float, float) 
     '''
+    from scipy.ndimage import map_coordinates
 
     nlat = spatial_values.shape[0]
     nlon = spatial_values.shape[1]
@@ -813,14 +1223,14 @@ def _rcmes_calc_average_on_new_time_unit_K(data, dates, unit):
     # 1D data arrays, i.e. time series
     if data.ndim==1:
         # Create array to store the resulting data
-        meanstore = np.zeros(len(unique_times))
+        meanstore = np.zeros(len(unique_times), dtype=utils.processing_dtype(data))
   
         # Calculate the means across each unique time unit
         i=0
         for myunit in unique_times:
             if processing_required:
                 datam=ma.masked_array(data,timeunits!=myunit)
-                meanstore[i] = ma.average(datam)
+                meanstore[i] = datam.mean(dtype=np.float64)
             
             # construct new times list
             yyyy, mm, dd = _create_new_year_month_day(myunit, dates)
@@ -830,7 +1240,8 @@ def _rcmes_calc_average_on_new_time_unit_K(data, dates, unit):
     # 3D data arrays
     if data.ndim==3:
         # Create array to store the resulting data
-        meanstore = np.zeros([len(unique_times),data.shape[1],data.shape[2]])
+        meanstore = np.zeros([len(unique_times),data.shape[1],data.shape[2]],
+                             dtype=utils.processing_dtype(data))
   
         # Calculate the means across each unique time unit
         i=0
@@ -846,7 +1257,8 @@ def _rcmes_calc_average_on_new_time_unit_K(data, dates, unit):
                 datamask_store.append(datamask_at_this_timeunit[0])
                 # Calculate means for each pixel in this time unit, ignoring missing data (using masked array).
                 datam = ma.masked_array(data,np.logical_or(mask,datamask_at_this_timeunit))
-                meanstore[i,:,:] = ma.average(datam,axis=0)
+                # Accumulate in float64 to limit round-off for single precision data
+                meanstore[i,:,:] = datam.mean(axis=0, dtype=np.float64)
             # construct new times list
             yyyy, mm, dd = _create_new_year_month_day(myunit, dates)
             newTimesList.append(datetime.datetime(yyyy,mm,dd))
@@ -917,6 +1329,9 @@ def _congrid(a, newdims, method='linear', centre=False, minusone=False):
     True - inarray is resampled by(i-1)/(x-1) * (j-1)/(y-1)
     This prevents extrapolation one element beyond bounds of input array.
     '''
+    import scipy.interpolate
+    import scipy.ndimage
+
     if not a.dtype in [np.float64, np.float32]:
         a = np.cast[float](a)
 
@@ -990,6 +1405,66 @@ def _congrid(a, newdims, method='linear', centre=False, minusone=False):
               "and \'spline\' are supported."
         return None
 
+def _merge_order_statistic(buffer, values, keep, release):
+    ''' Merge a new member into a sorted buffer of extreme values.
+
+    The buffer holds the N most extreme values seen so far at each grid
+    point, sorted from the most extreme along its first axis. The new values
+    are bubbled through the buffer with element-wise comparisons.
+
+    :param buffer: Array of shape (N, ...) sorted along its first axis.
+    :type buffer: :class:`numpy.ndarray`
+    :param values: Array of new values of shape buffer.shape[1:]. This array
+        is modified in place.
+    :type values: :class:`numpy.ndarray`
+    :param keep: np.minimum to track the lowest values or np.maximum to
+        track the highest values.
+    :param release: The opposite ufunc of keep.
+    '''
+    for level in buffer:
+        kept = keep(level, values)
+        release(level, values, out=values)
+        level[...] = kept
+
+def _order_statistic_percentile(lowest, highest, counts, percentile):
+    ''' Calculate a percentile from the tracked order statistics.
+
+    Uses the same linear interpolation as :func:`numpy.percentile` applied to
+    the valid values at each grid point.
+
+    :param lowest: The lowest values at each point sorted in ascending order.
+    :type lowest: :class:`numpy.ndarray`
+    :param highest: The highest values at each point sorted in descending order.
+    :type highest: :class:`numpy.ndarray`
+    :param counts: The number of valid values at each point.
+    :type counts: :class:`numpy.ndarray`
+    :param percentile: Percentile in the range [0, 100]
+    :type percentile: :class:`float`
+
+    :returns: Array of percentiles of shape counts.shape
+    '''
+    last = np.maximum(counts - 1, 0)
+    position = percentile / 100. * last
+    below = np.floor(position).astype(int)
+    above = np.minimum(below + 1, last)
+    fraction = position - below
+
+    if percentile <= 50:
+        buffer = lowest
+    else:
+        buffer = highest
+        # Rank from the top of the distribution
+        below, above = last - below, last - above
+    below = np.minimum(below, len(buffer) - 1)
+    above = np.minimum(above, len(buffer) - 1)
+
+    lower = np.take_along_axis(buffer, below[np.newaxis], axis=0)[0]
+    upper = np.take_along_axis(buffer, above[np.newaxis], axis=0)[0]
+    with np.errstate(invalid='ignore'):
+        result = lower + (upper - lower) * fraction
+    result[counts == 0] = 0.
+    return result
+
 def _check_dataset_shapes(datasets):
     """ If the  datasets are not the same shape throw a ValueError Exception
     
@@ -22,8 +22,11 @@ RCMES module to download a file from ESGF.
 '''
 
 import urllib2, httplib
+import time
 from os.path import expanduser, join
 
+import ocw.events as events
+
 from ocw.esgf.constants import ESGF_CREDENTIALS
 
 class HTTPSClientAuthHandler(urllib2.HTTPSHandler):
@@ -57,8 +60,12 @@ def download(url, toDirectory="/tmp"):
     localFilePath = join(toDirectory,url.split('/')[-1])
     print "\nDownloading url: %s to local path: %s ..." % (url, localFilePath)
     localFile=open( localFilePath, 'w')
+    start = time.time()
     webFile=opener.open(url)
-    localFile.write(webFile.read())
+    data = webFile.read()
+    localFile.write(data)
+    events.emit('bytes_fetched', source='esgf', url=url, bytes=len(data),
+                seconds=time.time() - start)
     
     # cleanup
     localFile.close()
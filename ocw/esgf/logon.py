@@ -20,7 +20,6 @@
 RCMES module to logon onto the ESGF.
 '''
 
-from pyesgf.logon import LogonManager
 import os
 
 from ocw.esgf.constants import JPL_MYPROXY_SERVER_DN
@@ -36,6 +35,8 @@ def logon(openid, password):
     if "esg-datanode.jpl.nasa.gov" in openid:  
         os.environ['MYPROXY_SERVER_DN'] = JPL_MYPROXY_SERVER_DN
         
+    from pyesgf.logon import LogonManager
+
     lm = LogonManager()
     lm.logon_with_openid(openid,password)
     return lm.is_logged_on()
@@ -21,8 +21,6 @@ RCMES module to execute a faceted search for ESGF files.
 
 '''
 
-from pyesgf.search import SearchConnection
-
 from ocw.esgf.constants import JPL_SEARCH_SERVICE_URL
 
 class SearchClient():
@@ -38,6 +36,8 @@ class SearchClient():
         :param distrib: True to execute a federation-wide search, 
                         False to search only the specified search service
         """
+        from pyesgf.search import SearchConnection
+
         connection = SearchConnection(searchServiceUrl, distrib=distrib)
         
         # dictionary of query constraints
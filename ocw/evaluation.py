@@ -24,6 +24,7 @@ import logging
 from metrics import Metric, UnaryMetric, BinaryMetric
 from dataset import Dataset, Bounds
 import ocw.dataset_processor as DSP
+import ocw.events as events
 
 import numpy.ma as ma
 
@@ -105,6 +106,11 @@ class Evaluation(object):
         #: num_target_ds + (1 if ref_dataset != None else 0``
         self.unary_results = []
 
+        # The number of metric runs done and to do by the current run. They
+        # are reported with the metric_completed progress events.
+        self._metric_cells_completed = 0
+        self._metric_cells_total = 0
+
     @property
     def ref_dataset(self):
         return self._ref_dataset
@@ -229,6 +235,9 @@ class Evaluation(object):
             logger.warning(error)
             return
 
+        self._metric_cells_completed = 0
+        self._metric_cells_total = self._count_metric_cells()
+
         if self._should_run_regular_metrics():
             if self.subregions:
                 self.results = self._run_subregion_evaluation()
@@ -270,6 +279,34 @@ class Evaluation(object):
     def _should_run_unary_metrics(self):
         return len(self.unary_metrics) > 0
 
+    def _count_metric_cells(self):
+        '''Count the metric runs that an evaluation run makes.'''
+        num_subregions = len(self.subregions) if self.subregions else 1
+        num_datasets = len(self.target_datasets)
+        cells = 0
+
+        if self._should_run_regular_metrics():
+            cells += num_datasets * len(self.metrics) * num_subregions
+
+        if self._should_run_unary_metrics():
+            if self.ref_dataset:
+                num_datasets += 1
+            cells += num_datasets * len(self.unary_metrics) * num_subregions
+
+        return cells
+
+    def _run_metric(self, metric, *datasets):
+        '''Run a metric and emit a ``metric_completed`` progress event.'''
+        result = metric.run(*datasets)
+
+        self._metric_cells_completed += 1
+        events.emit('metric_completed',
+                    metric=metric.__class__.__name__,
+                    datasets=[dataset.name for dataset in datasets],
+                    completed=self._metric_cells_completed,
+                    total=self._metric_cells_total)
+        return result
+
     def _run_subregion_evaluation(self):
         results = []
         new_refs = [DSP.subset(s, self.ref_dataset) for s in self.subregions]
@@ -285,7 +322,7 @@ class Evaluation(object):
                     new_ref = new_refs[i]
                     new_tar = new_targets[i]
 
-                    run_result = metric.run(new_ref, new_tar)
+                    run_result = self._run_metric(metric, new_ref, new_tar)
                     results[-1][-1].append(run_result)
         return convert_evaluation_result(results, subregion=True)
 
@@ -294,7 +331,7 @@ class Evaluation(object):
         for target in self.target_datasets:
             results.append([])
             for metric in self.metrics:
-                run_result = metric.run(self.ref_dataset, target)
+                run_result = self._run_metric(metric, self.ref_dataset, target)
                 results[-1].append(run_result)
         return convert_evaluation_result(results)
 
@@ -304,10 +341,10 @@ class Evaluation(object):
             unary_results.append([])
             # Unary metrics should be run over the reference Dataset also
             if self.ref_dataset:
-                unary_results[-1].append(metric.run(self.ref_dataset))
+                unary_results[-1].append(self._run_metric(metric, self.ref_dataset))
 
             for target in self.target_datasets:
-                unary_results[-1].append(metric.run(target))
+                unary_results[-1].append(self._run_metric(metric, target))
         return convert_unary_evaluation_result(unary_results)
 
     def _run_subregion_unary_evaluation(self):
@@ -327,10 +364,10 @@ class Evaluation(object):
                 unary_results[-1].append([])
 
                 if self.ref_dataset:
-                    unary_results[-1][-1].append(metric.run(new_refs[i]))
+                    unary_results[-1][-1].append(self._run_metric(metric, new_refs[i]))
 
                 for t in range(len(self.target_datasets)):
-                    unary_results[-1][-1].append(metric.run(new_targets[t][i]))
+                    unary_results[-1][-1].append(self._run_metric(metric, new_targets[t][i]))
 
         return convert_unary_evaluation_result(unary_results, subregion = True)
 
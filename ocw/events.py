@@ -0,0 +1,157 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+''' Structured progress events of long running operations.
+
+Data sources, the dataset processor steps of an evaluation, the evaluation
+itself and plot generation emit events such as ``dataset_loaded``,
+``bytes_fetched``, ``stage_finished``, ``metric_completed`` and
+``plot_rendered``. Every event is a dictionary with an ``event`` name, a
+``time`` stamp and event specific fields. Listeners that are added with
+:func:`add_listener` receive the events of every thread, listeners that are
+added with :func:`listening` only receive the events of the current thread.
+
+Events are cheap to emit when nobody listens, so they can be left in place
+in the toolkit.
+'''
+
+from contextlib import contextmanager
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_listeners = []
+_listeners_lock = threading.Lock()
+_thread_state = threading.local()
+
+def add_listener(listener):
+    ''' Call a listener with every event emitted by any thread.
+
+    :param listener: A callable that takes an event dictionary.
+    :type listener: Callable
+    '''
+    with _listeners_lock:
+        _listeners.append(listener)
+
+def remove_listener(listener):
+    ''' Stop calling a listener added with :func:`add_listener`.
+
+    :param listener: The listener to remove.
+    :type listener: Callable
+    '''
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+@contextmanager
+def listening(listener):
+    ''' Call a listener with the events emitted by the current thread.
+
+    .. sourcecode:: python
+
+        with events.listening(collected.append):
+            evaluation.run()
+
+    :param listener: A callable that takes an event dictionary.
+    :type listener: Callable
+    '''
+    thread_listeners = _get_thread_listeners()
+    thread_listeners.append(listener)
+    try:
+        yield listener
+    finally:
+        thread_listeners.remove(listener)
+
+def emit(event, **fields):
+    ''' Send an event to the listeners.
+
+    Exceptions raised by listeners are logged and don't interrupt the
+    operation that emits the event.
+
+    :param event: The name of the event.
+    :type event: :mod:`string`
+    :param fields: The JSON serializable fields of the event.
+
+    :returns: The event dictionary, or None if nobody listens.
+    '''
+    with _listeners_lock:
+        listeners = _listeners + _get_thread_listeners()
+
+    if not listeners:
+        return None
+
+    fields['event'] = event
+    fields['time'] = time.time()
+
+    for listener in listeners:
+        try:
+            listener(fields)
+        except Exception:
+            logger.exception('Progress event listener %r failed', listener)
+
+    return fields
+
+@contextmanager
+def stage(name, **fields):
+    ''' Time a stage of an operation.
+
+    A ``stage_started`` event is emitted when the block is entered and a
+    ``stage_finished`` event with the elapsed ``seconds`` when it is left.
+    If the block raises an exception the ``stage_finished`` event has a
+    ``failed`` field with the exception's message.
+
+    :param name: The name of the stage, e.g. ``subset``.
+    :type name: :mod:`string`
+    :param fields: Additional fields of both events.
+    '''
+    emit('stage_started', stage=name, **fields)
+    start = time.time()
+    finished_fields = dict(fields)
+    try:
+        yield
+    except BaseException as e:
+        finished_fields['failed'] = str(e) or type(e).__name__
+        raise
+    finally:
+        emit('stage_finished', stage=name, seconds=time.time() - start,
+             **finished_fields)
+
+def format_event(event):
+    ''' Format an event as a single line of text for logs and consoles.
+
+    :param event: An event as passed to the listeners.
+    :type event: :class:`dict`
+
+    :returns: The formatted event.
+    :rtype: :mod:`string`
+    '''
+    fields = ['{}={}'.format(key, _format_value(value))
+              for key, value in sorted(event.items())
+              if key not in ('event', 'time')]
+    return ' '.join([event['event']] + fields)
+
+def _format_value(value):
+    if isinstance(value, float):
+        return '{:.3f}'.format(value)
+    return value
+
+def _get_thread_listeners():
+    if not hasattr(_thread_state, 'listeners'):
+        _thread_state.listeners = []
+    return _thread_state.listeners
@@ -24,7 +24,6 @@ from abc import ABCMeta, abstractmethod
 import ocw.utils as utils
 import numpy
 import numpy.ma as ma
-from scipy.stats import mstats
 
 class Metric(object):
     '''Base Metric Class'''
@@ -273,7 +272,9 @@ def calc_bias(target_array, reference_array, average_over_time = False):
     
     bias = target_array - reference_array
     if average_over_time:
-        return ma.average(bias, axis=0)
+        # Accumulate in float64 to limit round-off for single precision values
+        mean_bias = ma.mean(bias, axis=0, dtype=numpy.float64)
+        return mean_bias.astype(utils.processing_dtype(bias))
     else:
         return bias
 
@@ -291,9 +292,10 @@ def calc_stddev(array, axis=None):
     '''
 
     if isinstance(axis, int):
-        return ma.std(array, axis=axis, ddof=1)
+        stddev = ma.std(array, axis=axis, ddof=1, dtype=numpy.float64)
+        return stddev.astype(utils.processing_dtype(array))
     else:
-        return ma.std(array, ddof=1)
+        return ma.std(array, ddof=1, dtype=numpy.float64)
         
 
 def calc_stddev_ratio(target_array, reference_array):
@@ -327,6 +329,8 @@ def calc_correlation(target_array, reference_array):
     :rtype: :class:'numpy.ma.core.MaskedArray'
     '''
 
+    from scipy.stats import mstats
+
     return mstats.pearsonr(reference_array.flatten(), target_array.flatten())[0]  
        
 def calc_rmse(target_array, reference_array):
@@ -345,4 +349,5 @@ def calc_rmse(target_array, reference_array):
     :rtype: :class:'float'
     '''
 
-    return (ma.mean((calc_bias(target_array, reference_array))**2))**0.5 
+    return (ma.mean((calc_bias(target_array, reference_array))**2,
+                    dtype=numpy.float64))**0.5 
@@ -0,0 +1,262 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+''' Render independent plots concurrently in a pool of processes.
+
+.. sourcecode:: python
+
+    with PlotPool() as pool:
+        for name, values in results:
+            pool.draw(plotter.draw_contour_map, values, lats, lons,
+                      fname=name, ptitle=name)
+
+Every plot is drawn with the Agg backend in a worker process and saved under
+a temporary name next to its file before it is renamed into place, so a
+reader never sees a partially written plot.
+
+Forking a process that runs other threads can deadlock the child on locks
+that those threads held at fork time. A multi-threaded program, such as the
+OCW UI backend, starts the worker processes with :func:`start_worker_pool`
+before it starts any threads and passes them to every :class:`PlotPool`.
+'''
+
+import inspect
+import multiprocessing
+import os
+import threading
+import time
+
+import ocw.events as events
+
+class PlotPool(object):
+    ''' A pool of processes that draw plots with the :mod:`ocw.plotter`
+    functions.
+    '''
+
+    def __init__(self, processes=None, basemap_cache=None, pool=None):
+        '''
+        :param processes: (Optional) The number of plots that are drawn
+            concurrently. Defaults to the number of CPUs. Inside a daemonic
+            process, which can't start worker processes, or while other
+            threads run, which makes starting them unsafe, the plots are
+            drawn by the calling process with its matplotlib backend.
+        :type processes: :class:`int`
+        :param basemap_cache: (Optional) Prepared Basemap instances, as
+            returned by :func:`plotter.get_basemap_cache`, that every worker
+            process starts with.
+        :type basemap_cache: :class:`dict`
+        :param pool: (Optional) Worker processes returned by
+            :func:`start_worker_pool` to draw the plots with. They are shared
+            with other plot pools and left running by :meth:`join`. The
+            processes argument isn't used with a shared pool, whose
+            processes keep the Basemaps they prepare.
+        :type pool: :class:`multiprocessing.pool.Pool`
+
+        :raises ValueError: If both a basemap_cache and a pool are given.
+        '''
+        if pool is not None and basemap_cache is not None:
+            raise ValueError('The processes of a shared pool were started '
+                             'without the basemap_cache.')
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+
+        self.processes = max(1, processes)
+        self.in_process = pool is None and (
+            multiprocessing.current_process().daemon or
+            threading.active_count() > 1)
+        self.basemap_cache = basemap_cache
+        self._shared_pool = pool
+        self._pool = pool
+        self._pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.join()
+        else:
+            self.terminate()
+
+    @property
+    def queued(self):
+        ''' The number of plots that were queued since the last join. '''
+        return len(self._pending)
+
+    def draw(self, plot_function, *args, **kwargs):
+        ''' Queue a plot.
+
+        :param plot_function: The module level plot function, e.g.
+            :func:`plotter.draw_contour_map`. It must take the ``fname`` and
+            ``fmt`` arguments of the :mod:`ocw.plotter` functions.
+        :type plot_function: :func:`function`
+        :param args: The positional arguments of the plot function.
+        :param kwargs: The keyword arguments of the plot function.
+
+        .. note:: The arguments are sent to a worker process in the
+            background, so they must not be modified until :meth:`join`
+            returns.
+        '''
+        if self.in_process:
+            self._pending.append(_SerialResult(plot_function, args, kwargs))
+            return
+
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.processes,
+                                              initializer=_init_worker,
+                                              initargs=(self.basemap_cache,))
+
+        self._pending.append(self._pool.apply_async(
+            _render_atomically, (plot_function, args, kwargs)))
+
+    def join(self):
+        ''' Wait for the queued plots.
+
+        A ``plot_rendered`` progress event is emitted for every plot.
+
+        :returns: The paths of the plot files in the order they were queued.
+        :rtype: :class:`list` of :mod:`string`
+
+        :raises: The first exception raised while drawing a plot. The other
+            plots are still drawn.
+        '''
+        pending, self._pending = self._pending, []
+        paths = []
+        error = None
+
+        for result in pending:
+            try:
+                path, seconds = result.get()
+            except Exception as e:
+                error = error or e
+                continue
+
+            events.emit('plot_rendered', file_name=os.path.basename(path),
+                        seconds=seconds)
+            paths.append(path)
+
+        self._close_pool()
+
+        if error is not None:
+            raise error
+
+        return paths
+
+    def terminate(self):
+        ''' Stop drawing plots and discard the queued plots. '''
+        self._pending = []
+        if self._pool is not None and self._pool is not self._shared_pool:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def _close_pool(self):
+        if self._pool is not None and self._pool is not self._shared_pool:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+def start_worker_pool(processes=None):
+    ''' Start worker processes that several :class:`PlotPool` share.
+
+    Call it before the calling process starts any threads.
+
+    :param processes: (Optional) The number of plots that are drawn
+        concurrently by all the plot pools. Defaults to the number of CPUs.
+    :type processes: :class:`int`
+
+    :returns: The worker processes to pass to :class:`PlotPool`.
+    :rtype: :class:`multiprocessing.pool.Pool`
+    '''
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    return multiprocessing.Pool(max(1, processes), initializer=_init_worker,
+                                initargs=(None,))
+
+class _SerialResult(object):
+    ''' A plot drawn by the calling process, with the interface of the
+    results of multiprocessing.Pool.apply_async.
+    '''
+
+    def __init__(self, plot_function, args, kwargs):
+        self._error = None
+        try:
+            self._value = _render_atomically(plot_function, args, kwargs)
+        except Exception as e:
+            self._error = e
+
+    def get(self):
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+def _init_worker(basemap_cache):
+    ''' Make a worker process draw without a display and warm its cache of
+    prepared Basemap instances.
+    '''
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+
+    if basemap_cache is not None:
+        import ocw.plotter
+        ocw.plotter.load_basemap_cache(basemap_cache)
+
+# The current figure of pyplot is shared by all threads, so plots that are
+# drawn in the calling process are drawn one at a time.
+_pyplot_lock = threading.Lock()
+
+def _render_atomically(plot_function, args, kwargs):
+    ''' Draw a plot into a temporary file and rename it into place.
+
+    :returns: The path of the plot file and the seconds taken to draw it.
+    '''
+    import matplotlib.pyplot as plt
+
+    start = time.time()
+    call_args = inspect.getcallargs(plot_function, *args, **kwargs)
+    fname = call_args['fname']
+    fmt = call_args.get('fmt', 'png')
+    path = '{}.{}'.format(fname, fmt)
+
+    directory, base_name = os.path.split(fname)
+    temp_fname = os.path.join(directory, '.{}.{}.tmp'.format(base_name,
+                                                             os.getpid()))
+    temp_path = '{}.{}'.format(temp_fname, fmt)
+
+    args = list(args)
+    fname_index = inspect.getargspec(plot_function).args.index('fname')
+    if fname_index < len(args):
+        args[fname_index] = temp_fname
+    else:
+        kwargs = dict(kwargs, fname=temp_fname)
+
+    with _pyplot_lock:
+        open_figures = set(plt.get_fignums())
+        try:
+            plot_function(*args, **kwargs)
+            os.rename(temp_path, path)
+        finally:
+            # The plotter functions leave their figures open. Close them, but
+            # not the figures that were open before.
+            for number in set(plt.get_fignums()) - open_figures:
+                plt.close(number)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    return path, time.time() - start
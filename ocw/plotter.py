@@ -15,18 +15,35 @@
 # specific language governing permissions and limitations
 # under the License.
 
+from collections import OrderedDict
+import copy
+import hashlib
 from tempfile import TemporaryFile
+import threading
+
 import matplotlib as mpl
 import matplotlib.pyplot as plt
-from mpl_toolkits.basemap import Basemap
 from mpl_toolkits.axes_grid1 import ImageGrid
-import scipy.stats.mstats as mstats
 import numpy as np
 import numpy.ma as ma
 
 # Set the default colormap to coolwarm
 mpl.rc('image', cmap='coolwarm')
 
+# The maximum number of prepared Basemap instances and of projected lat/lon
+# meshes that are cached.
+MAX_CACHED_BASEMAPS = 16
+MAX_CACHED_MESHES = 64
+
+# Maps (projection, bounds, resolution) to a prepared Basemap instance. Building
+# a Basemap reads and clips the coastline and country data, which takes longer
+# than drawing a small plot.
+_basemap_cache = OrderedDict()
+# Maps a Basemap cache key and the hashes of lats and lons to the projected
+# (x, y) mesh.
+_mesh_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
 def set_cmap(name):
     '''
     Sets the default colormap (eg when setting cmap=None in a function)
@@ -43,6 +60,131 @@ def set_cmap(name):
     cmap = plt.get_cmap(name)
     mpl.rc('image', cmap=cmap.name)
 
+def get_basemap(llcrnrlat, urcrnrlat, llcrnrlon, urcrnrlon, projection='cyl',
+                resolution='l'):
+    ''' Get a Basemap instance from the cache of prepared instances.
+
+    The instances are keyed by their projection, bounds and resolution. The
+    returned instance is a shallow copy that shares the prepared boundary
+    data with the cached one, so its axes can be set freely.
+
+    :param llcrnrlat: The latitude of the lower left corner.
+    :type llcrnrlat: :class:`float`
+    :param urcrnrlat: The latitude of the upper right corner.
+    :type urcrnrlat: :class:`float`
+    :param llcrnrlon: The longitude of the lower left corner.
+    :type llcrnrlon: :class:`float`
+    :param urcrnrlon: The longitude of the upper right corner.
+    :type urcrnrlon: :class:`float`
+    :param projection: (Optional) The Basemap projection.
+    :type projection: :mod:`string`
+    :param resolution: (Optional) The Basemap boundary resolution.
+    :type resolution: :mod:`string`
+
+    :returns: A :class:`mpl_toolkits.basemap.Basemap` without axes.
+    '''
+    key = _get_basemap_key(llcrnrlat, urcrnrlat, llcrnrlon, urcrnrlon,
+                           projection, resolution)
+
+    with _cache_lock:
+        m = _basemap_cache.pop(key, None)
+        if m is not None:
+            _basemap_cache[key] = m
+
+    if m is None:
+        from mpl_toolkits.basemap import Basemap
+
+        m = Basemap(projection=projection, resolution=resolution,
+                    llcrnrlat=llcrnrlat, urcrnrlat=urcrnrlat,
+                    llcrnrlon=llcrnrlon, urcrnrlon=urcrnrlon)
+        m.cache_key = key
+
+        with _cache_lock:
+            _basemap_cache[key] = m
+            while len(_basemap_cache) > MAX_CACHED_BASEMAPS:
+                _basemap_cache.popitem(last=False)
+
+    m = copy.copy(m)
+    m.ax = None
+    return m
+
+def get_basemap_cache():
+    ''' Get the prepared Basemap instances and projected meshes.
+
+    The returned cache can be pickled, e.g. to warm the caches of plotting
+    worker processes with :func:`load_basemap_cache`.
+
+    :returns: The cached Basemap instances and projected meshes.
+    :rtype: :class:`dict`
+    '''
+    with _cache_lock:
+        return {'basemaps': list(_basemap_cache.items()),
+                'meshes': list(_mesh_cache.items())}
+
+def load_basemap_cache(cache):
+    ''' Add Basemap instances and meshes from :func:`get_basemap_cache` to
+    the cache.
+
+    :param cache: A cache returned by :func:`get_basemap_cache`.
+    :type cache: :class:`dict`
+    '''
+    with _cache_lock:
+        for key, m in cache['basemaps']:
+            _basemap_cache[key] = m
+        for key, mesh in cache['meshes']:
+            _mesh_cache[key] = mesh
+
+        while len(_basemap_cache) > MAX_CACHED_BASEMAPS:
+            _basemap_cache.popitem(last=False)
+        while len(_mesh_cache) > MAX_CACHED_MESHES:
+            _mesh_cache.popitem(last=False)
+
+def clear_basemap_cache():
+    ''' Remove all Basemap instances and meshes from the cache. '''
+    with _cache_lock:
+        _basemap_cache.clear()
+        _mesh_cache.clear()
+
+def _get_basemap_key(llcrnrlat, urcrnrlat, llcrnrlon, urcrnrlon, projection,
+                     resolution):
+    bounds = tuple(round(float(value), 6)
+                   for value in (llcrnrlat, urcrnrlat, llcrnrlon, urcrnrlon))
+    return (projection, bounds, resolution)
+
+def _get_projected_mesh(m, lats, lons):
+    ''' Project lats and lons with a Basemap from :func:`get_basemap`.
+
+    One dimensional lats and lons are turned into a mesh first. The projected
+    meshes are cached.
+
+    :returns: The projected (x, y) mesh.
+    '''
+    lats = np.asarray(lats)
+    lons = np.asarray(lons)
+    digest = hashlib.sha1()
+    for values in (lats, lons):
+        digest.update(str(values.shape))
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tostring())
+
+    key = (m.cache_key, digest.hexdigest())
+
+    with _cache_lock:
+        mesh = _mesh_cache.pop(key, None)
+        if mesh is not None:
+            _mesh_cache[key] = mesh
+            return mesh
+
+    if lats.ndim == 1 and lons.ndim == 1:
+        lons, lats = np.meshgrid(lons, lats)
+    mesh = m(lons, lats)
+
+    with _cache_lock:
+        _mesh_cache[key] = mesh
+        while len(_mesh_cache) > MAX_CACHED_MESHES:
+            _mesh_cache.popitem(last=False)
+
+    return mesh
+
 def _nice_intervals(data, nlevs):
     '''
     Purpose::
@@ -58,6 +200,8 @@ def _nice_intervals(data, nlevs):
     Output::
         clevs - A list of floats for the resultant colorbar levels
     '''
+    import scipy.stats.mstats as mstats
+
     # Find the min and max levels by cutting off the tails of the distribution
     # This mitigates the influence of outliers
     data = data.ravel()
@@ -276,13 +420,13 @@ def draw_subregions(subregions, lats, lons, fname, fmt='png', ptitle='',
     fig.dpi = 300
     ax = fig.add_subplot(111)
 
-    # Determine the map boundaries and construct a Basemap object
+    # Determine the map boundaries and get a prepared Basemap object
     lonmin = lons.min()
     lonmax = lons.max()
     latmin = lats.min()
     latmax = lats.max()
-    m = Basemap(projection='cyl', llcrnrlat=latmin, urcrnrlat=latmax,
-                llcrnrlon=lonmin, urcrnrlon=lonmax, resolution='l', ax=ax)
+    m = get_basemap(latmin, latmax, lonmin, lonmax)
+    m.ax = ax
 
     # Draw the borders for coastlines and countries
     m.drawcoastlines(linewidth=1)
@@ -552,7 +696,7 @@ def draw_marker_on_map(lat, lon, fname, fmt='png', location_name=' ',gridshape=(
     fig.dpi = 300
     ax = fig.add_subplot(111)
     
-    m = Basemap(projection='cyl', resolution = 'c', llcrnrlat =lat-30, urcrnrlat = lat+30, llcrnrlon = lon-60, urcrnrlon = lon+60)
+    m = get_basemap(lat - 30, lat + 30, lon - 60, lon + 60, resolution='c')
     m.drawcoastlines(linewidth=1)
     m.drawcountries(linewidth=1)
     m.drawmapboundary(fill_color='aqua')
@@ -662,17 +806,12 @@ def draw_contour_map(dataset, lats, lons, fname, fmt='png', gridshape=(1, 1),
                      cbar_pad='0%'
                      )
 
-    # Determine the map boundaries and construct a Basemap object
+    # Determine the map boundaries and get a prepared Basemap object
     lonmin = lons.min()
     lonmax = lons.max()
     latmin = lats.min()
     latmax = lats.max()
-    m = Basemap(projection = 'cyl', llcrnrlat = latmin, urcrnrlat = latmax,
-                llcrnrlon = lonmin, urcrnrlon = lonmax, resolution = 'l')
-
-    # Convert lats and lons to projection coordinates
-    if lats.ndim == 1 and lons.ndim == 1:
-        lons, lats = np.meshgrid(lons, lats)
+    m = get_basemap(latmin, latmax, lonmin, lonmax)
 
     # Calculate contour levels if not given
     if clevs is None:
@@ -698,7 +837,8 @@ def draw_contour_map(dataset, lats, lons, fname, fmt='png', gridshape=(1, 1),
     if parallels is None:
         parallels = np.r_[np.arange(0, -90, -dlatlon)[::-1], np.arange(0, 90, dlatlon)]
 
-    x, y = m(lons, lats)
+    # Convert lats and lons to projection coordinates
+    x, y = _get_projected_mesh(m, lats, lons)
     for i, ax in enumerate(grid):
         # Load the data to be plotted
         data = dataset[i]
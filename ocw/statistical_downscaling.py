@@ -18,7 +18,6 @@
 
 import ocw.utils as utils
 import numpy as np
-from scipy.stats import percentileofscore, linregress
 
 class Downscaling:
     def __init__(self, ref_dataset, model_present, model_future):
@@ -66,6 +65,8 @@ class Downscaling:
 
         :returns: downscaled model_present and model_future
         '''
+        from scipy.stats import percentileofscore
+
         ref = self.ref_dataset
         model_present = self.model_present
         model_present_corrected = np.zeros(model_present.size)
@@ -89,6 +90,7 @@ class Downscaling:
 
         :returns: downscaled model_present and model_future
         '''
+        from scipy.stats import percentileofscore, linregress
 
         ref_original = self.ref_dataset
         model_present = self.model_present
@@ -18,7 +18,11 @@
 import unittest
 import ocw.data_source.dap as dap
 from ocw.dataset import Dataset
+import ocw.events as events
 import datetime as dt
+import numpy as np
+from mock import patch
+from pydap.model import BaseType, DatasetType, GridType
 
 class TestDap(unittest.TestCase):
     @classmethod
@@ -50,5 +54,49 @@ class TestDap(unittest.TestCase):
         self.assertEquals(self.dataset.origin['source'], 'dap')
         self.assertEquals(self.dataset.origin['url'], self.url)
 
+class TestDapWithoutServer(unittest.TestCase):
+    def setUp(self):
+        values = np.arange(24, dtype=float).reshape(2, 3, 4)
+        time = BaseType('time', np.array([0., 31.]), ('time',),
+                        units='days since 2000-01-01 00:00:00')
+        lat = BaseType('lat', np.array([-10., 0., 10.]), ('lat',))
+        lon = BaseType('lon', np.array([0., 10., 20., 30.]), ('lon',))
+        sst = GridType('sst')
+        sst['sst'] = BaseType('sst', values, ('time', 'lat', 'lon'))
+        sst['time'] = time
+        sst['lat'] = lat
+        sst['lon'] = lon
+        self.remote = DatasetType('sst.nc')
+        self.remote['sst'] = sst
+        self.remote['time'] = time
+        self.remote['lat'] = lat
+        self.remote['lon'] = lon
+        self.url = 'http://localhost/sst.nc'
+
+    @patch('pydap.client.open_url')
+    def test_load(self, open_url):
+        open_url.return_value = self.remote
+        dataset = dap.load(self.url, 'sst', name='foo')
+
+        open_url.assert_called_with(self.url)
+        np.testing.assert_array_equal(dataset.lats, [-10., 0., 10.])
+        np.testing.assert_array_equal(dataset.lons, [0., 10., 20., 30.])
+        self.assertEqual(list(dataset.times),
+                         [dt.datetime(2000, 1, 1), dt.datetime(2000, 2, 1)])
+        self.assertEqual(dataset.values.shape, (2, 3, 4))
+        self.assertEqual(dataset.name, 'foo')
+
+    @patch('pydap.client.open_url')
+    def test_loaded_event(self, open_url):
+        open_url.return_value = self.remote
+        emitted = []
+        with events.listening(emitted.append):
+            dap.load(self.url, 'sst', name='foo')
+
+        self.assertEqual(emitted[-1]['event'], 'dataset_loaded')
+        self.assertEqual(emitted[-1]['source'], 'dap')
+        self.assertEqual(emitted[-1]['shape'], [2, 3, 4])
+        self.assertTrue(emitted[-1]['seconds'] >= 0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -19,6 +19,7 @@
 
 import unittest
 from ocw.dataset import Dataset, Bounds
+import ocw.utils as utils
 import numpy as np
 import datetime as dt
 
@@ -61,6 +62,74 @@ class TestDatasetAttributes(unittest.TestCase):
     def test_origin(self):
         self.assertEqual(self.test_dataset.origin, self.origin)
 
+class TestDatasetDtype(unittest.TestCase):
+    def setUp(self):
+        self.lat = np.array([10, 12, 14, 16, 18])
+        self.lon = np.array([100, 102, 104, 106, 108])
+        self.time = np.array([dt.datetime(2000, x, 1) for x in range(1, 13)])
+        self.value = np.arange(300, dtype=np.float64).reshape(12, 5, 5)
+
+    def tearDown(self):
+        utils.set_working_dtype(None)
+
+    def test_input_dtype_is_kept(self):
+        dataset = Dataset(self.lat, self.lon, self.time, self.value)
+        self.assertEqual(dataset.values.dtype, np.float64)
+
+    def test_dtype_argument(self):
+        dataset = Dataset(self.lat, self.lon, self.time, self.value,
+                          dtype=np.float32)
+        self.assertEqual(dataset.values.dtype, np.float32)
+
+    def test_global_working_dtype(self):
+        utils.set_working_dtype(np.float32)
+        dataset = Dataset(self.lat, self.lon, self.time, self.value)
+        self.assertEqual(dataset.values.dtype, np.float32)
+
+    def test_dtype_argument_overrides_working_dtype(self):
+        utils.set_working_dtype(np.float32)
+        dataset = Dataset(self.lat, self.lon, self.time, self.value,
+                          dtype=np.float64)
+        self.assertEqual(dataset.values.dtype, np.float64)
+
+class TestDatasetNormalization(unittest.TestCase):
+    def setUp(self):
+        self.lat = np.array([10, 12, 14])
+        self.lon = np.array([0, 90, 180, 270])
+        self.time = np.array([dt.datetime(2000, x, 1) for x in range(1, 3)])
+        self.value = np.arange(24).reshape(2, 3, 4)
+
+    def test_caller_lons_are_not_modified(self):
+        lon = np.array([190, 200, 210, 220])
+        Dataset(self.lat, lon, self.time, self.value)
+        np.testing.assert_array_equal(lon, [190, 200, 210, 220])
+
+    def test_lon_shift(self):
+        dataset = Dataset(self.lat, self.lon, self.time, self.value)
+        np.testing.assert_array_equal(dataset.lons, [-180, -90, 0, 90])
+        np.testing.assert_array_equal(dataset.values[0, 0], [2, 3, 0, 1])
+
+    def test_lat_reversal_is_a_view(self):
+        dataset = Dataset(self.lat[::-1], self.lon - 180, self.time, self.value)
+        np.testing.assert_array_equal(dataset.lats, self.lat)
+        self.assertTrue(np.may_share_memory(dataset.values, self.value))
+
+    def test_slice_values_with_pending_shift(self):
+        dataset = Dataset(self.lat, self.lon, self.time, self.value)
+        sliced = dataset.slice_values(slice(1, 3), slice(1, 3), slice(0, 1))
+        np.testing.assert_array_equal(sliced, dataset.values[0:1, 1:3, 1:3])
+
+    def test_assigned_values_replace_pending_shift(self):
+        dataset = Dataset(self.lat, self.lon, self.time, self.value)
+        dataset.values = self.value
+        np.testing.assert_array_equal(dataset.values, self.value)
+
+    def test_normalized_skips_normalization(self):
+        dataset = Dataset(self.lat, self.lon, self.time, self.value,
+                          normalized=True)
+        np.testing.assert_array_equal(dataset.lons, self.lon)
+        self.assertIs(dataset.values, self.value)
+
 class TestInvalidDatasetInit(unittest.TestCase):
     def setUp(self):
         self.lat = np.array([10, 12, 14, 16, 18])
@@ -24,6 +24,7 @@ from ocw import dataset as ds
 from ocw.data_source import local
 import numpy as np
 import numpy.ma as ma
+import netCDF4
 
 import logging
 logging.basicConfig(level=logging.CRITICAL)
@@ -57,6 +58,159 @@ class TestEnsemble(unittest.TestCase):
         self.assertEquals(self.ensemble.name, self.ensemble_dataset_name)
         
 
+class TestEnsembleStatistics(unittest.TestCase):
+    def setUp(self):
+        self.datasets = [build_ten_cube_dataset(value) for value in range(1, 6)]
+        values = ma.array(self.datasets[0].values)
+        values[0, 0, 0] = ma.masked
+        self.datasets[0].values = values
+
+    def test_mean_and_spread(self):
+        statistics = dp.ensemble_statistics(self.datasets)
+        self.assertEqual(list(statistics.keys()), ['mean', 'std'])
+        self.assertEqual(statistics['mean'].values[0, 0, 0], 3.5)
+        self.assertEqual(statistics['mean'].values[1, 0, 0], 3.)
+        self.assertAlmostEqual(statistics['std'].values[1, 0, 0], np.sqrt(2.))
+        self.assertEqual(statistics['mean'].name, 'Dataset Ensemble mean')
+
+    def test_percentiles_match_numpy(self):
+        statistics = dp.ensemble_statistics(iter(self.datasets),
+                                            percentiles=[10, 50, 97.5],
+                                            num_members=5)
+        for percentile in [10, 50, 97.5]:
+            values = statistics['p%g' % percentile].values
+            self.assertAlmostEqual(values[1, 0, 0],
+                                   np.percentile(range(1, 6), percentile))
+            self.assertAlmostEqual(values[0, 0, 0],
+                                   np.percentile(range(2, 6), percentile))
+
+    def test_unknown_member_count(self):
+        with self.assertRaises(ValueError):
+            dp.ensemble_statistics(iter(self.datasets), percentiles=[50])
+
+    def test_unequal_dataset_shapes(self):
+        with self.assertRaises(ValueError):
+            dp.ensemble_statistics([ten_year_monthly_dataset(),
+                                    two_year_daily_dataset()])
+
+
+class TestMaskMissingData(unittest.TestCase):
+    def setUp(self):
+        self.datasets = [build_ten_cube_dataset(value) for value in range(1, 4)]
+        first = ma.array(self.datasets[0].values)
+        first[0, 0, 0] = ma.masked
+        self.datasets[0].values = first
+        last = ma.array(self.datasets[2].values)
+        last[1, 1, 1] = ma.masked
+        self.datasets[2].values = last
+
+    def test_union_mask(self):
+        mask = dp.union_mask(self.datasets)
+        self.assertEqual(mask.dtype, bool)
+        self.assertEqual(mask.sum(), 2)
+        self.assertTrue(mask[0, 0, 0] and mask[1, 1, 1])
+
+    def test_mask_missing_data(self):
+        datasets = dp.mask_missing_data(self.datasets)
+        for dataset in datasets:
+            self.assertTrue(dataset.values.mask[0, 0, 0])
+            self.assertTrue(dataset.values.mask[1, 1, 1])
+            self.assertEqual(dataset.values.mask.sum(), 2)
+
+    def test_masks_are_not_shared(self):
+        datasets = dp.mask_missing_data(self.datasets)
+        datasets[0].values[2, 2, 2] = ma.masked
+        self.assertFalse(datasets[1].values.mask[2, 2, 2])
+
+
+class TestFloat32Processing(unittest.TestCase):
+    def setUp(self):
+        self.dataset = ten_year_monthly_dataset()
+        self.dataset.values = self.dataset.values.astype(np.float32)
+
+    def test_temporal_rebin(self):
+        annual_dataset = dp.temporal_rebin(self.dataset,
+                                           datetime.timedelta(days=365))
+        self.assertEqual(annual_dataset.values.dtype, np.float32)
+
+    def test_spatial_regrid(self):
+        regridded_dataset = dp.spatial_regrid(self.dataset,
+                                              np.array(range(-89, 90, 4)),
+                                              np.array(range(-179, 180, 4)))
+        self.assertEqual(regridded_dataset.values.dtype, np.float32)
+
+    def test_subset(self):
+        subregion = ds.Bounds(-40, 40, -80, 80)
+        self.assertEqual(dp.subset(subregion, self.dataset).values.dtype,
+                         np.float32)
+
+    def test_temporal_subset_average(self):
+        subset = dp.temporal_subset(6, 8, self.dataset, average_each_year=True)
+        self.assertEqual(subset.values.dtype, np.float32)
+
+    def test_ensemble(self):
+        ensemble = dp.ensemble([self.dataset, self.dataset])
+        self.assertEqual(ensemble.values.dtype, np.float32)
+
+    def test_integer_values_are_promoted(self):
+        self.dataset.values = self.dataset.values.astype(np.int32)
+        annual_dataset = dp.temporal_rebin(self.dataset,
+                                           datetime.timedelta(days=365))
+        self.assertEqual(annual_dataset.values.dtype, np.float64)
+
+
+class TestTemporalSubset(unittest.TestCase):
+    def setUp(self):
+        self.ten_year_dataset = ten_year_monthly_dataset()
+        self.ten_year_dataset.values = np.array(
+            [np.ones([90, 180]) * t.month for t in self.ten_year_dataset.times])
+
+    def test_wrapped_season_times(self):
+        subset = dp.temporal_subset(12, 2, self.ten_year_dataset)
+        # Starts with the first December and finishes with the last February
+        self.assertEqual(subset.times[0], datetime.datetime(2000, 12, 1))
+        self.assertEqual(subset.times[-1], datetime.datetime(2009, 2, 1))
+        self.assertEqual(len(subset.times), 27)
+        self.assertTrue(all(t.month in [12, 1, 2] for t in subset.times))
+
+    def test_contiguous_season(self):
+        subset = dp.temporal_subset(6, 8, self.ten_year_dataset)
+        self.assertEqual(len(subset.times), 30)
+        np.testing.assert_array_equal(subset.values[:3, 0, 0], [6, 7, 8])
+
+    def test_average_each_year(self):
+        subset = dp.temporal_subset(12, 2, self.ten_year_dataset,
+                                    average_each_year=True)
+        self.assertEqual(subset.values.shape, (9, 90, 180))
+        # The center time of each season is used
+        self.assertEqual(subset.times[0], datetime.datetime(2001, 1, 1))
+        np.testing.assert_array_almost_equal(subset.values[:, 0, 0],
+                                             np.ones(9) * 5.)
+
+    def test_average_each_year_with_missing_data(self):
+        values = ma.array(self.ten_year_dataset.values)
+        values[5, :, :] = ma.masked
+        self.ten_year_dataset.values = values
+        subset = dp.temporal_subset(6, 8, self.ten_year_dataset,
+                                    average_each_year=True)
+        self.assertEqual(subset.values[0, 0, 0], 7.5)
+        self.assertEqual(subset.values[1, 0, 0], 7.)
+
+    def test_missing_season_month(self):
+        dataset = dp.temporal_subset(1, 6, self.ten_year_dataset)
+        with self.assertRaises(ValueError):
+            dp.temporal_subset(9, 11, dataset)
+
+    def test_seasonal_subsets(self):
+        subsets = dp.seasonal_subsets(self.ten_year_dataset,
+                                      average_each_year=True)
+        self.assertEqual(list(subsets.keys()), ['DJF', 'MAM', 'JJA', 'SON'])
+        jja = dp.temporal_subset(6, 8, self.ten_year_dataset,
+                                 average_each_year=True)
+        np.testing.assert_array_equal(subsets['JJA'].times, jja.times)
+        np.testing.assert_array_equal(subsets['JJA'].values, jja.values)
+
+
 class TestTemporalRebin(unittest.TestCase):
     
     def setUp(self):
@@ -369,6 +523,65 @@ class TestNetCDFWrite(unittest.TestCase):
         np.testing.assert_array_equal(self.ds.times, new_ds.times)
         np.testing.assert_array_equal(self.ds.values, new_ds.values)
 
+    def test_values_dtype_and_compression(self):
+        dp.write_netcdf(self.ds, self.file_name, dtype='f8', complevel=6)
+        out_file = netCDF4.Dataset(self.file_name)
+        values = out_file.variables[self.ds.variable]
+        self.assertEqual(values.dtype, np.float64)
+        self.assertTrue(values.filters()['zlib'])
+        self.assertTrue(values.filters()['shuffle'])
+        self.assertEqual(values.filters()['complevel'], 6)
+        out_file.close()
+
+    def test_default_float32_map_chunking(self):
+        dp.write_netcdf(self.ds, self.file_name)
+        out_file = netCDF4.Dataset(self.file_name)
+        values = out_file.variables[self.ds.variable]
+        self.assertEqual(values.dtype, np.float32)
+        self.assertEqual(values.chunking(), [16, 90, 180])
+        out_file.close()
+
+    def test_timeseries_chunking(self):
+        dp.write_netcdf(self.ds, self.file_name, chunking='timeseries')
+        out_file = netCDF4.Dataset(self.file_name)
+        chunks = out_file.variables[self.ds.variable].chunking()
+        self.assertEqual(chunks[0], 120)
+        self.assertTrue(chunks[1] < 90 and chunks[2] < 180)
+        out_file.close()
+
+    def test_invalid_chunking(self):
+        with self.assertRaises(ValueError):
+            dp.write_netcdf(self.ds, self.file_name, chunking='bogus')
+
+    def test_streamed_blocks(self):
+        blocks = (self.ds.values[i:i + 7] * 2 for i in range(0, 120, 7))
+        dp.write_netcdf_blocks(self.file_name, self.ds.lats, self.ds.lons,
+                               self.ds.times, blocks,
+                               variable=self.ds.variable, units=self.ds.units)
+        new_ds = local.load_file(self.file_name, self.ds.variable)
+        np.testing.assert_array_equal(self.ds.values * 2, new_ds.values)
+
+    def test_streamed_blocks_too_short(self):
+        blocks = (self.ds.values[i:i + 10] for i in range(0, 100, 10))
+        with self.assertRaises(ValueError):
+            dp.write_netcdf_blocks(self.file_name, self.ds.lats, self.ds.lons,
+                                   self.ds.times, blocks,
+                                   variable=self.ds.variable,
+                                   units=self.ds.units)
+
+    def test_concurrent_file_writes(self):
+        file_names = ['test_0.nc', 'test_1.nc']
+        datasets = [self.ds, ten_year_monthly_15th_dataset()]
+        try:
+            dp.write_netcdf_files(datasets, file_names, processes=2)
+            for dataset, file_name in zip(datasets, file_names):
+                new_ds = local.load_file(file_name, dataset.variable)
+                np.testing.assert_array_equal(dataset.times, new_ds.times)
+        finally:
+            for file_name in file_names:
+                if os.path.isfile(file_name):
+                    os.remove(file_name)
+
 def ten_year_monthly_dataset():
     lats = np.array(range(-89, 90, 2))
     lons = np.array(range(-179, 180, 2))
@@ -23,6 +23,7 @@ import datetime as dt
 from ocw.dataset import Dataset, Bounds
 from ocw.evaluation import Evaluation
 from ocw.metrics import Bias, TemporalStdDev
+import ocw.events as events
 
 class TestEvaluation(unittest.TestCase):
     def setUp(self):
@@ -202,6 +203,24 @@ class TestEvaluation(unittest.TestCase):
         self.assertTrue(type(new_eval.unary_results) == type([]))
         self.assertTrue(new_eval.unary_results[0][0].shape[0] == 3) # number of datasets (ref + target)
 
+    def test_metric_completed_events(self):
+        new_eval = Evaluation(
+            self.test_dataset,
+            [self.test_dataset, self.another_test_dataset],
+            [Bias(), TemporalStdDev()]
+        )
+        received = []
+        with events.listening(received.append):
+            new_eval.run()
+
+        completed = [event for event in received
+                     if event['event'] == 'metric_completed']
+        # 2 targets * 1 binary metric + (1 reference + 2 targets) * 1 unary
+        self.assertEqual([event['completed'] for event in completed],
+                         [1, 2, 3, 4, 5])
+        self.assertTrue(all(event['total'] == 5 for event in completed))
+        self.assertEqual(completed[0]['metric'], 'Bias')
+        self.assertEqual(completed[-1]['metric'], 'TemporalStdDev')
 
 if __name__  == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+'''Unit tests for the events.py module'''
+
+import threading
+import unittest
+
+import ocw.events as events
+
+class TestEvents(unittest.TestCase):
+    def test_emit_without_listeners(self):
+        self.assertEqual(events.emit('dataset_loaded'), None)
+
+    def test_global_listener(self):
+        received = []
+        events.add_listener(received.append)
+        try:
+            thread = threading.Thread(target=events.emit,
+                                      args=('dataset_loaded',),
+                                      kwargs={'name': 'model'})
+            thread.start()
+            thread.join()
+        finally:
+            events.remove_listener(received.append)
+
+        events.emit('dataset_loaded', name='ignored')
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0]['event'], 'dataset_loaded')
+        self.assertEqual(received[0]['name'], 'model')
+        self.assertIn('time', received[0])
+
+    def test_thread_listener(self):
+        received = []
+        with events.listening(received.append):
+            events.emit('bytes_fetched', bytes=10)
+            thread = threading.Thread(target=events.emit,
+                                      args=('bytes_fetched',),
+                                      kwargs={'bytes': 20})
+            thread.start()
+            thread.join()
+
+        events.emit('bytes_fetched', bytes=30)
+
+        self.assertEqual([event['bytes'] for event in received], [10])
+
+    def test_failing_listener(self):
+        def fail(event):
+            raise ValueError()
+
+        received = []
+        with events.listening(fail):
+            with events.listening(received.append):
+                events.emit('plot_rendered')
+
+        self.assertEqual(len(received), 1)
+
+    def test_stage(self):
+        received = []
+        with events.listening(received.append):
+            with events.stage('subsetting', dataset='model'):
+                pass
+
+        self.assertEqual([event['event'] for event in received],
+                         ['stage_started', 'stage_finished'])
+        self.assertEqual(received[1]['stage'], 'subsetting')
+        self.assertEqual(received[1]['dataset'], 'model')
+        self.assertGreaterEqual(received[1]['seconds'], 0)
+
+    def test_failed_stage(self):
+        received = []
+        with events.listening(received.append):
+            with self.assertRaises(ValueError):
+                with events.stage('subsetting'):
+                    raise ValueError('Invalid bounds')
+
+        self.assertEqual([event['event'] for event in received],
+                         ['stage_started', 'stage_finished'])
+        self.assertEqual(received[1]['failed'], 'Invalid bounds')
+
+    def test_format_event(self):
+        event = {'event': 'stage_finished', 'time': 1.0,
+                 'stage': 'subsetting', 'seconds': 1.23456}
+
+        self.assertEqual(events.format_event(event),
+                         'stage_finished seconds=1.235 stage=subsetting')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import unittest
+import os
+import sys
+import json
+import subprocess
+
+import ocw
+
+# Modules that must stay light to import. Batch workers import these just to
+# build and process Datasets.
+CORE_MODULES = ['ocw.dataset', 'ocw.utils', 'ocw.dataset_processor',
+                'ocw.metrics', 'ocw.evaluation', 'ocw.statistical_downscaling',
+                'ocw.data_source.dap', 'ocw.esgf.search', 'ocw.esgf.logon']
+
+# Dependencies that are only imported by the functions that need them.
+HEAVY_MODULES = ['matplotlib', 'mpl_toolkits.basemap', 'scipy', 'netCDF4',
+                 'netcdftime', 'pydap.client', 'pyesgf', 'bs4']
+
+# Seconds that importing all of the core modules may add on top of numpy.
+IMPORT_TIME_BUDGET = 1.0
+
+BENCHMARK_SCRIPT = '''
+import json, sys, time
+import numpy, dateutil.relativedelta
+start = time.time()
+for name in %r:
+    __import__(name)
+elapsed = time.time() - start
+heavy = sorted(name for name in %r if name in sys.modules)
+print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))
+'''
+
+def _benchmark_imports(modules):
+    ''' Import modules in a fresh interpreter.
+
+    :returns: A dictionary with the seconds spent importing the modules under
+        'elapsed' and the heavy modules that they pulled in under 'heavy'.
+    '''
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(ocw.__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(
+        [root] + [path for path in [env.get('PYTHONPATH')] if path])
+    script = BENCHMARK_SCRIPT % (modules, HEAVY_MODULES)
+    output = subprocess.check_output([sys.executable, '-c', script], env=env)
+    return json.loads(output.splitlines()[-1])
+
+class TestImportTime(unittest.TestCase):
+    def test_core_modules_skip_heavy_dependencies(self):
+        for module in CORE_MODULES:
+            result = _benchmark_imports([module])
+            self.assertEqual(result['heavy'], [],
+                             '%s imports %s' % (module, result['heavy']))
+
+    def test_import_time_is_within_budget(self):
+        result = _benchmark_imports(CORE_MODULES)
+        self.assertLess(result['elapsed'], IMPORT_TIME_BUDGET,
+                        'Importing the core modules took %.2fs'
+                        % result['elapsed'])
+
+    def test_plotter_defers_basemap(self):
+        result = _benchmark_imports(['ocw.plotter'])
+        self.assertNotIn('mpl_toolkits.basemap', result['heavy'])
+        self.assertNotIn('scipy', result['heavy'])
+
+if __name__ == '__main__':
+    unittest.main()
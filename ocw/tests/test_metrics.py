@@ -229,6 +229,14 @@ class TestTemporalMeanBias(unittest.TestCase):
         expected_result.fill(-300)
         np.testing.assert_array_equal(self.mean_bias.run(self.target_dataset,self.reference_dataset), expected_result)
 
+    def test_float32_values(self):
+        '''Test that single precision datasets produce a single precision mean bias.'''
+        self.reference_dataset.values = self.reference_dataset.values.astype(np.float32)
+        self.target_dataset.values = self.target_dataset.values.astype(np.float32)
+        result = self.mean_bias.run(self.target_dataset, self.reference_dataset)
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_array_equal(result, np.zeros((5, 5)) - 300)
+
 class TestRMSError(unittest.TestCase):
     '''Test the metrics.RMSError metric.'''
     def setUp(self):
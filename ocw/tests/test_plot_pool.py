@@ -0,0 +1,163 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+'''Unit tests for the plot_pool.py module'''
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+import ocw.events as events
+import ocw.plot_pool as plot_pool
+from ocw.plot_pool import PlotPool
+import ocw.plotter as plotter
+
+class TestPlotPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data = [np.arange(10.), np.arange(5.)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def draw_histograms(self, processes):
+        fnames = [os.path.join(self.tmp_dir, 'hist_{}'.format(i))
+                  for i in range(3)]
+        received = []
+
+        with events.listening(received.append):
+            with PlotPool(processes) as pool:
+                # fname is passed both positionally and as a keyword.
+                pool.draw(plotter.draw_histogram, self.data, ['a', 'b'],
+                          fnames[0])
+                for fname in fnames[1:]:
+                    pool.draw(plotter.draw_histogram, self.data, ['a', 'b'],
+                              fname=fname)
+
+        return fnames, received
+
+    def test_parallel_plots(self):
+        fnames, received = self.draw_histograms(2)
+
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)),
+                         ['hist_0.png', 'hist_1.png', 'hist_2.png'])
+        self.assertEqual([event['file_name'] for event in received],
+                         ['hist_0.png', 'hist_1.png', 'hist_2.png'])
+
+    def test_single_process(self):
+        fnames, received = self.draw_histograms(1)
+
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)),
+                         ['hist_0.png', 'hist_1.png', 'hist_2.png'])
+        self.assertEqual(len(received), 3)
+
+    def test_in_process(self):
+        import matplotlib.pyplot as plt
+        plt.switch_backend('Agg')
+
+        pool = PlotPool()
+        pool.in_process = True
+        fname = os.path.join(self.tmp_dir, 'hist')
+        pool.draw(plotter.draw_histogram, self.data, ['a', 'b'], fname)
+
+        self.assertEqual(pool.join(), [fname + '.png'])
+        self.assertEqual(os.listdir(self.tmp_dir), ['hist.png'])
+
+    def test_in_process_keeps_other_figures(self):
+        import matplotlib.pyplot as plt
+        plt.switch_backend('Agg')
+
+        other = plt.figure()
+        try:
+            pool = PlotPool()
+            pool.in_process = True
+            pool.draw(plotter.draw_histogram, self.data, ['a', 'b'],
+                      os.path.join(self.tmp_dir, 'hist'))
+            pool.join()
+
+            self.assertEqual(plt.get_fignums(), [other.number])
+        finally:
+            plt.close(other)
+
+    def test_in_process_while_threads_run(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait)
+        thread.start()
+        try:
+            self.assertTrue(PlotPool(2).in_process)
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_shared_worker_pool(self):
+        workers = plot_pool.start_worker_pool(2)
+        try:
+            for name in ('first', 'second'):
+                with PlotPool(pool=workers) as pool:
+                    self.assertFalse(pool.in_process)
+                    pool.draw(plotter.draw_histogram, self.data, ['a', 'b'],
+                              os.path.join(self.tmp_dir, name))
+        finally:
+            workers.terminate()
+            workers.join()
+
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)),
+                         ['first.png', 'second.png'])
+
+    def test_join_returns_paths(self):
+        pool = PlotPool(2)
+        fname = os.path.join(self.tmp_dir, 'hist')
+        pool.draw(plotter.draw_histogram, self.data, ['a', 'b'], fname,
+                  fmt='pdf')
+
+        self.assertEqual(pool.join(), [fname + '.pdf'])
+
+    def test_failed_plot(self):
+        good_fname = os.path.join(self.tmp_dir, 'good')
+        bad_fname = os.path.join(self.tmp_dir, 'bad')
+
+        pool = PlotPool(2)
+        pool.draw(plotter.draw_histogram, [None], ['a'], fname=bad_fname)
+        pool.draw(plotter.draw_histogram, self.data, ['a', 'b'],
+                  fname=good_fname)
+
+        self.assertRaises(AttributeError, pool.join)
+        # The other plot is still written and no temporary file is left.
+        self.assertEqual(os.listdir(self.tmp_dir), ['good.png'])
+
+    def test_worker_basemap_cache(self):
+        plotter.clear_basemap_cache()
+        plotter.get_basemap(-10, 10, -20, 20, resolution='c')
+        cache = plotter.get_basemap_cache()
+        plotter.clear_basemap_cache()
+
+        plot_pool._init_worker(cache)
+        try:
+            self.assertEqual(len(plotter._basemap_cache), 1)
+        finally:
+            plotter.clear_basemap_cache()
+
+    def test_shared_pool_with_basemap_cache(self):
+        self.assertRaises(ValueError, PlotPool, basemap_cache={},
+                          pool=object())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,10 +17,94 @@
 
 '''Unit tests for the plotter.py module'''
 
+import os
+import pickle
+import shutil
+import tempfile
 import unittest
 
+import matplotlib.pyplot as plt
+import numpy as np
+
+import ocw.plotter as plotter
+
 class TestPlotter(unittest.TestCase):
     pass
 
+class TestBasemapCache(unittest.TestCase):
+    def setUp(self):
+        plotter.clear_basemap_cache()
+
+    def tearDown(self):
+        plotter.clear_basemap_cache()
+
+    def test_basemap_is_reused(self):
+        first = plotter.get_basemap(-10, 10, -20, 20)
+        first.ax = 'axes'
+        second = plotter.get_basemap(-10, 10, -20, 20)
+
+        self.assertIsNot(first, second)
+        self.assertIs(first.coastsegs, second.coastsegs)
+        self.assertEqual(second.ax, None)
+        self.assertEqual(len(plotter._basemap_cache), 1)
+
+    def test_basemap_key(self):
+        plotter.get_basemap(-10, 10, -20, 20)
+        plotter.get_basemap(-10, 10, -20, 20, resolution='c')
+        plotter.get_basemap(-10, 10, -20, 21)
+
+        self.assertEqual(len(plotter._basemap_cache), 3)
+
+    def test_cache_size_is_bounded(self):
+        old_max = plotter.MAX_CACHED_BASEMAPS
+        plotter.MAX_CACHED_BASEMAPS = 2
+        try:
+            for lat in range(3):
+                plotter.get_basemap(lat, 10, -20, 20, resolution='c')
+        finally:
+            plotter.MAX_CACHED_BASEMAPS = old_max
+
+        self.assertEqual([key[1][0] for key in plotter._basemap_cache],
+                         [1, 2])
+
+    def test_pickled_cache(self):
+        m = plotter.get_basemap(-10, 10, -20, 20)
+        plotter._get_projected_mesh(m, np.arange(-10, 11), np.arange(-20, 21))
+        cache = pickle.loads(pickle.dumps(plotter.get_basemap_cache(), 2))
+
+        plotter.clear_basemap_cache()
+        plotter.load_basemap_cache(cache)
+
+        self.assertEqual(len(plotter._basemap_cache), 1)
+        self.assertEqual(len(plotter._mesh_cache), 1)
+
+    def test_projected_mesh_is_reused(self):
+        m = plotter.get_basemap(-10, 10, -20, 20)
+        lats = np.arange(-10, 11)
+        lons = np.arange(-20, 21)
+        x, y = plotter._get_projected_mesh(m, lats, lons)
+
+        self.assertEqual(x.shape, (len(lats), len(lons)))
+        self.assertIs(plotter._get_projected_mesh(m, lats, lons)[0], x)
+        self.assertIsNot(plotter._get_projected_mesh(m, lats, lons + 1)[0], x)
+
+    def test_contour_maps_share_basemap(self):
+        plt.switch_backend('Agg')
+        tmp_dir = tempfile.mkdtemp()
+        lats = np.arange(-10, 11)
+        lons = np.arange(-20, 21)
+        values = np.random.rand(2, len(lats), len(lons))
+        try:
+            for i in range(2):
+                plotter.draw_contour_map(values, lats, lons,
+                                         os.path.join(tmp_dir, str(i)),
+                                         gridshape=(1, 2))
+                plt.close('all')
+        finally:
+            shutil.rmtree(tmp_dir)
+
+        self.assertEqual(len(plotter._basemap_cache), 1)
+        self.assertEqual(len(plotter._mesh_cache), 1)
+
 if __name__  == '__main__':
     unittest.main()
\ No newline at end of file
@@ -145,6 +145,31 @@ class TestNormalizeLatLonValues(unittest.TestCase):
                           self.lons_unsorted,
                           self.values2)
 
+class TestWorkingDtype(unittest.TestCase):
+    def tearDown(self):
+        utils.set_working_dtype(None)
+
+    def test_default(self):
+        self.assertIsNone(utils.get_working_dtype())
+
+    def test_set_working_dtype(self):
+        utils.set_working_dtype(np.float32)
+        self.assertEqual(utils.get_working_dtype(), np.float32)
+
+    def test_invalid_working_dtype(self):
+        self.assertRaises(ValueError, utils.set_working_dtype, np.int32)
+
+    def test_processing_dtype_keeps_floats(self):
+        utils.set_working_dtype(np.float64)
+        values = np.ones(3, dtype=np.float32)
+        self.assertEqual(utils.processing_dtype(values), np.float32)
+
+    def test_processing_dtype_of_integers(self):
+        values = np.ones(3, dtype=np.int32)
+        self.assertEqual(utils.processing_dtype(values), np.float64)
+        utils.set_working_dtype(np.float32)
+        self.assertEqual(utils.processing_dtype(values), np.float32)
+
 class TestReshapeMonthlyToAnnually(unittest.TestCase):
     ''' Testing function 'reshape_monthly_to_annually' from ocw.utils.py '''
 
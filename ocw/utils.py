@@ -23,17 +23,72 @@ import numpy as np
 import numpy.ma as ma
 import datetime 
 
-from mpl_toolkits.basemap import shiftgrid
 from dateutil.relativedelta import relativedelta
-from netCDF4 import num2date
 
-def decode_time_values(dataset, time_var_name):
+# The dtype that Dataset values are converted to on construction. None keeps
+# the dtype of the values that are passed in.
+_working_dtype = None
+
+def set_working_dtype(dtype):
+    ''' Set the global working dtype of Dataset values.
+
+    Every Dataset that is constructed without an explicit dtype converts its
+    values to the working dtype. Setting numpy.float32 halves the memory and
+    bandwidth used by loading, processing and writing Datasets.
+
+    :param dtype: A numpy floating point dtype, or None to keep the dtype of
+        the values passed to each Dataset.
+    :type dtype: :class:`numpy.dtype`
+
+    :raises ValueError: If dtype is not a floating point dtype.
+    '''
+    global _working_dtype
+
+    if dtype is not None:
+        dtype = np.dtype(dtype)
+        if not np.issubdtype(dtype, np.floating):
+            raise ValueError("The working dtype must be a floating point "
+                             "dtype, not %s" % dtype)
+    _working_dtype = dtype
+
+def get_working_dtype():
+    ''' Get the global working dtype of Dataset values.
+
+    :returns: The working dtype or None if Datasets keep the dtype of their
+        input values.
+    :rtype: :class:`numpy.dtype`
+    '''
+    return _working_dtype
+
+def processing_dtype(values):
+    ''' Get the dtype that values derived from an array should be stored in.
+
+    Floating point values keep their own dtype so that a Dataset's dtype is
+    carried through processing. Other values use the working dtype, or
+    float64 if no working dtype is set.
+
+    :param values: The array from which new values will be derived.
+    :type values: :class:`numpy.ndarray`
+
+    :returns: The dtype for the derived values.
+    :rtype: :class:`numpy.dtype`
+    '''
+    if np.issubdtype(values.dtype, np.floating):
+        return values.dtype
+    if _working_dtype is not None:
+        return _working_dtype
+    return np.dtype(np.float64)
+
+def decode_time_values(dataset, time_var_name, indices=None):
     ''' Decode NetCDF time values into Python datetime objects.
 
     :param dataset: The dataset from which time values should be extracted.
     :type dataset: netCDF4.Dataset
     :param time_var_name: The name of the time variable in dataset.
     :type time_var_name: :mod:`string`
+    :param indices: (Optional) The indices of the time values to decode. All
+        of the time values are decoded by default.
+    :type indices: :class:`list` of :class:`int`
 
     :returns: The list of converted datetime values.
 
@@ -43,6 +98,7 @@ def decode_time_values(dataset, time_var_name):
     '''
     time_data = dataset.variables[time_var_name]
     time_format = time_data.units
+    time_values = time_data[:] if indices is None else time_data[indices]
 
     time_units = parse_time_units(time_format)
     time_base = parse_time_base(time_format)
@@ -52,7 +108,7 @@ def decode_time_values(dataset, time_var_name):
     if time_units == 'months':
         # datetime.timedelta doesn't support a 'months' option. To remedy
         # this, a month == 30 days for our purposes.
-        for time_val in time_data:
+        for time_val in time_values:
             times.append(time_base + relativedelta(months=int(time_val)))
     else:
         try:
@@ -60,7 +116,9 @@ def decode_time_values(dataset, time_var_name):
         except:
             times_calendar = 'standard'
 
-        times = num2date(time_data[:], units=time_format, calendar=times_calendar)
+        from netCDF4 import num2date
+
+        times = num2date(time_values, units=time_format, calendar=times_calendar)
     return times
 
 def parse_time_units(time_format):
@@ -167,6 +225,85 @@ def parse_base_time_string(time_format):
 
     return time_format.split('since')[1].strip()
 
+def get_lat_lon_normalization(lats, lons):
+    ''' Determine how lat/lon values must be reordered to be normalized.
+
+    Ensure that lat/lon values are within [-180, 180)/[-90, 90) as well
+    as sorted. The input arrays are never modified. Instead the reordering
+    is returned as indices which can be applied to the lat and lon axes of
+    a values array. Reversals are returned as slices so applying them
+    produces views.
+
+    :param lats: A 1D numpy array of sorted lat values.
+    :type lats: :class:`numpy.ndarray`
+    :param lons: A 1D numpy array of sorted lon values.
+    :type lons: :class:`numpy.ndarray`
+
+    :returns: A :func:`tuple` of the form (adjusted_lats, adjusted_lons,
+        lat_index, lon_index). lat_index is a :class:`slice` and lon_index is
+        either a :class:`slice` or, if the lons had to be shifted, an integer
+        :class:`numpy.ndarray`.
+
+    :raises ValueError: If the lat/lon values are not sorted.
+    '''
+    if lats.ndim != 1 or lons.ndim != 1:
+        return lats, lons, slice(None), slice(None)
+
+    # Avoid unnecessary shifting if all lons are higher than 180
+    if lons.min() > 180:
+        lons = lons - 360
+
+    # Make sure lats and lons are monotonically increasing
+    lats_decreasing = np.diff(lats) < 0
+    lons_decreasing = np.diff(lons) < 0
+
+    # If all values are decreasing then they just need to be reversed
+    lats_reversed, lons_reversed = lats_decreasing.all(), lons_decreasing.all()
+
+    # If the lat values are unsorted then raise an exception
+    if not lats_reversed and lats_decreasing.any():
+        raise ValueError('Latitudes must be sorted.')
+
+    # Perform same checks now for lons
+    if not lons_reversed and lons_decreasing.any():
+        raise ValueError('Longitudes must be sorted.')
+
+    lat_index = slice(None, None, -1) if lats_reversed else slice(None)
+    lon_index = slice(None, None, -1) if lons_reversed else slice(None)
+    lats_out = lats[lat_index]
+    lons_out = lons[lon_index]
+
+    # Also check if lons go from [0, 360), and convert to [-180, 180)
+    # if necessary
+    if lons_out.max() > 180:
+        shift_index, num_wrapped = _get_lon_shift_index(lons_out)
+        lon_index = np.arange(len(lons))[lon_index][shift_index]
+        lons_out = lons_out[shift_index]
+        lons_out[:num_wrapped] -= 360
+
+    return lats_out, lons_out, lat_index, lon_index
+
+def _get_lon_shift_index(lons):
+    ''' Get the index which rolls sorted [0, 360) lons to end at 180.
+
+    This reproduces the reordering of basemap's ``shiftgrid(180, data, lons,
+    start=False)`` without copying any data.
+
+    :param lons: A 1D numpy array of increasing lon values.
+    :type lons: :class:`numpy.ndarray`
+
+    :returns: A :func:`tuple` of the form (shift_index, num_wrapped) where
+        the first num_wrapped shifted lons must have 360 subtracted.
+    '''
+    num_lons = len(lons)
+    # If the grid includes a cyclic point, remove the duplicate point
+    cyclic_offset = 0 if np.fabs(lons[-1] - lons[0] - 360) > 1.e-4 else 1
+    split = np.argmin(np.fabs(lons - 180))
+    shift_index = np.concatenate((np.arange(split, num_lons),
+                                  np.arange(cyclic_offset,
+                                            split + cyclic_offset)))
+    return shift_index, num_lons - split
+
 def normalize_lat_lon_values(lats, lons, values):
     ''' Normalize lat/lon values
 
@@ -184,45 +321,8 @@ def normalize_lat_lon_values(lats, lons, values):
 
     :raises ValueError: If the lat/lon values are not sorted.
     '''
-    if lats.ndim ==1 and lons.ndim ==1:
-        # Avoid unnecessary shifting if all lons are higher than 180
-        if lons.min() > 180:
-            lons -= 360
-
-    	# Make sure lats and lons are monotonically increasing
-    	lats_decreasing = np.diff(lats) < 0
-    	lons_decreasing = np.diff(lons) < 0
-
-    	# If all values are decreasing then they just need to be reversed
-    	lats_reversed, lons_reversed = lats_decreasing.all(), lons_decreasing.all()
-
-    	# If the lat values are unsorted then raise an exception
-    	if not lats_reversed and lats_decreasing.any():
-            raise ValueError('Latitudes must be sorted.')
-
-    	# Perform same checks now for lons
-    	if not lons_reversed and lons_decreasing.any():
-            raise ValueError('Longitudes must be sorted.')
-
-    	# Also check if lons go from [0, 360), and convert to [-180, 180)
-    	# if necessary
-    	lons_shifted = lons.max() > 180
-    	lats_out, lons_out, data_out = lats[:], lons[:], values[:]
-    	# Now correct data if latlon grid needs to be shifted
-    	if lats_reversed:
-            lats_out = lats_out[::-1]
-            data_out = data_out[..., ::-1, :]
-
-    	if lons_reversed:
-            lons_out = lons_out[::-1]
-            data_out = data_out[..., ::-1]
-
-    	if lons_shifted:
-            data_out, lons_out = shiftgrid(180, data_out, lons_out, start=False)
-
-        return lats_out, lons_out, data_out
-    else:
-        return lats, lons, values
+    lats_out, lons_out, lat_index, lon_index = get_lat_lon_normalization(lats, lons)
+    return lats_out, lons_out, values[..., lat_index, :][..., lon_index]
 
 
 def reshape_monthly_to_annually(dataset):
@@ -268,7 +368,9 @@ def calc_temporal_mean(dataset):
 
     :returns: Mean values averaged for the first dimension (time)
     '''
-    return ma.mean(dataset.values, axis=0)
+    # Accumulate in float64 to limit round-off for single precision values
+    mean = ma.mean(dataset.values, axis=0, dtype=np.float64)
+    return mean.astype(processing_dtype(dataset.values))
 
 def calc_climatology_year(dataset):
     ''' Calculate climatology of dataset's values for each year
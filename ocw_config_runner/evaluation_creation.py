@@ -22,6 +22,7 @@ import logging
 from ocw.dataset import Bounds
 from ocw.evaluation import Evaluation
 import ocw.dataset_processor as dsp
+import ocw.events as events
 import ocw.data_source.local as local
 import ocw.data_source.rcmed as rcmed
 import ocw.data_source.esgf as esgf
@@ -120,38 +121,42 @@ def _prepare_datasets_for_evaluation(reference, targets, config_data):
     if temporal_time_delta and temporal_time_delta == 1:
         string_time_delta = 'daily'
 
-    reference = dsp.normalize_dataset_datetimes(reference, string_time_delta)
-    targets = [dsp.normalize_dataset_datetimes(t, string_time_delta) for t in targets]
+    with events.stage('normalizing'):
+        reference = dsp.normalize_dataset_datetimes(reference, string_time_delta)
+        targets = [dsp.normalize_dataset_datetimes(t, string_time_delta) for t in targets]
 
     if subset:
         start = dateutil.parser.parse(subset[4])
         end = dateutil.parser.parse(subset[5])
         bounds = Bounds(subset[0], subset[1], subset[2], subset[3], start, end)
 
-        if reference:
-            reference = dsp.safe_subset(bounds, reference)
+        with events.stage('subsetting'):
+            if reference:
+                reference = dsp.safe_subset(bounds, reference)
 
-        if targets:
-            targets = [dsp.safe_subset(bounds, t) for t in targets]
+            if targets:
+                targets = [dsp.safe_subset(bounds, t) for t in targets]
 
     if temporal_time_delta:
         resolution = timedelta(temporal_time_delta)
 
-        if reference:
-            reference = dsp.temporal_rebin(reference, resolution)
+        with events.stage('temporal_rebin'):
+            if reference:
+                reference = dsp.temporal_rebin(reference, resolution)
 
-        if targets:
-            targets = [dsp.temporal_rebin(t, resolution) for t in targets]
+            if targets:
+                targets = [dsp.temporal_rebin(t, resolution) for t in targets]
 
     if spatial_regrid_lats and spatial_regrid_lons:
         lats = np.arange(spatial_regrid_lats[0], spatial_regrid_lats[1], spatial_regrid_lats[2])
         lons = np.arange(spatial_regrid_lons[0], spatial_regrid_lons[1], spatial_regrid_lons[2])
 
-        if reference:
-            reference = dsp.spatial_regrid(reference, lats, lons)
+        with events.stage('spatial_regrid'):
+            if reference:
+                reference = dsp.spatial_regrid(reference, lats, lons)
 
-        if targets:
-            targets = [dsp.spatial_regrid(t, lats, lons) for t in targets]
+            if targets:
+                targets = [dsp.spatial_regrid(t, lats, lons) for t in targets]
 
     return reference, targets
 
@@ -0,0 +1,335 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+''' Incremental evaluation runs that reuse the results of earlier runs.
+
+A config based evaluation is split into a graph of stages. Every stage is
+keyed by a hash of the config fragment it depends on and the keys or content
+hashes of its inputs:
+
+* **load**: A dataset's config and, for local files, their modification time
+  and size.
+* **prepare**: The load key and the evaluation settings (subset, temporal
+  and spatial re-binning).
+* **metric cells**: The metric and the content hashes of the datasets it is
+  run on, including the subregion subsets.
+* **plots**: A plot's config and the keys of the prepared datasets and
+  metric cells.
+
+The output of every stage is stored in an :class:`ArtifactStore`, so running
+a changed config again only recomputes the stages whose keys changed. For
+example, changing a plot setting only redraws that plot.
+'''
+
+import cPickle as pickle
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from evaluation_creation import (_load_dataset,
+                                 _load_metric,
+                                 _load_subregion,
+                                 _prepare_datasets_for_evaluation)
+from plot_generation import plot_from_config
+from ocw.evaluation import Evaluation
+import ocw.events as events
+
+import numpy as np
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+# The evaluation settings that prepared datasets depend on.
+PREPARE_SETTINGS = ['subset', 'temporal_time_delta', 'spatial_regrid_lats',
+                    'spatial_regrid_lons']
+
+class ArtifactStore(object):
+    ''' A directory of pickled stage outputs keyed by their stage keys. '''
+
+    def __init__(self, directory):
+        '''
+        :param directory: The directory that the artifacts are stored in. It
+            is created if it doesn't exist.
+        :type directory: :mod:`string`
+        '''
+        self.directory = directory
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def __contains__(self, key):
+        return os.path.exists(self._get_path(key))
+
+    def get(self, key, default=None):
+        ''' Get an artifact.
+
+        :param key: The stage key of the artifact.
+        :type key: :mod:`string`
+        :param default: (Optional) The value returned for a missing artifact.
+
+        :returns: The stored artifact or the default value.
+        '''
+        try:
+            with open(self._get_path(key), 'rb') as artifact_file:
+                return pickle.load(artifact_file)
+        except IOError:
+            return default
+
+    def put(self, key, value):
+        ''' Store an artifact.
+
+        The artifact is written to a temporary file first and renamed into
+        place, so an interrupted run never leaves a partial artifact.
+
+        :param key: The stage key of the artifact.
+        :type key: :mod:`string`
+        :param value: The pickleable artifact.
+        '''
+        path = self._get_path(key)
+        artifact_dir = os.path.dirname(path)
+        if not os.path.exists(artifact_dir):
+            os.makedirs(artifact_dir)
+
+        handle, temp_path = tempfile.mkstemp(dir=artifact_dir, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as artifact_file:
+                pickle.dump(value, artifact_file, pickle.HIGHEST_PROTOCOL)
+            os.rename(temp_path, path)
+        except:
+            os.remove(temp_path)
+            raise
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.pickle')
+
+class IncrementalEvaluation(Evaluation):
+    ''' An Evaluation that takes the results of metric runs on identical
+    datasets from an artifact store.
+    '''
+
+    def __init__(self, reference, targets, metrics, subregions=None,
+                 artifact_store=None):
+        '''
+        See :class:`ocw.evaluation.Evaluation` for the other parameters.
+
+        :param artifact_store: The store of the metric results.
+        :type artifact_store: :class:`ArtifactStore`
+        '''
+        super(IncrementalEvaluation, self).__init__(reference, targets,
+                                                    metrics, subregions)
+        self.artifact_store = artifact_store
+
+        #: The keys of the metric runs of the last run, in the order they
+        #: were made.
+        self.metric_cell_keys = []
+        #: The number of metric runs that were reused by the last run.
+        self.reused_metric_cells = 0
+        # The datasets hashed by the current run and their digests, keyed by
+        # the id of the dataset. The datasets are kept so that their ids
+        # aren't reused by other datasets during the run.
+        self._dataset_digests = {}
+
+    def run(self):
+        self.metric_cell_keys = []
+        self.reused_metric_cells = 0
+        self._dataset_digests = {}
+        try:
+            super(IncrementalEvaluation, self).run()
+        finally:
+            self._dataset_digests = {}
+
+    def _run_metric(self, metric, *datasets):
+        metric_name = '{}.{}'.format(metric.__class__.__module__,
+                                     metric.__class__.__name__)
+        key = _hash('metric', metric_name,
+                    [self._get_dataset_digest(dataset)
+                     for dataset in datasets])
+        self.metric_cell_keys.append(key)
+
+        if key not in self.artifact_store:
+            result = super(IncrementalEvaluation, self)._run_metric(metric,
+                                                                    *datasets)
+            self.artifact_store.put(key, result)
+            return result
+
+        self.reused_metric_cells += 1
+        self._metric_cells_completed += 1
+        events.emit('metric_completed',
+                    metric=metric.__class__.__name__,
+                    datasets=[dataset.name for dataset in datasets],
+                    completed=self._metric_cells_completed,
+                    total=self._metric_cells_total,
+                    reused=True)
+        return self.artifact_store.get(key)
+
+    def _get_dataset_digest(self, dataset):
+        ''' Hash a dataset once per run, however many metrics it is used by. '''
+        if id(dataset) not in self._dataset_digests:
+            self._dataset_digests[id(dataset)] = (dataset,
+                                                  _hash_dataset(dataset))
+        return self._dataset_digests[id(dataset)][1]
+
+def run_incremental_evaluation(config_data, artifact_store, plot_processes=None):
+    ''' Run an evaluation from configuration data, reusing stored results.
+
+    :param config_data: Dictionary of the data parsed from the supplied YAML
+        configuration file.
+    :type config_data: :func:`dict`
+    :param artifact_store: The store of the stage outputs.
+    :type artifact_store: :class:`ArtifactStore`
+    :param plot_processes: (Optional) The number of plots that are drawn
+        concurrently. Defaults to the number of CPUs.
+    :type plot_processes: :class:`int`
+
+    :returns: A summary of the run with the number of computed and reused
+        outputs of every stage. Its keys are 'loaded', 'prepared',
+        'metric_cells' and 'plots', each mapping to a dictionary with the
+        keys 'computed' and 'reused'.
+    :rtype: :func:`dict`
+    '''
+    summary = {stage: {'computed': 0, 'reused': 0}
+               for stage in ['loaded', 'prepared', 'metric_cells', 'plots']}
+
+    # Prepare datasets
+    reference = None
+    targets = []
+    prepare_keys = []
+    datasets_config = config_data.get('datasets') or {}
+
+    if 'reference' in datasets_config:
+        reference, key = _get_prepared_dataset(datasets_config['reference'],
+                                               config_data, artifact_store,
+                                               summary)
+        prepare_keys.append(key)
+
+    for target_config in datasets_config.get('targets', []):
+        target, key = _get_prepared_dataset(target_config, config_data,
+                                            artifact_store, summary)
+        targets.append(target)
+        prepare_keys.append(key)
+
+    # Metrics cells
+    eval_metrics = []
+    if config_data['metrics']:
+        eval_metrics = [_load_metric(m)() for m in config_data['metrics']]
+
+    subregions = None
+    if 'subregions' in config_data:
+        subregions = [_load_subregion(s) for s in config_data['subregions']]
+
+    evaluation = IncrementalEvaluation(reference, targets, eval_metrics,
+                                       subregions=subregions,
+                                       artifact_store=artifact_store)
+
+    if evaluation._evaluation_is_valid():
+        with events.stage('evaluating'):
+            evaluation.run()
+
+    reused = evaluation.reused_metric_cells
+    summary['metric_cells']['reused'] = reused
+    summary['metric_cells']['computed'] = len(evaluation.metric_cell_keys) - reused
+
+    # Plots
+    stale_plots = []
+    plot_keys = []
+    for plot in config_data.get('plots', []):
+        # Plots are written to the working directory.
+        key = _hash('plot', plot, os.getcwd(), prepare_keys,
+                    evaluation.metric_cell_keys)
+        plot_paths = artifact_store.get(key)
+
+        if plot_paths and all(os.path.exists(path) for path in plot_paths):
+            summary['plots']['reused'] += 1
+            events.emit('artifact_reused', stage='plot', plot_type=plot['type'])
+        else:
+            stale_plots.append(plot)
+            plot_keys.append(key)
+
+    if stale_plots:
+        with events.stage('plotting'):
+            all_paths = plot_from_config(evaluation, {'plots': stale_plots},
+                                         plot_processes)
+
+        for key, plot_paths in zip(plot_keys, all_paths):
+            artifact_store.put(key, [os.path.abspath(path)
+                                     for path in plot_paths])
+        summary['plots']['computed'] = len(stale_plots)
+
+    return summary
+
+def _get_prepared_dataset(dataset_config, config_data, artifact_store,
+                          summary):
+    ''' Get a prepared dataset from the artifact store or load and prepare it.
+
+    :returns: The prepared dataset and its prepare key.
+    '''
+    load_key = _hash('load', dataset_config, _get_source_fingerprint(dataset_config))
+    prepare_settings = {name: config_data['evaluation'].get(name)
+                        for name in PREPARE_SETTINGS}
+    prepare_key = _hash('prepare', load_key, prepare_settings)
+
+    prepared = artifact_store.get(prepare_key)
+    if prepared is not None:
+        summary['prepared']['reused'] += 1
+        events.emit('artifact_reused', stage='prepare', name=prepared.name)
+        return prepared, prepare_key
+
+    dataset = artifact_store.get(load_key)
+    if dataset is None:
+        dataset = _load_dataset(dataset_config)
+        artifact_store.put(load_key, dataset)
+        summary['loaded']['computed'] += 1
+    else:
+        summary['loaded']['reused'] += 1
+        events.emit('artifact_reused', stage='load', name=dataset.name)
+
+    prepared, _ = _prepare_datasets_for_evaluation(dataset, [], config_data)
+    artifact_store.put(prepare_key, prepared)
+    summary['prepared']['computed'] += 1
+    return prepared, prepare_key
+
+def _get_source_fingerprint(dataset_config):
+    ''' Identify the version of a dataset's source data.
+
+    Local files are identified by their modification time and size. Remote
+    sources are assumed not to change.
+    '''
+    if dataset_config.get('data_source') != 'local':
+        return None
+
+    stat = os.stat(dataset_config['path'])
+    return [stat.st_mtime, stat.st_size]
+
+def _hash(*parts):
+    ''' Hash JSON serializable config fragments and keys. '''
+    serialized = json.dumps(parts, sort_keys=True, default=repr)
+    return hashlib.sha1(serialized).hexdigest()
+
+def _hash_dataset(dataset):
+    ''' Hash the content of a dataset that metrics depend on. '''
+    digest = hashlib.sha1()
+    digest.update(str([dataset.variable, dataset.units]))
+
+    for values in [dataset.lats, dataset.lons, dataset.values]:
+        values = np.ma.asarray(values)
+        digest.update(str((values.dtype, values.shape)))
+        digest.update(np.ascontiguousarray(values.filled(0)).tostring())
+        digest.update(np.ascontiguousarray(np.ma.getmaskarray(values)).tostring())
+
+    digest.update(str([str(time) for time in dataset.times]))
+    return digest.hexdigest()
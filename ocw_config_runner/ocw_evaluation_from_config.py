@@ -17,17 +17,21 @@
 
 import argparse
 import logging
+import sys
 
 from configuration_parsing import is_config_valid
 from evaluation_creation import generate_evaluation_from_config
+from incremental_evaluation import ArtifactStore, run_incremental_evaluation
 from plot_generation import plot_from_config
+import ocw.events as events
 
 import yaml
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
-def run_evaluation_from_config(config_file_path, ignore_config_errors=False):
+def run_evaluation_from_config(config_file_path, ignore_config_errors=False,
+                               plot_processes=None, artifact_store=None):
     """ Run an OCW evaluation specified by a config file.
 
     :param config_file_path: The file path to a OCW compliant YAML file
@@ -42,6 +46,16 @@ def run_evaluation_from_config(config_file_path, ignore_config_errors=False):
         to graph something that doesn't require a full evaluation run. This is
         provided for that situation.
     :type ignore_config_errors: :func:`bool`
+
+    :param plot_processes: (Optional) The number of plots that are drawn
+        concurrently. Defaults to the number of CPUs.
+    :type plot_processes: :class:`int`
+
+    :param artifact_store: (Optional) The directory where the loaded and
+        prepared datasets, metric results and plot records are stored. When
+        it is given, only the stages whose config or inputs changed since an
+        earlier run are recomputed.
+    :type artifact_store: :mod:`string`
     """
     config = yaml.load(open(config_file_path, 'r'))
 
@@ -53,12 +67,29 @@ def run_evaluation_from_config(config_file_path, ignore_config_errors=False):
 
         sys.exit(1)
 
+    if artifact_store:
+        summary = run_incremental_evaluation(config,
+                                             ArtifactStore(artifact_store),
+                                             plot_processes)
+        logger.info('Incremental evaluation run: %s', summary)
+        return
+
     evaluation = generate_evaluation_from_config(config)
 
     if evaluation._evaluation_is_valid():
-        evaluation.run()
+        with events.stage('evaluating'):
+            evaluation.run()
+
+    with events.stage('plotting'):
+        plot_from_config(evaluation, config, plot_processes)
 
-    plot_from_config(evaluation, config)
+def print_progress_event(event):
+    """ Print a progress event to stderr.
+
+    :param event: The event as passed to :mod:`ocw.events` listeners.
+    :type event: :func:`dict`
+    """
+    sys.stderr.write(events.format_event(event) + '\n')
 
 if __name__ == '__main__':
     description = 'OCW Config Based Evaluation'
@@ -67,6 +98,20 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description=description, epilog=epilog)
     parser.add_argument('config', help='Path to YAML config file for the evaluation')
     parser.add_argument('ignore_config_errors', nargs='?', default=False, type=bool)
+    parser.add_argument('--progress', action='store_true',
+                        help='Print progress events such as loaded datasets '
+                             'and stage timings to stderr')
+    parser.add_argument('--plot-processes', type=int, default=None,
+                        help='Number of plots drawn concurrently. Defaults to '
+                             'the number of CPUs')
+    parser.add_argument('--artifact-store', default=None,
+                        help='Directory to keep datasets, metric results and '
+                             'plot records in so that runs of a changed config '
+                             'only recompute what changed')
     args = parser.parse_args()
 
-    run_evaluation_from_config(args.config, args.ignore_config_errors)
+    if args.progress:
+        events.add_listener(print_progress_event)
+
+    run_evaluation_from_config(args.config, args.ignore_config_errors,
+                               args.plot_processes, args.artifact_store)
@@ -18,6 +18,7 @@
 import logging
 
 import ocw.dataset_processor as dsp
+from ocw.plot_pool import PlotPool
 import ocw.plotter as plots
 import ocw.utils as utils
 
@@ -26,7 +27,7 @@ import numpy as np
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
-def plot_from_config(evaluation, config_data):
+def plot_from_config(evaluation, config_data, processes=None):
     """ Generate plots for an evaluation from configuration data.
 
     :param evaluation: The Evaluation for which to generate plots.
@@ -34,22 +35,45 @@ def plot_from_config(evaluation, config_data):
     :param config_data: Dictionary of the data parsed from the supplied YAML
         configuration file.
     :type: :func:`dict`
+    :param processes: (Optional) The number of plots that are drawn
+        concurrently. Defaults to the number of CPUs.
+    :type processes: :class:`int`
+
+    :returns: A list with the list of plot file paths of every entry of the
+        plots settings.
+    :rtype: :class:`list`
     """
-    for plot in config_data['plots']:
-        if plot['type'] == 'contour':
-            _draw_contour_plot(evaluation, plot)
-        elif plot['type'] == 'subregion':
-            _draw_subregion_diagram(evaluation, plot)
-        elif plot['type'] == 'taylor':
-            _draw_taylor_diagram(evaluation, plot)
-        elif plot['type'] == 'time_series':
-            _draw_time_series_plot(evaluation, plot)
-        elif plot['type'] == 'portrait':
-            _draw_portrait_diagram(evaluation, plot)
-        else:
-            logger.error('Unrecognized plot type requested: {}'.format(plot['type']))
-
-def _draw_contour_plot(evaluation, plot_config):
+    # The number of files that every entry of the plots settings queues.
+    num_files = []
+
+    with PlotPool(processes) as pool:
+        for plot in config_data['plots']:
+            queued = pool.queued
+
+            if plot['type'] == 'contour':
+                _draw_contour_plot(evaluation, plot, pool)
+            elif plot['type'] == 'subregion':
+                _draw_subregion_diagram(evaluation, plot, pool)
+            elif plot['type'] == 'taylor':
+                _draw_taylor_diagram(evaluation, plot, pool)
+            elif plot['type'] == 'time_series':
+                _draw_time_series_plot(evaluation, plot, pool)
+            elif plot['type'] == 'portrait':
+                _draw_portrait_diagram(evaluation, plot, pool)
+            else:
+                logger.error('Unrecognized plot type requested: {}'.format(plot['type']))
+
+            num_files.append(pool.queued - queued)
+
+        paths = pool.join()
+
+    plot_paths = []
+    for count in num_files:
+        plot_paths.append(paths[:count])
+        paths = paths[count:]
+    return plot_paths
+
+def _draw_contour_plot(evaluation, plot_config, pool):
     """"""
     lats = plot_config['lats']
     if type(lats) != type(list):
@@ -68,13 +92,14 @@ def _draw_contour_plot(evaluation, plot_config):
             vals = evaluation.results[target][metric][subregion]
 
         plot_name = plot_config['output_name'] + '_{}'.format(i)
-        plots.draw_contour_map(vals,
-                               np.array(lats),
-                               np.array(lons),
-                               plot_name,
-                               **plot_config.get('optional_args', {}))
-
-def _draw_taylor_diagram(evaluation, plot_config):
+        pool.draw(plots.draw_contour_map,
+                  vals,
+                  np.array(lats),
+                  np.array(lons),
+                  plot_name,
+                  **plot_config.get('optional_args', {}))
+
+def _draw_taylor_diagram(evaluation, plot_config, pool):
     """"""
     plot_name = plot_config['output_name']
     ref_dataset_name = evaluation.ref_dataset.name
@@ -103,13 +128,14 @@ def _draw_taylor_diagram(evaluation, plot_config):
 
     plot_data = np.array([stddev_results, pattern_corr_results]).transpose()
 
-    plots.draw_taylor_diagram(plot_data,
-                              target_dataset_names,
-                              ref_dataset_name,
-                              fname=plot_name,
-                              **plot_config.get('optional_args', {}))
+    pool.draw(plots.draw_taylor_diagram,
+              plot_data,
+              target_dataset_names,
+              ref_dataset_name,
+              fname=plot_name,
+              **plot_config.get('optional_args', {}))
 
-def _draw_subregion_diagram(evaluation, plot_config):
+def _draw_subregion_diagram(evaluation, plot_config, pool):
     """"""
     lats = plot_config['lats']
     if type(lats) != type(list):
@@ -119,13 +145,14 @@ def _draw_subregion_diagram(evaluation, plot_config):
     if type(lons) != type(list):
         lons = np.arange(lons['range_min'], lons['range_max'], lons['range_step'])
 
-    plots.draw_subregions(evaluation.subregions,
-                          lats,
-                          lons,
-                          plot_config['output_name'],
-                          **plot_config.get('optional_args', {}))
+    pool.draw(plots.draw_subregions,
+              evaluation.subregions,
+              lats,
+              lons,
+              plot_config['output_name'],
+              **plot_config.get('optional_args', {}))
 
-def _draw_portrait_diagram(evaluation, plot_config):
+def _draw_portrait_diagram(evaluation, plot_config, pool):
     """"""
     metric_index = plot_config['metric_index']
 
@@ -133,13 +160,14 @@ def _draw_portrait_diagram(evaluation, plot_config):
     subregion_names = ["R{}".format(i) for i in range(len(evaluation.subregions))]
     target_names = [t.name for t in evaluation.target_datasets]
 
-    plots.draw_portrait_diagram(diagram_data,
-                                target_names,
-                                subregion_names,
-                                fname=plot_config['output_name'],
-                                **plot_config.get('optional_args', {}))
+    pool.draw(plots.draw_portrait_diagram,
+              diagram_data,
+              target_names,
+              subregion_names,
+              fname=plot_config['output_name'],
+              **plot_config.get('optional_args', {}))
 
-def _draw_time_series_plot(evaluation, plot_config):
+def _draw_time_series_plot(evaluation, plot_config, pool):
     """"""
     time_range_info = plot_config['time_range']
     ref_ds = evaluation.ref_dataset
@@ -180,11 +208,12 @@ def _draw_time_series_plot(evaluation, plot_config):
                 results.append(utils.calc_time_series(subset))
                 labels.append(subset.name)
 
-            plots.draw_time_series(np.array(results),
-                                   ref_ds.times,
-                                   labels,
-                                   'R{}'.format(bound_count),
-                                   **plot_config.get('optional_args', {}))
+            pool.draw(plots.draw_time_series,
+                      np.array(results),
+                      ref_ds.times,
+                      labels,
+                      'R{}'.format(bound_count),
+                      **plot_config.get('optional_args', {}))
 
     else:
         results = []
@@ -197,8 +226,9 @@ def _draw_time_series_plot(evaluation, plot_config):
             results.append(utils.calc_time_series(t))
             labels.append(t.name)
 
-        plots.draw_time_series(np.array(results),
-                               ref_ds.times,
-                               labels,
-                               'time_series',
-                               **plot_config.get('optional_args', {}))
+        pool.draw(plots.draw_time_series,
+                  np.array(results),
+                  ref_ds.times,
+                  labels,
+                  'time_series',
+                  **plot_config.get('optional_args', {}))
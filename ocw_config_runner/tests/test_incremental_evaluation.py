@@ -0,0 +1,177 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import copy
+import datetime as dt
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+import incremental_evaluation as incremental
+from ocw.dataset import Dataset
+import ocw.dataset_processor as dsp
+
+import numpy as np
+
+class TestArtifactStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = incremental.ArtifactStore(os.path.join(self.tmp_dir,
+                                                            'store'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_put_and_get(self):
+        self.store.put('abcdef', {'values': [1, 2]})
+
+        self.assertIn('abcdef', self.store)
+        self.assertEqual(self.store.get('abcdef'), {'values': [1, 2]})
+
+    def test_missing_artifact(self):
+        self.assertNotIn('abcdef', self.store)
+        self.assertEqual(self.store.get('abcdef', 'default'), 'default')
+
+class TestIncrementalEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.tmp_dir)
+
+        lats = np.arange(-10, 10, 2.)
+        lons = np.arange(-20, 20, 2.)
+        times = np.array([dt.datetime(2000, 1, 1) + dt.timedelta(days=30 * i)
+                          for i in range(24)])
+        for name in ['ref', 'target']:
+            values = np.random.rand(len(times), len(lats), len(lons))
+            dataset = Dataset(lats, lons, times, values, variable='tas',
+                              units='K')
+            dsp.write_netcdf(dataset, os.path.join(self.tmp_dir, name + '.nc'))
+
+        self.config = {
+            'evaluation': {
+                'temporal_time_delta': 365,
+                'spatial_regrid_lats': (-8, 8, 2),
+                'spatial_regrid_lons': (-18, 18, 2)
+            },
+            'datasets': {
+                'reference': self._dataset_config('ref'),
+                'targets': [self._dataset_config('target')]
+            },
+            'metrics': ['Bias'],
+            'plots': [{
+                'type': 'contour',
+                'results_indices': [(0, 0)],
+                'lats': {'range_min': -8, 'range_max': 8, 'range_step': 2},
+                'lons': {'range_min': -18, 'range_max': 18, 'range_step': 2},
+                'output_name': 'bias',
+                'optional_args': {'ptitle': 'Bias', 'gridshape': (3, 3)}
+            }]
+        }
+        self.store = incremental.ArtifactStore(os.path.join(self.tmp_dir,
+                                                            'store'))
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp_dir)
+
+    def _dataset_config(self, name):
+        return {
+            'data_source': 'local',
+            'file_count': 1,
+            'path': os.path.join(self.tmp_dir, name + '.nc'),
+            'variable': 'tas'
+        }
+
+    def run_evaluation(self, config):
+        return incremental.run_incremental_evaluation(config, self.store,
+                                                      plot_processes=1)
+
+    def test_unchanged_config_is_reused(self):
+        first = self.run_evaluation(self.config)
+        second = self.run_evaluation(self.config)
+
+        self.assertEqual(first['loaded'], {'computed': 2, 'reused': 0})
+        self.assertEqual(first['metric_cells'], {'computed': 1, 'reused': 0})
+        self.assertEqual(first['plots'], {'computed': 1, 'reused': 0})
+        self.assertTrue(os.path.exists('bias_0.png'))
+
+        self.assertEqual(second['loaded'], {'computed': 0, 'reused': 0})
+        self.assertEqual(second['prepared'], {'computed': 0, 'reused': 2})
+        self.assertEqual(second['metric_cells'], {'computed': 0, 'reused': 1})
+        self.assertEqual(second['plots'], {'computed': 0, 'reused': 1})
+
+    def test_changed_plot_is_redrawn(self):
+        self.run_evaluation(self.config)
+
+        config = copy.deepcopy(self.config)
+        config['plots'][0]['optional_args']['ptitle'] = 'Mean bias'
+        summary = self.run_evaluation(config)
+
+        self.assertEqual(summary['metric_cells'], {'computed': 0, 'reused': 1})
+        self.assertEqual(summary['plots'], {'computed': 1, 'reused': 0})
+
+    def test_deleted_plot_is_redrawn(self):
+        self.run_evaluation(self.config)
+        os.remove('bias_0.png')
+        summary = self.run_evaluation(self.config)
+
+        self.assertEqual(summary['plots'], {'computed': 1, 'reused': 0})
+        self.assertTrue(os.path.exists('bias_0.png'))
+
+    def test_changed_preparation(self):
+        self.config['plots'] = []
+        self.run_evaluation(self.config)
+
+        config = copy.deepcopy(self.config)
+        config['evaluation']['temporal_time_delta'] = 30
+        summary = self.run_evaluation(config)
+
+        self.assertEqual(summary['loaded'], {'computed': 0, 'reused': 2})
+        self.assertEqual(summary['prepared'], {'computed': 2, 'reused': 0})
+        self.assertEqual(summary['metric_cells'], {'computed': 1, 'reused': 0})
+
+    def test_added_metric(self):
+        self.config['plots'] = []
+        self.run_evaluation(self.config)
+
+        config = copy.deepcopy(self.config)
+        config['metrics'].append('TemporalStdDev')
+        summary = self.run_evaluation(config)
+
+        # The binary Bias run is reused. TemporalStdDev is run on the
+        # reference and the target.
+        self.assertEqual(summary['metric_cells'], {'computed': 2, 'reused': 1})
+
+    def test_datasets_are_hashed_once_per_run(self):
+        self.config['plots'] = []
+        self.config['metrics'].append('TemporalStdDev')
+
+        with patch('incremental_evaluation._hash_dataset',
+                   wraps=incremental._hash_dataset) as hash_dataset:
+            self.run_evaluation(self.config)
+            # Bias uses both datasets and TemporalStdDev uses each of them.
+            self.assertEqual(hash_dataset.call_count, 2)
+
+            self.run_evaluation(self.config)
+            self.assertEqual(hash_dataset.call_count, 4)
+
+if __name__ == '__main__':
+    unittest.main()